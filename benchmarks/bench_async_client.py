@@ -0,0 +1,49 @@
+"""
+Measure AsyncGitHubClient file-fetch throughput at different concurrency limits.
+
+Every file of a synthetic repository is fetched from a local FakeGitHubServer with a
+fixed per-request latency; concurrency 1 is the serial baseline the old blocking
+client amounted to.
+
+Usage:
+    python -m benchmarks.bench_async_client --files 500 --latency 0.02 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from benchmarks.bench_ingest import make_files
+from benchmarks.fake_github import FakeGitHubServer
+from src.api.async_client import AsyncGitHubClient
+
+
+async def fetch_all(server: FakeGitHubServer, concurrency: int) -> int:
+    async with AsyncGitHubClient("benchmark-token", base_url=server.base_url,
+                                 max_concurrency=concurrency, max_connections=concurrency) as client:
+        contents = await asyncio.gather(*(
+            client.get_file_content(server.full_name, path) for path in server.files
+        ))
+    return sum(1 for content in contents if content is not None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=500, help="number of files in the synthetic repo")
+    parser.add_argument("--latency", type=float, default=0.02, help="per-request server latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="concurrency limits to measure")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with FakeGitHubServer(make_files(args.files), latency=args.latency) as server:
+        for concurrency in args.concurrency:
+            server.reset_counters()
+            start = time.perf_counter()
+            fetched = asyncio.run(fetch_all(server, concurrency))
+            elapsed = time.perf_counter() - start
+            print(f"concurrency {concurrency:>3}: {fetched} files in {elapsed:.3f}s "
+                  f"({fetched / elapsed:.0f} files/s, {server.request_count} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark batch analysis throughput in repositories per hour.
+
+A local FakeGitHubServer serves the same synthetic repository under many names and a
+FakeChatServer answers the description requests, both with per-request latency, so
+the numbers reflect how well a batch overlaps its network waits.
+
+Usage:
+    python -m benchmarks.bench_batch --repos 200 --files 40 --latency 0.02 --chat-latency 1.0 --concurrency 1 8 32
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.bench_ingest import make_files
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.fake_openai import FakeChatServer
+from src.batch import BatchRunner
+from src.config.config_manager import ConfigManager
+from src.main import RepoInsight
+
+
+def make_config(directory: str, github_url: str, chat_url: str) -> ConfigManager:
+    settings = {
+        'github': {'api_token': 'token', 'api_url': github_url, 'max_concurrency': 32},
+        'openai': {'api_key': 'key', 'api_base': chat_url, 'max_concurrency': 16},
+        # Every repository has the same content, so on-disk caches would make all but the first free.
+        'cache': {'directory': None},
+    }
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as config_file:
+        yaml.safe_dump(settings, config_file)
+    return ConfigManager(path)
+
+
+async def run(config: ConfigManager, urls, concurrency: int, timeout: float):
+    repo_insight = RepoInsight(config)
+    out = io.StringIO()
+    try:
+        start = time.perf_counter()
+        counts = await BatchRunner(repo_insight, concurrency=concurrency, timeout=timeout).run(urls, out)
+        return time.perf_counter() - start, counts
+    finally:
+        await repo_insight.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repos", type=int, default=100, help="repositories in the batch")
+    parser.add_argument("--files", type=int, default=40, help="files per repository")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of GitHub latency per request")
+    parser.add_argument("--chat-latency", type=float, default=1.0, help="seconds of latency per chat completion")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="repositories analyzed at once")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per repository")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    names = [f"octo/repo{index}" for index in range(args.repos)]
+    with FakeGitHubServer(make_files(args.files), owner="octo", name="repo0", latency=args.latency,
+                          mirrors=names[1:]) as github, \
+            FakeChatServer(latency=args.chat_latency) as chat, \
+            tempfile.TemporaryDirectory() as directory:
+        config = make_config(directory, github.base_url, chat.base_url)
+        urls = [f"https://github.com/{name}" for name in names]
+        for concurrency in args.concurrency:
+            github.reset_counters()
+            elapsed, counts = asyncio.run(run(config, urls, concurrency, args.timeout))
+            print(f"concurrency {concurrency:>3}: {len(urls)} repos in {elapsed:7.2f}s, "
+                  f"{len(urls) / elapsed * 3600:9.0f} repos/hour, {github.request_count} GitHub requests, "
+                  f"{counts['error']} failed, {counts['timeout']} timed out")
+
+
+if __name__ == "__main__":
+    main()
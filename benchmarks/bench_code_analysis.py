@@ -0,0 +1,81 @@
+"""
+Benchmark Python code analysis inline against a process pool of increasing size.
+
+Every run parses the same synthetic modules with analyze_python_module, either on
+the calling thread or through ProcessPoolRunner.map, and reports throughput and
+speedup over the inline run. Parsing is CPU-bound, so expect speedups to follow the
+number of available cores.
+
+Usage:
+    python -m benchmarks.bench_code_analysis --files 400 --functions 200 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List, Tuple
+
+from src.analysis.code_analyzer import analyze_python_module
+from src.analysis.parallel import ProcessPoolRunner
+
+
+def make_sources(count: int, functions: int) -> List[Tuple[str, str]]:
+    """
+    Build synthetic Python modules.
+
+    Args:
+        count (int): Number of modules.
+        functions (int): Functions (each with a few statements) per module.
+
+    Returns:
+        List[Tuple[str, str]]: (file_path, content) pairs.
+    """
+    body = "".join(
+        f"def function{index}(value):\n"
+        f"    import os\n"
+        f"    total = value + {index}\n"
+        f"    items = [total * step for step in range(10)]\n"
+        f"    return sum(items)\n\n"
+        for index in range(functions)
+    )
+    return [(f"src/module{index}.py", f"class Module{index}:\n    pass\n\n{body}") for index in range(count)]
+
+
+async def run_pool(sources: List[Tuple[str, str]], workers: int, chunk_size: int) -> float:
+    pool = ProcessPoolRunner(workers, chunk_size=chunk_size)
+    try:
+        # Warm the workers up so process start-up is not measured.
+        await pool.map(analyze_python_module, sources[:workers])
+        start = time.perf_counter()
+        await pool.map(analyze_python_module, sources)
+        return time.perf_counter() - start
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=400, help="number of synthetic modules")
+    parser.add_argument("--functions", type=int, default=200, help="functions per module")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=16, help="files per worker round trip")
+    args = parser.parse_args()
+
+    sources = make_sources(args.files, args.functions)
+    megabytes = sum(len(content) for _, content in sources) / 1e6
+    print(f"{args.files} files, {megabytes:.1f} MB, {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    for source in sources:
+        analyze_python_module(*source)
+    inline = time.perf_counter() - start
+    print(f"   inline: {inline:.3f}s, {args.files / inline:.0f} files/s")
+
+    for workers in sorted(set(args.workers)):
+        elapsed = asyncio.run(run_pool(sources, workers, args.chunk_size))
+        print(f"{workers:>2} workers: {elapsed:.3f}s, {args.files / elapsed:.0f} files/s, "
+              f"{inline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
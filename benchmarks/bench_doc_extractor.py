@@ -0,0 +1,72 @@
+"""
+Benchmark DocExtractor's single-pass section index against the full HTML render.
+
+Both paths extract the same sections from synthetic READMEs and changelogs of
+increasing size; the results are checked to be identical before timing.
+
+Usage:
+    python -m benchmarks.bench_doc_extractor --sizes 10 100 1000 --repeat 3
+"""
+import argparse
+import logging
+import time
+
+from src.documentation.doc_extractor import DocExtractor
+
+
+def make_document(sections: int) -> str:
+    """
+    Build a synthetic markdown document: a title, a description, and many sections with
+    paragraphs, lists, inline code, links and code blocks.
+
+    Args:
+        sections (int): Number of release sections.
+
+    Returns:
+        str: The markdown document.
+    """
+    parts = ["# Demo Project\n", "A demo project used to benchmark documentation extraction.\n",
+             "It has a second paragraph.\n", "## Installation\n", "Install it with pip.\n",
+             "    pip install demo\n", "## Usage\n", "Run `demo --help` for the options.\n"]
+    for index in range(sections):
+        parts.append(f"## Release 1.{index}.0\n")
+        parts.append(f"Released on day {index}. See the [notes][notes-{index}] for details.\n")
+        parts.append("- Fixed a crash in the parser\n- Improved *startup* time\n- Updated dependencies\n")
+        parts.append("    def example():\n        return 42\n")
+        parts.append(f"Plain closing paragraph number {index} with no markup at all.\n")
+    parts.append("## Contributing\n")
+    parts.append("Pull requests are welcome.\n")
+    parts.extend(f"[notes-{index}]: https://example.com/releases/{index}\n" for index in range(sections))
+    return "\n".join(parts)
+
+
+def time_call(function, content: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="release sections per document")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the best is reported")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    extractor = DocExtractor()
+    for size in args.sizes:
+        content = make_document(size)
+        if extractor.extract_info(content) != extractor.extract_info_html(content):
+            raise SystemExit(f"Extractors disagree on the {size}-section document")
+        html = time_call(extractor.extract_info_html, content, args.repeat)
+        indexed = time_call(extractor.extract_info, content, args.repeat)
+        megabytes = len(content.encode()) / 1e6
+        print(f"{size:>6} sections, {megabytes:7.2f} MB: html {megabytes / html:7.2f} MB/s, "
+              f"index {megabytes / indexed:7.2f} MB/s, {html / indexed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
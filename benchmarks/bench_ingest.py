@@ -0,0 +1,122 @@
+"""
+Benchmark the per-file contents, archive and batched GraphQL ingest paths.
+
+Each path fetches a synthetic repository from a local FakeGitHubServer and run every
+file through CodeAnalyzer / DocExtractor, mirroring RepoInsight's ingest modes.
+
+Usage:
+    python -m benchmarks.bench_ingest --files 500 --latency 0.02
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from benchmarks.fake_github import FakeGitHubServer
+from src.analysis.code_analyzer import CodeAnalyzer
+from src.api.async_client import AsyncGitHubClient
+from src.api.github_api import GitHubAPI
+from src.api.graphql_blobs import BlobBatchFetcher
+from src.documentation.doc_extractor import DocExtractor
+from src.utils.file_utils import is_code_file, is_text_file
+
+
+def make_files(count: int) -> Dict[str, bytes]:
+    """
+    Build a synthetic repository with a mix of Python modules and markdown docs.
+
+    Args:
+        count (int): Number of files to generate.
+
+    Returns:
+        Dict[str, bytes]: File contents keyed by path.
+    """
+    files = {}
+    for index in range(count):
+        package = f"pkg{index % 20}"
+        if index % 5 == 0:
+            files[f"docs/{package}/guide{index}.md"] = (
+                f"# Guide {index}\n\nDescription of guide {index}.\n\n## Usage\n\nRun it.\n"
+            ).encode()
+        else:
+            files[f"src/{package}/module{index}.py"] = (
+                f"import os\n\nclass Thing{index}:\n    def run(self):\n        value = {index}\n        return value\n"
+            ).encode()
+    return files
+
+
+def analyze(file_path: str, content: str, code_analyzer: CodeAnalyzer, doc_extractor: DocExtractor):
+    if is_code_file(file_path):
+        code_analyzer.analyze_python_file(content)
+    if is_text_file(file_path):
+        doc_extractor.extract_info(content)
+
+
+def run_per_file(github_api: GitHubAPI, repo, structure: Dict[str, str]) -> int:
+    code_analyzer, doc_extractor = CodeAnalyzer(), DocExtractor()
+    analyzed = 0
+    for file_path, file_type in structure.items():
+        if file_type != "file" or not (is_code_file(file_path) or is_text_file(file_path)):
+            continue
+        content = github_api.get_file_content(repo, file_path)
+        if content:
+            analyze(file_path, content, code_analyzer, doc_extractor)
+            analyzed += 1
+    return analyzed
+
+
+def run_archive(github_api: GitHubAPI, repo) -> int:
+    code_analyzer, doc_extractor = CodeAnalyzer(), DocExtractor()
+    analyzed = 0
+    wanted = lambda path: is_code_file(path) or is_text_file(path)
+    for file_path, data in github_api.iter_archive_files(repo, predicate=wanted):
+        analyze(file_path, data.decode("utf-8"), code_analyzer, doc_extractor)
+        analyzed += 1
+    return analyzed
+
+
+def run_graphql(base_url: str, github_api: GitHubAPI, repo) -> int:
+    code_analyzer, doc_extractor = CodeAnalyzer(), DocExtractor()
+    entries = [
+        entry for entry in github_api.get_repository_tree(repo).values()
+        if entry.type == "file" and (is_code_file(entry.path) or is_text_file(entry.path))
+    ]
+
+    async def fetch() -> int:
+        analyzed = 0
+        async with AsyncGitHubClient("benchmark-token", base_url=base_url) as client:
+            async for file_path, content in BlobBatchFetcher(client).iter_blob_contents(repo.full_name, entries):
+                if content:
+                    analyze(file_path, content, code_analyzer, doc_extractor)
+                    analyzed += 1
+        return analyzed
+
+    return asyncio.run(fetch())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=300, help="number of files in the synthetic repo")
+    parser.add_argument("--latency", type=float, default=0.01, help="per-request server latency in seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with FakeGitHubServer(make_files(args.files), latency=args.latency) as server:
+        github_api = GitHubAPI("benchmark-token", base_url=server.base_url)
+        repo = github_api.get_repository(f"https://github.com/{server.full_name}")
+        structure = github_api.get_repository_structure(repo)
+
+        for label, run in (("per-file", lambda: run_per_file(github_api, repo, structure)),
+                           ("archive", lambda: run_archive(github_api, repo)),
+                           ("graphql", lambda: run_graphql(server.base_url, github_api, repo))):
+            server.reset_counters()
+            start = time.perf_counter()
+            analyzed = run()
+            elapsed = time.perf_counter() - start
+            print(f"{label:>9}: {analyzed} files in {elapsed:.3f}s, "
+                  f"{server.request_count} requests, {server.bytes_sent / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark analyzing a local working tree and a bare repository against the GitHub API.
+
+A synthetic repository of Python modules is committed to a working tree, cloned bare
+and repacked so its blobs live in a packfile, and served by a local FakeGitHubServer
+with per-request latency. Each source runs RepoInsight.analyze_repository_files with
+caching off, so every run lists the tree and reads and parses every file. The local
+sources need no network, so they measure the analyzers themselves at scale.
+
+Usage:
+    python -m benchmarks.bench_local_repo --files 1000 --functions 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.bench_code_analysis import make_sources
+from benchmarks.bench_pipeline import make_config
+from benchmarks.fake_github import FakeGitHubServer
+from src.main import RepoInsight
+
+
+def git(directory: str, *args: str):
+    subprocess.run(["git", "-c", "user.name=Bench", "-c", "user.email=bench@example.com", *args],
+                   cwd=directory, check=True, capture_output=True)
+
+
+def make_repositories(directory: str, files: Dict[str, bytes]):
+    """
+    Commit files to a working tree and clone it into a packed bare repository.
+
+    Returns:
+        Tuple[str, str]: Paths of the working tree and the bare repository.
+    """
+    work = os.path.join(directory, "bench", "repo")
+    for path, data in files.items():
+        os.makedirs(os.path.dirname(os.path.join(work, path)), exist_ok=True)
+        with open(os.path.join(work, path), 'wb') as output_file:
+            output_file.write(data)
+    git(work, "init", "-q")
+    git(work, "add", "-A")
+    git(work, "commit", "-q", "-m", "bench")
+    bare = os.path.join(directory, "mirrors", "bench", "repo.git")
+    git(directory, "clone", "-q", "--bare", "--no-local", work, bare)
+    git(bare, "repack", "-adq")
+    return work, bare
+
+
+async def measure(repo_insight: RepoInsight, sources: Dict[str, str], repeat: int) -> Dict[str, float]:
+    timings = {}
+    for name, repo_url in sources.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            repo = await asyncio.to_thread(repo_insight.open_repository, repo_url)
+            tree, _ = await repo_insight.analyze_repository_files(repo)
+            best = min(best, time.perf_counter() - start)
+            repo_insight.release(repo.full_name)
+            if hasattr(repo, "close"):
+                repo.close()
+        timings[name] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000, help="number of synthetic modules")
+    parser.add_argument("--functions", type=int, default=50, help="functions per module")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of latency per GitHub request")
+    parser.add_argument("--concurrency", type=int, default=16, help="GitHub requests in flight")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    files = {path: content.encode() for path, content in make_sources(args.files, args.functions)}
+    with FakeGitHubServer(files, latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        work, bare = make_repositories(directory, files)
+        repo_insight = RepoInsight(make_config(directory, server.base_url, args.concurrency, 64 * 1024 * 1024))
+        sources = {
+            "working tree": work,
+            "bare repository": f"file://{bare}",
+            "GitHub API": f"https://github.com/{server.full_name}",
+        }
+
+        async def run():
+            try:
+                return await measure(repo_insight, sources, args.repeat)
+            finally:
+                await repo_insight.close()
+
+        timings = asyncio.run(run())
+
+    megabytes = sum(len(data) for data in files.values()) / 1e6
+    print(f"{args.files} files, {megabytes:.1f} MB, GitHub API at {args.latency * 1000:.0f} ms latency, "
+          f"{args.concurrency} requests in flight")
+    for name, seconds in timings.items():
+        print(f"{name:>16}: {seconds:7.3f}s  {args.files / seconds:8.0f} files/s")
+
+
+if __name__ == "__main__":
+    main()
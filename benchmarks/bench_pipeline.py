@@ -0,0 +1,142 @@
+"""
+Benchmark the fetch/analyze pipeline against running the two stages back to back.
+
+A local FakeGitHubServer with per-request latency serves synthetic Python modules.
+It runs in its own process, so serving does not compete with the client for the GIL
+as a remote GitHub would not. The benchmark times fetching every file alone,
+analyzing every file alone in this process, the staged run (fetch everything, then
+analyze everything) and RepoInsight's pipelined analyze_files, all running the same
+analyzers. A pipeline that overlaps well lands near max(fetch, analyze) rather than
+their sum, while holding at most max_bytes of content at once. With --workers 0
+parsing shares the GIL with the fetches; the default uses analysis.workers' automatic
+process pool.
+
+Usage:
+    python -m benchmarks.bench_pipeline --files 300 --functions 100 --latency 0.05 --max-bytes 1000000
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+import yaml
+
+from benchmarks.bench_code_analysis import make_sources
+from benchmarks.fake_github import FakeGitHubServer
+from src.config.config_manager import ConfigManager
+from src.main import RepoInsight
+
+
+def make_config(directory: str, base_url: str, concurrency: int, max_bytes: int,
+                workers: Optional[int] = None) -> ConfigManager:
+    settings = {
+        'github': {'api_token': 'token', 'api_url': base_url, 'max_concurrency': concurrency},
+        'openai': {'api_key': 'key'},
+        'analysis': {'max_bytes_in_flight': max_bytes, 'workers': workers},
+        'cache': {'directory': None},
+    }
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as config_file:
+        yaml.safe_dump(settings, config_file)
+    return ConfigManager(path)
+
+
+def serve(files: Dict[str, bytes], latency: float, connection):
+    server = FakeGitHubServer(files, latency=latency).start()
+    connection.send((server.base_url, server.full_name))
+    connection.recv()
+    server.stop()
+
+
+async def run(repo_insight: RepoInsight, full_name: str, tree, repeat: int) -> Dict[str, float]:
+    paths = [path for path, entry in tree.items() if entry.type == "file"]
+    repo = await asyncio.to_thread(repo_insight.github_api.get_repository, f"https://github.com/{full_name}")
+    analyzers = repo_insight.analyzers
+
+    async def fetch_all():
+        return await asyncio.gather(*(repo_insight.async_client.get_file_content(full_name, path) for path in paths))
+
+    def analyze_all(contents):
+        for path, content in zip(paths, contents):
+            analyzers.dispatch(path, content, analyzers.analyzers_for(path))
+
+    async def fetch_only():
+        await fetch_all()
+
+    async def analyze_only():
+        analyze_all(contents)
+
+    async def staged():
+        analyze_all(await fetch_all())
+
+    async def pipelined():
+        await repo_insight.analyze_files(repo, tree)
+
+    contents = await fetch_all()
+    timings = {}
+    for name, stage in (("fetch only", fetch_only), ("analyze only", analyze_only),
+                        ("staged", staged), ("pipelined", pipelined)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await stage()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=300, help="number of synthetic modules")
+    parser.add_argument("--functions", type=int, default=100, help="functions per module")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of latency per request")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--max-bytes", type=int, default=1000000, help="content held between fetch and analysis")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest is reported")
+    parser.add_argument("--workers", type=int,
+                        help="analysis worker processes of the pipelined run; 0 parses in this process "
+                             "(default: one per CPU but one)")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    files = {path: content.encode() for path, content in make_sources(args.files, args.functions)}
+    connection, server_connection = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(files, args.latency, server_connection), daemon=True)
+    server.start()
+    base_url, full_name = connection.recv()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            config = make_config(directory, base_url, args.concurrency, args.max_bytes, args.workers)
+            repo_insight = RepoInsight(config)
+            repo = repo_insight.github_api.get_repository(f"https://github.com/{full_name}")
+            tree = repo_insight.github_api.get_repository_tree(repo)
+
+            async def measure():
+                try:
+                    return await run(repo_insight, full_name, tree, args.repeat)
+                finally:
+                    await repo_insight.close()
+
+            timings = asyncio.run(measure())
+    finally:
+        connection.send(None)
+        server.join()
+
+    megabytes = sum(len(data) for data in files.values()) / 1e6
+    print(f"{args.files} files, {megabytes:.1f} MB, {args.latency * 1000:.0f} ms latency, "
+          f"{args.concurrency} requests in flight, {config.analysis_workers} analysis workers, "
+          f"{os.cpu_count()} CPUs")
+    fetch_time, analyze_time = timings["fetch only"], timings["analyze only"]
+    overlap = (fetch_time + analyze_time - timings['pipelined']) / min(fetch_time, analyze_time)
+    print(f"   fetch only: {fetch_time:6.3f}s")
+    print(f" analyze only: {analyze_time:6.3f}s")
+    print(f"       staged: {timings['staged']:6.3f}s (sum {fetch_time + analyze_time:.3f}s)")
+    print(f"    pipelined: {timings['pipelined']:6.3f}s (max {max(fetch_time, analyze_time):.3f}s), "
+          f"{timings['staged'] / timings['pipelined']:.2f}x staged, {overlap:.0%} of the shorter stage hidden")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark building and rendering the repository tree of large synthetic listings.
+
+Paths are spread over nested directories of random depth, so the tree has many
+directories of very different sizes. The benchmark times the build, a full
+render, and a render limited in depth and fan-out as used for prompts.
+
+Usage:
+    python -m benchmarks.bench_repo_tree --entries 10000 100000 200000 --depth 4 --max-depth 3 --max-children 20
+"""
+import argparse
+import io
+import logging
+import random
+import time
+from typing import Dict, Tuple
+
+from src.analysis.repo_tree import RepoTree
+
+EXTENSIONS = ("py", "md", "js", "ts", "json", "txt", "go", "png")
+
+
+def make_listing(entries: int, depth: int = 4, seed: int = 0) -> Tuple[Dict[str, str], Dict[str, int]]:
+    """
+    Build a flat listing of a synthetic repository.
+
+    Args:
+        entries (int): Number of files.
+        depth (int): Deepest directory level; each level has ten directory names.
+        seed (int): Random seed.
+
+    Returns:
+        Tuple[Dict[str, str], Dict[str, int]]: Entry types and file sizes keyed by path.
+    """
+    rng = random.Random(seed)
+    structure, sizes = {}, {}
+    for index in range(entries):
+        directory = "/".join(f"dir{rng.randint(0, 9)}" for _ in range(rng.randint(0, depth)))
+        path = (directory + "/" if directory else "") + f"file{index}.{rng.choice(EXTENSIONS)}"
+        structure[path] = "file"
+        sizes[path] = rng.randint(10, 100000)
+    return structure, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000, 200000], help="files per repository")
+    parser.add_argument("--depth", type=int, default=4, help="deepest directory level of the synthetic tree")
+    parser.add_argument("--max-depth", type=int, default=3, help="depth limit of the limited render")
+    parser.add_argument("--max-children", type=int, default=20, help="fan-out limit of the limited render")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    for entries in args.entries:
+        structure, sizes = make_listing(entries, args.depth)
+
+        start = time.perf_counter()
+        tree = RepoTree.build(structure, sizes)
+        built = time.perf_counter() - start
+        out = io.StringIO()
+        start = time.perf_counter()
+        tree.write(out)
+        rendered = time.perf_counter() - start
+        start = time.perf_counter()
+        limited = tree.render(args.max_depth, args.max_children)
+        limited_time = time.perf_counter() - start
+
+        print(f"{entries:>7} files, {len(tree.directories_by_path):>6} directories: build {built:6.3f}s, "
+              f"full render {rendered:6.3f}s ({out.getvalue().count(chr(10))} lines), "
+              f"limited render {limited_time:6.3f}s ({limited.count(chr(10)) + 1} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Benchmark RepoInsight end to end on synthetic repositories and flag regressions against a saved baseline.
+
+Each scenario generates a repository at a given scale with benchmarks.synthetic and
+serves it from a local FakeGitHubServer (REST, GraphQL and archive endpoints) with
+per-request latency and an optional rate limit, while a FakeChatServer answers the
+description request. A cold RepoInsight.analyze_repository run is timed end to end
+and per stage from its metrics, and throughput is reported in files and bytes per
+second. The fastest of --repeat runs is kept for every timing.
+
+--save-baseline writes the results to a JSON file. --baseline compares the results
+with such a file and exits with status 1 when a timing of a scenario run with the
+same scale and settings is more than --tolerance slower than its baseline.
+
+Usage:
+    python -m benchmarks.bench_suite --scenarios small medium --save-baseline baseline.json
+    python -m benchmarks.bench_suite --scenarios small medium --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.fake_openai import FakeChatServer
+from benchmarks.synthetic import RepositorySpec, make_items, make_repository
+from src.config.config_manager import ConfigManager
+from src.main import INGEST_MODES, RepoInsight
+from src.utils.metrics import PROFILED_STAGES, Metrics
+
+SCENARIOS = {
+    'small': RepositorySpec(files=50, depth=2, file_size=1500, issues=20, pulls=10),
+    'medium': RepositorySpec(files=500, depth=4, file_size=3000, issues=300, pulls=150),
+    'large': RepositorySpec(files=3000, depth=6, file_size=4000, issues=2000, pulls=1000),
+    'deep': RepositorySpec(files=1000, depth=12, file_size=2000, issues=50, pulls=50),
+}
+
+# Timings shorter than this in the baseline are too noisy to compare.
+MIN_SECONDS = 0.05
+
+
+def make_config(directory: str, github_url: str, chat_url: str, concurrency: int) -> ConfigManager:
+    settings = {
+        'github': {'api_token': 'token', 'api_url': github_url, 'max_concurrency': concurrency},
+        'openai': {'api_key': 'key', 'api_base': chat_url},
+        # Every run must do the full work, so nothing is cached between them.
+        'cache': {'directory': None},
+    }
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as config_file:
+        yaml.safe_dump(settings, config_file)
+    return ConfigManager(path)
+
+
+async def measure_run(config: ConfigManager, repo_url: str, ingest_mode: str) -> Dict[str, Any]:
+    """
+    Analyze a repository once and collect its timings.
+
+    Args:
+        config (ConfigManager): Configuration pointing at the fake servers.
+        repo_url (str): URL of the repository.
+        ingest_mode (str): One of INGEST_MODES.
+
+    Returns:
+        Dict[str, Any]: The run's metrics report, with the end-to-end time as 'seconds'.
+
+    Raises:
+        RuntimeError: If the run failed before asking for a description.
+    """
+    metrics = Metrics()
+    repo_insight = RepoInsight(config, ingest_mode=ingest_mode, metrics=metrics)
+    try:
+        start = time.perf_counter()
+        description = await repo_insight.analyze_repository(repo_url)
+        seconds = time.perf_counter() - start
+        report = repo_insight.collect_metrics().report()
+    finally:
+        await repo_insight.close()
+    if not metrics.counter('llm_requests'):
+        raise RuntimeError(f"The run did not reach generation: {description}")
+    report['seconds'] = seconds
+    return report
+
+
+def run_scenario(spec: RepositorySpec, ingest_mode: str = "files", latency: float = 0.01, chat_latency: float = 0.2,
+                 rate_limit: Optional[int] = None, rate_limit_window: float = 1.0, concurrency: int = 16,
+                 repeat: int = 3) -> Dict[str, Any]:
+    """
+    Benchmark one scenario.
+
+    Args:
+        spec (RepositorySpec): The scale of the synthetic repository.
+        ingest_mode (str): One of INGEST_MODES.
+        latency (float): Seconds of latency per GitHub request.
+        chat_latency (float): Seconds of latency per chat completion.
+        rate_limit (Optional[int]): GitHub requests allowed per rate-limit window; None for no limit.
+        rate_limit_window (float): Length of a rate-limit window in seconds.
+        concurrency (int): GitHub requests in flight.
+        repeat (int): Number of runs; the fastest timings are kept.
+
+    Returns:
+        Dict[str, Any]: 'spec' and 'settings' of the scenario, the repository's 'files' and
+            'bytes', 'seconds' ('total' and each stage's wall-clock time), 'throughput'
+            (files per second overall and for the stages in PROFILED_STAGES, and bytes per
+            second overall), and the 'requests' and 'rate_limited' responses of the last run.
+    """
+    files = make_repository(spec)
+    settings = {'ingest_mode': ingest_mode, 'latency': latency, 'chat_latency': chat_latency,
+                'rate_limit': rate_limit, 'rate_limit_window': rate_limit_window, 'concurrency': concurrency}
+    seconds: Dict[str, float] = {}
+    with FakeGitHubServer(files, latency=latency, issues=make_items(spec.issues, seed=spec.seed),
+                          pulls=make_items(spec.pulls, pull_requests=True, seed=spec.seed),
+                          rate_limit=rate_limit, rate_limit_window=rate_limit_window) as server, \
+            FakeChatServer(latency=chat_latency, usage=True) as chat, \
+            tempfile.TemporaryDirectory() as directory:
+        config = make_config(directory, server.base_url, chat.base_url, concurrency)
+        for _ in range(repeat):
+            server.reset_counters()
+            report = asyncio.run(measure_run(config, f"https://github.com/{server.full_name}", ingest_mode))
+            timings = {'total': report['seconds']}
+            timings.update((stage, timing['wall_seconds']) for stage, timing in report['stages'].items())
+            for name, value in timings.items():
+                seconds[name] = min(seconds.get(name, value), value)
+        requests, rate_limited = server.request_count, server.rate_limited_count
+
+    size = sum(len(data) for data in files.values())
+    # Files per second means something only for the stages that work through the files.
+    throughput = {name: len(files) / value for name, value in seconds.items()
+                  if value > 0 and (name == 'total' or name in PROFILED_STAGES)}
+    throughput['bytes_per_second'] = size / seconds['total']
+    return {
+        'spec': spec.to_dict(),
+        'settings': settings,
+        'files': len(files),
+        'bytes': size,
+        'seconds': {name: round(value, 6) for name, value in sorted(seconds.items())},
+        'throughput': {name: round(value, 3) for name, value in sorted(throughput.items())},
+        'requests': requests,
+        'rate_limited': rate_limited,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            min_seconds: float = MIN_SECONDS) -> List[Dict[str, Any]]:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Results of run_scenario keyed by scenario name.
+        baseline (Dict[str, Any]): A saved baseline, with results under 'scenarios'.
+        tolerance (float): Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+        min_seconds (float): Baseline timings shorter than this are not compared.
+
+    Returns:
+        List[Dict[str, Any]]: One row per scenario and timing with 'scenario', 'timing',
+            'baseline' and 'current' seconds, their 'ratio', and a 'status' of 'ok',
+            'regression', 'improved', 'new' (no baseline timing), 'noise' (too short to
+            compare) or 'incomparable' (the scenario's scale or settings changed).
+    """
+    rows = []
+    for scenario, result in results.items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        comparable = previous is not None and (previous['spec'], previous['settings']) == (result['spec'], result['settings'])
+        for timing, current in result['seconds'].items():
+            before = previous['seconds'].get(timing) if comparable else None
+            row = {'scenario': scenario, 'timing': timing, 'baseline': before, 'current': current, 'ratio': None}
+            if previous is None or (comparable and before is None):
+                row['status'] = 'new'
+            elif not comparable:
+                row['status'] = 'incomparable'
+            elif before < min_seconds:
+                row['status'] = 'noise'
+            else:
+                row['ratio'] = current / before
+                if row['ratio'] > 1 + tolerance:
+                    row['status'] = 'regression'
+                elif row['ratio'] < 1 / (1 + tolerance):
+                    row['status'] = 'improved'
+                else:
+                    row['status'] = 'ok'
+            rows.append(row)
+    return rows
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]]):
+    """
+    Save benchmark results as a baseline, along with a description of the machine.
+
+    Args:
+        path (str): Destination file.
+        results (Dict[str, Dict[str, Any]]): Results of run_scenario keyed by scenario name.
+    """
+    baseline = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scenarios': results,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=["small", "medium"],
+                        help="scenarios to run")
+    parser.add_argument("--files", type=int, help="override the number of files of every scenario")
+    parser.add_argument("--depth", type=int, help="override the directory depth of every scenario")
+    parser.add_argument("--file-size", type=int, help="override the typical file size of every scenario")
+    parser.add_argument("--issues", type=int, help="override the number of issues of every scenario")
+    parser.add_argument("--pulls", type=int, help="override the number of pull requests of every scenario")
+    parser.add_argument("--ingest-mode", choices=INGEST_MODES, default="files", help="how file contents are fetched")
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds of GitHub latency per request")
+    parser.add_argument("--chat-latency", type=float, default=0.2, help="seconds of latency per chat completion")
+    parser.add_argument("--rate-limit", type=int, help="GitHub requests allowed per rate-limit window")
+    parser.add_argument("--rate-limit-window", type=float, default=1.0, help="seconds per rate-limit window")
+    parser.add_argument("--concurrency", type=int, default=16, help="GitHub requests in flight")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the fastest timings are kept")
+    parser.add_argument("--output", metavar="FILE", help="also write the results to FILE as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare the results with a saved baseline")
+    parser.add_argument("--save-baseline", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown over the baseline flagged, as a fraction")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    overrides = {name: value for name, value in (('files', args.files), ('depth', args.depth),
+                                                 ('file_size', args.file_size), ('issues', args.issues),
+                                                 ('pulls', args.pulls)) if value is not None}
+    results = {}
+    for name in args.scenarios:
+        spec = dataclasses.replace(SCENARIOS[name], **overrides)
+        result = run_scenario(spec, args.ingest_mode, args.latency, args.chat_latency, args.rate_limit,
+                              args.rate_limit_window, args.concurrency, args.repeat)
+        results[name] = result
+        throughput = result['throughput']
+        print(f"{name}: {result['files']} files, {result['bytes'] / 1e6:.1f} MB, {result['requests']} requests, "
+              f"{result['rate_limited']} rate limited")
+        for timing, seconds in result['seconds'].items():
+            rate = f"{throughput[timing]:10.1f} files/s" if timing in throughput else ""
+            print(f"  {timing:>16}: {seconds:8.3f}s {rate}")
+        print(f"  {'':>16}  {throughput['bytes_per_second'] / 1e6:18.2f} MB/s end to end")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            rows = compare(results, json.load(baseline_file), args.tolerance)
+        for row in rows:
+            change = f"{(row['ratio'] - 1) * 100:+6.1f}%" if row['ratio'] is not None else ""
+            print(f"{row['scenario']:>8} {row['timing']:>16}: {row['status']:<12} {change}")
+        regressions = [row for row in rows if row['status'] == 'regression']
+        if regressions:
+            print(f"{len(regressions)} timings regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+import base64
+import hashlib
+import io
+import json
+import logging
+import re
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+from src.utils.file_utils import git_blob_sha
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_BLOB_LOOKUP = re.compile(r"(\w+): object\(expression: \$(\w+)\)")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connects (and stalls clients for a SYN retry) under concurrency.
+    request_queue_size = 256
+
+
+class FakeGitHubServer:
+    """
+    An in-process stand-in for the GitHub REST API and codeload archive endpoints,
+    serving a single synthetic repository over HTTP on localhost.
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, bytes],
+        owner: str = "octo",
+        name: str = "repo",
+        latency: float = 0.0,
+        issues: Optional[List[Dict]] = None,
+        pulls: Optional[List[Dict]] = None,
+        etags: bool = True,
+        rate_limit: Optional[int] = None,
+        rate_limit_window: float = 3600.0,
+        secondary_limit: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        graphql_text_limit: int = 512 * 1024,
+        mirrors: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the fake server.
+
+        Args:
+            files (Dict[str, bytes]): Repository content keyed by path.
+            owner (str): Repository owner login.
+            name (str): Repository name.
+            latency (float): Seconds to sleep before answering each request.
+            issues (Optional[List[Dict]]): Issues served, paginated, by the issues listing.
+            pulls (Optional[List[Dict]]): Pull requests served, paginated, by the pulls listing.
+            etags (bool): Send ETags and answer matching If-None-Match requests with 304.
+            rate_limit (Optional[int]): Primary rate limit, in requests per window per token.
+            rate_limit_window (float): Length in seconds of a primary rate-limit window.
+            secondary_limit (Optional[int]): Reject requests with a secondary rate-limit 403
+                while more than this many are in flight.
+            retry_after (Optional[float]): Retry-After value sent with secondary rate-limit responses.
+            graphql_text_limit (int): Blobs larger than this are returned truncated by GraphQL.
+            mirrors (Optional[List[str]]): Further 'owner/name' repositories served with the same
+                content, e.g. to stand in for a batch of repositories.
+        """
+        self.owner = owner
+        self.name = name
+        self.latency = latency
+        self.issues = issues or []
+        self.pulls = pulls or []
+        self.etags = etags
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.secondary_limit = secondary_limit
+        self.retry_after = retry_after
+        self.graphql_text_limit = graphql_text_limit
+        self.mirrors = list(mirrors or [])
+        self.not_modified_count = 0
+        self.rate_limited_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._budgets: Dict[str, List[float]] = {}
+        self.commits: Dict[str, Dict[str, bytes]] = {}
+        # Directory tree SHAs by commit and directory, and the commit and directory of each tree SHA.
+        self._tree_shas: Dict[str, Dict[str, str]] = {}
+        self._trees: Dict[str, Tuple[str, str]] = {}
+        self.push(files)
+        self.request_count = 0
+        self.bytes_sent = 0
+        self.request_paths: List[str] = []
+        self._lock = threading.Lock()
+        self._archive: Optional[bytes] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+    @property
+    def full_names(self) -> List[str]:
+        return [self.full_name] + self.mirrors
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def repo_url(self) -> str:
+        return f"{self.base_url}/repos/{self.full_name}"
+
+    def start(self) -> "FakeGitHubServer":
+        """
+        Start serving on an ephemeral localhost port in a background thread.
+        """
+        self._server = _Server(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Shut the server down.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeGitHubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def push(self, files: Dict[str, bytes]) -> str:
+        """
+        Make files the content of a new head commit on the default branch.
+
+        Args:
+            files (Dict[str, bytes]): Repository content keyed by path.
+
+        Returns:
+            str: The SHA of the new commit.
+        """
+        self.files = files
+        self.commit_sha = hashlib.sha1(
+            str(len(self.commits)).encode()
+            + b"".join(path.encode() + git_blob_sha(data).encode() for path, data in sorted(files.items()))
+        ).hexdigest()
+        self.commits[self.commit_sha] = files
+        self._archive = None
+        return self.commit_sha
+
+    def reset_counters(self):
+        """
+        Reset the request and byte counters.
+        """
+        with self._lock:
+            self.request_count = 0
+            self.bytes_sent = 0
+            self.request_paths = []
+            self.not_modified_count = 0
+            self.rate_limited_count = 0
+            self.max_in_flight = 0
+
+    def archive(self) -> bytes:
+        """
+        Build (once) the gzipped tarball GitHub would serve for the repository.
+
+        Returns:
+            bytes: The archive content.
+        """
+        if self._archive is None:
+            buffer = io.BytesIO()
+            root = f"{self.owner}-{self.name}-{self.commit_sha[:7]}"
+            with tarfile.open(fileobj=buffer, mode="w:gz", format=tarfile.PAX_FORMAT,
+                              pax_headers={"comment": self.commit_sha}) as archive:
+                for path, data in sorted(self.files.items()):
+                    info = tarfile.TarInfo(f"{root}/{path}")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+            self._archive = buffer.getvalue()
+        return self._archive
+
+    def _directories(self, files: Dict[str, bytes]):
+        directories = set()
+        for path in files:
+            parts = path.split("/")[:-1]
+            for depth in range(1, len(parts) + 1):
+                directories.add("/".join(parts[:depth]))
+        return directories
+
+    def tree_shas(self, commit: str) -> Dict[str, str]:
+        """
+        Compute the tree SHAs of a commit's directories, '' being the root.
+
+        Like git's, they depend only on the content below the directory, so directories
+        untouched by a commit keep their SHA.
+
+        Args:
+            commit (str): Commit SHA.
+
+        Returns:
+            Dict[str, str]: Tree SHAs keyed by directory path.
+        """
+        if commit not in self._tree_shas:
+            files = self.commits[commit]
+            digests = {directory: hashlib.sha1(f"tree {directory}".encode()) for directory in self._directories(files) | {""}}
+            for path, data in sorted(files.items()):
+                parts = path.split("/")[:-1]
+                for depth in range(len(parts) + 1):
+                    digests["/".join(parts[:depth])].update(path.encode() + git_blob_sha(data).encode())
+            self._tree_shas[commit] = {directory: digest.hexdigest() for directory, digest in digests.items()}
+            self._trees.update((sha, (commit, directory)) for directory, sha in self._tree_shas[commit].items())
+        return self._tree_shas[commit]
+
+    def tree(self, sha: Optional[str] = None, recursive: bool = True) -> Dict:
+        """
+        Build the Git Trees API response for a commit or one of its directories.
+
+        Args:
+            sha (Optional[str]): Commit or tree SHA. Defaults to the head commit.
+            recursive (bool): List every entry below the tree rather than its children only.
+
+        Returns:
+            Dict: The JSON payload.
+        """
+        if sha not in self._trees:
+            commit = sha if sha in self.commits else self.commit_sha
+            self.tree_shas(commit)
+            sha = self._tree_shas[commit][""]
+        commit, directory = self._trees[sha]
+        files, tree_shas = self.commits[commit], self._tree_shas[commit]
+        prefix = directory + "/" if directory else ""
+        elements = [
+            {"path": path[len(prefix):], "mode": "040000", "type": "tree", "sha": tree_sha}
+            for path, tree_sha in tree_shas.items() if path and path.startswith(prefix)
+        ]
+        elements.extend(
+            {"path": path[len(prefix):], "mode": "100644", "type": "blob", "sha": git_blob_sha(data), "size": len(data)}
+            for path, data in files.items() if path.startswith(prefix)
+        )
+        if not recursive:
+            elements = [element for element in elements if "/" not in element["path"]]
+        elements.sort(key=lambda element: element["path"])
+        return {"sha": sha, "url": f"{self.repo_url}/git/trees/{sha}",
+                "tree": elements, "truncated": False}
+
+    def compare(self, base: str, head: str) -> Dict:
+        """
+        Build the Compare API response between two commits of the linear history.
+
+        Args:
+            base (str): The earlier commit SHA.
+            head (str): The later commit SHA.
+
+        Returns:
+            Dict: The JSON payload.
+        """
+        order = list(self.commits)
+        if base not in self.commits or head not in self.commits or order.index(base) > order.index(head):
+            return {"status": "diverged", "files": []}
+        old, new = self.commits[base], self.commits[head]
+        files = [
+            {"filename": path, "status": "added" if path not in old else "modified", "sha": git_blob_sha(data)}
+            for path, data in sorted(new.items()) if old.get(path) != data
+        ]
+        files.extend({"filename": path, "status": "removed", "sha": git_blob_sha(old[path])}
+                     for path in sorted(old) if path not in new)
+        return {"status": "identical" if base == head else "ahead",
+                "url": f"{self.repo_url}/compare/{base}...{head}", "files": files}
+
+    def resolve_graphql(self, query: str, variables: Dict) -> Dict:
+        """
+        Answer the aliased blob lookups of a GraphQL repository query.
+
+        Only `alias: object(expression: $var)` lookups of this repository are supported,
+        which is what the batched blob fetcher sends.
+
+        Args:
+            query (str): The GraphQL document.
+            variables (Dict): Values of the query variables.
+
+        Returns:
+            Dict: The JSON payload.
+        """
+        if f"{variables.get('owner')}/{variables.get('name')}" not in self.full_names:
+            return {"data": {"repository": None},
+                    "errors": [{"type": "NOT_FOUND", "message": "Could not resolve to a Repository."}]}
+        repository = {}
+        for alias, variable in GRAPHQL_BLOB_LOOKUP.findall(query):
+            ref, _, path = variables.get(variable, "").partition(":")
+            files = self.files if ref == "HEAD" else self.commits.get(ref, {})
+            data = files.get(path)
+            if data is None:
+                repository[alias] = None
+                continue
+            try:
+                text = None if b"\0" in data else data.decode("utf-8")
+            except UnicodeDecodeError:
+                text = None
+            truncated = text is not None and len(data) > self.graphql_text_limit
+            repository[alias] = {
+                "text": text[:self.graphql_text_limit] if truncated else text,
+                "isBinary": text is None,
+                "isTruncated": truncated,
+                "byteSize": len(data),
+            }
+        return {"data": {"repository": repository}}
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        """
+        Count a request, apply the injected rate limits and latency, and route it.
+
+        Args:
+            handler (BaseHTTPRequestHandler): The active request handler.
+        """
+        # Read any request body up front so rejected requests leave the keep-alive connection clean.
+        handler.body = handler.rfile.read(int(handler.headers.get("Content-Length", "0")))
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if not self._check_rate_limits(handler):
+                if self.latency:
+                    time.sleep(self.latency)
+                self._route(handler)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _check_rate_limits(self, handler: BaseHTTPRequestHandler) -> bool:
+        """
+        Answer the request with a rate-limit error if it exceeds an injected limit.
+
+        Args:
+            handler (BaseHTTPRequestHandler): The active request handler.
+
+        Returns:
+            bool: True if the request was rejected.
+        """
+        handler.rate_limit_headers = {}
+        with self._lock:
+            if self.secondary_limit is not None and self.in_flight > self.secondary_limit:
+                self.rate_limited_count += 1
+                headers = {} if self.retry_after is None else {"Retry-After": str(self.retry_after)}
+                rejected = (headers, "You have exceeded a secondary rate limit.")
+            elif self.rate_limit is not None:
+                now = time.time()
+                budget = self._budgets.setdefault(handler.headers.get("Authorization", ""), [now, 0])
+                if now >= budget[0] + self.rate_limit_window:
+                    budget[:] = [now, 0]
+                remaining = self.rate_limit - budget[1]
+                handler.rate_limit_headers = {
+                    "X-RateLimit-Limit": str(self.rate_limit),
+                    "X-RateLimit-Remaining": str(max(remaining - 1, 0)),
+                    "X-RateLimit-Reset": str(int(budget[0] + self.rate_limit_window + 1)),
+                }
+                if remaining <= 0:
+                    self.rate_limited_count += 1
+                    handler.rate_limit_headers["X-RateLimit-Remaining"] = "0"
+                    rejected = ({}, "API rate limit exceeded.")
+                else:
+                    budget[1] += 1
+                    rejected = None
+            else:
+                rejected = None
+        if rejected:
+            headers, message = rejected
+            self._send_json(handler, {"message": message}, status=403, headers=headers)
+            return True
+        return False
+
+    def _route(self, handler: BaseHTTPRequestHandler):
+        """
+        Route a request to the matching fake endpoint.
+
+        Args:
+            handler (BaseHTTPRequestHandler): The active request handler.
+        """
+        url = urlsplit(handler.path)
+        path = unquote(url.path)
+        with self._lock:
+            self.request_count += 1
+            self.request_paths.append(path)
+
+        full_name = next((name for name in self.full_names
+                          if path == f"/repos/{name}" or path.startswith(f"/repos/{name}/")), self.full_name)
+        owner, name = full_name.split("/")
+        repo_prefix = f"/repos/{full_name}"
+
+        if path == "/graphql" and handler.command == "POST":
+            request = json.loads(handler.body or b"{}")
+            return self._send_json(handler, self.resolve_graphql(request.get("query", ""),
+                                                                 request.get("variables") or {}))
+
+        if path == repo_prefix:
+            return self._send_json(handler, {
+                "id": 1, "name": name, "full_name": full_name,
+                "owner": {"login": owner}, "default_branch": "main",
+                "url": f"{self.base_url}{repo_prefix}",
+            })
+        if path == f"{repo_prefix}/branches/main":
+            return self._send_json(handler, {
+                "name": "main",
+                "commit": {"sha": self.commit_sha, "url": f"{self.repo_url}/commits/{self.commit_sha}"},
+            })
+        if path in (f"{repo_prefix}/issues", f"{repo_prefix}/pulls"):
+            items = self.issues if path.endswith("/issues") else self.pulls
+            return self._send_page(handler, path, parse_qs(url.query), items)
+        if path.startswith(f"{repo_prefix}/git/trees/"):
+            recursive = parse_qs(url.query).get("recursive", ["0"])[0] not in ("0", "false")
+            return self._send_json(handler, self.tree(path.rsplit("/", 1)[-1], recursive))
+        if path.startswith(f"{repo_prefix}/compare/"):
+            base, head = path[len(f"{repo_prefix}/compare/"):].split("...")
+            return self._send_json(handler, self.compare(base, head))
+        if path.startswith(f"{repo_prefix}/contents/"):
+            file_path = path[len(f"{repo_prefix}/contents/"):]
+            ref = parse_qs(url.query).get("ref", [self.commit_sha])[0]
+            data = self.commits.get(ref, self.files).get(file_path)
+            if data is None:
+                return self._send_json(handler, {"message": "Not Found"}, status=404)
+            if "raw" in handler.headers.get("Accept", ""):
+                return self._send_bytes(handler, data, "application/octet-stream")
+            return self._send_json(handler, {
+                "type": "file", "encoding": "base64", "path": file_path,
+                "name": file_path.rsplit("/", 1)[-1], "sha": git_blob_sha(data), "size": len(data),
+                "content": base64.b64encode(data).decode("ascii"),
+                "url": f"{self.repo_url}/contents/{file_path}",
+            })
+        for archive_format in ("tarball", "zipball"):
+            if path.startswith(f"{repo_prefix}/{archive_format}"):
+                handler.send_response(302)
+                handler.send_header("Location", f"{self.base_url}/_codeload/{self.full_name}/tar.gz/{self.commit_sha}")
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+        if path.startswith("/_codeload/"):
+            return self._send_bytes(handler, self.archive(), "application/x-gzip")
+
+        logger.debug(f"Fake GitHub has no route for {path} ({parse_qs(url.query)})")
+        return self._send_json(handler, {"message": "Not Found"}, status=404)
+
+    def _send_page(self, handler: BaseHTTPRequestHandler, path: str, query: Dict[str, List[str]], items: List[Dict]):
+        if "since" in query:
+            items = [item for item in items if item.get("updated_at", "") >= query["since"][0]]
+        if query.get("sort") == ["updated"]:
+            items = sorted(items, key=lambda item: item.get("updated_at", ""), reverse=query.get("direction") == ["desc"])
+        per_page = int(query.get("per_page", ["30"])[0])
+        page = int(query.get("page", ["1"])[0])
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            next_query = {key: values[0] for key, values in query.items()}
+            next_query.update(page=str(page + 1), per_page=str(per_page))
+            next_url = f"{self.base_url}{path}?" + "&".join(f"{key}={value}" for key, value in next_query.items())
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        self._send_json(handler, items[start:start + per_page], headers=headers)
+
+    def _send_json(self, handler: BaseHTTPRequestHandler, payload, status: int = 200, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self._send_bytes(handler, body, "application/json; charset=utf-8", status, headers)
+
+    def _send_bytes(self, handler: BaseHTTPRequestHandler, body: bytes, content_type: str,
+                    status: int = 200, headers: Optional[Dict] = None):
+        headers = dict(getattr(handler, "rate_limit_headers", {}), **(headers or {}))
+        if self.etags and status == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            headers["ETag"] = etag
+            if handler.headers.get("If-None-Match") == etag:
+                with self._lock:
+                    self.not_modified_count += 1
+                handler.send_response(304)
+                for key, value in headers.items():
+                    handler.send_header(key, value)
+                handler.send_header("Content-Length", "0")
+                handler.end_headers()
+                return
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+        with self._lock:
+            self.bytes_sent += len(body)
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                fake.handle(self)
+
+            def do_POST(self):
+                fake.handle(self)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.fake_github import _Server
+
+logger = logging.getLogger(__name__)
+
+
+def default_reply(messages: List[Dict[str, str]]) -> str:
+    """
+    Derive a short deterministic completion from the last message of a conversation.
+
+    Args:
+        messages (List[Dict[str, str]]): The conversation.
+
+    Returns:
+        str: 'Summary <hash>', the hash identifying the prompt.
+    """
+    prompt = messages[-1]["content"] if messages else ""
+    return f"Summary {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+
+
+def split_chunks(content: str) -> List[str]:
+    """
+    Split a completion into the word-sized pieces a streamed response delivers.
+
+    Args:
+        content (str): The completion text.
+
+    Returns:
+        List[str]: Pieces that join back to the text.
+    """
+    words = content.split(" ")
+    return [word if index == 0 else " " + word for index, word in enumerate(words)]
+
+
+class FakeChatServer:
+    """
+    An in-process stand-in for an OpenAI-compatible chat completion endpoint,
+    answering POST /chat/completions over HTTP on localhost, streamed as
+    server-sent events when the request asks for it.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failures: int = 0,
+        failure_status: int = 429,
+        reply: Optional[Callable[[List[Dict[str, str]]], str]] = None,
+        chunk_delay: float = 0.0,
+        break_after_chunks: Optional[int] = None,
+        usage: bool = False,
+    ):
+        """
+        Initialize the fake server.
+
+        Args:
+            latency (float): Seconds to sleep before answering each request.
+            failures (int): Number of initial requests answered with failure_status.
+            failure_status (int): HTTP status of the injected failures.
+            reply (Optional[Callable]): Maps the request messages to the completion text.
+                Defaults to default_reply.
+            chunk_delay (float): Seconds to sleep between the chunks of a streamed response.
+            break_after_chunks (Optional[int]): Drop the connection of streamed responses
+                after this many chunks.
+            usage (bool): Report token usage, counted as words, in responses and as a final
+                chunk of streamed responses.
+        """
+        self.latency = latency
+        self.failures = failures
+        self.failure_status = failure_status
+        self.reply = reply or default_reply
+        self.chunk_delay = chunk_delay
+        self.break_after_chunks = break_after_chunks
+        self.usage = usage
+        self.chunks_sent = 0
+        self.request_count = 0
+        self.failed_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeChatServer":
+        """
+        Start serving on an ephemeral localhost port in a background thread.
+        """
+        self._server = _Server(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Shut the server down.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeChatServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_counters(self):
+        """
+        Forget the requests served so far.
+        """
+        with self._lock:
+            self.request_count = 0
+            self.failed_count = 0
+            self.chunks_sent = 0
+            self.max_in_flight = 0
+            self.requests = []
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        """
+        Count a request, apply the injected latency and failures, and answer it.
+
+        Args:
+            handler (BaseHTTPRequestHandler): The active request handler.
+        """
+        body = handler.rfile.read(int(handler.headers.get("Content-Length", "0")))
+        with self._lock:
+            self.request_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.failed_count < self.failures
+            if fail:
+                self.failed_count += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if handler.path.rstrip("/") != "/v1/chat/completions":
+                return self._send_json(handler, {"error": {"message": "Not Found"}}, status=404)
+            if fail:
+                return self._send_json(handler, {"error": {"message": "Injected failure"}}, status=self.failure_status)
+            try:
+                request = json.loads(body)
+                messages = request["messages"]
+            except (ValueError, KeyError) as e:
+                return self._send_json(handler, {"error": {"message": f"Bad request: {e!r}"}}, status=400)
+            with self._lock:
+                self.requests.append(request)
+            content = self.reply(messages)
+            usage = None
+            if self.usage:
+                prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in messages)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content.split()),
+                         "total_tokens": prompt_tokens + len(content.split())}
+            if request.get("stream"):
+                return self._send_stream(handler, request.get("model"), content, usage)
+            response = {
+                "object": "chat.completion",
+                "model": request.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            }
+            if usage:
+                response["usage"] = usage
+            self._send_json(handler, response)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _send_stream(self, handler: BaseHTTPRequestHandler, model: Optional[str], content: str,
+                     usage: Optional[Dict] = None):
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+        events = [{"role": "assistant"}] + [{"content": piece} for piece in split_chunks(content)]
+        for index, delta in enumerate(events):
+            if self.break_after_chunks is not None and index > self.break_after_chunks:
+                handler.close_connection = True
+                return
+            if index and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            chunk = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            try:
+                self._write_chunk(handler, f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                # The client hung up, e.g. because it cancelled the stream.
+                handler.close_connection = True
+                return
+            with self._lock:
+                self.chunks_sent += 1
+        if usage:
+            chunk = {"object": "chat.completion.chunk", "model": model, "choices": [], "usage": usage}
+            self._write_chunk(handler, f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(handler, b"data: [DONE]\n\n")
+        handler.wfile.write(b"0\r\n\r\n")
+
+    @staticmethod
+    def _write_chunk(handler: BaseHTTPRequestHandler, data: bytes):
+        handler.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        handler.wfile.flush()
+
+    def _send_json(self, handler: BaseHTTPRequestHandler, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                fake.handle(self)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
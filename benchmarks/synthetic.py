@@ -0,0 +1,171 @@
+"""
+Deterministic synthetic repositories for the benchmarks.
+
+make_repository builds the content of a repository at a given scale (number of
+files, directory depth, typical file size) and make_items the issues or pull
+requests served alongside it. The same arguments always produce the same bytes, so
+runs on different commits of RepoInsight measure the same work.
+"""
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+LABELS = ("bug", "enhancement", "documentation", "question", "performance", "good first issue")
+WORDS = ("parse", "fetch", "cache", "index", "render", "client", "request", "module", "config", "tree",
+         "stream", "token", "batch", "worker", "report", "graph", "summary", "archive", "commit", "schema")
+
+
+@dataclass
+class RepositorySpec:
+    """
+    The scale of a synthetic repository.
+
+    Attributes:
+        files (int): Number of files, README.md included.
+        depth (int): Deepest directory level below src/ and docs/.
+        file_size (int): Typical file size in bytes; sizes vary from half to twice this.
+        issues (int): Number of issues.
+        pulls (int): Number of pull requests.
+        doc_ratio (float): Share of the files that are markdown documents rather than Python modules.
+        seed (int): Random seed.
+    """
+    files: int = 200
+    depth: int = 3
+    file_size: int = 2000
+    issues: int = 100
+    pulls: int = 50
+    doc_ratio: float = 0.2
+    seed: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the spec as a plain dictionary, as saved with benchmark results.
+        """
+        return asdict(self)
+
+
+def make_directories(rng: random.Random, count: int, depth: int) -> List[str]:
+    """
+    Build a random directory hierarchy no deeper than depth levels.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        count (int): Number of directories.
+        depth (int): Deepest level.
+
+    Returns:
+        List[str]: Directory paths relative to the top-level directory, '' for the top level itself.
+    """
+    directories = [""]
+    while depth > 0 and len(directories) < count:
+        parent = rng.choice([directory for directory in directories if not directory or directory.count("/") + 1 < depth])
+        directories.append((parent + "/" if parent else "") + f"{rng.choice(WORDS)}{len(directories)}")
+    return directories
+
+
+def make_module(rng: random.Random, index: int, size: int, imports: List[str]) -> bytes:
+    """
+    Build a Python module of roughly size bytes that imports the given modules.
+    """
+    lines = [f'"""Module {index}: {" ".join(rng.sample(WORDS, 4))}."""']
+    lines += [f"import {name}" for name in imports] + ["", ""]
+    lines += [f"class Component{index}:", f"    name = 'component{index}'", "",
+              "    def run(self, value):", "        return value + 1", "", ""]
+    function = 0
+    while sum(len(line) + 1 for line in lines) < size:
+        verb = rng.choice(WORDS)
+        lines += [
+            f"def {verb}_{function}(items, limit={rng.randint(1, 100)}):",
+            f'    """{verb.capitalize()} the items up to a limit."""',
+            "    total = 0",
+            "    for item in items[:limit]:",
+            f"        total += item * {rng.randint(2, 9)}",
+            "    return total",
+            "",
+            "",
+        ]
+        function += 1
+    return "\n".join(lines).encode()
+
+
+def make_document(rng: random.Random, title: str, size: int) -> bytes:
+    """
+    Build a markdown document of roughly size bytes with a few sections.
+    """
+    parts = [f"# {title}\n\n{title} covers the {' and '.join(rng.sample(WORDS, 2))} parts of the project.\n"]
+    section = 0
+    while sum(len(part) + 1 for part in parts) < size:
+        heading = rng.choice(("Usage", "Configuration", "Design", "Examples", "Notes"))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(12))
+        parts.append(f"## {heading} {section}\n\n{sentence.capitalize()}.\n\n```\nrun --{rng.choice(WORDS)}\n```\n")
+        section += 1
+    return "\n".join(parts).encode()
+
+
+def make_repository(spec: RepositorySpec) -> Dict[str, bytes]:
+    """
+    Build the content of a synthetic repository: a README, Python packages under src/
+    whose modules import one another, and markdown documents under docs/.
+
+    Args:
+        spec (RepositorySpec): The scale of the repository.
+
+    Returns:
+        Dict[str, bytes]: File contents keyed by path.
+    """
+    rng = random.Random(spec.seed)
+    files = {"README.md": make_document(rng, "Synthetic project", spec.file_size)}
+    count = max(spec.files - 1, 0)
+    documents = round(count * spec.doc_ratio)
+    directories = make_directories(rng, max(count // 10, 1), spec.depth)
+    modules: List[str] = []
+    for index in range(count):
+        directory = rng.choice(directories)
+        size = rng.randint(spec.file_size // 2, spec.file_size * 2)
+        if index < documents:
+            path = "docs/" + (directory + "/" if directory else "") + f"guide{index}.md"
+            files[path] = make_document(rng, f"Guide {index}", size)
+        else:
+            package = "src/" + (directory + "/" if directory else "")
+            imports = rng.sample(modules, min(len(modules), 3))
+            files[f"{package}module{index}.py"] = make_module(rng, index, size, imports)
+            modules.append((package[len("src/"):] + f"module{index}").replace("/", "."))
+    return files
+
+
+def make_items(count: int, pull_requests: bool = False, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build the issues or pull requests of a synthetic repository, as the REST listings return them.
+
+    Args:
+        count (int): Number of items.
+        pull_requests (bool): Build pull requests rather than issues.
+        seed (int): Random seed.
+
+    Returns:
+        List[Dict[str, Any]]: The items, numbered from 1, oldest first.
+    """
+    rng = random.Random(seed + (1 if pull_requests else 0))
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for number in range(1, count + 1):
+        created = start + timedelta(hours=number * 7)
+        closed = created + timedelta(hours=rng.randint(1, 24 * 30)) if rng.random() < 0.6 else None
+        item = {
+            "number": number,
+            "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {number}",
+            "state": "closed" if closed else "open",
+            "user": {"login": f"user{rng.randint(1, 25)}", "id": number},
+            "labels": [{"name": name} for name in rng.sample(LABELS, rng.randint(0, 2))],
+            "comments": rng.randint(0, 12),
+            "body": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "updated_at": (closed or created).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "closed_at": closed.strftime("%Y-%m-%dT%H:%M:%SZ") if closed else None,
+        }
+        if pull_requests:
+            item["draft"] = rng.random() < 0.1
+            item["merged_at"] = item["closed_at"] if closed and rng.random() < 0.8 else None
+        items.append(item)
+    return items
@@ -0,0 +1,94 @@
+import heapq
+import logging
+from collections import Counter
+from datetime import datetime
+from statistics import median
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class ActivitySummary:
+    """
+    Aggregates a stream of projected issues or pull requests into a compact summary.
+
+    Items are folded in one at a time, so a listing of any length is summarized
+    without being held in memory: only counters, close durations and a bounded
+    heap of the most recently updated items are kept.
+    """
+
+    def __init__(self, recent: int = 10, top: int = 10):
+        """
+        Initialize the ActivitySummary.
+
+        Args:
+            recent (int): Number of most recently updated items listed in the summary.
+            top (int): Number of labels and authors listed in the summary.
+        """
+        self.recent = recent
+        self.top = top
+        self.total = 0
+        self.states = Counter()
+        self.merged = 0
+        self.labels = Counter()
+        self.authors = Counter()
+        self.days_to_close: List[float] = []
+        self.cursor: Optional[str] = None
+        self._recent: List[Tuple[str, int, str]] = []
+
+    def add(self, item: Dict[str, Any]):
+        """
+        Fold one item into the summary.
+
+        Args:
+            item (Dict[str, Any]): An issue or pull request projected with ISSUE_FIELDS
+                or PULL_REQUEST_FIELDS.
+        """
+        self.total += 1
+        self.states[item.get('state') or 'unknown'] += 1
+        if item.get('merged_at'):
+            self.merged += 1
+        self.labels.update(item.get('labels') or [])
+        if item.get('user'):
+            self.authors[item['user']] += 1
+
+        created, closed = _parse_timestamp(item.get('created_at')), _parse_timestamp(item.get('closed_at'))
+        if created and closed:
+            self.days_to_close.append((closed - created).total_seconds() / 86400)
+
+        updated_at = item.get('updated_at') or ''
+        if self.cursor is None or updated_at > self.cursor:
+            self.cursor = updated_at
+        entry = (updated_at, item.get('number') or 0, item.get('title') or '')
+        if len(self._recent) < self.recent:
+            heapq.heappush(self._recent, entry)
+        elif self.recent:
+            heapq.heappushpop(self._recent, entry)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Build the summary of the items added so far.
+
+        Returns:
+            Dict[str, Any]: Counts by state, merged count, top labels and authors, the median
+                number of days to close and the most recently updated items.
+        """
+        return {
+            'total': self.total,
+            'open': self.states['open'],
+            'closed': self.states['closed'],
+            'merged': self.merged,
+            'top_labels': self.labels.most_common(self.top),
+            'top_authors': self.authors.most_common(self.top),
+            'median_days_to_close': round(median(self.days_to_close), 1) if self.days_to_close else None,
+            'recent': [f"#{number} {title}" for _, number, title in sorted(self._recent, reverse=True)],
+        }
@@ -0,0 +1,81 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from .registry import RegisteredAnalyzer
+from ..utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    A content-addressed cache of per-file analysis results.
+
+    Results are keyed by git blob SHA, result name and analyzer version. A file whose
+    blob is unchanged since an earlier run needs neither a fetch nor a parse, and
+    bumping an analyzer's version invalidates only that analyzer's results.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """
+        Initialize the AnalysisCache.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_bytes (Optional[int]): Size cap of the cache; least recently used results are evicted first.
+        """
+        self.store = DiskCache(path, max_bytes)
+
+    @staticmethod
+    def key(blob_sha: str, analyzer: RegisteredAnalyzer, name: str) -> str:
+        return f"{name}:{analyzer.version}:{blob_sha}"
+
+    def lookup(self, blob_sha: str, analyzers: List[RegisteredAnalyzer]) -> Dict[str, Any]:
+        """
+        Fetch the cached results of the given analyzers for a blob.
+
+        Args:
+            blob_sha (str): Git blob SHA of the file content.
+            analyzers (List[RegisteredAnalyzer]): Analyzers interested in the file.
+
+        Returns:
+            Dict[str, Any]: Cached results keyed by result name. Analyzers with a result missing
+                from the dict have to be run; a cached None means the analyzer had nothing to report.
+        """
+        results = {}
+        for analyzer in analyzers:
+            for name in analyzer.result_names:
+                value = self.store.get(self.key(blob_sha, analyzer, name))
+                if value is not None:
+                    results[name] = json.loads(value)
+        return results
+
+    def store_results(self, blob_sha: str, analyzers: List[RegisteredAnalyzer], results: Dict[str, Any]):
+        """
+        Store freshly computed results for a blob.
+
+        Args:
+            blob_sha (str): Git blob SHA of the file content.
+            analyzers (List[RegisteredAnalyzer]): Analyzers that were run.
+            results (Dict[str, Any]): Their results keyed by result name. Results absent from
+                the dict come from analyzers that failed and are not cached.
+        """
+        for analyzer in analyzers:
+            for name in analyzer.result_names:
+                if name in results:
+                    value = json.dumps(results[name], separators=(',', ':')).encode('utf-8')
+                    self.store.set(self.key(blob_sha, analyzer, name), value)
+
+    @property
+    def hits(self) -> int:
+        return self.store.hits
+
+    @property
+    def misses(self) -> int:
+        return self.store.misses
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
+    def close(self):
+        self.store.close()
@@ -1,12 +1,16 @@
 import ast
 import logging
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List, Tuple
+from .symbol_index import encode_symbols
 
 logger = logging.getLogger(__name__)
 
 class CodeAnalyzer(ast.NodeVisitor):
     """
     Analyzes Python code content and gathers statistics on functions, classes, imports, and assignments.
+
+    The same pass records a symbol table: every function, class, method and imported
+    name as a (kind, qualified name, first line, last line) tuple.
     """
 
     def __init__(self):
@@ -16,8 +20,10 @@ class CodeAnalyzer(ast.NodeVisitor):
             'imports': 0,
             'assignments': 0
         }
+        self.symbols: List[Tuple[str, str, int, int]] = []
+        self.scope: List[Tuple[str, str]] = []
 
-analysis = self.code_analyzer.analyze_python_file(content)
+    def analyze_python_file(self, content: str) -> Optional[Dict[str, int]]:
         """
         Analyze a Python file's content and gather statistics.
 
@@ -30,11 +36,11 @@ analysis = self.code_analyzer.analyze_python_file(content)
         self.reset_stats()
         try:
             tree = ast.parse(content)
-            self.visit(tree)
-            return self.stats.copy()
         except SyntaxError as e:
-            logger.error(f"Syntax error in Python file: {e.text.strip()} at line {e.lineno}")
+            logger.error(f"Syntax error in Python file: {(e.text or '').strip()} at line {e.lineno}")
             return None
+        self.visit(tree)
+        return self.stats.copy()
 
     def reset_stats(self):
         """
@@ -46,55 +52,76 @@ analysis = self.code_analyzer.analyze_python_file(content)
             'imports': 0,
             'assignments': 0
         }
+        self.symbols = []
+        self.scope = []
+
+    def _add_symbol(self, kind: str, name: str, node: ast.AST):
+        self.symbols.append((kind, name, node.lineno, getattr(node, 'end_lineno', None) or node.lineno))
+
+    def _visit_scope(self, kind: str, node: ast.AST):
+        qualified_name = '.'.join([name for name, _ in self.scope] + [node.name])
+        if kind == 'function' and self.scope and self.scope[-1][1] == 'class':
+            kind = 'method'
+        self._add_symbol(kind, qualified_name, node)
+        self.scope.append((node.name, kind))
+        self.generic_visit(node)
+        self.scope.pop()
 
     def visit_FunctionDef(self, node: ast.FunctionDef):
         """
-        Count function definitions.
+        Count function definitions and record them as function or method symbols.
 
         Args:
             node (ast.FunctionDef): The function definition node.
         """
         self.stats['functions'] += 1
-        self.generic_visit(node)
+        self._visit_scope('function', node)
 
     def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
         """
-        Count async function definitions.
+        Count async function definitions and record them as function or method symbols.
 
         Args:
             node (ast.AsyncFunctionDef): The async function definition node.
         """
         self.stats['functions'] += 1
-        self.generic_visit(node)
+        self._visit_scope('function', node)
 
     def visit_ClassDef(self, node: ast.ClassDef):
         """
-        Count class definitions.
+        Count class definitions and record them as class symbols.
 
         Args:
             node (ast.ClassDef): The class definition node.
         """
         self.stats['classes'] += 1
-        self.generic_visit(node)
+        self._visit_scope('class', node)
 
     def visit_Import(self, node: ast.Import):
         """
-        Count import statements.
+        Count import statements and record each imported module.
 
         Args:
             node (ast.Import): The import statement node.
         """
         self.stats['imports'] += 1
+        for alias in node.names:
+            self._add_symbol('import', alias.name, node)
         self.generic_visit(node)
 
     def visit_ImportFrom(self, node: ast.ImportFrom):
         """
-        Count import-from statements.
+        Count import-from statements and record each imported name, qualified by its
+        module, e.g. 'os.path.join' or '..utils.helper' for relative imports.
 
         Args:
             node (ast.ImportFrom): The import-from statement node.
         """
         self.stats['imports'] += 1
+        module = '.' * node.level + (node.module or '')
+        for alias in node.names:
+            separator = '' if not module or module.endswith('.') else '.'
+            self._add_symbol('import', f"{module}{separator}{alias.name}", node)
         self.generic_visit(node)
 
     def visit_Assign(self, node: ast.Assign):
@@ -120,4 +147,28 @@ analysis = self.code_analyzer.analyze_python_file(content)
             f"- Number of classes: {self.stats.get('classes', 0)}\n"
             f"- Number of imports: {self.stats.get('imports', 0)}\n"
             f"- Number of assignments: {self.stats.get('assignments', 0)}"
-        )
\ No newline at end of file
+        )
+
+
+def analyze_python_module(file_path: str, content: str) -> Optional[Dict[str, Any]]:
+    """
+    Count code elements and extract the symbol table of a Python file in one parse and
+    one visitor pass.
+
+    No state is shared between calls, so this is safe to call from several threads,
+    and as a module-level function it can be sent to worker processes.
+
+    Args:
+        file_path (str): The path to the file.
+        content (str): The content of the Python file.
+
+    Returns:
+        Optional[Dict[str, Any]]: 'code_analysis', the counts of code elements, and 'symbols',
+            the symbol table encoded with symbol_index.encode_symbols; None if a syntax error occurs.
+    """
+    analyzer = CodeAnalyzer()
+    stats = analyzer.analyze_python_file(content)
+    if stats is None:
+        return None
+    return {'code_analysis': stats, 'symbols': encode_symbols(analyzer.symbols)}
+
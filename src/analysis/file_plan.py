@@ -0,0 +1,317 @@
+import re
+import hashlib
+import logging
+import posixpath
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+from ..api.github_api import TreeEntry
+from ..utils.file_utils import LANGUAGE_EXTENSIONS, get_file_extension, is_code_file
+
+logger = logging.getLogger(__name__)
+
+# Directories holding third-party code, after the most common entries of GitHub Linguist's vendor.yml.
+VENDORED_PATTERNS = (
+    '**/node_modules/**', '**/bower_components/**', '**/jspm_packages/**',
+    '**/vendor/**', '**/vendors/**', '**/third_party/**', '**/third-party/**', '**/thirdparty/**', '**/3rdparty/**',
+    '**/site-packages/**', '**/venv/**', '**/.venv/**', '**/virtualenv/**', '**/Godeps/**', '**/Pods/**',
+    '**/Carthage/**', '**/.yarn/**', '**/deps/**', '**/dist/**',
+)
+
+# Files produced by tools rather than written by hand, after Linguist's generated.rb.
+GENERATED_PATTERNS = (
+    'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml', 'bun.lockb', 'composer.lock',
+    'Gemfile.lock', 'Cargo.lock', 'poetry.lock', 'Pipfile.lock', 'pdm.lock', 'uv.lock', 'go.sum', 'flake.lock',
+    '*.min.js', '*.min.css', '*-min.js', '*.bundle.js', '*.chunk.js', '*.js.map', '*.css.map',
+    '*_pb2.py', '*_pb2_grpc.py', '*.pb.go', '*.pb.cc', '*.pb.h', '*.designer.cs', '*.g.cs', '*.generated.*',
+    '**/__generated__/**', '**/.next/**', '**/__pycache__/**',
+)
+
+# Why a file is not fetched, in the order the checks run.
+SKIP_REASONS = ('vendored', 'generated', 'binary', 'too_large', 'unknown_size', 'unsupported_language')
+
+AttributeValue = Union[bool, str]
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    """
+    Compile a .gitattributes / .gitignore style glob into a regular expression over paths.
+
+    A pattern without a slash matches a file name at any depth; one with a slash is
+    anchored at the root. '*' and '?' stay within one path component, '**' spans any
+    number of them, and character classes are kept.
+
+    Args:
+        pattern (str): The glob, relative to the directory it applies to.
+
+    Returns:
+        Pattern: An expression that matches the whole relative path.
+    """
+    if '/' not in pattern:
+        pattern = '**/' + pattern
+    pattern = pattern.lstrip('/')
+    regex, index = '', 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith('**/', index):
+            regex += '(?:.*/)?'
+            index += 3
+            continue
+        if pattern.startswith('/**', index) and index + 3 == len(pattern):
+            regex += '/.*'
+            break
+        if pattern.startswith('**', index):
+            regex += '.*'
+            index += 2
+            continue
+        if char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            end = pattern.find(']', index + 2)
+            if end < 0:
+                regex += re.escape(char)
+            else:
+                body = pattern[index + 1:end]
+                regex += '[' + ('^' + body[1:] if body[:1] == '!' else body).replace('\\', '\\\\') + ']'
+                index = end
+        else:
+            regex += re.escape(char)
+        index += 1
+    return re.compile(regex + r'\Z')
+
+
+def parse_gitattributes(text: str) -> List[Tuple[Pattern, Dict[str, Optional[AttributeValue]]]]:
+    """
+    Parse the content of a .gitattributes file.
+
+    Args:
+        text (str): The file content.
+
+    Returns:
+        List[Tuple[Pattern, Dict[str, Optional[AttributeValue]]]]: (pattern, attributes) in
+            file order. An attribute is True when set, False when unset ('-attr'), its value
+            for 'attr=value', and None when reset to unspecified ('!attr'). The 'binary' macro
+            is expanded to unset 'text' and 'diff'.
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or line.startswith('[attr]'):
+            continue
+        pattern, *tokens = line.split()
+        attributes: Dict[str, Optional[AttributeValue]] = {}
+        for token in tokens:
+            if token.startswith('-'):
+                attributes[token[1:]] = False
+            elif token.startswith('!'):
+                attributes[token[1:]] = None
+            elif '=' in token:
+                name, value = token.split('=', 1)
+                attributes[name] = value
+            else:
+                attributes[token] = True
+        if attributes.pop('binary', None):
+            attributes.update(text=False, diff=False)
+        if pattern.startswith('!') or pattern.endswith('/'):
+            # git ignores negative patterns, and directory patterns never match the files within.
+            continue
+        rules.append((glob_to_regex(pattern), attributes))
+    return rules
+
+
+def is_truthy(value: Optional[AttributeValue]) -> Optional[bool]:
+    """
+    Interpret a linguist attribute: set or 'true' is True, unset or 'false' is False.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.lower() not in ('false', '0', 'no')
+    return value
+
+
+@dataclass
+class FilePlan:
+    """
+    Which files of a tree to fetch, and what skipping the rest saves.
+
+    Attributes:
+        selected (Dict[str, TreeEntry]): Entries of the files to fetch, keyed by path.
+        skipped (Dict[str, str]): The reason each skipped file is left out, keyed by path;
+            one of SKIP_REASONS.
+        bytes_avoided (int): Total size of the skipped files.
+        requests_avoided (int): Content requests the skipped files would have cost.
+    """
+    selected: Dict[str, TreeEntry] = field(default_factory=dict)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    bytes_avoided: int = 0
+    requests_avoided: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the plan for reports.
+
+        Returns:
+            Dict[str, Any]: Numbers of 'selected' and 'skipped' files, skipped files 'by_reason',
+                'bytes_avoided' and 'requests_avoided'.
+        """
+        return {
+            'selected': len(self.selected),
+            'skipped': len(self.skipped),
+            'by_reason': dict(Counter(self.skipped.values())),
+            'bytes_avoided': self.bytes_avoided,
+            'requests_avoided': self.requests_avoided,
+        }
+
+
+class FilePlanner:
+    """
+    Decides from tree metadata alone which files are worth fetching.
+
+    Files are skipped when they are vendored or generated (by path heuristics after GitHub
+    Linguist, or by linguist-vendored / linguist-generated in .gitattributes), marked binary
+    in .gitattributes, larger than max_file_size (or of unknown size when there is a limit),
+    or code in a language outside supported_languages (after any linguist-language
+    override). Attributes from .gitattributes always win over the heuristics, so a
+    repository can opt a path back in with e.g. 'vendor/** -linguist-vendored'.
+    """
+
+    def __init__(
+        self,
+        max_file_size: Optional[int] = None,
+        supported_languages: Optional[Iterable[str]] = None,
+        vendored_patterns: Iterable[str] = VENDORED_PATTERNS,
+        generated_patterns: Iterable[str] = GENERATED_PATTERNS,
+    ):
+        """
+        Initialize the FilePlanner.
+
+        Args:
+            max_file_size (Optional[int]): Files larger than this many bytes are skipped. None or
+                0 means no limit.
+            supported_languages (Optional[Iterable[str]]): Code in other languages is skipped. None
+                or empty means every language.
+            vendored_patterns (Iterable[str]): Globs of vendored paths.
+            generated_patterns (Iterable[str]): Globs of generated files.
+        """
+        self.max_file_size = max_file_size or None
+        self.supported_languages = {language.lower() for language in supported_languages or ()}
+        vendored_patterns, generated_patterns = tuple(vendored_patterns), tuple(generated_patterns)
+        self.vendored = [glob_to_regex(pattern) for pattern in vendored_patterns]
+        self.generated = [glob_to_regex(pattern) for pattern in generated_patterns]
+        settings = repr((self.max_file_size, sorted(self.supported_languages), vendored_patterns, generated_patterns))
+        # Changes whenever the planner's settings do, so results planned under others can be told apart.
+        self.version = hashlib.sha1(settings.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def attribute_files(tree: Dict[str, TreeEntry]) -> List[str]:
+        """
+        List the paths of the .gitattributes files of a tree, shallowest first.
+        """
+        paths = [path for path, entry in tree.items()
+                 if entry.type == 'file' and posixpath.basename(path) == '.gitattributes']
+        return sorted(paths, key=lambda path: (path.count('/'), path))
+
+    def plan(
+        self,
+        tree: Dict[str, TreeEntry],
+        attributes: Optional[Dict[str, str]] = None,
+        claims: Optional[Callable[[str], bool]] = None,
+    ) -> FilePlan:
+        """
+        Plan which files of a tree to fetch.
+
+        Args:
+            tree (Dict[str, TreeEntry]): Entries keyed by path.
+            attributes (Optional[Dict[str, str]]): Content of the tree's .gitattributes files keyed
+                by their path; see attribute_files.
+            claims (Optional[Callable[[str], bool]]): Only files it accepts would be fetched at all;
+                the others are neither selected nor counted as avoided.
+
+        Returns:
+            FilePlan: The selected and skipped files.
+        """
+        rules = self.attribute_rules(attributes or {})
+        plan = FilePlan()
+        for path, entry in tree.items():
+            if entry.type != 'file' or (claims and not claims(path)):
+                continue
+            reason = self.skip_reason(entry, self.attributes_of(path, rules))
+            if reason:
+                plan.skipped[path] = reason
+                plan.bytes_avoided += entry.size or 0
+                plan.requests_avoided += 1
+            else:
+                plan.selected[path] = entry
+        if plan.skipped:
+            by_reason = ', '.join(f"{count} {reason}" for reason, count in sorted(plan.summary()['by_reason'].items()))
+            logger.info(f"Fetch plan: {len(plan.selected)} files to fetch, {len(plan.skipped)} skipped ({by_reason}); "
+                        f"{plan.requests_avoided} requests and {plan.bytes_avoided} bytes avoided.")
+        return plan
+
+    @staticmethod
+    def attribute_rules(attributes: Dict[str, str]) -> List[Tuple[str, Pattern, Dict[str, Optional[AttributeValue]]]]:
+        """
+        Parse .gitattributes files into (directory prefix, pattern, attributes) rules, in the
+        order they apply: shallower files first, and lines in file order.
+        """
+        rules = []
+        for path in sorted(attributes, key=lambda path: (path.count('/'), path)):
+            directory = posixpath.dirname(path)
+            prefix = directory + '/' if directory else ''
+            rules.extend((prefix, pattern, values) for pattern, values in parse_gitattributes(attributes[path]))
+        return rules
+
+    @staticmethod
+    def attributes_of(path: str, rules: List[Tuple[str, Pattern, Dict[str, Optional[AttributeValue]]]]
+                      ) -> Dict[str, AttributeValue]:
+        """
+        Resolve the attributes of a path: later rules override earlier ones.
+        """
+        resolved: Dict[str, Optional[AttributeValue]] = {}
+        for prefix, pattern, values in rules:
+            if path.startswith(prefix) and pattern.match(path[len(prefix):]):
+                resolved.update(values)
+        return {name: value for name, value in resolved.items() if value is not None}
+
+    def skip_reason(self, entry: TreeEntry, attributes: Dict[str, AttributeValue]) -> Optional[str]:
+        """
+        Tell why a file should not be fetched.
+
+        Args:
+            entry (TreeEntry): The file's tree entry.
+            attributes (Dict[str, AttributeValue]): Its resolved .gitattributes attributes.
+
+        Returns:
+            Optional[str]: One of SKIP_REASONS, or None to fetch the file.
+        """
+        path = entry.path
+        vendored = is_truthy(attributes.get('linguist-vendored'))
+        if vendored is None:
+            vendored = any(pattern.match(path) for pattern in self.vendored)
+        if vendored:
+            return 'vendored'
+        generated = is_truthy(attributes.get('linguist-generated'))
+        if generated is None:
+            generated = any(pattern.match(path) for pattern in self.generated)
+        if generated:
+            return 'generated'
+        if attributes.get('text') is False:
+            return 'binary'
+        if self.max_file_size:
+            if entry.size is None:
+                # Without a size the file could be any size; it is not fetched blind.
+                return 'unknown_size'
+            if entry.size > self.max_file_size:
+                return 'too_large'
+        if self.supported_languages:
+            language = attributes.get('linguist-language')
+            if isinstance(language, str):
+                language = language.lower()
+            elif is_code_file(path):
+                language = LANGUAGE_EXTENSIONS.get(get_file_extension(path))
+            if language and language not in self.supported_languages:
+                return 'unsupported_language'
+        return None
@@ -0,0 +1,257 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from scipy import sparse
+from .symbol_index import decode_symbols
+
+logger = logging.getLogger(__name__)
+
+
+def module_names(path: str, packages: Set[str]) -> List[str]:
+    """
+    Dotted names under which a Python file can be imported.
+
+    The first name is relative to the repository root. If the file's package chain
+    (directories holding an __init__.py) stops below the root, as in a src/ layout,
+    the name relative to the top of the chain follows.
+
+    Args:
+        path (str): Repository path of a .py file.
+        packages (Set[str]): Directories that contain an __init__.py.
+
+    Returns:
+        List[str]: The names; a package's __init__.py is named after its directory.
+    """
+    parts = path[:-len('.py')].split('/')
+    if parts[-1] == '__init__':
+        parts.pop()
+    names = ['.'.join(parts)] if parts else []
+    top = len(parts) - 1
+    while top > 0 and '/'.join(parts[:top]) in packages:
+        top -= 1
+    if 0 < top < len(parts):
+        names.append('.'.join(parts[top:]))
+    return names
+
+
+class ImportGraph:
+    """
+    The repository's module dependency graph, as a sparse adjacency matrix.
+
+    Import symbols from the symbol analyzer are resolved to repository modules;
+    imports of anything outside the repository are dropped. Node i imports node j
+    when entry (i, j) is set. Centrality is computed with vectorized sparse
+    matrix products. Updates are incremental: only changed files' imports are
+    re-resolved (all of them only when modules are added or removed), node ids
+    are stable, and PageRank is warm-started from the previous scores.
+    """
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.active = np.zeros(0, dtype=bool)
+        self._ids: Dict[str, int] = {}
+        self._lookup: Dict[str, int] = {}
+        self._sources: Dict[str, Optional[str]] = {}
+        self._imports: Dict[int, Tuple[str, ...]] = {}
+        self._targets: Dict[int, np.ndarray] = {}
+        self._matrix: Optional[sparse.csr_matrix] = None
+        self._pagerank: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, file_symbols: Dict[str, Optional[str]]) -> 'ImportGraph':
+        """
+        Build the graph of a set of Python files.
+
+        Args:
+            file_symbols (Dict[str, Optional[str]]): Symbols encoded with encode_symbols, keyed by
+                file path; None for files that could not be parsed.
+
+        Returns:
+            ImportGraph: The graph.
+        """
+        graph = cls()
+        graph.update(file_symbols)
+        return graph
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    def update(self, file_symbols: Dict[str, Optional[str]]) -> int:
+        """
+        Bring the graph in line with the current set of Python files.
+
+        Args:
+            file_symbols (Dict[str, Optional[str]]): Symbols of every Python file, as for build.
+                Files missing from it are removed from the graph.
+
+        Returns:
+            int: Number of files added, changed or removed.
+        """
+        python_files = {path: encoded for path, encoded in file_symbols.items() if path.endswith('.py')}
+        removed = [path for path in self._sources if path not in python_files]
+        changed = [path for path, encoded in python_files.items()
+                   if path not in self._sources or self._sources[path] != encoded]
+        added = [path for path in changed if path not in self._ids or not self.active[self._ids[path]]]
+        if not removed and not changed:
+            return 0
+
+        for path in removed:
+            node = self._ids[path]
+            self.active[node] = False
+            self._imports.pop(node, None)
+            self._targets.pop(node, None)
+            del self._sources[path]
+        new_paths = [path for path in added if path not in self._ids]
+        self._ids.update((path, len(self.paths) + offset) for offset, path in enumerate(new_paths))
+        self.paths.extend(new_paths)
+        self.active = np.concatenate([self.active, np.zeros(len(new_paths), dtype=bool)])
+        for path in changed:
+            node = self._ids[path]
+            self.active[node] = True
+            self._sources[path] = python_files[path]
+            encoded = python_files[path] or ''
+            self._imports[node] = tuple(name for kind, name, _, _ in decode_symbols(encoded) if kind == 'import')
+
+        if removed or added:
+            # Module names changed, so any file's imports may now resolve differently.
+            self._build_lookup()
+            stale = self._imports.keys()
+        else:
+            stale = [self._ids[path] for path in changed]
+        for node in stale:
+            self._targets[node] = self._resolve(node)
+        self._matrix = None
+        return len(changed) + len(removed)
+
+    def _build_lookup(self):
+        paths = [path for path in self.paths if self.active[self._ids[path]]]
+        packages = {path[:-len('/__init__.py')] for path in paths if path.endswith('/__init__.py')}
+        names = [(module_names(path, packages), self._ids[path]) for path in sorted(paths)]
+        # Names relative to the repository root win over names relative to a package chain.
+        self._lookup = {}
+        for position in (0, 1):
+            for module, node in names:
+                if len(module) > position:
+                    self._lookup.setdefault(module[position], node)
+
+    def _resolve(self, node: int) -> np.ndarray:
+        path = self.paths[node]
+        own = path[:-len('.py')].replace('/', '.')
+        package = own[:-len('.__init__')] if own.endswith('.__init__') else own.rpartition('.')[0]
+        targets = set()
+        for name in self._imports[node]:
+            if name.startswith('.'):
+                level = len(name) - len(name.lstrip('.'))
+                base = package.split('.') if package else []
+                if level - 1 > len(base):
+                    continue
+                base = base[:len(base) - (level - 1)]
+                name = '.'.join(base + ([name[level:]] if name[level:] else []))
+            if name.endswith('*'):
+                name = name[:-1].rstrip('.')
+            # 'from a.b import c' imports module a.b.c or name c of module a.b.
+            while name:
+                target = self._lookup.get(name)
+                if target is not None:
+                    if target != node:
+                        targets.add(target)
+                    break
+                name = name.rpartition('.')[0]
+        return np.fromiter(sorted(targets), dtype=np.int64, count=len(targets))
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """
+        The adjacency matrix: entry (i, j) is 1 when module i imports module j.
+        """
+        if self._matrix is None:
+            size = len(self.paths)
+            nodes = np.fromiter(self._targets.keys(), dtype=np.int64, count=len(self._targets))
+            targets = list(self._targets.values())
+            counts = np.fromiter((len(value) for value in targets), dtype=np.int64, count=len(targets))
+            columns = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+            rows = np.repeat(nodes, counts)
+            self._matrix = sparse.csr_matrix(
+                (np.ones(len(columns), dtype=np.float64), (rows, columns)), shape=(size, size)
+            )
+        return self._matrix
+
+    def in_degree(self) -> np.ndarray:
+        """
+        Number of repository modules importing each module.
+
+        Returns:
+            np.ndarray: One count per node id.
+        """
+        return np.asarray(self.matrix.sum(axis=0)).ravel()
+
+    def pagerank(self, damping: float = 0.85, tolerance: float = 1e-8, max_iterations: int = 100) -> np.ndarray:
+        """
+        PageRank of each module, with rank flowing from importers to the modules they import.
+
+        Args:
+            damping (float): Probability of following an import rather than jumping to a random module.
+            tolerance (float): Convergence threshold on the L1 change between iterations.
+            max_iterations (int): Upper bound on the number of power iterations.
+
+        Returns:
+            np.ndarray: One score per node id, summing to 1 over active modules; 0 for removed modules.
+        """
+        size = len(self.paths)
+        count = len(self)
+        if not count:
+            return np.zeros(size)
+        adjacency = self.matrix
+        out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+        inverse = np.divide(1.0, out_degree, out=np.zeros(size), where=out_degree > 0)
+        transition = (sparse.diags(inverse) @ adjacency).T.tocsr()
+        teleport = self.active / count
+        dangling = self.active & (out_degree == 0)
+
+        rank = teleport
+        if self._pagerank is not None:
+            previous = np.zeros(size)
+            previous[:len(self._pagerank)] = self._pagerank
+            previous[~self.active] = 0
+            if previous.sum() > 0:
+                rank = previous / previous.sum()
+
+        for iteration in range(max_iterations):
+            updated = damping * (transition @ rank + rank[dangling].sum() * teleport) + (1 - damping) * teleport
+            change = np.abs(updated - rank).sum()
+            rank = updated
+            if change < tolerance:
+                break
+        logger.debug(f"PageRank converged after {iteration + 1} iterations over {count} modules.")
+        self._pagerank = rank
+        return rank
+
+    def ranking(self, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Modules ordered by PageRank, ties broken by in-degree and then path.
+
+        Args:
+            limit (Optional[int]): Number of modules to return. Defaults to all of them.
+
+        Returns:
+            List[Tuple[str, float]]: (path, PageRank) pairs, highest first.
+        """
+        scores = self.pagerank()
+        nodes = np.flatnonzero(self.active)
+        order = np.lexsort((np.array([self.paths[node] for node in nodes]), -self.in_degree()[nodes], -scores[nodes]))
+        return [(self.paths[nodes[position]], float(scores[nodes[position]])) for position in order[:limit]]
+
+    def imports_of(self, path: str) -> List[str]:
+        """
+        Repository modules a file imports.
+
+        Args:
+            path (str): Path of a Python file in the graph.
+
+        Returns:
+            List[str]: Paths of the imported modules; empty for unknown files.
+        """
+        node = self._ids.get(path)
+        if node is None or not self.active[node]:
+            return []
+        return [self.paths[target] for target in self._targets[node]]
@@ -0,0 +1,203 @@
+import os
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from ..api.github_api import TreeEntry, FileChange
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RunState:
+    """
+    What an analysis run of a repository leaves behind for the next incremental run.
+
+    Attributes:
+        commit_sha (str): The commit that was analyzed.
+        tree (Dict[str, TreeEntry]): The repository tree at that commit.
+        results (Dict[str, Dict[str, Any]]): Per-file results keyed by analyzer name, then path.
+        analyzer_versions (Dict[str, str]): Versions of the analyzers that produced the results.
+    """
+    commit_sha: str
+    tree: Dict[str, TreeEntry]
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    analyzer_versions: Dict[str, str] = field(default_factory=dict)
+
+
+class RunStateStore:
+    """
+    Persists one RunState per repository as a JSON file in a directory.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the RunStateStore.
+
+        Args:
+            directory (str): Directory holding the state files; created if missing.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, full_name: str, kind: str = '') -> str:
+        suffix = f'.{kind}.json' if kind else '.json'
+        return os.path.join(self.directory, full_name.replace('/', '__') + suffix)
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as state_file:
+            json.dump(data, state_file, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    def load(self, full_name: str) -> Optional[RunState]:
+        """
+        Load the state of the last run of a repository.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+
+        Returns:
+            Optional[RunState]: The stored state, or None if there is no usable state.
+        """
+        try:
+            with open(self.path_for(full_name), 'r', encoding='utf-8') as state_file:
+                data = json.load(state_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable run state for {full_name}: {e}")
+            return None
+        tree = {path: TreeEntry(path, *values) for path, values in data['tree'].items()}
+        return RunState(data['commit_sha'], tree, data['results'], data.get('analyzer_versions', {}))
+
+    def save(self, full_name: str, state: RunState):
+        """
+        Atomically replace the stored state of a repository.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            state (RunState): The state to store.
+        """
+        data = {
+            'commit_sha': state.commit_sha,
+            # Entries are stored as compact [type, sha, size, mode] lists keyed by path.
+            'tree': {path: [entry.type, entry.sha, entry.size, entry.mode] for path, entry in state.tree.items()},
+            'results': state.results,
+            'analyzer_versions': state.analyzer_versions,
+        }
+        self._write_json(self.path_for(full_name), data)
+
+    def load_activity(self, full_name: str, kind: str) -> Tuple[Optional[str], Dict[str, Dict[str, Any]]]:
+        """
+        Load the issues or pull requests synced by earlier runs.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            kind (str): 'issues' or 'pulls'.
+
+        Returns:
+            Tuple[Optional[str], Dict[str, Dict[str, Any]]]: The 'since' cursor to resume from
+                (None for a full sync) and the projected items keyed by number.
+        """
+        try:
+            with open(self.path_for(full_name, kind), 'r', encoding='utf-8') as state_file:
+                data = json.load(state_file)
+        except FileNotFoundError:
+            return None, {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {kind} state for {full_name}: {e}")
+            return None, {}
+        return data['cursor'], data['items']
+
+    def save_activity(self, full_name: str, kind: str, cursor: Optional[str], items: Dict[str, Dict[str, Any]]):
+        """
+        Atomically replace the synced issues or pull requests of a repository.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            kind (str): 'issues' or 'pulls'.
+            cursor (Optional[str]): Latest 'updated_at' seen, where the next sync resumes.
+            items (Dict[str, Dict[str, Any]]): Projected items keyed by number.
+        """
+        self._write_json(self.path_for(full_name, kind), {'cursor': cursor, 'items': items})
+
+
+def _parent_dirs(path: str) -> Iterable[str]:
+    parts = path.split('/')[:-1]
+    for depth in range(1, len(parts) + 1):
+        yield '/'.join(parts[:depth])
+
+
+def apply_file_changes(tree: Dict[str, TreeEntry], changes: List[FileChange]) -> Tuple[Set[str], Set[str]]:
+    """
+    Update a tree in place with the files changed between two commits.
+
+    Args:
+        tree (Dict[str, TreeEntry]): Tree at the base commit; becomes the tree at the head commit.
+        changes (List[FileChange]): Files changed between the commits.
+
+    Returns:
+        Tuple[Set[str], Set[str]]: Paths of added or modified files, and paths of removed files.
+    """
+    changed, removed = set(), set()
+    for change in changes:
+        if change.status == 'removed' or change.previous_path:
+            old_path = change.previous_path or change.path
+            tree.pop(old_path, None)
+            removed.add(old_path)
+        if change.status == 'removed':
+            continue
+        previous = tree.get(change.path)
+        tree[change.path] = TreeEntry(
+            path=change.path,
+            type='file',
+            sha=change.sha,
+            size=None,
+            mode=previous.mode if previous else '100644',
+        )
+        changed.add(change.path)
+        removed.discard(change.path)
+        for directory in _parent_dirs(change.path):
+            if directory not in tree:
+                tree[directory] = TreeEntry(directory, 'dir', '', None, '040000')
+
+    if removed:
+        # Directories left without any entry below them disappear from git trees.
+        occupied = {directory for path in tree for directory in _parent_dirs(path)}
+        for path in [path for path, entry in tree.items() if entry.type == 'dir' and path not in occupied]:
+            del tree[path]
+    return changed, removed
+
+
+def diff_trees(old: Dict[str, TreeEntry], new: Dict[str, TreeEntry]) -> Tuple[Set[str], Set[str]]:
+    """
+    Compare two trees by blob SHA.
+
+    Args:
+        old (Dict[str, TreeEntry]): Tree at the earlier commit.
+        new (Dict[str, TreeEntry]): Tree at the later commit.
+
+    Returns:
+        Tuple[Set[str], Set[str]]: Paths of added or modified files, and paths of removed files.
+    """
+    changed = {
+        path for path, entry in new.items()
+        if entry.type == 'file' and (path not in old or old[path].sha != entry.sha)
+    }
+    removed = {path for path, entry in old.items() if entry.type == 'file' and path not in new}
+    return changed, removed
+
+
+def drop_results(results: Dict[str, Dict[str, Any]], paths: Iterable[str]):
+    """
+    Remove the per-file results of the given paths from every analyzer, in place.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Per-file results keyed by analyzer name, then path.
+        paths (Iterable[str]): Paths whose results are stale.
+    """
+    paths = list(paths)
+    for analyzer_results in results.values():
+        for path in paths:
+            analyzer_results.pop(path, None)
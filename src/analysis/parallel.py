@@ -0,0 +1,136 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(Exception):
+    """
+    Raised for a call that failed inside a worker process.
+    """
+
+
+def run_chunk(function: Callable, chunk: List[Tuple]) -> List[Tuple[bool, Any]]:
+    """
+    Apply a function to a chunk of argument tuples inside a worker process.
+
+    Failures are caught per call so that one bad file does not fail its whole chunk.
+
+    Args:
+        function (Callable): A picklable module-level function.
+        chunk (List[Tuple]): Positional arguments of each call.
+
+    Returns:
+        List[Tuple[bool, Any]]: (True, result) or (False, error message) per call.
+    """
+    outcomes = []
+    for args in chunk:
+        try:
+            outcomes.append((True, function(*args)))
+        except Exception as e:
+            outcomes.append((False, f"{type(e).__name__}: {e}"))
+    return outcomes
+
+
+class ProcessPoolRunner:
+    """
+    Runs CPU-bound, stateless functions in a pool of worker processes.
+
+    Calls submitted one at a time from many coroutines are gathered into chunks
+    per function, so each round trip to a worker carries up to chunk_size calls
+    and the pickling and IPC cost is amortized.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 32, flush_delay: float = 0.005):
+        """
+        Initialize the ProcessPoolRunner.
+
+        Args:
+            workers (Optional[int]): Number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int): Maximum number of calls sent to a worker at once.
+            flush_delay (float): Seconds a partial chunk waits for more calls before it is sent.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.flush_delay = flush_delay
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.chunks_sent = 0
+        self._pending: Dict[Callable, List[Tuple[Tuple, asyncio.Future]]] = {}
+
+    async def submit(self, function: Callable, *args) -> Any:
+        """
+        Run function(*args) in a worker process.
+
+        Args:
+            function (Callable): A picklable module-level function.
+            *args: Its positional arguments; they must be picklable.
+
+        Returns:
+            Any: The function's return value.
+
+        Raises:
+            WorkerError: If the call raised in the worker.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        chunk = self._pending.setdefault(function, [])
+        chunk.append((args, future))
+        if len(chunk) >= self.chunk_size:
+            self._flush(function)
+        elif len(chunk) == 1:
+            loop.call_later(self.flush_delay, self._flush, function)
+        return await future
+
+    async def map(self, function: Callable, calls: Iterable[Tuple]) -> List[Any]:
+        """
+        Run function over many argument tuples, in chunks.
+
+        Args:
+            function (Callable): A picklable module-level function.
+            calls (Iterable[Tuple]): Positional arguments of each call.
+
+        Returns:
+            List[Any]: The results in call order; a WorkerError instance where a call raised.
+        """
+        calls = list(calls)
+        loop = asyncio.get_running_loop()
+        chunks = [calls[start:start + self.chunk_size] for start in range(0, len(calls), self.chunk_size)]
+        self.chunks_sent += len(chunks)
+        outcomes = await asyncio.gather(
+            *(loop.run_in_executor(self.executor, run_chunk, function, chunk) for chunk in chunks)
+        )
+        return [result if ok else WorkerError(result) for chunk in outcomes for ok, result in chunk]
+
+    def _flush(self, function: Callable):
+        chunk = self._pending.pop(function, None)
+        if not chunk:
+            return
+        self.chunks_sent += 1
+        loop = asyncio.get_running_loop()
+        done = loop.run_in_executor(self.executor, run_chunk, function, [args for args, _ in chunk])
+        done.add_done_callback(lambda finished: self._resolve(chunk, finished))
+
+    @staticmethod
+    def _resolve(chunk: List[Tuple[Tuple, asyncio.Future]], finished: asyncio.Future):
+        if finished.cancelled() or finished.exception() is not None:
+            error = finished.exception() if not finished.cancelled() else WorkerError("Chunk cancelled")
+            for _, future in chunk:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), (ok, result) in zip(chunk, finished.result()):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(WorkerError(result))
+
+    def close(self):
+        """
+        Shut the worker processes down.
+        """
+        self.executor.shutdown(cancel_futures=True)
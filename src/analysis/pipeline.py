@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+Item = TypeVar('Item')
+
+# Marks the end of a stage's output on the queue to the next stage.
+_DONE = object()
+
+
+def _utf8_size(content: str) -> int:
+    # isascii() is a flag check on CPython strings, so ASCII content is not encoded just to be measured.
+    return len(content) if content.isascii() else len(content.encode('utf-8', 'surrogatepass'))
+
+
+class ByteBudget:
+    """
+    Caps the bytes of fetched content waiting for or under analysis.
+
+    A fetch that would exceed the budget waits until analyzed content releases
+    enough of it. A single item larger than the whole budget is let through once
+    nothing else is held, so it cannot stall the pipeline.
+    """
+
+    def __init__(self, max_bytes: Optional[int]):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.peak = 0
+        self._released = asyncio.Condition()
+
+    async def acquire(self, size: int):
+        async with self._released:
+            if self.max_bytes is not None:
+                await self._released.wait_for(lambda: self.used == 0 or self.used + size <= self.max_bytes)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    async def release(self, size: int):
+        async with self._released:
+            self.used -= size
+            self._released.notify_all()
+
+
+class AnalysisPipeline:
+    """
+    Overlaps fetching file contents with analyzing them.
+
+    Fetch workers feed a bounded queue that analyze workers drain, and the
+    caller aggregates results as they come out of a second queue. When analysis
+    falls behind, the full queue and the byte budget stop the fetch workers, so
+    the content held in memory stays bounded however large the repository is;
+    when fetching falls behind, analysis simply waits. End-to-end time approaches
+    the slower of the two stages rather than their sum.
+    """
+
+    def __init__(self, fetch_concurrency: int = 16, analyze_concurrency: int = 1, queue_size: int = 64,
+                 max_bytes: Optional[int] = 64 * 1024 * 1024):
+        """
+        Initialize the AnalysisPipeline.
+
+        Args:
+            fetch_concurrency (int): Number of fetches in flight at once.
+            analyze_concurrency (int): Number of analyses in flight at once. More than one only
+                helps when analysis awaits, e.g. on a process pool.
+            queue_size (int): Most fetched items waiting for analysis, and analyzed items
+                waiting for aggregation.
+            max_bytes (Optional[int]): Most bytes of content fetched but not yet analyzed.
+                None for no limit.
+        """
+        self.fetch_concurrency = fetch_concurrency
+        self.analyze_concurrency = analyze_concurrency
+        self.queue_size = queue_size
+        self.max_bytes = max_bytes
+        self.fetched = 0
+        self.analyzed = 0
+        self.peak_bytes = 0
+
+    async def run(self, items: Iterable[Item], fetch: Callable[[Item], Awaitable[Optional[str]]],
+                  analyze: Callable[[Item, str], Awaitable[Any]]) -> AsyncIterator[Tuple[Item, Any]]:
+        """
+        Fetch and analyze items, yielding results as they are ready.
+
+        Args:
+            items (Iterable[Item]): What to fetch, e.g. tree entries. Consumed lazily.
+            fetch (Callable): Coroutine function returning an item's content, or None if it has none.
+            analyze (Callable): Coroutine function analyzing an item's content.
+
+        Yields:
+            Tuple[Item, Any]: Each item with its analysis result; None for items without content.
+        """
+        pending = iter(items)
+
+        async def produce(put: Callable[[Item, Optional[str]], Awaitable[None]]):
+            async def worker():
+                # The workers share one iterator, so each item is fetched by exactly one of them.
+                for item in pending:
+                    await put(item, await fetch(item))
+
+            await asyncio.gather(*(worker() for _ in range(self.fetch_concurrency)))
+
+        async for result in self._run(produce, analyze):
+            yield result
+
+    async def run_stream(self, source: AsyncIterable[Tuple[Item, Optional[str]]],
+                         analyze: Callable[[Item, str], Awaitable[Any]]) -> AsyncIterator[Tuple[Item, Any]]:
+        """
+        Analyze items whose contents arrive from a stream, e.g. batched blob queries.
+
+        The stream is only read while the pipeline has room, so a lazy source is held
+        back by the same backpressure as the fetch workers of run.
+
+        Args:
+            source (AsyncIterable[Tuple[Item, Optional[str]]]): Items with their content, or None.
+            analyze (Callable): Coroutine function analyzing an item's content.
+
+        Yields:
+            Tuple[Item, Any]: Each item with its analysis result; None for items without content.
+        """
+        async def produce(put: Callable[[Item, Optional[str]], Awaitable[None]]):
+            async for item, content in source:
+                await put(item, content)
+
+        async for result in self._run(produce, analyze):
+            yield result
+
+    async def _run(self, produce: Callable, analyze: Callable) -> AsyncIterator[Tuple[Item, Any]]:
+        budget = ByteBudget(self.max_bytes)
+        contents: asyncio.Queue = asyncio.Queue(self.queue_size)
+        results: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        async def put(item: Item, content: Optional[str]):
+            size = _utf8_size(content) if content else 0
+            await budget.acquire(size)
+            self.fetched += 1
+            await contents.put((item, content, size))
+
+        async def fetch_stage():
+            await produce(put)
+            for _ in range(self.analyze_concurrency):
+                await contents.put(_DONE)
+
+        async def analyze_worker():
+            while True:
+                queued = await contents.get()
+                if queued is _DONE:
+                    await results.put(_DONE)
+                    return
+                item, content, size = queued
+                try:
+                    result = await analyze(item, content) if content else None
+                finally:
+                    await budget.release(size)
+                self.analyzed += 1
+                await results.put((item, result))
+
+        tasks = [asyncio.ensure_future(fetch_stage())]
+        tasks.extend(asyncio.ensure_future(analyze_worker()) for _ in range(self.analyze_concurrency))
+        try:
+            finished = 0
+            while finished < self.analyze_concurrency:
+                getter = asyncio.ensure_future(results.get())
+                # A failed stage would otherwise leave the aggregator waiting for results forever.
+                done, _ = await asyncio.wait([getter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    for task in done:
+                        if task.exception() is not None:
+                            raise task.exception()
+                    tasks = [task for task in tasks if not task.done()]
+                    continue
+                result = getter.result()
+                if result is _DONE:
+                    finished += 1
+                else:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.peak_bytes = max(self.peak_bytes, budget.peak)
+
+    def stats(self) -> Dict[str, int]:
+        return {'fetched': self.fetched, 'analyzed': self.analyzed, 'peak_bytes': self.peak_bytes}
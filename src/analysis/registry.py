@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from .parallel import ProcessPoolRunner
+from ..utils.file_utils import classify_file
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RegisteredAnalyzer:
+    """
+    An analyzer and the file classifications it claims.
+
+    Attributes:
+        name (str): Key under which the analyzer's results are collected, e.g. 'code_analysis',
+            and its version is reported.
+        classifications (FrozenSet[str]): The analyzer runs on files carrying any of these.
+        analyze (Callable[[str, str], Optional[Any]]): Called with (file_path, content);
+            returns the per-file result, or None if there is nothing to report.
+        version (str): Bumped whenever the analyzer's output for the same input changes.
+        parallel (bool): analyze is a picklable, stateless module-level function that may run
+            in a worker process.
+        outputs (Tuple[str, ...]): For an analyzer that computes several results in one pass,
+            their names: analyze returns a dict with these keys, or None, and each result is
+            collected under its own name as if from a separate analyzer. Empty for an analyzer
+            whose single result is collected under name.
+    """
+    name: str
+    classifications: FrozenSet[str]
+    analyze: Callable[[str, str], Optional[Any]]
+    version: str = "1"
+    parallel: bool = False
+    outputs: Tuple[str, ...] = ()
+
+    @property
+    def result_names(self) -> Tuple[str, ...]:
+        return self.outputs or (self.name,)
+
+    def split(self, result: Optional[Any]) -> Dict[str, Any]:
+        """
+        Key the result of analyze by result name.
+        """
+        if not self.outputs:
+            return {self.name: result}
+        return {output: (result or {}).get(output) for output in self.outputs}
+
+
+class AnalyzerRegistry:
+    """
+    Routes file contents to every analyzer that claims the file's classification,
+    so that each file is fetched once no matter how many analyzers are interested.
+    """
+
+    def __init__(self, classifier: Callable[[str], FrozenSet[str]] = classify_file):
+        """
+        Initialize the AnalyzerRegistry.
+
+        Args:
+            classifier (Callable[[str], FrozenSet[str]]): Maps a file path to its classifications.
+        """
+        self.classifier = classifier
+        self.analyzers: List[RegisteredAnalyzer] = []
+
+    def register(
+        self,
+        name: str,
+        classifications: Iterable[str],
+        analyze: Callable[[str, str], Optional[Any]],
+        version: str = "1",
+        parallel: bool = False,
+        outputs: Iterable[str] = (),
+    ) -> RegisteredAnalyzer:
+        """
+        Register an analyzer.
+
+        Args:
+            name (str): Key under which the analyzer's results are collected.
+            classifications (Iterable[str]): File classifications the analyzer claims.
+            analyze (Callable[[str, str], Optional[Any]]): Called with (file_path, content).
+            version (str): Analyzer version, part of any cache key for its results.
+            parallel (bool): analyze may run in a worker process, see RegisteredAnalyzer.
+            outputs (Iterable[str]): Names of the results of a multi-result analyzer, see RegisteredAnalyzer.
+
+        Returns:
+            RegisteredAnalyzer: The registered analyzer.
+
+        Raises:
+            ValueError: If an analyzer or result with the same name is already registered.
+        """
+        analyzer = RegisteredAnalyzer(name, frozenset(classifications), analyze, version, parallel, tuple(outputs))
+        taken = {used for registered in self.analyzers for used in (registered.name,) + registered.result_names}
+        clashes = taken & ({name} | set(analyzer.result_names))
+        if clashes:
+            raise ValueError(f"Analyzer '{name}' clashes with the registered name '{sorted(clashes)[0]}'.")
+        self.analyzers.append(analyzer)
+        return analyzer
+
+    @property
+    def names(self) -> List[str]:
+        """
+        Names under which results are collected, in registration order.
+        """
+        return [name for analyzer in self.analyzers for name in analyzer.result_names]
+
+    def analyzers_for(self, file_path: str) -> List[RegisteredAnalyzer]:
+        """
+        Find the analyzers interested in a file.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            List[RegisteredAnalyzer]: Matching analyzers, in registration order.
+        """
+        classifications = self.classifier(file_path)
+        return [analyzer for analyzer in self.analyzers if analyzer.classifications & classifications]
+
+    def claims(self, file_path: str) -> bool:
+        """
+        Check whether any analyzer is interested in a file, i.e. whether it is worth fetching.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            bool: True if at least one analyzer claims the file.
+        """
+        return bool(self.analyzers_for(file_path))
+
+    def dispatch(
+        self,
+        file_path: str,
+        content: str,
+        analyzers: Optional[List[RegisteredAnalyzer]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run every interested analyzer on a file's content.
+
+        Args:
+            file_path (str): The path to the file.
+            content (str): The file content.
+            analyzers (Optional[List[RegisteredAnalyzer]]): Analyzers to run. Defaults to
+                analyzers_for(file_path).
+
+        Returns:
+            Dict[str, Any]: Results keyed by result name; None where an analyzer had nothing
+                to report. Analyzers that raised are left out.
+        """
+        if analyzers is None:
+            analyzers = self.analyzers_for(file_path)
+        results = {}
+        for analyzer in analyzers:
+            try:
+                result = analyzer.analyze(file_path, content)
+            except Exception as e:
+                logger.error(f"Analyzer '{analyzer.name}' failed on {file_path}: {e}")
+                continue
+            results.update(analyzer.split(result))
+        return results
+
+    async def dispatch_async(
+        self,
+        file_path: str,
+        content: str,
+        analyzers: Optional[List[RegisteredAnalyzer]] = None,
+        pool: Optional[ProcessPoolRunner] = None,
+    ) -> Dict[str, Any]:
+        """
+        Like dispatch, but runs parallel analyzers in a process pool when one is given.
+
+        Args:
+            file_path (str): The path to the file.
+            content (str): The file content.
+            analyzers (Optional[List[RegisteredAnalyzer]]): Analyzers to run. Defaults to
+                analyzers_for(file_path).
+            pool (Optional[ProcessPoolRunner]): Pool for parallel analyzers, while the others run in a
+                thread; None runs every analyzer inline.
+
+        Returns:
+            Dict[str, Any]: Results keyed by result name; None where an analyzer had nothing
+                to report. Analyzers that raised are left out.
+        """
+        if analyzers is None:
+            analyzers = self.analyzers_for(file_path)
+        if pool is None:
+            return self.dispatch(file_path, content, analyzers)
+        offloaded = [analyzer for analyzer in analyzers if analyzer.parallel]
+        inline = [analyzer for analyzer in analyzers if not analyzer.parallel]
+        # Analyzers that cannot leave the process still run off the event loop, alongside the pool.
+        results, *outcomes = await asyncio.gather(
+            asyncio.to_thread(self.dispatch, file_path, content, inline),
+            *(pool.submit(analyzer.analyze, file_path, content) for analyzer in offloaded),
+            return_exceptions=True,
+        )
+        for analyzer, outcome in zip(offloaded, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Analyzer '{analyzer.name}' failed on {file_path}: {outcome}")
+                continue
+            results.update(analyzer.split(outcome))
+        return results
@@ -0,0 +1,242 @@
+import io
+import logging
+import functools
+from typing import Any, Dict, Iterator, List, Mapping, Optional, TextIO, Tuple
+from ..utils.file_utils import LANGUAGE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+
+def file_kind(name: str) -> str:
+    """
+    The extension a file is counted under in directory aggregates: the text after the
+    last dot, or the whole name for files without one, e.g. 'Makefile'.
+    """
+    return name.rsplit('.', 1)[-1] if '.' in name else name
+
+
+@functools.lru_cache(maxsize=4096)
+def _language(extension: str) -> str:
+    return LANGUAGE_EXTENSIONS.get('.' + extension.lower(), 'other')
+
+
+def format_size(size: int) -> str:
+    """
+    Format a byte count for display, e.g. '512 B', '3.4 KB' or '12.0 MB'.
+    """
+    if size < 1024:
+        return f"{size} B"
+    if size < 1048576:
+        return f"{size / 1024:.1f} KB"
+    if size < 1073741824:
+        return f"{size / 1048576:.1f} MB"
+    return f"{size / 1073741824:.1f} GB"
+
+
+class DirectoryNode:
+    """
+    A directory of a RepoTree with aggregates over its whole subtree.
+
+    Attributes:
+        name (str): Directory name; '' for the root.
+        path (str): Path relative to the repository root; '' for the root.
+        children (Dict[str, DirectoryNode]): Subdirectories keyed by name.
+        files (List[Tuple[str, Optional[int]]]): (name, size in bytes) of the files directly inside.
+        file_count (int): Number of files in the subtree.
+        size (int): Total size in bytes of the files in the subtree whose size is known.
+        extensions (Dict[str, int]): Files in the subtree by extension (see file_kind).
+    """
+    __slots__ = ('name', 'path', 'children', 'files', 'file_count', 'size', 'extensions')
+
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.children: Dict[str, "DirectoryNode"] = {}
+        self.files: List[Tuple[str, Optional[int]]] = []
+        self.file_count = 0
+        self.size = 0
+        self.extensions: Dict[str, int] = {}
+
+    @property
+    def depth(self) -> int:
+        return self.path.count('/') + 1 if self.path else 0
+
+    def common_extensions(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """
+        The most frequent extensions in the subtree, ties in name order.
+        """
+        return sorted(self.extensions.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def languages(self) -> Dict[str, int]:
+        """
+        Files in the subtree by language; files of unknown language count as 'other'.
+        """
+        languages: Dict[str, int] = {}
+        for extension, count in self.extensions.items():
+            language = _language(extension)
+            languages[language] = languages.get(language, 0) + count
+        return languages
+
+    def __repr__(self) -> str:
+        return f"DirectoryNode({self.path!r}, files={self.file_count}, size={self.size})"
+
+
+class RepoTree:
+    """
+    The directory tree of a repository, built once from a flat listing.
+
+    Every directory carries its file count, byte size and extension mix over its
+    whole subtree, computed in one bottom-up pass. The tree is rendered by a
+    writer that streams lines to a file-like object and can cut the output at a
+    maximum depth and a maximum number of entries per directory, summarizing what
+    it leaves out.
+    """
+
+    def __init__(self):
+        self.root = DirectoryNode('', '')
+        self.directories_by_path: Dict[str, DirectoryNode] = {'': self.root}
+
+    @classmethod
+    def build(cls, entries: Mapping[str, Any], sizes: Optional[Mapping[str, int]] = None) -> "RepoTree":
+        """
+        Build a tree from a flat listing.
+
+        Args:
+            entries (Mapping[str, Any]): Entry type ('file', 'dir', ...) or TreeEntry keyed by path.
+                Parent directories need not be listed.
+            sizes (Optional[Mapping[str, int]]): File sizes in bytes keyed by path. Defaults to the
+                sizes of TreeEntry values.
+
+        Returns:
+            RepoTree: The tree.
+        """
+        tree = cls()
+        directories = tree.directories_by_path
+        for path, entry in entries.items():
+            kind = getattr(entry, 'type', entry)
+            if kind == 'dir':
+                tree.directory(path)
+                continue
+            if kind != 'file':
+                continue
+            size = sizes.get(path) if sizes is not None else getattr(entry, 'size', None)
+            parent, _, name = path.rpartition('/')
+            node = directories.get(parent) or tree.directory(parent)
+            node.files.append((name, size))
+
+        # Deepest directories first, so each is complete before it is added to its parent.
+        for node in sorted(directories.values(), key=lambda node: -node.depth):
+            extensions = node.extensions
+            if node.files:
+                node.files.sort()
+                node.file_count += len(node.files)
+                for name, size in node.files:
+                    kind = file_kind(name)
+                    extensions[kind] = extensions.get(kind, 0) + 1
+                    if size:
+                        node.size += size
+            if node.path:
+                parent = directories[node.path.rpartition('/')[0]]
+                parent.file_count += node.file_count
+                parent.size += node.size
+                totals = parent.extensions
+                for kind, count in extensions.items():
+                    totals[kind] = totals.get(kind, 0) + count
+        return tree
+
+    def directory(self, path: str) -> DirectoryNode:
+        """
+        Look up a directory, creating it and its missing ancestors.
+
+        Args:
+            path (str): Directory path; '' for the root.
+
+        Returns:
+            DirectoryNode: The directory.
+        """
+        node = self.directories_by_path.get(path)
+        if node is None:
+            parent_path, _, name = path.rpartition('/')
+            parent = self.directory(parent_path)
+            node = self.directories_by_path[path] = parent.children[name] = DirectoryNode(name, path)
+        return node
+
+    def find(self, path: str) -> Optional[DirectoryNode]:
+        return self.directories_by_path.get(path)
+
+    def directories(self, max_depth: Optional[int] = None) -> Iterator[DirectoryNode]:
+        """
+        Yield the directories holding any files, in path order, optionally down to a depth.
+
+        Args:
+            max_depth (Optional[int]): Deepest level yielded; top-level directories are at depth 1.
+        """
+        for path in sorted(self.directories_by_path):
+            node = self.directories_by_path[path]
+            if path and node.file_count and (max_depth is None or node.depth <= max_depth):
+                yield node
+
+    def write(self, out: TextIO, max_depth: Optional[int] = None, max_children: Optional[int] = None,
+              node: Optional[DirectoryNode] = None):
+        """
+        Write the tree as an indented list, one entry per line.
+
+        Directories are listed before files, larger directories first. Directories at
+        max_depth are shown with their aggregates only, and a directory with more than
+        max_children entries lists the first ones followed by a line counting the rest.
+
+        Args:
+            out (TextIO): Where the lines are written.
+            max_depth (Optional[int]): Deepest level whose contents are listed. None lists everything.
+            max_children (Optional[int]): Most entries listed per directory. None lists all of them.
+            node (Optional[DirectoryNode]): Directory whose contents are written. Defaults to the root.
+        """
+        # An explicit stack of (subdirectories still to write, depth, trailing file lines) keeps
+        # deep trees clear of the recursion limit; a directory's files are written in one go.
+        stack = [self._frame(node or self.root, 0, max_children)]
+        while stack:
+            directories, depth, tail = stack[-1]
+            child = next(directories, None)
+            if child is None:
+                stack.pop()
+                if tail:
+                    out.write(tail)
+                continue
+            out.write(f"{'  ' * depth}- {child.name}/ ({self.describe(child)})\n")
+            if (max_depth is None or depth + 1 < max_depth) and (child.children or child.files):
+                stack.append(self._frame(child, depth + 1, max_children))
+
+    def render(self, max_depth: Optional[int] = None, max_children: Optional[int] = None) -> str:
+        """
+        Render the tree as a string; see write.
+        """
+        out = io.StringIO()
+        self.write(out, max_depth, max_children)
+        return out.getvalue().rstrip('\n')
+
+    @staticmethod
+    def describe(node: DirectoryNode) -> str:
+        """
+        Summarize a directory's aggregates, e.g. '120 files, 1.2 MB, python 80%, markdown 15%, other 5%'.
+        """
+        parts = [f"{node.file_count} file" + ("" if node.file_count == 1 else "s")]
+        if node.size:
+            parts.append(format_size(node.size))
+        if node.file_count:
+            languages = sorted((-count, language) for language, count in node.languages().items())[:3]
+            parts.extend(f"{language} {round(-100 * count / node.file_count)}%" for count, language in languages)
+        return ', '.join(parts)
+
+    @staticmethod
+    def _frame(node: DirectoryNode, depth: int, max_children: Optional[int]) -> Tuple[Iterator[DirectoryNode], int, str]:
+        directories = sorted(node.children.values(), key=lambda child: (-child.file_count, child.name))
+        total = len(directories) + len(node.files)
+        shown = total if max_children is None else min(total, max_children)
+        shown_files = max(shown - len(directories), 0)
+        indent = '  ' * depth
+        lines = [f"{indent}- {name} ({format_size(size)})\n" if size is not None else f"{indent}- {name}\n"
+                 for name, size in node.files[:shown_files]]
+        if shown < total:
+            hidden_files = sum(child.file_count for child in directories[shown:]) + len(node.files) - shown_files
+            lines.append(f"{indent}- ... {total - shown} more entries ({hidden_files} files)\n")
+        return iter(directories[:shown]), depth, ''.join(lines)
@@ -0,0 +1,390 @@
+import os
+import sys
+import hashlib
+import mmap
+import struct
+import logging
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_KINDS = ('function', 'class', 'method', 'import')
+_KIND_COUNTS = ('functions', 'classes', 'methods', 'imports')
+_KIND_CODES = {kind: code for code, kind in enumerate(SYMBOL_KINDS)}
+
+# File layout: header, the uint32 columns in _COLUMNS order, the kind bytes, then both string blobs.
+_MAGIC = b'RSYM'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBBxxIIIII')
+_COLUMNS = ('file_strings', 'name_strings', 'row_file', 'row_name', 'row_start', 'row_end',
+            'file_rows', 'name_rows', 'name_offsets')
+
+
+def _utf8(value: str) -> bytes:
+    return value.encode('utf-8')
+
+
+def encode_symbols(symbols: Iterable[Tuple[str, str, int, int]]) -> str:
+    """
+    Encode a file's symbols as one string, one tab-separated line per symbol.
+
+    A single string per file keeps cached and in-flight results compact.
+
+    Args:
+        symbols (Iterable[Tuple[str, str, int, int]]): (kind, qualified name, first line, last line) tuples.
+
+    Returns:
+        str: The encoded symbols.
+    """
+    return ''.join(f"{_KIND_CODES[kind]}\t{name}\t{start}\t{end}\n" for kind, name, start, end in symbols)
+
+
+def decode_symbols(encoded: str) -> Iterator[Tuple[str, str, int, int]]:
+    """
+    Decode the output of encode_symbols.
+
+    Args:
+        encoded (str): Encoded symbols.
+
+    Yields:
+        Tuple[str, str, int, int]: (kind, qualified name, first line, last line) per symbol.
+    """
+    for line in encoded.splitlines():
+        code, name, start, end = line.split('\t')
+        yield SYMBOL_KINDS[int(code)], name, int(start), int(end)
+
+
+def digest_symbols(file_symbols: Dict[str, Optional[str]]) -> str:
+    """
+    Fingerprint the input of SymbolIndex.build, to tell whether a saved index is still current.
+
+    Args:
+        file_symbols (Dict[str, Optional[str]]): Symbols encoded with encode_symbols, keyed by file path.
+
+    Returns:
+        str: A hex digest that changes whenever the built index would.
+    """
+    digest = hashlib.sha256()
+    for path in sorted((path for path, encoded in file_symbols.items() if encoded), key=_utf8):
+        digest.update(_utf8(path) + b'\0' + _utf8(file_symbols[path]) + b'\0')
+    return digest.hexdigest()
+
+
+class Symbol:
+    """
+    A symbol looked up in a SymbolIndex.
+
+    Attributes:
+        kind (str): One of SYMBOL_KINDS.
+        name (str): Qualified name, e.g. 'Outer.method', or the imported module and name.
+        file_path (str): File defining or importing the symbol.
+        start (int): First line of the definition or import statement.
+        end (int): Last line of the definition or import statement.
+    """
+    __slots__ = ('kind', 'name', 'file_path', 'start', 'end')
+
+    def __init__(self, kind: str, name: str, file_path: str, start: int, end: int):
+        self.kind = kind
+        self.name = name
+        self.file_path = file_path
+        self.start = start
+        self.end = end
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Symbol):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.kind!r}, {self.name!r}, {self.file_path!r}, {self.start}, {self.end})"
+
+
+class StringTable:
+    """
+    Sorted, deduplicated strings stored as one UTF-8 blob and an offsets column.
+
+    Strings are decoded only when accessed, and looked up by binary search on
+    their encoded bytes, so a table read from a memory-mapped file is used in place.
+    """
+
+    def __init__(self, offsets: Sequence[int], blob: bytes):
+        """
+        Initialize the StringTable.
+
+        Args:
+            offsets (Sequence[int]): Start offset of each string in the blob, plus the blob length.
+            blob (bytes): The UTF-8 strings, concatenated in sorted order.
+        """
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def build(cls, strings: Iterable[str]) -> 'StringTable':
+        encoded = sorted({_utf8(string) for string in strings})
+        offsets = array('I', [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return cls(offsets, b''.join(encoded))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _bytes(self, index: int) -> bytes:
+        return bytes(self.blob[self.offsets[index]:self.offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        return sys.intern(self._bytes(index).decode('utf-8'))
+
+    def index(self, value: str) -> Optional[int]:
+        """
+        Find the position of a string.
+
+        Args:
+            value (str): The string to look up.
+
+        Returns:
+            Optional[int]: Its index, or None if the table does not contain it.
+        """
+        target = _utf8(value)
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < len(self) and self._bytes(low) == target else None
+
+
+class SymbolIndex:
+    """
+    A columnar symbol table for a whole repository.
+
+    Symbols are stored as parallel uint32 columns (file id, name id, first and
+    last line) plus a byte column of kinds, sorted by file, with file paths and
+    qualified names interned in sorted string tables. Rows of a file are a
+    contiguous range, and a second column orders the rows by name, so lookups
+    by file or by name are two binary searches and a slice. No per-symbol objects
+    exist until a lookup returns them. The index can be saved in a binary format
+    whose columns are used in place when the file is memory-mapped again.
+    """
+
+    def __init__(self, files: StringTable, names: StringTable, kinds: Sequence[int],
+                 columns: Dict[str, Sequence[int]], mapped: Optional[mmap.mmap] = None):
+        """
+        Initialize the SymbolIndex. Use build or load to create one.
+
+        Args:
+            files (StringTable): File paths.
+            names (StringTable): Qualified names.
+            kinds (Sequence[int]): Kind code of each row, an index into SYMBOL_KINDS.
+            columns (Dict[str, Sequence[int]]): The row columns: row_file, row_name, row_start, row_end;
+                file_rows (first row of each file, plus the row count); name_rows (rows ordered by name)
+                and name_offsets (first position in name_rows of each name, plus the row count).
+            mapped (Optional[mmap.mmap]): The memory map backing the columns, if loaded from a file.
+        """
+        self.files = files
+        self.names = names
+        self.kinds = kinds
+        self.row_file = columns['row_file']
+        self.row_name = columns['row_name']
+        self.row_start = columns['row_start']
+        self.row_end = columns['row_end']
+        self.file_rows = columns['file_rows']
+        self.name_rows = columns['name_rows']
+        self.name_offsets = columns['name_offsets']
+        self._mapped = mapped
+
+    @classmethod
+    def build(cls, file_symbols: Dict[str, Optional[str]]) -> 'SymbolIndex':
+        """
+        Build an index from per-file symbol results.
+
+        Args:
+            file_symbols (Dict[str, Optional[str]]): Symbols encoded with encode_symbols, keyed by
+                file path; None for files without symbols.
+
+        Returns:
+            SymbolIndex: The index.
+        """
+        paths = sorted((path for path, encoded in file_symbols.items() if encoded), key=_utf8)
+        kinds = bytearray()
+        row_file, row_name, row_start, row_end, file_rows = (array('I') for _ in range(5))
+        # Names get ids in order of first appearance here, renumbered to their sorted order below.
+        first_seen: Dict[str, int] = {}
+        for file_id, path in enumerate(paths):
+            file_rows.append(len(kinds))
+            for line in file_symbols[path].splitlines():
+                code, name, start, end = line.split('\t')
+                kinds.append(int(code))
+                row_file.append(file_id)
+                row_name.append(first_seen.setdefault(name, len(first_seen)))
+                row_start.append(int(start))
+                row_end.append(int(end))
+        file_rows.append(len(kinds))
+
+        names = sorted(first_seen, key=_utf8)
+        renumbered = array('I', bytes(4 * len(names)))
+        for name_id, name in enumerate(names):
+            renumbered[first_seen[name]] = name_id
+        row_name = array('I', [renumbered[name_id] for name_id in row_name])
+
+        # Counting sort of the rows by name id.
+        counts = array('I', bytes(4 * len(names)))
+        for name_id in row_name:
+            counts[name_id] += 1
+        name_offsets = array('I', [0])
+        for count in counts:
+            name_offsets.append(name_offsets[-1] + count)
+        positions = array('I', name_offsets[:-1])
+        name_rows = array('I', bytes(4 * len(kinds)))
+        for row, name_id in enumerate(row_name):
+            name_rows[positions[name_id]] = row
+            positions[name_id] += 1
+        columns = {'row_file': row_file, 'row_name': row_name, 'row_start': row_start, 'row_end': row_end,
+                   'file_rows': file_rows, 'name_rows': name_rows, 'name_offsets': name_offsets}
+        return cls(StringTable.build(paths), StringTable.build(names), bytes(kinds), columns)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _symbol(self, row: int) -> Symbol:
+        return Symbol(SYMBOL_KINDS[self.kinds[row]], self.names[self.row_name[row]],
+                      self.files[self.row_file[row]], self.row_start[row], self.row_end[row])
+
+    def file_symbols(self, file_path: str) -> List[Symbol]:
+        """
+        Look up the symbols of a file.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            List[Symbol]: The file's symbols in source order; empty if the file is not indexed.
+        """
+        file_id = self.files.index(file_path)
+        if file_id is None:
+            return []
+        return [self._symbol(row) for row in range(self.file_rows[file_id], self.file_rows[file_id + 1])]
+
+    def lookup(self, name: str) -> List[Symbol]:
+        """
+        Look up the symbols with a qualified name, across all files.
+
+        Args:
+            name (str): Qualified name, e.g. 'Config.load' or 'os.path.join'.
+
+        Returns:
+            List[Symbol]: Matching symbols, ordered by file; empty if there are none.
+        """
+        name_id = self.names.index(name)
+        if name_id is None:
+            return []
+        rows = self.name_rows[self.name_offsets[name_id]:self.name_offsets[name_id + 1]]
+        return [self._symbol(row) for row in rows]
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count the indexed files and the symbols of each kind.
+
+        Returns:
+            Dict[str, int]: 'files' and one count per kind, e.g. 'functions'.
+        """
+        kinds = bytes(self.kinds)
+        counts = {'files': len(self.files)}
+        counts.update((label, kinds.count(code)) for code, label in enumerate(_KIND_COUNTS))
+        return counts
+
+    def save(self, path: str):
+        """
+        Atomically write the index in its binary format.
+
+        Args:
+            path (str): Destination file; its directory must exist.
+        """
+        columns = {
+            'file_strings': self.files.offsets, 'name_strings': self.names.offsets,
+            'row_file': self.row_file, 'row_name': self.row_name, 'row_start': self.row_start,
+            'row_end': self.row_end, 'file_rows': self.file_rows, 'name_rows': self.name_rows,
+            'name_offsets': self.name_offsets,
+        }
+        header = _HEADER.pack(_MAGIC, _VERSION, sys.byteorder == 'little', len(self.files), len(self.names),
+                              len(self), len(self.files.blob), len(self.names.blob))
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as index_file:
+            index_file.write(header)
+            for name in _COLUMNS:
+                index_file.write(array('I', columns[name]).tobytes())
+            index_file.write(bytes(self.kinds))
+            index_file.write(bytes(self.files.blob))
+            index_file.write(bytes(self.names.blob))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SymbolIndex']:
+        """
+        Memory-map an index written by save. The columns are read in place, not copied,
+        unless the file was written on a machine of the other byte order.
+
+        Args:
+            path (str): The index file.
+
+        Returns:
+            Optional[SymbolIndex]: The index, or None if the file is missing or unreadable.
+        """
+        try:
+            with open(path, 'rb') as index_file:
+                mapped = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not map symbol index {path}: {e}")
+            return None
+
+        view = memoryview(mapped)
+        try:
+            magic, version, little_endian, n_files, n_names, n_rows, files_bytes, names_bytes = \
+                _HEADER.unpack_from(view)
+            lengths = {'file_strings': n_files + 1, 'name_strings': n_names + 1, 'row_file': n_rows,
+                       'row_name': n_rows, 'row_start': n_rows, 'row_end': n_rows,
+                       'file_rows': n_files + 1, 'name_rows': n_rows, 'name_offsets': n_names + 1}
+            expected = _HEADER.size + 4 * sum(lengths.values()) + n_rows + files_bytes + names_bytes
+            if magic != _MAGIC or version != _VERSION or len(view) != expected:
+                raise ValueError("not a symbol index of this version")
+        except (struct.error, ValueError) as e:
+            logger.warning(f"Ignoring invalid symbol index {path}: {e}")
+            view.release()
+            mapped.close()
+            return None
+
+        swap = bool(little_endian) != (sys.byteorder == 'little')
+        columns, offset = {}, _HEADER.size
+        for name in _COLUMNS:
+            column = view[offset:offset + 4 * lengths[name]]
+            offset += 4 * lengths[name]
+            if swap:
+                column = array('I', column.tobytes())
+                column.byteswap()
+            else:
+                column = column.cast('I')
+            columns[name] = column
+        kinds = view[offset:offset + n_rows]
+        offset += n_rows
+        files = StringTable(columns.pop('file_strings'), view[offset:offset + files_bytes])
+        offset += files_bytes
+        names = StringTable(columns.pop('name_strings'), view[offset:offset + names_bytes])
+        view.release()
+        return cls(files, names, kinds, columns, mapped)
+
+    def close(self):
+        """
+        Release the memory map of a loaded index. The index must not be used afterwards.
+        """
+        if self._mapped is None:
+            return
+        for column in (self.kinds, self.files.offsets, self.files.blob, self.names.offsets, self.names.blob,
+                       self.row_file, self.row_name, self.row_start, self.row_end,
+                       self.file_rows, self.name_rows, self.name_offsets):
+            if isinstance(column, memoryview):
+                column.release()
+        self._mapped.close()
+        self._mapped = None
@@ -0,0 +1,43 @@
+import logging
+import tarfile
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def iter_tar_members(
+    fileobj: BinaryIO,
+    predicate: Optional[Callable[[str], bool]] = None,
+    max_member_size: Optional[int] = None,
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Stream-decompress a repository tarball and yield its regular files one at a time.
+
+    The archive is read sequentially from fileobj, so neither the archive nor more
+    than one member is ever held in memory, and nothing is written to disk. The
+    top-level '<owner>-<repo>-<sha>/' directory GitHub wraps the tree in is stripped.
+
+    Args:
+        fileobj (BinaryIO): A readable (possibly non-seekable) stream of the gzipped tarball.
+        predicate (Optional[Callable[[str], bool]]): Only members whose repository path
+            satisfies the predicate are read; the others are skipped without decompressing
+            into memory.
+        max_member_size (Optional[int]): Skip members larger than this many bytes.
+
+    Yields:
+        Tuple[str, bytes]: The repository path and content of each selected file.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            path = member.name.split("/", 1)[1] if "/" in member.name else member.name
+            if predicate and not predicate(path):
+                continue
+            if max_member_size is not None and member.size > max_member_size:
+                logger.debug(f"Skipping {path}: {member.size} bytes exceeds the size limit.")
+                continue
+            handle = archive.extractfile(member)
+            if handle is None:
+                continue
+            yield path, handle.read()
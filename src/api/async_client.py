@@ -0,0 +1,379 @@
+import os
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import httpx
+from .http_cache import ConditionalCache
+from .rate_limiter import RateLimitScheduler
+from ..utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_BASE_URL = "https://api.github.com"
+
+# Fields of issues and pull requests kept by the streaming listings.
+ISSUE_FIELDS = ('number', 'title', 'state', 'user.login', 'labels.name', 'comments',
+                'created_at', 'updated_at', 'closed_at')
+PULL_REQUEST_FIELDS = ('number', 'title', 'state', 'user.login', 'labels.name', 'draft',
+                       'created_at', 'updated_at', 'closed_at', 'merged_at')
+
+
+def project_fields(item: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Keep only the given fields of an API item.
+
+    A dotted field such as 'user.login' is stored under its first part and holds the
+    nested value; applied to a list such as 'labels.name', it holds the list of values.
+
+    Args:
+        item (Dict[str, Any]): The item as returned by the API.
+        fields (Tuple[str, ...]): Field names, optionally dotted.
+
+    Returns:
+        Dict[str, Any]: The projected item. Missing fields are None.
+    """
+    projected = {}
+    for field in fields:
+        key, _, nested = field.partition('.')
+        value = item.get(key)
+        if nested and isinstance(value, list):
+            value = [element.get(nested) for element in value if isinstance(element, dict)]
+        elif nested:
+            value = value.get(nested) if isinstance(value, dict) else None
+        projected[key] = value
+    return projected
+
+
+class AsyncGitHubClient:
+    """
+    A native asyncio GitHub REST client.
+
+    Requests share one keep-alive connection pool (HTTP/2 when the optional 'h2'
+    package is installed, HTTP/1.1 otherwise) and every request carries a timeout.
+    A RateLimitScheduler bounds the requests in flight, rotates across tokens and
+    retries rate-limited responses.
+    """
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = DEFAULT_BASE_URL,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        timeout: float = 30.0,
+        http2: Optional[bool] = None,
+        cache: Optional[ConditionalCache] = None,
+        tokens: Optional[List[str]] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Initialize the AsyncGitHubClient.
+
+        Args:
+            token (Optional[str]): GitHub token. If None, it will use the GITHUB_TOKEN environment variable.
+            base_url (str): GitHub API base URL, for GitHub Enterprise or a local stand-in.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            max_connections (int): Maximum number of pooled connections.
+            timeout (float): Per-request timeout in seconds.
+            http2 (Optional[bool]): Force HTTP/2 on or off. Defaults to on when 'h2' is installed.
+            cache (Optional[ConditionalCache]): Revalidate GET responses with ETags instead of
+                downloading them again.
+            tokens (Optional[List[str]]): Additional tokens to rotate across.
+            scheduler (Optional[RateLimitScheduler]): Share a scheduler (and its rate-limit
+                budget) between clients. Built from the token(s) and max_concurrency if None.
+            metrics (Optional[Metrics]): Counts the requests sent and the bytes received.
+
+        Raises:
+            ValueError: If no GitHub token is provided.
+        """
+        self.token = token or os.environ.get('GITHUB_TOKEN')
+        if not self.token and not tokens and not scheduler:
+            logger.error("GitHub token is required")
+            raise ValueError("GitHub token is required")
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.metrics = metrics
+        self.scheduler = scheduler or RateLimitScheduler(
+            [token for token in [self.token, *(tokens or [])] if token], max_concurrency,
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Accept": "application/vnd.github.v3+json"},
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(timeout),
+            follow_redirects=True,
+        )
+
+    async def __aenter__(self) -> "AsyncGitHubClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the pooled connections.
+        """
+        await self.client.aclose()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the connection pool, waiting for a concurrency slot first.
+
+        GET requests are made conditional when a cached response exists, and a 304
+        answer is transparently replaced by the cached response. Rate-limited
+        responses are retried on the token and schedule the scheduler picks.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Absolute URL or path relative to the base URL.
+            **kwargs: Passed through to httpx.AsyncClient.build_request.
+
+        Returns:
+            httpx.Response: The response.
+
+        Raises:
+            httpx.HTTPError: On transport errors and timeouts.
+        """
+        request = self.client.build_request(method, url, **kwargs)
+        entry = self.cache.prepare(request) if self.cache and method == "GET" else None
+        attempt = 0
+        while True:
+            token = await self.scheduler.acquire()
+            try:
+                request.headers["Authorization"] = f"token {token.token}"
+                response = await self.client.send(request)
+            finally:
+                await self.scheduler.release(token)
+            if self.metrics:
+                self.metrics.incr('http_requests', client='github', method=method, status=response.status_code)
+                self.metrics.incr('http_response_bytes', len(response.content), client='github')
+            delay = self.scheduler.observe(token, response, attempt)
+            if delay is None:
+                break
+            attempt += 1
+            await asyncio.sleep(delay)
+        if self.cache and method == "GET":
+            response = self.cache.resolve(request, response, entry)
+        return response
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """
+        GET a JSON resource.
+
+        Args:
+            url (str): Absolute URL or path relative to the base URL.
+            params (Optional[Dict[str, Any]]): Query parameters.
+
+        Returns:
+            Optional[Any]: The decoded JSON body if successful, else None.
+        """
+        try:
+            response = await self.request("GET", url, params=params)
+        except httpx.HTTPError as e:
+            logger.error(f"Error requesting {url}: {e!r}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Error requesting {url}: HTTP {response.status_code}")
+            return None
+        return response.json()
+
+    @property
+    def graphql_url(self) -> str:
+        # GitHub Enterprise serves REST under /api/v3 and GraphQL under /api/graphql.
+        if self.base_url.endswith('/api/v3'):
+            return self.base_url[:-len('v3')] + 'graphql'
+        return f"{self.base_url}/graphql"
+
+    async def graphql(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Optional[Dict]:
+        """
+        Run a GraphQL query.
+
+        Args:
+            query (str): The GraphQL document.
+            variables (Optional[Dict[str, Any]]): Values of the query variables.
+
+        Returns:
+            Optional[Dict]: The 'data' member of the response (possibly partial when some
+                fields failed to resolve), or None if the request failed.
+        """
+        try:
+            response = await self.request("POST", self.graphql_url, json={"query": query, "variables": variables or {}})
+        except httpx.HTTPError as e:
+            logger.error(f"Error running GraphQL query: {e!r}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Error running GraphQL query: HTTP {response.status_code}")
+            return None
+        payload = response.json()
+        for error in payload.get('errors') or []:
+            logger.debug(f"GraphQL error: {error.get('message')}")
+        return payload.get('data')
+
+    async def get_file_content(self, full_name: str, file_path: str, ref: Optional[str] = None) -> Optional[str]:
+        """
+        Retrieve the content of a file from the repository.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            file_path (str): The path to the file in the repository.
+            ref (Optional[str]): Commit SHA or branch. Defaults to the default branch.
+
+        Returns:
+            Optional[str]: The file content if successful, else None.
+        """
+        url = f"/repos/{full_name}/contents/{quote(file_path)}"
+        try:
+            response = await self.request(
+                "GET", url,
+                params={"ref": ref} if ref else None,
+                headers={"Accept": "application/vnd.github.raw"},
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"Error accessing file {file_path}: {e!r}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Error accessing file {file_path}: HTTP {response.status_code}")
+            return None
+        try:
+            content = response.content.decode('utf-8')
+        except UnicodeDecodeError:
+            logger.debug(f"Skipping non UTF-8 file {file_path}")
+            return None
+        logger.debug(f"Content retrieved for file: {file_path}")
+        return content
+
+    async def fetch_page(self, url: str,
+                         params: Optional[Dict[str, Any]] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Fetch one page of a paginated listing.
+
+        Args:
+            url (str): Absolute URL or path of the page.
+            params (Optional[Dict[str, Any]]): Query parameters.
+
+        Returns:
+            Tuple[Optional[List[Dict]], Optional[str]]: The items (None on failure) and the
+                URL of the next page from the 'next' Link header, if any.
+        """
+        try:
+            response = await self.request("GET", url, params=params)
+        except httpx.HTTPError as e:
+            logger.error(f"Error requesting {url}: {e!r}")
+            return None, None
+        if response.status_code != 200:
+            logger.error(f"Error requesting {url}: HTTP {response.status_code}")
+            return None, None
+        return response.json(), response.links.get('next', {}).get('url')
+
+    async def iter_pages(self, url: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Dict]]:
+        """
+        Stream the pages of a paginated listing by following 'next' Link headers.
+
+        The next page is requested as soon as the current one arrives, so it downloads
+        while the caller processes the current page. Iteration stops at the first failure.
+
+        Args:
+            url (str): Absolute URL or path of the first page.
+            params (Optional[Dict[str, Any]]): Query parameters of the first page.
+
+        Yields:
+            List[Dict]: The items of each page.
+        """
+        pending = asyncio.ensure_future(self.fetch_page(url, params))
+        try:
+            while pending:
+                items, next_url = await pending
+                pending = asyncio.ensure_future(self.fetch_page(next_url)) if next_url and items else None
+                if items:
+                    yield items
+        finally:
+            if pending:
+                pending.cancel()
+
+    async def paginate_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """
+        Collect every page of a paginated listing by following 'next' Link headers.
+
+        Args:
+            url (str): Absolute URL or path of the first page.
+            params (Optional[Dict[str, Any]]): Query parameters of the first page.
+
+        Returns:
+            List[Dict]: The items of all pages fetched before the first failure.
+        """
+        results = []
+        async for items in self.iter_pages(url, params):
+            results.extend(items)
+        return results
+
+    async def iter_issues(
+        self,
+        full_name: str,
+        state: str = "all",
+        since: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = ISSUE_FIELDS,
+        per_page: int = 100,
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the issues of the repository, excluding pull requests.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            state (str): Issue state filter ('open', 'closed' or 'all').
+            since (Optional[str]): ISO 8601 timestamp; only issues updated at or after it are listed.
+            fields (Optional[Tuple[str, ...]]): Fields to keep, see project_fields. None keeps the raw items.
+            per_page (int): Page size, at most 100.
+
+        Yields:
+            Dict: The issues, least recently updated first.
+        """
+        params = {"state": state, "per_page": per_page, "sort": "updated", "direction": "asc"}
+        if since:
+            params["since"] = since
+        async for items in self.iter_pages(f"/repos/{full_name}/issues", params):
+            for item in items:
+                # The issues listing includes pull requests; they are streamed by iter_pull_requests.
+                if 'pull_request' not in item:
+                    yield project_fields(item, fields) if fields else item
+
+    async def iter_pull_requests(
+        self,
+        full_name: str,
+        state: str = "all",
+        since: Optional[str] = None,
+        fields: Optional[Tuple[str, ...]] = PULL_REQUEST_FIELDS,
+        per_page: int = 100,
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the pull requests of the repository.
+
+        The pulls listing has no 'since' filter, so pull requests are listed most recently
+        updated first and the stream stops at the first one older than since.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            state (str): Pull request state filter ('open', 'closed' or 'all').
+            since (Optional[str]): ISO 8601 timestamp; only pull requests updated at or after it are listed.
+            fields (Optional[Tuple[str, ...]]): Fields to keep, see project_fields. None keeps the raw items.
+            per_page (int): Page size, at most 100.
+
+        Yields:
+            Dict: The pull requests, most recently updated first.
+        """
+        params = {"state": state, "per_page": per_page, "sort": "updated", "direction": "desc"}
+        async for items in self.iter_pages(f"/repos/{full_name}/pulls", params):
+            for item in items:
+                if since and (item.get('updated_at') or '') < since:
+                    return
+                yield project_fields(item, fields) if fields else item
@@ -0,0 +1,473 @@
+import os
+import mmap
+import zlib
+import struct
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Object type numbers of pack entries.
+OBJECT_TYPES = {1: 'commit', 2: 'tree', 3: 'blob', 4: 'tag'}
+OFS_DELTA = 6
+REF_DELTA = 7
+
+
+class GitObjectError(Exception):
+    """
+    Raised when a git object is missing or cannot be decoded.
+    """
+
+
+def _read_varint(data, position: int) -> Tuple[int, int]:
+    """
+    Read a little-endian base-128 integer, as used in delta headers.
+    """
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """
+    Rebuild an object from its delta base and a git delta.
+
+    Args:
+        base (bytes): Content of the base object.
+        delta (bytes): The delta instructions.
+
+    Returns:
+        bytes: Content of the rebuilt object.
+
+    Raises:
+        GitObjectError: If the delta does not apply to the base.
+    """
+    base_size, position = _read_varint(delta, 0)
+    if base_size != len(base):
+        raise GitObjectError(f"Delta expects a {base_size} byte base, got {len(base)} bytes.")
+    target_size, position = _read_varint(delta, position)
+    out = bytearray()
+    end = len(delta)
+    while position < end:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            # Copy a range of the base: offset and size bytes are present as flagged.
+            offset = size = 0
+            for index in range(4):
+                if opcode & (1 << index):
+                    offset |= delta[position] << (8 * index)
+                    position += 1
+            for index in range(3):
+                if opcode & (0x10 << index):
+                    size |= delta[position] << (8 * index)
+                    position += 1
+            out += base[offset:offset + (size or 0x10000)]
+        elif opcode:
+            out += delta[position:position + opcode]
+            position += opcode
+        else:
+            raise GitObjectError("Invalid delta opcode 0.")
+    if len(out) != target_size:
+        raise GitObjectError(f"Delta produced {len(out)} bytes, expected {target_size}.")
+    return bytes(out)
+
+
+class PackFile:
+    """
+    A git packfile and its version 2 index, both memory-mapped.
+
+    Lookups binary-search the index's sorted SHA table inside the map, so opening a
+    pack costs nothing beyond the two mmap calls whatever the number of objects.
+    """
+
+    def __init__(self, index_path: str, pack_path: str):
+        """
+        Open a pack.
+
+        Args:
+            index_path (str): Path to the .idx file.
+            pack_path (str): Path to the .pack file.
+
+        Raises:
+            GitObjectError: If the index is not a version 2 pack index.
+        """
+        self.index_path = index_path
+        self.pack_path = pack_path
+        self._files = [open(index_path, 'rb'), open(pack_path, 'rb')]
+        self.index = mmap.mmap(self._files[0].fileno(), 0, access=mmap.ACCESS_READ)
+        self.pack = mmap.mmap(self._files[1].fileno(), 0, access=mmap.ACCESS_READ)
+        if self.index[:8] != b'\xfftOc\x00\x00\x00\x02':
+            self.close()
+            raise GitObjectError(f"Unsupported pack index {index_path}.")
+        self.count = struct.unpack_from('>I', self.index, 8 + 255 * 4)[0]
+        self._names = 8 + 256 * 4
+        self._offsets = self._names + self.count * 24
+        self._large_offsets = self._offsets + self.count * 4
+
+    def close(self):
+        self.index.close()
+        self.pack.close()
+        for file in self._files:
+            file.close()
+
+    def find(self, sha: bytes) -> Optional[int]:
+        """
+        Look up the pack offset of an object.
+
+        Args:
+            sha (bytes): The 20-byte binary object SHA.
+
+        Returns:
+            Optional[int]: The offset of the object's entry, or None if it is not in this pack.
+        """
+        first = sha[0]
+        low = struct.unpack_from('>I', self.index, 8 + (first - 1) * 4)[0] if first else 0
+        high = struct.unpack_from('>I', self.index, 8 + first * 4)[0]
+        index, names = self.index, self._names
+        while low < high:
+            middle = (low + high) // 2
+            start = names + middle * 20
+            candidate = index[start:start + 20]
+            if candidate < sha:
+                low = middle + 1
+            elif candidate > sha:
+                high = middle
+            else:
+                return self._offset(middle)
+        return None
+
+    def _offset(self, position: int) -> int:
+        offset = struct.unpack_from('>I', self.index, self._offsets + position * 4)[0]
+        if offset & 0x80000000:
+            offset = struct.unpack_from('>Q', self.index, self._large_offsets + (offset & 0x7fffffff) * 8)[0]
+        return offset
+
+    def entry_header(self, offset: int) -> Tuple[int, int, int]:
+        """
+        Decode the header of the pack entry at offset.
+
+        Returns:
+            Tuple[int, int, int]: Type number, size of the (possibly delta) data, and the
+                offset just past the header.
+        """
+        pack = self.pack
+        byte = pack[offset]
+        offset += 1
+        kind = (byte >> 4) & 7
+        size = byte & 0x0f
+        shift = 4
+        while byte & 0x80:
+            byte = pack[offset]
+            offset += 1
+            size |= (byte & 0x7f) << shift
+            shift += 7
+        return kind, size, offset
+
+    def base_offset(self, offset: int) -> Tuple[int, int]:
+        """
+        Decode the negative base offset of an OFS_DELTA entry starting at offset.
+
+        Returns:
+            Tuple[int, int]: The distance back to the base entry, and the offset past it.
+        """
+        pack = self.pack
+        byte = pack[offset]
+        offset += 1
+        distance = byte & 0x7f
+        while byte & 0x80:
+            byte = pack[offset]
+            offset += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7f)
+        return distance, offset
+
+    def inflate(self, offset: int, size: int) -> bytes:
+        """
+        Decompress entry data straight out of the map, without copying the compressed bytes.
+        """
+        decompressor = zlib.decompressobj()
+        with memoryview(self.pack) as view:
+            data = decompressor.decompress(view[offset:], size)
+        if len(data) != size:
+            raise GitObjectError(f"Truncated object at offset {offset} of {self.pack_path}.")
+        return data
+
+
+class GitObjectStore:
+    """
+    Reads objects, refs and trees of a git repository straight from its object
+    database: loose objects and memory-mapped packfiles, with deltas resolved.
+    Recently used delta bases are kept in a small cache, since delta chains of
+    neighbouring objects tend to share them.
+    """
+
+    def __init__(self, git_dir: str, cache_size: int = 256):
+        """
+        Open an object store.
+
+        Args:
+            git_dir (str): The repository's git directory: a bare repository, or the .git
+                directory of a working tree.
+            cache_size (int): Number of delta bases kept in memory.
+        """
+        self.git_dir = git_dir
+        self.objects_dir = os.path.join(git_dir, 'objects')
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[str, bytes]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.packs: List[PackFile] = []
+        pack_dir = os.path.join(self.objects_dir, 'pack')
+        if os.path.isdir(pack_dir):
+            for name in sorted(os.listdir(pack_dir)):
+                if name.endswith('.idx') and os.path.exists(os.path.join(pack_dir, name[:-4] + '.pack')):
+                    try:
+                        self.packs.append(PackFile(os.path.join(pack_dir, name),
+                                                   os.path.join(pack_dir, name[:-4] + '.pack')))
+                    except GitObjectError as e:
+                        logger.warning(e)
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+        self.packs = []
+        self._cache.clear()
+
+    def read(self, sha: str) -> Tuple[str, bytes]:
+        """
+        Read an object.
+
+        Args:
+            sha (str): Hex object SHA.
+
+        Returns:
+            Tuple[str, bytes]: The object type ('commit', 'tree', 'blob' or 'tag') and content.
+
+        Raises:
+            GitObjectError: If the object is missing or corrupt.
+        """
+        loose = self._read_loose(sha)
+        if loose is not None:
+            return loose
+        binary = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.find(binary)
+            if offset is not None:
+                return self._read_packed(pack, offset)
+        raise GitObjectError(f"Object {sha} not found in {self.git_dir}.")
+
+    def size(self, sha: str) -> int:
+        """
+        The size of an object's content, read from its header without inflating it whole.
+        """
+        path = os.path.join(self.objects_dir, sha[:2], sha[2:])
+        if os.path.exists(path):
+            with open(path, 'rb') as loose_file:
+                decompressor = zlib.decompressobj()
+                header = b''
+                while b'\0' not in header:
+                    chunk = loose_file.read(64)
+                    if not chunk:
+                        raise GitObjectError(f"Corrupt loose object {sha}.")
+                    header += decompressor.decompress(chunk, 64)
+            return int(header.split(b'\0', 1)[0].split(b' ')[1])
+        binary = bytes.fromhex(sha)
+        for pack in self.packs:
+            offset = pack.find(binary)
+            if offset is None:
+                continue
+            kind, size, data_offset = pack.entry_header(offset)
+            if kind == OFS_DELTA:
+                data_offset = pack.base_offset(data_offset)[1]
+            elif kind == REF_DELTA:
+                data_offset += 20
+            if kind in (OFS_DELTA, REF_DELTA):
+                # The target size is the second varint of the delta; a few inflated bytes hold both.
+                decompressor = zlib.decompressobj()
+                with memoryview(pack.pack) as view:
+                    head = decompressor.decompress(view[data_offset:], 20)
+                size = _read_varint(head, _read_varint(head, 0)[1])[0]
+            return size
+        raise GitObjectError(f"Object {sha} not found in {self.git_dir}.")
+
+    def _read_loose(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        path = os.path.join(self.objects_dir, sha[:2], sha[2:])
+        try:
+            with open(path, 'rb') as loose_file:
+                raw = zlib.decompress(loose_file.read())
+        except FileNotFoundError:
+            return None
+        except zlib.error as e:
+            raise GitObjectError(f"Corrupt loose object {sha}: {e}") from e
+        header, _, content = raw.partition(b'\0')
+        kind, _, size = header.partition(b' ')
+        if int(size) != len(content):
+            raise GitObjectError(f"Corrupt loose object {sha}: size mismatch.")
+        return kind.decode('ascii'), content
+
+    def _read_packed(self, pack: PackFile, offset: int) -> Tuple[str, bytes]:
+        kind, size, data_offset = pack.entry_header(offset)
+        if kind in OBJECT_TYPES:
+            return OBJECT_TYPES[kind], pack.inflate(data_offset, size)
+        if kind == OFS_DELTA:
+            distance, data_offset = pack.base_offset(data_offset)
+            base_kind, base = self._read_base(pack, offset - distance)
+        elif kind == REF_DELTA:
+            base_kind, base = self.read(pack.pack[data_offset:data_offset + 20].hex())
+            data_offset += 20
+        else:
+            raise GitObjectError(f"Unknown pack entry type {kind} at offset {offset} of {pack.pack_path}.")
+        return base_kind, apply_delta(base, pack.inflate(data_offset, size))
+
+    def _read_base(self, pack: PackFile, offset: int) -> Tuple[str, bytes]:
+        key = (pack.pack_path, offset)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        # Objects are read from several threads at once; only the cache needs the lock.
+        cached = self._read_packed(pack, offset)
+        with self._cache_lock:
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return cached
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """
+        Resolve a ref name, 'HEAD' or a full SHA to a commit SHA.
+
+        Args:
+            ref (str): E.g. 'HEAD', 'main', 'refs/heads/main' or a 40-character SHA.
+
+        Returns:
+            Optional[str]: The SHA, or None if the ref does not exist.
+        """
+        if len(ref) == 40 and all(char in '0123456789abcdef' for char in ref):
+            return ref
+        candidates = [ref] if ref == 'HEAD' or ref.startswith('refs/') else [f"refs/heads/{ref}", f"refs/tags/{ref}"]
+        for name in candidates:
+            path = os.path.join(self.git_dir, name)
+            if os.path.isfile(path):
+                with open(path, 'r', encoding='utf-8') as ref_file:
+                    value = ref_file.read().strip()
+                if value.startswith('ref: '):
+                    return self.resolve(value[5:])
+                return value
+            packed = self.packed_refs().get(name)
+            if packed:
+                return packed
+        return None
+
+    def symbolic_head(self) -> Optional[str]:
+        """
+        The branch HEAD points at, e.g. 'main', or None for a detached HEAD.
+        """
+        try:
+            with open(os.path.join(self.git_dir, 'HEAD'), 'r', encoding='utf-8') as head_file:
+                value = head_file.read().strip()
+        except OSError:
+            return None
+        return value[len('ref: refs/heads/'):] if value.startswith('ref: refs/heads/') else None
+
+    def packed_refs(self) -> Dict[str, str]:
+        refs = {}
+        try:
+            with open(os.path.join(self.git_dir, 'packed-refs'), 'r', encoding='utf-8') as refs_file:
+                for line in refs_file:
+                    if line.startswith(('#', '^')):
+                        continue
+                    sha, _, name = line.strip().partition(' ')
+                    refs[name] = sha
+        except OSError:
+            pass
+        return refs
+
+    def commit_tree(self, commit_sha: str) -> str:
+        """
+        The SHA of the root tree of a commit.
+        """
+        kind, content = self.read(commit_sha)
+        while kind == 'tag':
+            kind, content = self.read(content.split(b'\n', 1)[0].split(b' ')[1].decode('ascii'))
+        if kind != 'commit' or not content.startswith(b'tree '):
+            raise GitObjectError(f"{commit_sha} is not a commit.")
+        return content[5:45].decode('ascii')
+
+    def iter_tree(self, tree_sha: str, prefix: str = '') -> Iterator[Tuple[str, str, str]]:
+        """
+        Walk a tree recursively.
+
+        Args:
+            tree_sha (str): SHA of the tree.
+            prefix (str): Path prefix of the tree relative to the repository root.
+
+        Yields:
+            Tuple[str, str, str]: Mode, path and SHA of every entry, directories included.
+        """
+        pending = [(tree_sha, prefix)]
+        while pending:
+            sha, base = pending.pop()
+            kind, content = self.read(sha)
+            if kind != 'tree':
+                raise GitObjectError(f"{sha} is not a tree.")
+            position, end = 0, len(content)
+            while position < end:
+                space = content.index(b' ', position)
+                nul = content.index(b'\0', space)
+                mode = content[position:space].decode('ascii')
+                path = base + content[space + 1:nul].decode('utf-8', 'surrogateescape')
+                entry_sha = content[nul + 1:nul + 21].hex()
+                position = nul + 21
+                yield mode, path, entry_sha
+                if mode == '40000':
+                    pending.append((entry_sha, path + '/'))
+
+
+def read_index(git_dir: str) -> Dict[str, Tuple[str, int, int]]:
+    """
+    Read the blob SHAs git recorded for a working tree in its index.
+
+    Only versions 2 and 3 of the index format are decoded; other versions, and
+    repositories without an index, give an empty result.
+
+    Args:
+        git_dir (str): The working tree's .git directory.
+
+    Returns:
+        Dict[str, Tuple[str, int, int]]: (blob SHA, size, mtime in nanoseconds) keyed by path.
+    """
+    path = os.path.join(git_dir, 'index')
+    try:
+        with open(path, 'rb') as index_file:
+            data = index_file.read()
+    except OSError:
+        return {}
+    if data[:4] != b'DIRC':
+        return {}
+    version, count = struct.unpack_from('>II', data, 4)
+    if version not in (2, 3):
+        logger.debug(f"Index version {version} is not supported, hashing files instead.")
+        return {}
+    entries = {}
+    position = 12
+    for _ in range(count):
+        mtime_s, mtime_ns = struct.unpack_from('>II', data, position + 8)
+        size = struct.unpack_from('>I', data, position + 36)[0]
+        sha = data[position + 40:position + 60].hex()
+        flags = struct.unpack_from('>H', data, position + 60)[0]
+        header = 64 if version == 3 and flags & 0x4000 else 62
+        name_end = data.index(b'\0', position + header)
+        name = data[position + header:name_end].decode('utf-8', 'surrogateescape')
+        # Entries are NUL-padded to a multiple of eight bytes.
+        position += (header + (name_end - position - header) + 8) & ~7
+        if not flags & 0x3000:  # merge stage 0 only
+            entries[name] = (sha, size, mtime_s * 1_000_000_000 + mtime_ns)
+    return entries
@@ -1,18 +1,77 @@
 import os
 import logging
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Tuple, Callable, Iterator
+import requests
 from github import Github
 from github.GithubException import GithubException
+from .archive import iter_tar_members
 
 logger = logging.getLogger(__name__)
 
+# Git tree entry types mapped onto the 'file'/'dir' vocabulary used by the structure dict.
+TREE_ENTRY_TYPES = {
+    'blob': 'file',
+    'tree': 'dir',
+    'commit': 'submodule',
+}
+
+
+@dataclass(frozen=True)
+class TreeEntry:
+    """
+    A single entry of a repository tree as reported by the Git Trees API.
+
+    Attributes:
+        path (str): Path of the entry relative to the repository root.
+        type (str): 'file', 'dir' or 'submodule'.
+        sha (str): Git object SHA (blob SHA for files).
+        size (Optional[int]): Blob size in bytes, None for directories and submodules.
+        mode (str): Git file mode, e.g. '100644' or '040000'.
+    """
+    path: str
+    type: str
+    sha: str
+    size: Optional[int]
+    mode: str
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """
+    A file changed between two commits, as reported by the Compare API.
+
+    Attributes:
+        status (str): 'added', 'modified', 'removed', 'renamed', 'copied' or 'changed'.
+        path (str): Path of the file at the head commit.
+        sha (Optional[str]): Blob SHA at the head commit, None for removed files.
+        previous_path (Optional[str]): Path at the base commit for renamed files.
+    """
+    status: str
+    path: str
+    sha: Optional[str]
+    previous_path: Optional[str] = None
+
+
+# The Compare API lists at most this many files; a diff that hits the limit may be incomplete.
+MAX_COMPARE_FILES = 300
+
+# Looking entries up directory by directory costs one request per directory; past this many,
+# a single recursive listing of the whole tree is cheaper.
+MAX_DIRECTORY_LISTINGS = 16
+
+
 class GitHubAPI:
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, max_workers: int = 8, base_url: Optional[str] = None):
         """
         Initialize the GitHubAPI with a token.
 
         Args:
             token (Optional[str]): GitHub token. If None, it will use the GITHUB_TOKEN environment variable.
+            max_workers (int): Number of threads used to fetch subtrees in parallel when a
+                recursive tree listing is truncated.
+            base_url (Optional[str]): GitHub API base URL, for GitHub Enterprise or a local stand-in.
 
         Raises:
             ValueError: If no GitHub token is provided.
@@ -21,7 +80,8 @@ class GitHubAPI:
         if not self.token:
             logger.error("GitHub token is required")
             raise ValueError("GitHub token is required")
-        self.github = Github(self.token)
+        self.github = Github(self.token, base_url=base_url) if base_url else Github(self.token)
+        self.max_workers = max_workers
 
     def get_repository(self, repo_url: str):
         """
@@ -85,16 +145,22 @@ class GitHubAPI:
             logger.error(f"Error accessing file {file_path}: {e}")
             return None
 
-    def get_repository_structure(self, repo) -> Dict[str, str]:
+    def get_repository_structure(self, repo, use_tree: bool = True) -> Dict[str, str]:
         """
         Retrieve the structure of the repository.
 
         Args:
             repo (Repository): The GitHub repository object.
+            use_tree (bool): List the whole tree with a single recursive Git Trees request
+                (see get_repository_tree) instead of one contents request per directory.
 
         Returns:
             Dict[str, str]: A dictionary with file paths as keys and their types ('file' or 'dir') as values.
         """
+        if use_tree:
+            tree = self.get_repository_tree(repo)
+            return {path: entry.type for path, entry in tree.items()}
+
         structure = {}
         try:
             contents = repo.get_contents("")
@@ -106,4 +172,224 @@ class GitHubAPI:
             logger.info("Repository structure retrieved successfully.")
         except GithubException as e:
             logger.error(f"Error retrieving repository structure: {e}")
-        return structure
\ No newline at end of file
+        return structure
+
+    def get_default_commit_sha(self, repo) -> Optional[str]:
+        """
+        Resolve the commit SHA at the head of the repository's default branch.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+
+        Returns:
+            Optional[str]: The commit SHA if successful, else None.
+        """
+        try:
+            return repo.get_branch(repo.default_branch).commit.sha
+        except GithubException as e:
+            logger.error(f"Error resolving default branch commit: {e}")
+            return None
+
+    def get_repository_tree(self, repo, ref: Optional[str] = None) -> Dict[str, TreeEntry]:
+        """
+        Retrieve the full repository tree with one recursive Git Trees request.
+
+        If GitHub truncates the recursive listing, the tree is walked level by level
+        instead: truncated directories are listed non-recursively and their
+        subdirectories are fetched recursively in parallel.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+            ref (Optional[str]): Commit SHA to list. Defaults to the head of the default branch.
+
+        Returns:
+            Dict[str, TreeEntry]: Tree entries keyed by path, or an empty dict on failure.
+        """
+        ref = ref or self.get_default_commit_sha(repo)
+        if not ref:
+            return {}
+
+        entries: Dict[str, TreeEntry] = {}
+        try:
+            tree = repo.get_git_tree(ref, recursive=True)
+            if not tree.truncated:
+                self._add_tree_entries(entries, tree, "")
+                logger.info(f"Repository tree retrieved: {len(entries)} entries.")
+                return entries
+
+            logger.info("Recursive tree listing truncated, fetching subtrees in parallel.")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = [(tree.sha, "")]
+                while pending:
+                    pending = self._expand_truncated_trees(repo, executor, pending, entries)
+            logger.info(f"Repository tree retrieved: {len(entries)} entries.")
+        except GithubException as e:
+            logger.error(f"Error retrieving repository tree: {e}")
+            return {}
+        return entries
+
+    def _expand_truncated_trees(
+        self,
+        repo,
+        executor: ThreadPoolExecutor,
+        pending: List[Tuple[str, str]],
+        entries: Dict[str, TreeEntry],
+    ) -> List[Tuple[str, str]]:
+        """
+        List one level of truncated directories and fetch their subdirectories recursively.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+            executor (ThreadPoolExecutor): Executor used for the parallel requests.
+            pending (List[Tuple[str, str]]): (tree SHA, path prefix) of directories to expand.
+            entries (Dict[str, TreeEntry]): Collected entries, updated in place.
+
+        Returns:
+            List[Tuple[str, str]]: Subdirectories whose recursive listing was truncated as well.
+        """
+        shallow_trees = executor.map(lambda item: repo.get_git_tree(item[0]), pending)
+        subtrees = []
+        for (_, prefix), shallow in zip(pending, shallow_trees):
+            for entry in self._add_tree_entries(entries, shallow, prefix):
+                if entry.type == 'dir':
+                    subtrees.append((entry.sha, entry.path + "/"))
+
+        truncated = []
+        recursive_trees = executor.map(lambda item: repo.get_git_tree(item[0], recursive=True), subtrees)
+        for (sha, prefix), subtree in zip(subtrees, recursive_trees):
+            if subtree.truncated:
+                truncated.append((sha, prefix))
+            else:
+                self._add_tree_entries(entries, subtree, prefix)
+        return truncated
+
+    def get_tree_entries(self, repo, ref: str, paths: List[str]) -> Optional[Dict[str, TreeEntry]]:
+        """
+        Look up the tree entries of a few paths at a commit, e.g. the sizes of the files a
+        Compare request reported as changed, by listing only the directories that hold them.
+
+        The directories are listed non-recursively from the root down, each level's in parallel.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+            ref (str): Commit SHA.
+            paths (List[str]): Paths to look up.
+
+        Returns:
+            Optional[Dict[str, TreeEntry]]: The entries of the paths that exist at the commit,
+                keyed by path, or None when the lookup failed or would take more than
+                MAX_DIRECTORY_LISTINGS requests and the caller has to list the whole tree.
+        """
+        directories = {''}
+        for path in paths:
+            parts = path.split('/')[:-1]
+            directories.update('/'.join(parts[:depth]) for depth in range(1, len(parts) + 1))
+        if len(directories) > MAX_DIRECTORY_LISTINGS:
+            return None
+
+        entries: Dict[str, TreeEntry] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                pending = [(ref, '')]
+                while pending:
+                    listings = executor.map(lambda item: repo.get_git_tree(item[0]), pending)
+                    subtrees = []
+                    for (_, prefix), listing in zip(pending, listings):
+                        for entry in self._add_tree_entries(entries, listing, prefix):
+                            if entry.type == 'dir' and entry.path in directories:
+                                subtrees.append((entry.sha, entry.path + '/'))
+                    pending = subtrees
+        except GithubException as e:
+            logger.error(f"Error listing directories at {ref}: {e}")
+            return None
+        return {path: entries[path] for path in paths if path in entries}
+
+    @staticmethod
+    def _add_tree_entries(entries: Dict[str, TreeEntry], tree, prefix: str) -> List[TreeEntry]:
+        """
+        Convert the elements of a Git tree into TreeEntry objects and add them to entries.
+
+        Args:
+            entries (Dict[str, TreeEntry]): Collected entries, updated in place.
+            tree (GitTree): The Git tree returned by PyGithub.
+            prefix (str): Path prefix of the tree relative to the repository root.
+
+        Returns:
+            List[TreeEntry]: The entries that were added.
+        """
+        added = []
+        for element in tree.tree:
+            entry = TreeEntry(
+                path=prefix + element.path,
+                type=TREE_ENTRY_TYPES.get(element.type, element.type),
+                sha=element.sha,
+                size=element.size if element.type == 'blob' else None,
+                mode=element.mode,
+            )
+            entries[entry.path] = entry
+            added.append(entry)
+        return added
+
+    def iter_archive_files(
+        self,
+        repo,
+        ref: Optional[str] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+        max_file_size: Optional[int] = None,
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Download the repository tarball once and stream its files.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+            ref (Optional[str]): Commit SHA or branch to download. Defaults to the default branch.
+            predicate (Optional[Callable[[str], bool]]): Only yield files whose path satisfies it.
+            max_file_size (Optional[int]): Skip files larger than this many bytes.
+
+        Yields:
+            Tuple[str, bytes]: The path and raw content of each file in the archive.
+        """
+        try:
+            archive_url = repo.get_archive_link("tarball", ref) if ref else repo.get_archive_link("tarball")
+            with requests.get(archive_url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                yield from iter_tar_members(response.raw, predicate, max_file_size)
+            logger.info("Repository archive processed successfully.")
+        except (GithubException, requests.RequestException) as e:
+            logger.error(f"Error downloading repository archive: {e}")
+
+    def compare_commits(self, repo, base: str, head: str) -> Optional[List[FileChange]]:
+        """
+        List the files changed between two commits with a single Compare request.
+
+        Args:
+            repo (Repository): The GitHub repository object.
+            base (str): The earlier commit SHA.
+            head (str): The later commit SHA.
+
+        Returns:
+            Optional[List[FileChange]]: The changed files, or None when the comparison is not
+                a complete linear diff (head not ahead of base, or too many files to list) and
+                the caller has to diff full trees instead.
+        """
+        try:
+            comparison = repo.compare(base, head)
+            if comparison.status not in ('ahead', 'identical'):
+                logger.info(f"Commit {head} is {comparison.status} of {base}, cannot use a linear diff.")
+                return None
+            files = comparison.files
+        except GithubException as e:
+            logger.error(f"Error comparing commits {base}...{head}: {e}")
+            return None
+        if len(files) >= MAX_COMPARE_FILES:
+            logger.info(f"Comparison {base}...{head} lists {len(files)} files and may be truncated.")
+            return None
+        return [
+            FileChange(
+                status=changed.status,
+                path=changed.filename,
+                sha=None if changed.status == 'removed' else changed.sha,
+                previous_path=changed.previous_filename if changed.status == 'renamed' else None,
+            )
+            for changed in files
+        ]
@@ -0,0 +1,118 @@
+import re
+import logging
+from typing import List, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def translate_pattern(pattern: str) -> Tuple[Pattern, bool]:
+    """
+    Translate one gitignore pattern into a regular expression.
+
+    Args:
+        pattern (str): The pattern, without a leading '!'.
+
+    Returns:
+        Tuple[Pattern, bool]: The expression, matched against paths relative to the directory of
+            the file the pattern came from, and whether the pattern only matches directories.
+    """
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    # A slash anywhere but at the end anchors the pattern; otherwise it matches at any depth.
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = [] if anchored else ['(?:.*/)?']
+    i, n = 0, len(pattern)
+    while i < n:
+        at_segment_start = i == 0 or pattern[i - 1] == '/'
+        if at_segment_start and pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif at_segment_start and pattern.startswith('**', i) and i + 2 == n:
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            members = pattern[i + 1:end]
+            if members.startswith('!'):
+                members = '^' + members[1:]
+            parts.append('[' + members.replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < n:
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile(''.join(parts)), dir_only
+
+
+class IgnoreRules:
+    """
+    The gitignore rules of a working tree, added file by file as it is walked.
+
+    Rules from files added later take precedence, as a nested .gitignore overrides its
+    parents and .gitignore files override .git/info/exclude. Within the rules that apply
+    to a path, the last match decides, and a '!' pattern re-includes.
+    """
+
+    def __init__(self):
+        # (directory prefix, expression, directory only, negated), in increasing precedence.
+        self.rules: List[Tuple[str, Pattern, bool, bool]] = []
+
+    def add_file(self, path: str, prefix: str = ''):
+        """
+        Add the rules of an ignore file, if it exists.
+
+        Args:
+            path (str): The file, e.g. a .gitignore or .git/info/exclude.
+            prefix (str): Path of the directory its patterns are relative to, with a trailing
+                slash, or '' for the root.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8', errors='surrogateescape') as ignore_file:
+                lines = ignore_file.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            if not line.endswith('\\ '):
+                line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:] if line[1:2] in ('#', '!') else line
+            try:
+                expression, dir_only = translate_pattern(line)
+            except re.error as e:
+                logger.debug(f"Skipping gitignore pattern {line!r} of {path}: {e}")
+                continue
+            self.rules.append((prefix, expression, dir_only, negated))
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        """
+        Tell whether a path is ignored by its own name; callers skip the contents of ignored
+        directories themselves.
+
+        Args:
+            path (str): Path relative to the working tree's root.
+            is_dir (bool): Whether the path is a directory.
+
+        Returns:
+            bool: True if the last rule matching the path ignores it.
+        """
+        result = False
+        for prefix, expression, dir_only, negated in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if path.startswith(prefix) and expression.fullmatch(path, len(prefix)):
+                result = not negated
+        return result
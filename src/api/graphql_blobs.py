@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from .async_client import AsyncGitHubClient
+from .github_api import TreeEntry
+
+logger = logging.getLogger(__name__)
+
+BLOB_FIELDS = "... on Blob { text isBinary isTruncated byteSize }"
+
+
+class BlobBatchFetcher:
+    """
+    Fetches file contents many at a time through GitHub's GraphQL API.
+
+    Each query resolves dozens of aliased `object(expression: "<ref>:<path>")`
+    lookups, so a medium-sized repository needs a handful of requests instead of
+    one contents request per file. Batches are packed against a response-size
+    budget using the blob sizes from the tree, and truncated blobs fall back to
+    the REST contents endpoint.
+    """
+
+    def __init__(
+        self,
+        client: AsyncGitHubClient,
+        max_batch_files: int = 100,
+        max_batch_bytes: int = 2 * 1024 * 1024,
+        max_concurrent_batches: int = 4,
+        unknown_size: int = 16 * 1024,
+    ):
+        """
+        Initialize the BlobBatchFetcher.
+
+        Args:
+            client (AsyncGitHubClient): Client the queries are sent through.
+            max_batch_files (int): Maximum number of blobs per query.
+            max_batch_bytes (int): Budget of blob bytes per query response. A single blob
+                larger than the budget is fetched in a batch of its own.
+            max_concurrent_batches (int): Number of queries in flight at once.
+            unknown_size (int): Size assumed for entries whose blob size is unknown.
+        """
+        self.client = client
+        self.max_batch_files = max_batch_files
+        self.max_batch_bytes = max_batch_bytes
+        self.max_concurrent_batches = max_concurrent_batches
+        self.unknown_size = unknown_size
+        self.queries = 0
+        self.fallbacks = 0
+
+    def plan_batches(self, entries: Iterable[TreeEntry]) -> List[List[TreeEntry]]:
+        """
+        Pack entries into batches that respect the file count and byte budget.
+
+        Args:
+            entries (Iterable[TreeEntry]): File entries to fetch.
+
+        Returns:
+            List[List[TreeEntry]]: The batches, in the order of the entries.
+        """
+        batches, batch, batch_bytes = [], [], 0
+        for entry in entries:
+            size = self.unknown_size if entry.size is None else entry.size
+            if batch and (len(batch) >= self.max_batch_files or batch_bytes + size > self.max_batch_bytes):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append(entry)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def build_query(count: int) -> str:
+        """
+        Build a query resolving `count` blobs passed as variables $e0..$e<count-1>.
+
+        Args:
+            count (int): Number of aliased lookups.
+
+        Returns:
+            str: The GraphQL document.
+        """
+        declarations = "".join(f", $e{index}: String!" for index in range(count))
+        lookups = " ".join(f"f{index}: object(expression: $e{index}) {{ {BLOB_FIELDS} }}" for index in range(count))
+        return f"query($owner: String!, $name: String!{declarations}) {{ repository(owner: $owner, name: $name) {{ {lookups} }} }}"
+
+    async def fetch_batch(self, full_name: str, batch: List[TreeEntry],
+                          ref: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Fetch the contents of one batch of files.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            batch (List[TreeEntry]): File entries to fetch.
+            ref (str): Commit SHA, branch or 'HEAD'.
+
+        Returns:
+            List[Tuple[str, Optional[str]]]: Path and content of each file; None for
+                missing, binary and undecodable files.
+        """
+        owner, name = full_name.split('/', 1)
+        variables = {'owner': owner, 'name': name}
+        variables.update((f"e{index}", f"{ref}:{entry.path}") for index, entry in enumerate(batch))
+        self.queries += 1
+        data = await self.client.graphql(self.build_query(len(batch)), variables)
+        blobs = (data or {}).get('repository') or {}
+
+        contents, truncated = [], []
+        for index, entry in enumerate(batch):
+            blob = blobs.get(f"f{index}")
+            if data is not None and blob is None:
+                logger.debug(f"Blob not found for {entry.path}")
+                contents.append((entry.path, None))
+            elif blob is not None and blob.get('isBinary'):
+                logger.debug(f"Skipping binary file {entry.path}")
+                contents.append((entry.path, None))
+            elif blob is None or blob.get('isTruncated') or blob.get('text') is None:
+                # A failed query, or a blob too large for GraphQL: fall back to REST.
+                truncated.append(entry)
+            else:
+                contents.append((entry.path, blob['text']))
+
+        if truncated:
+            self.fallbacks += len(truncated)
+            fetched = await asyncio.gather(
+                *(self.client.get_file_content(full_name, entry.path, None if ref == 'HEAD' else ref)
+                  for entry in truncated)
+            )
+            contents.extend((entry.path, content) for entry, content in zip(truncated, fetched))
+        return contents
+
+    async def iter_blob_contents(self, full_name: str, entries: Iterable[TreeEntry],
+                                 ref: Optional[str] = None) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """
+        Fetch the contents of files in batches, yielding them as batches complete.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            entries (Iterable[TreeEntry]): File entries to fetch.
+            ref (Optional[str]): Commit SHA or branch. Defaults to the default branch.
+
+        Yields:
+            Tuple[str, Optional[str]]: Path and content of each file; None for missing,
+                binary and undecodable files.
+        """
+        ref = ref or 'HEAD'
+        batches = iter(self.plan_batches(entries))
+        # At most max_concurrent_batches are requested or waiting to be consumed at a time,
+        # so a consumer that falls behind holds back further queries.
+        running = set()
+        try:
+            while True:
+                while len(running) < self.max_concurrent_batches:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    running.add(asyncio.ensure_future(self.fetch_batch(full_name, batch, ref)))
+                if not running:
+                    return
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    for path, content in finished.result():
+                        yield path, content
+        finally:
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {'queries': self.queries, 'fallbacks': self.fallbacks}
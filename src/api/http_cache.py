@@ -0,0 +1,101 @@
+import json
+import hashlib
+import logging
+from typing import Dict, Optional
+import httpx
+from ..utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body; Link is needed to keep following paginated listings.
+STORED_HEADERS = ('content-type', 'link', 'etag', 'last-modified')
+
+
+class ConditionalCache:
+    """
+    An on-disk cache of GET responses revalidated with conditional requests.
+
+    Stored responses are replayed when GitHub answers If-None-Match /
+    If-Modified-Since with 304 Not Modified, which does not count against the
+    primary rate limit.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None):
+        """
+        Initialize the ConditionalCache.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_bytes (Optional[int]): Size cap of the cache; least recently used responses are evicted first.
+        """
+        self.store = DiskCache(path, max_bytes)
+        self.not_modified = 0
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        """
+        Derive the cache key of a request from its URL (including the query) and Accept header.
+
+        Args:
+            request (httpx.Request): The outgoing request.
+
+        Returns:
+            str: The cache key.
+        """
+        identity = f"{request.method} {request.url} {request.headers.get('accept', '')}"
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def prepare(self, request: httpx.Request) -> Optional[Dict]:
+        """
+        Add validators of a cached response to a request.
+
+        Args:
+            request (httpx.Request): The outgoing request, updated in place.
+
+        Returns:
+            Optional[Dict]: The cached entry ('headers' and 'body'), or None if nothing is cached.
+        """
+        value = self.store.get(self.key(request))
+        if value is None:
+            return None
+        header_length = int.from_bytes(value[:4], 'big')
+        headers = json.loads(value[4:4 + header_length])
+        if 'etag' in headers:
+            request.headers['If-None-Match'] = headers['etag']
+        if 'last-modified' in headers:
+            request.headers['If-Modified-Since'] = headers['last-modified']
+        return {'headers': headers, 'body': value[4 + header_length:]}
+
+    def resolve(self, request: httpx.Request, response: httpx.Response, entry: Optional[Dict]) -> httpx.Response:
+        """
+        Replay a cached response on 304, or store a fresh cacheable response.
+
+        Args:
+            request (httpx.Request): The request that was sent.
+            response (httpx.Response): The response received, already read.
+            entry (Optional[Dict]): The cached entry returned by prepare.
+
+        Returns:
+            httpx.Response: The response to hand to the caller.
+        """
+        if response.status_code == 304 and entry is not None:
+            self.not_modified += 1
+            headers = dict(response.headers)
+            headers.update(entry['headers'])
+            headers.pop('content-encoding', None)
+            headers['content-length'] = str(len(entry['body']))
+            return httpx.Response(200, headers=headers, content=entry['body'], request=request)
+
+        if response.status_code == 200 and ('etag' in response.headers or 'last-modified' in response.headers):
+            headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            header_bytes = json.dumps(headers, separators=(',', ':')).encode('utf-8')
+            self.store.set(self.key(request), len(header_bytes).to_bytes(4, 'big') + header_bytes + response.content)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        stats = self.store.stats()
+        stats['not_modified'] = self.not_modified
+        return stats
+
+    def close(self):
+        self.store.close()
@@ -0,0 +1,322 @@
+import os
+import hashlib
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+from .github_api import TreeEntry, FileChange
+from .git_objects import GitObjectError, GitObjectStore, read_index
+from .gitignore import IgnoreRules
+from ..utils.file_utils import git_blob_sha_of_file, read_text_file
+
+logger = logging.getLogger(__name__)
+
+# Git tree entry modes mapped onto the 'file'/'dir' vocabulary used by the structure dict.
+TREE_MODES = {
+    '40000': 'dir',
+    '160000': 'submodule',
+}
+
+
+def is_local_source(repo_url: str) -> bool:
+    """
+    Tell whether a repository 'URL' names a file:// URL or an existing local path rather than
+    a remote. Remote shorthands such as 'github.com/owner/repo' or 'git@github.com:owner/repo.git'
+    are only local if a path of that name exists.
+    """
+    if repo_url.startswith('file://'):
+        return True
+    return '://' not in repo_url and os.path.exists(os.path.expanduser(repo_url))
+
+
+class LocalRepository:
+    """
+    A repository on the local disk: a working tree or a bare repository.
+
+    Attributes:
+        path (str): Absolute path of the working tree or bare repository.
+        full_name (str): 'parent/name' from the last two path components, e.g. 'octo/repo'
+            for /srv/mirrors/octo/repo.git, matching the layout of typical mirrors.
+        git_dir (Optional[str]): The git directory; None for a plain directory.
+        bare (bool): Whether files are read from the object database rather than the disk.
+        default_branch (Optional[str]): The branch HEAD points at, if any.
+    """
+
+    def __init__(self, path: str, git_dir: Optional[str], bare: bool):
+        self.path = path
+        self.git_dir = git_dir
+        self.bare = bare
+        name = os.path.basename(path)
+        if name.endswith('.git'):
+            name = name[:-4]
+        self.full_name = f"{os.path.basename(os.path.dirname(path)) or 'local'}/{name}"
+        self.store = GitObjectStore(git_dir) if git_dir else None
+        self.default_branch = self.store.symbolic_head() if self.store else None
+        # The tree listed last, so file reads can map paths to blobs and a working tree's
+        # fingerprint to the stat results it was computed from.
+        self.listed: Tuple[Optional[str], Dict[str, TreeEntry]] = (None, {})
+        self.stats: Tuple[Optional[str], Dict[str, Tuple[int, int]]] = (None, {})
+
+    def close(self):
+        if self.store:
+            self.store.close()
+
+    def __repr__(self) -> str:
+        return f"LocalRepository({self.path!r}, bare={self.bare})"
+
+
+class LocalRepoAPI:
+    """
+    Serves the repository-reading methods of GitHubAPI from the local disk, with no
+    network involved.
+
+    Working trees are walked with os.scandir and reflect the files as they are on disk,
+    uncommitted changes included; untracked files that git ignores are skipped unread. Blob SHAs come from the git index for files whose size
+    and modification time still match it, and are computed otherwise, from a memory map
+    for large files. Bare repositories are read from their loose objects and packfiles.
+    """
+
+    def get_repository(self, repo_url: str) -> Optional[LocalRepository]:
+        """
+        Open a local repository.
+
+        Args:
+            repo_url (str): Path or file:// URL of a working tree, a plain directory or a bare repository.
+
+        Returns:
+            Optional[LocalRepository]: The repository, or None if the path is not a directory.
+        """
+        path = unquote(urlsplit(repo_url).path) if repo_url.startswith('file://') else repo_url
+        path = os.path.abspath(os.path.expanduser(path)).rstrip(os.sep) or os.sep
+        if not os.path.isdir(path):
+            logger.error(f"Error accessing repository: {path} is not a directory.")
+            return None
+        if os.path.isdir(os.path.join(path, '.git')):
+            git_dir, bare = os.path.join(path, '.git'), False
+        elif os.path.isdir(os.path.join(path, 'objects')) and os.path.isfile(os.path.join(path, 'HEAD')):
+            git_dir, bare = path, True
+        else:
+            git_dir, bare = None, False
+        try:
+            repository = LocalRepository(path, git_dir, bare)
+        except (OSError, GitObjectError) as e:
+            logger.error(f"Error opening repository {path}: {e}")
+            return None
+        logger.info(f"Repository '{path}' opened ({'bare' if bare else 'working tree'}).")
+        return repository
+
+    def get_default_commit_sha(self, repo: LocalRepository) -> Optional[str]:
+        """
+        Identify the state of the repository to analyze.
+
+        Returns:
+            Optional[str]: The commit HEAD resolves to for a bare repository. For a working
+                tree, a fingerprint of every file's path, size and modification time, which
+                changes whenever a file does.
+        """
+        if repo.bare:
+            try:
+                return repo.store.resolve('HEAD')
+            except (OSError, GitObjectError) as e:
+                logger.error(f"Error resolving HEAD of {repo.path}: {e}")
+                return None
+        stats = self._stat_tree(repo.path, repo.git_dir)
+        digest = hashlib.sha1()
+        for path in sorted(stats):
+            size, mtime = stats[path]
+            digest.update(f"{path}\0{size}\0{mtime}\n".encode('utf-8', 'surrogateescape'))
+        fingerprint = digest.hexdigest()
+        repo.stats = (fingerprint, stats)
+        return fingerprint
+
+    def get_repository_tree(self, repo: LocalRepository, ref: Optional[str] = None) -> Dict[str, TreeEntry]:
+        """
+        List every file and directory of the repository.
+
+        Args:
+            repo (LocalRepository): The repository.
+            ref (Optional[str]): Commit SHA or ref of a bare repository; for a working tree, the
+                fingerprint from get_default_commit_sha, whose stat results are reused. Defaults
+                to the current state.
+
+        Returns:
+            Dict[str, TreeEntry]: Tree entries keyed by path, or an empty dict on failure.
+        """
+        ref = ref or self.get_default_commit_sha(repo)
+        if not ref:
+            return {}
+        if repo.listed[0] == ref:
+            return dict(repo.listed[1])
+        try:
+            entries = self._list_objects(repo, ref) if repo.bare else self._list_working_tree(repo, ref)
+        except (OSError, GitObjectError) as e:
+            logger.error(f"Error retrieving repository tree: {e}")
+            return {}
+        repo.listed = (ref, entries)
+        logger.info(f"Repository tree retrieved: {len(entries)} entries.")
+        return dict(entries)
+
+    def get_repository_structure(self, repo: LocalRepository, use_tree: bool = True) -> Dict[str, str]:
+        return {path: entry.type for path, entry in self.get_repository_tree(repo).items()}
+
+    def get_file_content(self, repo: LocalRepository, file_path: str, ref: Optional[str] = None) -> Optional[str]:
+        """
+        Read a file as text.
+
+        Args:
+            repo (LocalRepository): The repository.
+            file_path (str): Path of the file relative to the repository root.
+            ref (Optional[str]): As for get_repository_tree; working trees are always read from disk.
+
+        Returns:
+            Optional[str]: The content, or None if the file is missing, binary or not UTF-8.
+        """
+        if not repo.bare:
+            return read_text_file(os.path.join(repo.path, file_path))
+        data = self.read_blob(repo, file_path, ref)
+        if data is None:
+            return None
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+
+    def read_blob(self, repo: LocalRepository, file_path: str, ref: Optional[str] = None) -> Optional[bytes]:
+        """
+        Read a file's raw content from a bare repository's object database.
+        """
+        listed_ref, listed = repo.listed
+        entries = listed if listed_ref and ref in (None, listed_ref) else self.get_repository_tree(repo, ref)
+        entry = entries.get(file_path)
+        if entry is None or entry.type != 'file':
+            return None
+        try:
+            return repo.store.read(entry.sha)[1]
+        except GitObjectError as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
+
+    def iter_archive_files(
+        self,
+        repo: LocalRepository,
+        ref: Optional[str] = None,
+        predicate: Optional[Callable[[str], bool]] = None,
+        max_file_size: Optional[int] = None,
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Stream the repository's files, like GitHubAPI.iter_archive_files does from a tarball.
+
+        Args:
+            repo (LocalRepository): The repository.
+            ref (Optional[str]): As for get_repository_tree.
+            predicate (Optional[Callable[[str], bool]]): Only yield files whose path satisfies it.
+            max_file_size (Optional[int]): Skip files larger than this many bytes.
+
+        Yields:
+            Tuple[str, bytes]: The path and raw content of each file.
+        """
+        for path, entry in sorted(self.get_repository_tree(repo, ref).items()):
+            if entry.type != 'file' or (predicate and not predicate(path)):
+                continue
+            if max_file_size is not None and entry.size is not None and entry.size > max_file_size:
+                continue
+            try:
+                if repo.bare:
+                    data = repo.store.read(entry.sha)[1]
+                else:
+                    with open(os.path.join(repo.path, path), 'rb') as local_file:
+                        data = local_file.read()
+            except (OSError, GitObjectError) as e:
+                logger.error(f"Error reading {path}: {e}")
+                continue
+            yield path, data
+
+    def compare_commits(self, repo: LocalRepository, base: str, head: str) -> Optional[List[FileChange]]:
+        """
+        Local trees are cheap to list, so callers always diff full trees; see GitHubAPI.compare_commits.
+
+        Returns:
+            None: Always.
+        """
+        return None
+
+    @staticmethod
+    def _stat_tree(root: str, git_dir: Optional[str] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Walk a working tree with os.scandir, skipping .git, symbolic links and untracked paths
+        matched by .gitignore files or .git/info/exclude, such as node_modules or build output.
+
+        Args:
+            root (str): The working tree.
+            git_dir (Optional[str]): Its git directory, whose index tells tracked files, which
+                are never skipped, and whose info/exclude adds ignore rules.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: (size, mtime in nanoseconds) of every file, and (-1, 0)
+                for every directory, keyed by path relative to root.
+        """
+        tracked = set(read_index(git_dir)) if git_dir else set()
+        # Ignored directories holding tracked files are still walked, for those files only.
+        tracked_dirs = {path[:end] for path in tracked for end in range(len(path)) if path[end] == '/'}
+        rules = IgnoreRules()
+        if git_dir:
+            rules.add_file(os.path.join(git_dir, 'info', 'exclude'))
+        stats: Dict[str, Tuple[int, int]] = {}
+        pending = [('', False)]
+        while pending:
+            prefix, inside_ignored = pending.pop()
+            directory = os.path.join(root, prefix) if prefix else root
+            rules.add_file(os.path.join(directory, '.gitignore'), prefix)
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name == '.git' or entry.is_symlink():
+                        continue
+                    path = prefix + entry.name
+                    is_dir = entry.is_dir()
+                    ignored = inside_ignored or rules.ignored(path, is_dir)
+                    if ignored and path not in tracked and path not in tracked_dirs:
+                        continue
+                    if is_dir:
+                        stats[path] = (-1, 0)
+                        pending.append((path + '/', ignored))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        stats[path] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+
+    def _list_working_tree(self, repo: LocalRepository, ref: str) -> Dict[str, TreeEntry]:
+        fingerprint, stats = repo.stats
+        if fingerprint != ref:
+            self.get_default_commit_sha(repo)
+            stats = repo.stats[1]
+        index = read_index(repo.git_dir) if repo.git_dir else {}
+        try:
+            # Files modified within the index's own timestamp granularity may not be reflected in it.
+            index_mtime = os.stat(os.path.join(repo.git_dir, 'index')).st_mtime_ns if index else 0
+        except OSError:
+            index_mtime = 0
+        entries = {}
+        hashed = 0
+        for path, (size, mtime) in stats.items():
+            if size < 0:
+                entries[path] = TreeEntry(path, 'dir', '', None, '040000')
+                continue
+            indexed = index.get(path)
+            if indexed and indexed[1] == size and indexed[2] == mtime and mtime < index_mtime:
+                sha = indexed[0]
+            else:
+                sha = git_blob_sha_of_file(os.path.join(repo.path, path), size)
+                hashed += 1
+            entries[path] = TreeEntry(path, 'file', sha, size, '100644')
+        logger.debug(f"Working tree listed: {len(entries)} entries, {hashed} files hashed.")
+        return entries
+
+    def _list_objects(self, repo: LocalRepository, ref: str) -> Dict[str, TreeEntry]:
+        store = repo.store
+        commit = store.resolve(ref)
+        if not commit:
+            raise GitObjectError(f"Unknown ref {ref}.")
+        entries = {}
+        for mode, path, sha in store.iter_tree(store.commit_tree(commit)):
+            kind = TREE_MODES.get(mode, 'file')
+            entries[path] = TreeEntry(path, kind, sha, store.size(sha) if kind == 'file' else None, mode.zfill(6))
+        return entries
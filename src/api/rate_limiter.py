@@ -0,0 +1,278 @@
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header, given either as seconds or as an HTTP-date.
+
+    Args:
+        value (str): The header value.
+
+    Returns:
+        Optional[float]: Seconds to wait from now, or None if the value is malformed.
+    """
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class TokenBucket:
+    """
+    Paces acquisitions to a refill rate, allowing bursts up to the bucket capacity.
+    A rate of None means unpaced.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: float = 1.0):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate (Optional[float]): Tokens added per second, or None for no pacing.
+            capacity (float): Maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.rate is None or self.tokens >= 1:
+                    self.tokens = max(self.tokens - 1, 0.0)
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def set_rate(self, rate: Optional[float]):
+        self._refill()
+        self.rate = rate
+
+
+class AdaptiveLimiter:
+    """
+    A concurrency limit adjusted with AIMD: it grows by one slot per window of
+    successful requests and halves whenever GitHub reports a secondary rate limit.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        """
+        Initialize the AdaptiveLimiter.
+
+        Args:
+            max_limit (int): Upper bound (and starting value) of the concurrency limit.
+            min_limit (int): Lower bound of the concurrency limit.
+        """
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            while self.in_flight >= int(self.limit):
+                await self._condition.wait()
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttled(self):
+        self.limit = max(float(self.min_limit), self.limit / 2)
+        logger.info(f"Secondary rate limit hit, concurrency reduced to {int(self.limit)}.")
+
+
+class TokenState:
+    """
+    Rate-limit budget of one GitHub token, as last reported by the API.
+    """
+
+    def __init__(self, token: str, requests_per_second: Optional[float], burst: int):
+        self.token = token
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.base_rate = requests_per_second
+
+    def available(self, now: float) -> bool:
+        return self.remaining is None or self.remaining > 0 or now >= self.reset_at
+
+
+class RateLimitScheduler:
+    """
+    Schedules GitHub requests across a pool of tokens.
+
+    It tracks X-RateLimit-Remaining / X-RateLimit-Reset per token and always
+    picks the token with the most budget left. Once a token's budget runs low,
+    a token bucket spreads what is left until the reset. Retry-After and
+    secondary-limit responses are honoured with backoff, and concurrency is
+    managed with AIMD.
+    """
+
+    def __init__(
+        self,
+        tokens: List[str],
+        max_concurrency: int = 16,
+        requests_per_second: Optional[float] = None,
+        pace_below: float = 0.1,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Initialize the RateLimitScheduler.
+
+        Args:
+            tokens (List[str]): GitHub tokens to rotate across.
+            max_concurrency (int): Upper bound of requests in flight.
+            requests_per_second (Optional[float]): Optional steady pace per token, None for unpaced.
+            pace_below (float): Fraction of a token's hourly limit below which the remaining
+                budget is spread evenly until the reset instead of being spent at full speed.
+            max_retries (int): Attempts per request after a rate-limited response.
+            max_backoff (float): Upper bound in seconds of a computed exponential backoff;
+                a Retry-After header is always honoured in full.
+
+        Raises:
+            ValueError: If no token is given.
+        """
+        if not tokens:
+            raise ValueError("At least one GitHub token is required")
+        self.tokens = [TokenState(token, requests_per_second, max_concurrency) for token in dict.fromkeys(tokens)]
+        self.concurrency = AdaptiveLimiter(max_concurrency)
+        self.pace_below = pace_below
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.retries = 0
+        self.wait_seconds = 0.0
+
+    async def acquire(self) -> TokenState:
+        """
+        Wait for a concurrency slot and a token with budget left.
+
+        Returns:
+            TokenState: The token to authenticate the request with; pass it to release.
+        """
+        await self.concurrency.acquire()
+        try:
+            while True:
+                now = time.time()
+                candidates = [state for state in self.tokens if state.available(now)]
+                if candidates:
+                    break
+                delay = min(state.reset_at for state in self.tokens) - now + 1
+                logger.warning(f"All GitHub tokens exhausted, waiting {delay:.0f}s for the rate limit reset.")
+                self.wait_seconds += max(delay, 0)
+                await asyncio.sleep(max(delay, 0))
+            state = max(candidates, key=lambda state: float('inf') if state.remaining is None else state.remaining)
+            if state.remaining is not None:
+                state.remaining -= 1
+            self.wait_seconds += await state.bucket.acquire()
+            return state
+        except BaseException:
+            await self.concurrency.release()
+            raise
+
+    async def release(self, state: TokenState):
+        await self.concurrency.release()
+
+    def observe(self, state: TokenState, response: httpx.Response, attempt: int) -> Optional[float]:
+        """
+        Update a token's budget from response headers and decide whether to retry.
+
+        Args:
+            state (TokenState): The token the request was sent with.
+            response (httpx.Response): The response.
+            attempt (int): Zero-based attempt number of the request.
+
+        Returns:
+            Optional[float]: Seconds to sleep before retrying, or None if the response is final.
+        """
+        headers = response.headers
+        if 'x-ratelimit-remaining' in headers:
+            state.remaining = int(headers['x-ratelimit-remaining'])
+            state.reset_at = float(headers.get('x-ratelimit-reset', state.reset_at))
+            state.limit = int(headers.get('x-ratelimit-limit', state.limit or 0)) or state.limit
+            self._update_pace(state)
+
+        if response.status_code not in (403, 429):
+            self.concurrency.on_success()
+            return None
+
+        retry_after = headers.get('retry-after')
+        if state.remaining == 0 and retry_after is None:
+            # Primary limit: other tokens may still have budget; acquire() waits for the reset otherwise.
+            logger.info(f"Token budget exhausted until {time.ctime(state.reset_at)}.")
+            delay = 0.0
+        elif retry_after is not None or response.status_code == 429 or 'secondary rate limit' in response.text.lower():
+            self.concurrency.on_throttled()
+            delay = parse_retry_after(retry_after) if retry_after is not None else None
+            if delay is None:
+                delay = min(self.max_backoff, 2 ** attempt) * (0.5 + random.random() / 2)
+        else:
+            # A plain 403 (permissions, blocked resource) is not worth retrying.
+            return None
+
+        if attempt >= self.max_retries:
+            logger.error(f"Giving up on {response.request.url} after {attempt + 1} rate-limited attempts.")
+            return None
+        self.retries += 1
+        self.wait_seconds += delay
+        return delay
+
+    def _update_pace(self, state: TokenState):
+        seconds_to_reset = state.reset_at - time.time()
+        if state.limit and seconds_to_reset > 0 and state.remaining < state.limit * self.pace_below:
+            budget_rate = max(state.remaining, 1) / seconds_to_reset
+            rate = budget_rate if state.base_rate is None else min(budget_rate, state.base_rate)
+        else:
+            rate = state.base_rate
+        state.bucket.set_rate(rate)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report scheduling counters.
+
+        Returns:
+            Dict[str, float]: Retries, seconds spent waiting on limits and the current concurrency limit.
+        """
+        return {
+            'retries': self.retries,
+            'wait_seconds': self.wait_seconds,
+            'concurrency_limit': int(self.concurrency.limit),
+            'tokens': len(self.tokens),
+        }
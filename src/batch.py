@@ -0,0 +1,149 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+from .api.local_repo import is_local_source
+from .generation.insight_generator import InsightGenerationError
+
+logger = logging.getLogger(__name__)
+
+GITHUB_URL_PREFIX = "https://github.com/"
+
+
+def read_repo_urls(path: str) -> List[str]:
+    """
+    Read repository URLs from a file, one per line.
+
+    Blank lines and lines starting with '#' are skipped, and repeated URLs are kept once.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        List[str]: The URLs, in file order.
+    """
+    with open(path, 'r', encoding='utf-8') as urls_file:
+        lines = (line.strip() for line in urls_file)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+
+def completed_urls(path: str) -> Set[str]:
+    """
+    Collect the URLs an earlier batch run analyzed successfully.
+
+    Args:
+        path (str): Path to the JSONL results of the earlier run. A missing file means none.
+
+    Returns:
+        Set[str]: URLs of the records with status 'ok'.
+    """
+    completed = set()
+    try:
+        with open(path, 'r', encoding='utf-8') as results_file:
+            for line in results_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short when the earlier run was killed.
+                    continue
+                if record.get('status') == 'ok':
+                    completed.add(record.get('url'))
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+class BatchRunner:
+    """
+    Analyze many repositories concurrently with one RepoInsight.
+
+    All repositories share the RepoInsight's HTTP connection pools, on-disk caches,
+    GitHub rate-limit budget and chat completion concurrency. At most concurrency
+    repositories are analyzed at once, each is abandoned after timeout seconds, and
+    a JSONL record is written for each repository as soon as it finishes.
+    """
+
+    def __init__(self, repo_insight: Any, concurrency: int = 4, timeout: Optional[float] = 900.0):
+        """
+        Initialize the BatchRunner.
+
+        Args:
+            repo_insight (RepoInsight): The analyzer shared by every repository.
+            concurrency (int): Maximum number of repositories analyzed at once.
+            timeout (Optional[float]): Seconds one repository may take. None means no limit.
+        """
+        if concurrency < 1:
+            raise ValueError("Batch concurrency must be at least 1.")
+        self.repo_insight = repo_insight
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.counts: Dict[str, int] = {'ok': 0, 'error': 0, 'timeout': 0}
+
+    async def run(self, repo_urls: Iterable[str], out: TextIO) -> Dict[str, int]:
+        """
+        Analyze repositories and write one JSON record per line as each finishes.
+
+        Records hold the 'url', its 'status' ('ok', 'error' or 'timeout'), the elapsed
+        'seconds' and either the 'description' or the 'error'.
+
+        Args:
+            repo_urls (Iterable[str]): URLs of the repositories.
+            out (TextIO): Where the records are written; flushed after each one.
+
+        Returns:
+            Dict[str, int]: Number of repositories by status.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def job(repo_url: str):
+            async with semaphore:
+                try:
+                    record = await self.analyze(repo_url)
+                finally:
+                    # Timed-out and failed repositories hold indexes and plans too.
+                    self.repo_insight.release_url(repo_url)
+            self.counts[record['status']] += 1
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+
+        await asyncio.gather(*(job(repo_url) for repo_url in repo_urls))
+        logger.info(f"Batch finished: {self.counts['ok']} analyzed, {self.counts['error']} failed, "
+                    f"{self.counts['timeout']} timed out.")
+        return dict(self.counts)
+
+    async def analyze(self, repo_url: str) -> Dict[str, Any]:
+        """
+        Analyze one repository within the timeout.
+
+        Args:
+            repo_url (str): URL of the repository.
+
+        Returns:
+            Dict[str, Any]: The record of the repository.
+        """
+        record: Dict[str, Any] = {'url': repo_url}
+        start = time.perf_counter()
+        if not (repo_url.startswith(GITHUB_URL_PREFIX) or is_local_source(repo_url)):
+            record.update(status='error', error="Not a GitHub repository URL or local path.")
+        else:
+            try:
+                record.update(await asyncio.wait_for(self.describe(repo_url), self.timeout))
+            except asyncio.TimeoutError:
+                logger.error(f"Analysis of {repo_url} timed out after {self.timeout} seconds.")
+                record.update(status='timeout', error=f"Timed out after {self.timeout} seconds.")
+            except InsightGenerationError as e:
+                logger.error(f"Error generating insights for {repo_url}: {str(e)}")
+                record.update(status='error', error=f"Error generating insights: {str(e)}")
+            except Exception as e:
+                logger.error(f"An unexpected error occurred analyzing {repo_url}: {str(e)}")
+                record.update(status='error', error=f"An unexpected error occurred: {str(e)}")
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        return record
+
+    async def describe(self, repo_url: str) -> Dict[str, Any]:
+        combined_analysis, error = await self.repo_insight.collect_analysis(repo_url)
+        if error:
+            return {'status': 'error', 'error': error}
+        description = await self.repo_insight.insight_generator.generate_insights(combined_analysis)
+        return {'status': 'ok', 'repository': combined_analysis['repository'], 'description': description}
@@ -0,0 +1,248 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'config', 'config.yaml')
+
+
+class ConfigManager:
+    """
+    Loads RepoInsight settings from config/config.yaml, with environment variables
+    (GITHUB_TOKEN, OPENAI_API_KEY, GITHUB_API_URL) taking precedence.
+    """
+
+    def __init__(self, config_path: Optional[str] = None):
+        """
+        Initialize the ConfigManager.
+
+        Args:
+            config_path (Optional[str]): Path to the YAML configuration file. Defaults to config/config.yaml.
+        """
+        self.config_path = config_path or os.environ.get('REPOINSIGHT_CONFIG', DEFAULT_CONFIG_PATH)
+        self.config = self.load_config(self.config_path)
+
+    @staticmethod
+    def load_config(config_path: str) -> Dict[str, Any]:
+        """
+        Read the YAML configuration file.
+
+        Args:
+            config_path (str): Path to the YAML configuration file.
+
+        Returns:
+            Dict[str, Any]: The parsed configuration, or an empty dict if it cannot be read.
+        """
+        try:
+            with open(config_path, 'r', encoding='utf-8') as config_file:
+                return yaml.safe_load(config_file) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.warning(f"Could not load configuration from {config_path}: {e}")
+            return {}
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        """
+        Read a single setting.
+
+        Args:
+            section (str): Top-level section, e.g. 'analysis'.
+            key (str): Key within the section.
+            default (Any): Value returned when the setting is missing.
+
+        Returns:
+            Any: The setting's value.
+        """
+        return (self.config.get(section) or {}).get(key, default)
+
+    @staticmethod
+    def _secret(value: Optional[str]) -> Optional[str]:
+        # The shipped config.yaml holds 'your_..._here' placeholders rather than real secrets.
+        if not value or (value.startswith('your_') and value.endswith('_here')):
+            return None
+        return value
+
+    @property
+    def github_token(self) -> Optional[str]:
+        return self._secret(os.environ.get('GITHUB_TOKEN') or self.get('github', 'api_token'))
+
+    @property
+    def github_tokens(self) -> List[str]:
+        """
+        All configured GitHub tokens: the main token, then GITHUB_TOKENS (comma-separated)
+        or the github.api_tokens list, with placeholders and duplicates removed.
+        """
+        extra = os.environ.get('GITHUB_TOKENS')
+        extra = extra.split(',') if extra else self.get('github', 'api_tokens', []) or []
+        tokens = [self.github_token] + [self._secret(token.strip()) for token in extra]
+        return list(dict.fromkeys(token for token in tokens if token))
+
+    @property
+    def github_max_concurrency(self) -> int:
+        return int(self.get('github', 'max_concurrency', 16))
+
+    @property
+    def github_base_url(self) -> str:
+        return os.environ.get('GITHUB_API_URL') or self.get('github', 'api_url', 'https://api.github.com')
+
+    @property
+    def openai_api_key(self) -> Optional[str]:
+        return self._secret(os.environ.get('OPENAI_API_KEY') or self.get('openai', 'api_key'))
+
+    @property
+    def prompt_token_budget(self) -> int:
+        """
+        Maximum number of tokens of the prompt sent to the model.
+        """
+        return int(self.get('openai', 'prompt_token_budget', 3000))
+
+    @property
+    def openai_api_base(self) -> str:
+        return os.environ.get('OPENAI_API_BASE') or self.get('openai', 'api_base', 'https://api.openai.com/v1')
+
+    @property
+    def openai_max_concurrency(self) -> int:
+        """
+        Maximum number of chat completion requests in flight in the map-reduce summarization mode.
+        """
+        return int(self.get('openai', 'max_concurrency', 4))
+
+    @property
+    def summarization_mode(self) -> str:
+        """
+        'single' to describe the repository from one prompt, 'map_reduce' to summarize directories first.
+        """
+        return self.get('openai', 'summarization', 'single')
+
+    @property
+    def max_file_size(self) -> int:
+        return int(self.get('analysis', 'max_file_size', 1000000))
+
+    @property
+    def ingest_mode(self) -> str:
+        """
+        How file contents are fetched: 'files' (one request per file), 'archive' (one
+        tarball download) or 'graphql' (blobs batched into GraphQL queries).
+        """
+        return self.get('analysis', 'ingest_mode', 'files')
+
+    @property
+    def incremental(self) -> bool:
+        """
+        Re-analyze only the files changed since the last run; needs a cache directory.
+        """
+        return bool(self.get('analysis', 'incremental', False))
+
+    @property
+    def analysis_workers(self) -> int:
+        """
+        Number of worker processes for CPU-bound analyzers; 0 runs them in this process.
+        Unset (null) uses every CPU but one, which is left to the event loop fetching files.
+        """
+        workers = self.get('analysis', 'workers')
+        if workers is None:
+            return max((os.cpu_count() or 1) - 1, 0)
+        return int(workers)
+
+    @property
+    def pipeline_queue_size(self) -> int:
+        """
+        Most fetched files waiting for analysis, and analyzed files waiting to be collected.
+        """
+        return int(self.get('analysis', 'queue_size', 64))
+
+    @property
+    def pipeline_max_bytes(self) -> Optional[int]:
+        """
+        Most bytes of file content fetched but not yet analyzed; null for no limit.
+        """
+        max_bytes = self.get('analysis', 'max_bytes_in_flight', 67108864)
+        return int(max_bytes) if max_bytes else None
+
+    @property
+    def detailed_modules(self) -> int:
+        """
+        Number of most central modules, by import graph PageRank, detailed in the report.
+        """
+        return int(self.get('analysis', 'detailed_modules', 20))
+
+    @property
+    def cache_directory(self) -> Optional[str]:
+        return self.get('cache', 'directory')
+
+    @property
+    def analysis_cache_path(self) -> Optional[str]:
+        directory = self.cache_directory
+        return os.path.join(directory, 'analysis.sqlite') if directory else None
+
+    @property
+    def analysis_cache_max_bytes(self) -> Optional[int]:
+        return self.get('cache', 'analysis_max_bytes')
+
+    @property
+    def http_cache_path(self) -> Optional[str]:
+        directory = self.cache_directory
+        return os.path.join(directory, 'http.sqlite') if directory else None
+
+    @property
+    def http_cache_max_bytes(self) -> Optional[int]:
+        return self.get('cache', 'http_max_bytes')
+
+    @property
+    def run_state_directory(self) -> Optional[str]:
+        directory = self.cache_directory
+        return os.path.join(directory, 'state') if directory else None
+
+    @property
+    def symbol_index_directory(self) -> Optional[str]:
+        directory = self.cache_directory
+        return os.path.join(directory, 'symbols') if directory else None
+
+    @property
+    def response_cache_path(self) -> Optional[str]:
+        directory = self.cache_directory
+        return os.path.join(directory, 'responses.sqlite') if directory else None
+
+    @property
+    def response_cache_max_bytes(self) -> Optional[int]:
+        return self.get('cache', 'responses_max_bytes')
+
+    @property
+    def response_cache_ttl(self) -> Optional[float]:
+        """
+        Seconds a cached model response is reused; None reuses it until evicted.
+        """
+        ttl = self.get('cache', 'responses_ttl')
+        return float(ttl) if ttl is not None else None
+
+    @property
+    def batch_concurrency(self) -> int:
+        """
+        Maximum number of repositories analyzed at once in batch mode.
+        """
+        return int(self.get('batch', 'concurrency', 4))
+
+    @property
+    def batch_timeout(self) -> Optional[float]:
+        """
+        Seconds one repository may take in batch mode; null for no limit.
+        """
+        timeout = self.get('batch', 'timeout', 900)
+        return float(timeout) if timeout else None
+
+    @property
+    def supported_languages(self) -> List[str]:
+        return list(self.get('analysis', 'supported_languages', []))
+
+    def is_valid(self, require_github: bool = True) -> bool:
+        """
+        Check that the credentials required for an analysis run are present.
+
+        Args:
+            require_github (bool): Whether a GitHub token is needed; local repositories are read without one.
+
+        Returns:
+            bool: True if an OpenAI API key, and a GitHub token where required, are configured.
+        """
+        return bool(self.openai_api_key and (self.github_tokens or not require_github))
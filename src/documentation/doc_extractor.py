@@ -1,16 +1,66 @@
 import re
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 import markdown
 from bs4 import BeautifulSoup
+from .section_index import MarkdownSectionIndex
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SECTIONS = ('Installation', 'Usage', 'Contributing')
+
 class DocExtractor:
+    def __init__(self, sections: Iterable[str] = DEFAULT_SECTIONS):
+        """
+        Initialize the DocExtractor.
+
+        Args:
+            sections (Iterable[str]): Titles of the sections to extract, matched case-insensitively
+                against h2/h3 headings. Each is reported under its lowercased, underscored title.
+        """
+        self.sections = tuple(sections)
+
+    @staticmethod
+    def section_key(section_title: str) -> str:
+        return section_title.lower().replace(' ', '_')
+
     def extract_info(self, content: str) -> Dict[str, Optional[Any]]:
         """
         Extract specific sections from documentation content.
 
+        The document is scanned once into a MarkdownSectionIndex and every section is
+        answered from it; documents the index cannot model faithfully (raw HTML blocks,
+        headings nested in lists or quotes) go through extract_info_html instead.
+
+        Args:
+            content (str): The content of the documentation file.
+
+        Returns:
+            Dict[str, Optional[Any]]: Extracted information for various sections.
+        """
+        if not content:
+            logger.warning("No content provided to extract info.")
+            return {}
+
+        index = MarkdownSectionIndex(content)
+        if index.requires_html:
+            return self.extract_info_html(content)
+
+        header = index.first_heading([1])
+        project_name = index.heading_text(header)[0] if header else None
+        info = {
+            'project_name': project_name,
+            'description': (index.section_text(header) or None) if header else None,
+        }
+        for section_title in self.sections:
+            heading = index.find_heading(section_title, [2, 3])
+            info[self.section_key(section_title)] = (index.section_text(heading) or None) if heading else None
+        return info
+
+    def extract_info_html(self, content: str) -> Dict[str, Optional[Any]]:
+        """
+        Extract specific sections by rendering the whole document to HTML and searching it.
+
         Args:
             content (str): The content of the documentation file.
 
@@ -27,12 +77,42 @@ class DocExtractor:
         info = {
             'project_name': self.extract_project_name(soup),
             'description': self.extract_description(soup),
-            'installation': self.extract_section(soup, 'Installation'),
-            'usage': self.extract_section(soup, 'Usage'),
-            'contributing': self.extract_section(soup, 'Contributing'),
         }
+        for section_title in self.sections:
+            info[self.section_key(section_title)] = self.extract_section(soup, section_title)
         return info
 
+    def extract_section_source(self, content: str, section_title: str) -> Optional[str]:
+        """
+        Extract the markdown source of the first section, at any heading level, whose title
+        contains section_title (case-insensitively).
+
+        Args:
+            content (str): The content of the documentation file.
+            section_title (str): The title of the section to extract.
+
+        Returns:
+            Optional[str]: The section's markdown up to the next heading, or None if the
+                section is missing or empty.
+        """
+        if not content:
+            return None
+        index = MarkdownSectionIndex(content)
+        heading = index.find_heading(section_title, range(1, 7))
+        return (index.section_source(heading) or None) if heading else None
+
+    def extract_contributing(self, content: str) -> Optional[str]:
+        """
+        Extract the markdown source of the Contributing section.
+
+        Args:
+            content (str): The content of the documentation file.
+
+        Returns:
+            Optional[str]: The section content if found and not empty, else None.
+        """
+        return self.extract_section_source(content, 'Contributing')
+
     def extract_project_name(self, soup: BeautifulSoup) -> Optional[str]:
         """
         Extract the project name from the documentation.
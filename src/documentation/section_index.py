@@ -0,0 +1,324 @@
+import re
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import markdown
+from markdown.blockprocessors import ReferenceProcessor
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Block-level patterns, as recognized by Python-Markdown without extensions.
+ATX_HEADING = re.compile(r'(?P<level>#{1,6})(?P<text>(?:\\.|[^\\])*?)#*$')
+SETEXT_UNDERLINE = re.compile(r'[=-]+[ ]*$')
+HORIZONTAL_RULE = re.compile(r'[ ]{0,3}(?:(?:-+[ ]{0,2}){3,}|(?:_+[ ]{0,2}){3,}|(?:\*+[ ]{0,2}){3,})[ ]*$')
+LIST_ITEM = re.compile(r'[ ]{0,3}(?:[*+-]|\d+\.)[ ]+')
+NESTED_PREFIX = re.compile(r'(?:[ ]*>|[ ]*(?:[*+-]|\d+\.)[ ]+|[ ]+)')
+BLOCK_QUOTE = re.compile(r'[ ]{0,3}>')
+# Raw HTML blocks open with a block-level tag (or a comment / declaration); inline tags start paragraphs.
+HTML_BLOCK = re.compile(
+    r'[ ]{0,3}<(?:[!?]|/?(?:%s)(?![A-Za-z0-9-]))' % '|'.join(markdown.Markdown().block_level_elements),
+    re.IGNORECASE,
+)
+REFERENCE_CANDIDATE = re.compile(r'[ ]{0,3}\[[^\[\]]*\]:')
+# Characters that may start inline markup, entities or raw HTML.
+INLINE_MARKUP = re.compile(r'[\\`*_\[\]<&]')
+
+
+@dataclass
+class Heading:
+    """
+    A top-level heading or horizontal rule, and the span of lines it opens.
+
+    Attributes:
+        level (int): Heading level 1-6, or 0 for a horizontal rule.
+        source (str): The heading's markdown source; the text line for setext headings.
+        start (int): Index of the first line after the heading.
+        end (int): Index of the line of the next heading or rule (exclusive end of the span).
+        setext (bool): Whether the heading is underlined rather than prefixed with '#'.
+    """
+    level: int
+    source: str
+    start: int
+    end: int = 0
+    setext: bool = False
+    _text: Optional[Tuple[str, Optional[str]]] = None
+
+
+class MarkdownSectionIndex:
+    """
+    A heading -> section span index built in one pass over a markdown document.
+
+    The index follows Python-Markdown's block rules for ATX and setext headings,
+    horizontal rules, code blocks, lists and link definitions, so it reproduces what DocExtractor's
+    HTML-based extraction sees. Section text is computed on demand. Plain
+    paragraphs are handled directly, and any other span is rendered on its own,
+    never the whole document. Documents whose top-level heading structure could
+    differ from the line structure (raw HTML blocks, headings or link definitions
+    nested in lists or quotes) are flagged with requires_html, so callers can fall back to a full render.
+    """
+
+    def __init__(self, content: str):
+        """
+        Build the index.
+
+        Args:
+            content (str): The markdown document.
+        """
+        content = content.replace('\r\n', '\n').replace('\r', '\n').expandtabs(4)
+        self.lines = ['' if not line.strip(' ') else line for line in content.split('\n')]
+        self.headings: List[Heading] = []
+        self.requires_html = False
+        self.references: Dict[str, str] = {}
+        self._scan()
+
+    def _scan(self):
+        lines = self.lines
+        block_start, in_code, in_list, list_block, list_indent = True, False, False, False, False
+        # quoted: a quote line was seen in the current block, which holds the rest of the block.
+        # after_reference: the current block is the rest of one that a link definition ended; rules
+        # and quotes anywhere in the original block were split off before the definition was.
+        quoted, after_reference, block_first, follows_list = False, False, 0, False
+        index = 0
+        while index < len(lines):
+            line = lines[index]
+            if not line:
+                block_start, in_code, quoted, after_reference = True, False, False, False
+                index += 1
+                continue
+
+            # Prose lines can only open a setext heading, so the other block patterns are skipped.
+            prose = line[0].isalpha()
+            if block_start:
+                block_first, follows_list = index, in_list
+                # Python-Markdown merges an indented block into a preceding list.
+                list_indent = in_list and line.startswith('    ')
+                list_block = not prose and (bool(LIST_ITEM.match(line)) or list_indent)
+                in_list = list_block
+                in_code = not list_block and line.startswith('    ')
+            elif in_code and not line.startswith('    '):
+                # An unindented line ends an indented code block and starts a new block.
+                block_start, in_code, quoted = True, False, False
+                continue
+
+            atx = ATX_HEADING.match(line) if line.startswith('#') else None
+            setext = (block_start and not in_code and not list_indent and index + 1 < len(lines)
+                      and SETEXT_UNDERLINE.match(lines[index + 1])
+                      # Rules and quotes are split off the block before the link definition is taken out of it.
+                      and not (after_reference and (HORIZONTAL_RULE.match(line) or BLOCK_QUOTE.match(line)
+                                                    or HORIZONTAL_RULE.match(lines[index + 1]))))
+            if not prose:
+                if list_indent and (atx or SETEXT_UNDERLINE.match(line) or HORIZONTAL_RULE.match(line)):
+                    # The whole block is moved into the preceding list item, headings and rules included.
+                    self.requires_html = True
+                if HTML_BLOCK.match(line) or self._is_nested_heading(line, list_block or quoted):
+                    self.requires_html = True
+                if not in_code and BLOCK_QUOTE.match(line):
+                    # After a link definition, the quote was split off a block that began before it.
+                    self.requires_html = self.requires_html or after_reference
+                    quoted = True
+                definition_lines = self._add_reference(index) if not setext and REFERENCE_CANDIDATE.match(line) else 0
+                if definition_lines:
+                    # The lines after a link definition are parsed as a block of their own...
+                    following = index + definition_lines
+                    if list_block or list_indent or quoted:
+                        # ... inside the list item or quote, where they can form a nested heading.
+                        self.requires_html = self.requires_html or (following < len(lines) and bool(lines[following]))
+                    else:
+                        block_start, after_reference = True, True
+                        # A definition leaves no element behind, so a list before it can still take an indented block.
+                        in_list = follows_list and index == block_first
+                        index = following
+                        continue
+            if ((list_block or list_indent or quoted) and not setext and index + 1 < len(lines)
+                    and SETEXT_UNDERLINE.match(lines[index + 1])):
+                # An underline below a lazy line can make a setext heading inside the list item or quote.
+                self.requires_html = True
+
+            if atx:
+                self._open(len(atx.group('level')), line, index)
+                after_reference = False
+            elif setext:
+                self._open(1 if lines[index + 1].startswith('=') else 2, line.strip(), index, setext=True)
+                index += 1
+            elif not prose and not in_code and HORIZONTAL_RULE.match(line):
+                self._open(0, line, index)
+                after_reference = False
+            else:
+                block_start = False
+                index += 1
+                continue
+            block_start, in_code, in_list, list_block, list_indent, quoted = True, False, False, False, False, False
+            index += 1
+
+        if self.headings:
+            self.headings[-1].end = len(lines)
+
+    def _add_reference(self, index: int) -> int:
+        """
+        Record the link definition starting at a line, if there is one.
+
+        Returns:
+            int: The number of lines the definition spans, or 0 if the line does not start one.
+        """
+        # Link definitions apply document-wide, so they are replayed before any span rendered on its own.
+        # Headings, rules, quotes and raw HTML are split off the block first, so a definition never spans them.
+        window = [self.lines[index]]
+        for line in self.lines[index + 1:index + 3]:
+            if (not line or line.startswith('#') or HORIZONTAL_RULE.match(line) or BLOCK_QUOTE.match(line)
+                    or HTML_BLOCK.match(line)):
+                break
+            window.append(line)
+        match = ReferenceProcessor.RE.match('\n'.join(window))
+        if not match:
+            return 0
+        # Replayed on one line, as a definition spanning lines could read as a setext heading on its own.
+        definition = ' '.join(part.strip() for part in match.group(0).split('\n'))
+        self.references.setdefault(match.group(1).strip().lower(), definition)
+        return match.group(0).count('\n') + 1
+
+    def _render(self, source: str) -> BeautifulSoup:
+        if self.references and '[' in source:
+            lowered = source.lower()
+            used = [definition for label, definition in self.references.items() if f'[{label}' in lowered]
+            source = '\n\n'.join(used + [source])
+        return BeautifulSoup(markdown.markdown(source), 'html.parser')
+
+    def _open(self, level: int, source: str, index: int, setext: bool = False):
+        if self.headings:
+            self.headings[-1].end = index
+        self.headings.append(Heading(level, source, index + (2 if setext else 1), setext=setext))
+
+    @staticmethod
+    def _is_nested_heading(line: str, nested_block: bool) -> bool:
+        """
+        Check whether a line could become a heading (or setext underline) nested in a list
+        item or block quote, which the line-based index would misplace, or a nested link
+        definition, which applies to the whole document but is not recorded.
+        """
+        if not (nested_block or BLOCK_QUOTE.match(line) or LIST_ITEM.match(line)):
+            return False
+        rest, stripped = line, False
+        while True:
+            match = NESTED_PREFIX.match(rest)
+            if not match or not match.group():
+                break
+            rest, stripped = rest[match.end():], True
+        return stripped and (rest.startswith('#') or bool(SETEXT_UNDERLINE.match(rest) or REFERENCE_CANDIDATE.match(rest)))
+
+    def heading_text(self, heading: Heading) -> Tuple[str, Optional[str]]:
+        """
+        Text of a heading as BeautifulSoup reports it.
+
+        Args:
+            heading (Heading): A heading of this index.
+
+        Returns:
+            Tuple[str, Optional[str]]: get_text(strip=True) and .string of the heading element.
+        """
+        if heading._text is None:
+            if heading.setext:
+                text = heading.source
+            else:
+                text = ATX_HEADING.match(heading.source).group('text').strip()
+            if not INLINE_MARKUP.search(text):
+                heading._text = (text, text or None)
+            else:
+                element = self._render(self._heading_markdown(heading)).find()
+                heading._text = (element.get_text(strip=True), element.string) if element else ('', None)
+        return heading._text
+
+    def _heading_markdown(self, heading: Heading) -> str:
+        if heading.setext:
+            return f"{heading.source}\n{'=' if heading.level == 1 else '-'}\n"
+        return heading.source
+
+    def first_heading(self, levels: Iterable[int]) -> Optional[Heading]:
+        """
+        Find the first heading of the given levels.
+
+        Args:
+            levels (Iterable[int]): Heading levels to accept.
+
+        Returns:
+            Optional[Heading]: The heading, or None if there is none.
+        """
+        levels = set(levels)
+        return next((heading for heading in self.headings if heading.level in levels), None)
+
+    def find_heading(self, title: str, levels: Iterable[int]) -> Optional[Heading]:
+        """
+        Find the first heading of the given levels whose text contains a title, ignoring case.
+
+        Only headings consisting of a single text node qualify, like BeautifulSoup's
+        string= filter.
+
+        Args:
+            title (str): The title to look for.
+            levels (Iterable[int]): Heading levels to accept.
+
+        Returns:
+            Optional[Heading]: The heading, or None if there is none.
+        """
+        levels, title = set(levels), title.lower()
+        for heading in self.headings:
+            if heading.level in levels:
+                string = self.heading_text(heading)[1]
+                if string and title in string.lower():
+                    return heading
+        return None
+
+    def section_source(self, heading: Heading) -> str:
+        """
+        The markdown source of the span a heading opens, stripped.
+
+        Args:
+            heading (Heading): A heading of this index.
+
+        Returns:
+            str: The source lines up to the next heading or rule.
+        """
+        return '\n'.join(self.lines[heading.start:heading.end]).strip()
+
+    def section_text(self, heading: Heading) -> str:
+        """
+        The text of the span a heading opens, as DocExtractor's HTML extraction joins it:
+        the get_text(strip=True) of every block, space-separated, with empty separators between blocks.
+
+        Args:
+            heading (Heading): A heading of this index.
+
+        Returns:
+            str: The section text; empty if the section has none.
+        """
+        lines = self.lines[heading.start:heading.end]
+        blocks = self._plain_blocks(lines)
+        if blocks is None:
+            return self._render_text(lines)
+        texts = ['']
+        for block in blocks:
+            texts.extend([block, ''])
+        return ' '.join(texts).strip()
+
+    @staticmethod
+    def _plain_blocks(lines: List[str]) -> Optional[List[str]]:
+        """
+        Split a span into paragraph texts, or return None if it holds anything but plain paragraphs.
+        """
+        blocks, block = [], []
+        for line in lines + ['']:
+            if not line:
+                if block:
+                    blocks.append('\n'.join(block).strip())
+                    block = []
+                continue
+            if INLINE_MARKUP.search(line) or line.endswith('  ') or BLOCK_QUOTE.match(line):
+                return None
+            if not block and (line.startswith('    ') or LIST_ITEM.match(line)):
+                return None
+            block.append(line)
+        return blocks
+
+    def _render_text(self, lines: List[str]) -> str:
+        soup = self._render('\n'.join(lines))
+        return ' '.join(element.get_text(strip=True) for element in soup.contents).strip()
@@ -0,0 +1,265 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from ..utils.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+
+class ChatCompletionError(Exception):
+    """
+    Raised when a chat completion request fails.
+    """
+
+
+class RetryableChatError(ChatCompletionError):
+    """
+    Raised for failures worth retrying: rate limits, server errors and transport errors.
+    """
+
+
+class AsyncChatClient:
+    """
+    A minimal asyncio client for OpenAI-compatible chat completion endpoints.
+
+    Requests share one keep-alive connection pool, at most max_concurrency of them
+    are in flight at once, and rate-limited, failed and timed-out requests are
+    retried with exponential backoff. Streamed completions are retried the same
+    way until their first chunk arrives; after that a failure is raised, since
+    the caller has already consumed part of the output. Pointing api_base at a
+    local server makes the client testable without network access.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_base: str = DEFAULT_API_BASE,
+        max_concurrency: int = 4,
+        timeout: float = 120.0,
+        max_attempts: int = 3,
+        retry_wait: float = 1.0,
+        retry_max_wait: float = 60.0,
+        metrics: Optional[Metrics] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ):
+        """
+        Initialize the AsyncChatClient.
+
+        Args:
+            api_key (Optional[str]): API key. If None, it will use the OPENAI_API_KEY environment variable.
+            api_base (str): Base URL of the API, e.g. 'https://api.openai.com/v1'.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            timeout (float): Per-request timeout in seconds.
+            max_attempts (int): Attempts per completion, including the first.
+            retry_wait (float): Multiplier of the exponential backoff between attempts, in seconds.
+            retry_max_wait (float): Upper bound on a single backoff, in seconds.
+            metrics (Optional[Metrics]): Counts the requests and their token usage.
+            count_tokens (Optional[Callable[[str], int]]): Estimates token usage from the text of
+                the messages and completion, for endpoints that do not report it.
+        """
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.api_base = api_base.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.retry_wait = retry_wait
+        self.retry_max_wait = retry_max_wait
+        self.requests = 0
+        self.metrics = metrics
+        self.count_tokens = count_tokens
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.client = httpx.AsyncClient(
+            base_url=self.api_base,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=httpx.Timeout(timeout),
+        )
+
+    async def close(self):
+        """
+        Close the pooled connections.
+        """
+        await self.client.aclose()
+
+    def retrying(self) -> AsyncRetrying:
+        return AsyncRetrying(
+            reraise=True,
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=self.retry_wait, max=self.retry_max_wait),
+            retry=retry_if_exception_type(RetryableChatError),
+        )
+
+    async def complete(self, messages: List[Dict[str, str]], model: str, max_tokens: int,
+                       temperature: float) -> str:
+        """
+        Request a chat completion.
+
+        Args:
+            messages (List[Dict[str, str]]): The conversation, as role/content dicts.
+            model (str): Model name.
+            max_tokens (int): Maximum number of tokens in the completion.
+            temperature (float): Sampling temperature.
+
+        Returns:
+            str: The content of the first choice.
+
+        Raises:
+            ChatCompletionError: If the request failed, after retries where they apply.
+        """
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        async for attempt in self.retrying():
+            with attempt:
+                content, usage = await self._post(payload)
+        self.record_usage(messages, content, usage)
+        return content
+
+    async def stream(self, messages: List[Dict[str, str]], model: str, max_tokens: int,
+                     temperature: float) -> AsyncIterator[str]:
+        """
+        Request a chat completion and yield its content as it arrives.
+
+        Closing the iterator early, or cancelling the task consuming it, closes the
+        connection and ends the request.
+
+        Args:
+            messages (List[Dict[str, str]]): The conversation, as role/content dicts.
+            model (str): Model name.
+            max_tokens (int): Maximum number of tokens in the completion.
+            temperature (float): Sampling temperature.
+
+        Yields:
+            str: Consecutive pieces of the content of the first choice.
+
+        Raises:
+            ChatCompletionError: If the request failed, after retries where they apply, or
+                the stream broke off after its first chunk.
+        """
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens,
+                   "temperature": temperature, "stream": True}
+        async for attempt in self.retrying():
+            with attempt:
+                response, chunks, first = await self._open_stream(payload)
+        pieces: List[str] = []
+        usage: Dict[str, Any] = {}
+        try:
+            if first is not None:
+                pieces.append(first)
+                yield first
+            async for chunk in chunks:
+                if isinstance(chunk, dict):
+                    usage = chunk
+                    continue
+                pieces.append(chunk)
+                yield chunk
+            self.record_usage(messages, ''.join(pieces), usage)
+        except httpx.TransportError as e:
+            raise ChatCompletionError(f"Chat completion stream broke off: {e!r}") from e
+        finally:
+            await chunks.aclose()
+            await response.aclose()
+            self._semaphore.release()
+
+    async def _open_stream(self, payload: Dict) -> Tuple[httpx.Response, AsyncIterator[str], Optional[str]]:
+        """
+        Send a streamed request and wait for its first chunk.
+
+        On success the caller owns the response and a semaphore slot, and has to close
+        the one and release the other.
+        """
+        await self._semaphore.acquire()
+        response = None
+        try:
+            self.requests += 1
+            request = self.client.build_request("POST", "/chat/completions", json=payload)
+            response = await self.client.send(request, stream=True)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableChatError(f"Chat completion request failed: HTTP {response.status_code}")
+            if response.status_code != 200:
+                body = (await response.aread()).decode('utf-8', 'replace')
+                raise ChatCompletionError(f"Chat completion request failed: HTTP {response.status_code} {body[:200]}")
+            chunks = self._iter_chunks(response)
+            try:
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = None
+            if isinstance(first, dict):
+                # Usage before any content: the completion is empty.
+                chunks, first = self._prepend(first, chunks), None
+            return response, chunks, first
+        except BaseException as e:
+            if response is not None:
+                await response.aclose()
+            self._semaphore.release()
+            if isinstance(e, httpx.TransportError):
+                raise RetryableChatError(f"Chat completion request failed: {e!r}") from e
+            raise
+
+    @staticmethod
+    async def _prepend(first: Any, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    @staticmethod
+    async def _iter_chunks(response: httpx.Response) -> AsyncIterator[Any]:
+        """
+        Parse the server-sent events of a streamed completion into content pieces, and
+        the token usage as a dict if the endpoint reports it in a final chunk.
+        """
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                return
+            try:
+                chunk = json.loads(data)
+                usage = chunk.get("usage")
+                choices = chunk.get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+            except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                raise ChatCompletionError(f"Malformed chat completion chunk: {e!r}") from e
+            if content:
+                yield content
+            if isinstance(usage, dict):
+                yield usage
+
+    def record_usage(self, messages: List[Dict[str, str]], content: str, usage: Optional[Dict[str, Any]]):
+        """
+        Count a completed request and its tokens: as reported by the endpoint, or else
+        estimated with count_tokens.
+        """
+        if not self.metrics:
+            return
+        self.metrics.incr('llm_requests')
+        if usage and 'prompt_tokens' in usage:
+            prompt, completion, source = usage.get('prompt_tokens') or 0, usage.get('completion_tokens') or 0, 'reported'
+        elif self.count_tokens:
+            prompt = sum(self.count_tokens(message.get('content') or '') for message in messages)
+            completion, source = self.count_tokens(content), 'estimated'
+        else:
+            return
+        self.metrics.incr('llm_tokens', prompt, kind='prompt', source=source)
+        self.metrics.incr('llm_tokens', completion, kind='completion', source=source)
+
+    async def _post(self, payload: Dict) -> Tuple[str, Optional[Dict[str, Any]]]:
+        async with self._semaphore:
+            self.requests += 1
+            try:
+                response = await self.client.post("/chat/completions", json=payload)
+            except httpx.TransportError as e:
+                raise RetryableChatError(f"Chat completion request failed: {e!r}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableChatError(f"Chat completion request failed: HTTP {response.status_code}")
+        if response.status_code != 200:
+            raise ChatCompletionError(f"Chat completion request failed: HTTP {response.status_code} {response.text[:200]}")
+        try:
+            body = response.json()
+            return body["choices"][0]["message"]["content"], body.get("usage")
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ChatCompletionError(f"Malformed chat completion response: {e!r}") from e
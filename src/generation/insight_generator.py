@@ -1,13 +1,49 @@
 import os
 import openai
 import logging
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, Any, List, Optional, Union
 from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+from .prompt_builder import PromptBuilder, TokenCounter
+from .chat_client import AsyncChatClient, ChatCompletionError, DEFAULT_API_BASE
+from .map_reduce import TreeSummarizer, build_summary_tree
+from .response_cache import ResponseCache
+from ..analysis.repo_tree import RepoTree
+from ..utils.metrics import Metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PROMPT_SECTIONS = ("Repository Structure", "Directory Summaries", "Code Analysis", "Documentation Analysis",
+                   "API Analysis", "Activity")
+# How the description is generated: from one prompt, or by summarizing directories bottom up first.
+SUMMARIZATION_MODES = ("single", "map_reduce")
+# Files that usually reveal how a project is started, built or deployed.
+ENTRY_POINTS = frozenset({
+    '__main__.py', 'main.py', 'app.py', 'cli.py', 'manage.py', 'server.py', 'wsgi.py', 'asgi.py',
+    'setup.py', 'setup.cfg', 'pyproject.toml', 'requirements.txt', 'package.json', 'Cargo.toml',
+    'go.mod', 'pom.xml', 'Dockerfile', 'docker-compose.yml', 'Makefile',
+})
+
+# Priority of a directory's file count by depth; sibling directories are ordered by size.
+DIRECTORY_PRIORITIES = (45, 25, 15)
+
+
+def _basename(path: str) -> str:
+    return path.rsplit('/', 1)[-1]
+
+
+def _is_readme(path: str) -> bool:
+    return _basename(path).lower().startswith('readme')
+
+
+class InsightGenerationError(Exception):
+    """
+    Raised when a project description cannot be generated.
+    """
+
+
 class InsightGenerator:
     """
     A class to generate comprehensive descriptions of GitHub repositories
@@ -20,6 +56,15 @@ class InsightGenerator:
         model: str = "gpt-3.5-turbo",
         max_tokens: int = 1000,
         temperature: float = 0.7,
+        prompt_token_budget: int = 3000,
+        doc_value_tokens: int = 200,
+        api_base: str = DEFAULT_API_BASE,
+        max_concurrency: int = 4,
+        response_cache: Optional[ResponseCache] = None,
+        min_directory_files: int = 5,
+        directory_token_budget: int = 2000,
+        summarization: str = "single",
+        metrics: Optional[Metrics] = None,
     ):
         """
         Initialize the InsightGenerator.
@@ -29,6 +74,16 @@ class InsightGenerator:
             model (str): OpenAI model to use.
             max_tokens (int): Maximum number of tokens in the generated response.
             temperature (float): Sampling temperature.
+            prompt_token_budget (int): Maximum number of tokens of the prompt.
+            doc_value_tokens (int): Maximum number of tokens quoted from any one extracted documentation section.
+            api_base (str): Base URL of the chat completion API used by the asynchronous methods.
+            max_concurrency (int): Maximum number of concurrent requests of the asynchronous methods.
+            response_cache (Optional[ResponseCache]): Persistent store of model responses, reused across runs.
+            min_directory_files (int): Smallest directory, in files, summarized on its own.
+            directory_token_budget (int): Maximum number of tokens of each directory prompt.
+            summarization (str): Default mode of the asynchronous methods: 'single' prompt, or
+                'map_reduce' to summarize directories first.
+            metrics (Optional[Metrics]): Times generation and counts chat completion requests and tokens.
 
         Raises:
             ValueError: If no OpenAI API key is provided.
@@ -40,6 +95,18 @@ class InsightGenerator:
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.prompt_token_budget = prompt_token_budget
+        self.doc_value_tokens = doc_value_tokens
+        self.token_counter = TokenCounter(model)
+        self.api_base = api_base
+        self.max_concurrency = max_concurrency
+        self.response_cache = response_cache
+        self.min_directory_files = min_directory_files
+        self.directory_token_budget = directory_token_budget
+        self.summarization = summarization
+        self.metrics = metrics
+        self.chat_client: Optional[AsyncChatClient] = None
+        self.summary_stats: Dict[str, int] = {}
 
     @retry(
         reraise=True,
@@ -47,12 +114,14 @@ class InsightGenerator:
         wait=wait_random_exponential(min=1, max=60),
         retry=retry_if_exception_type(openai.error.RateLimitError),
     )
-    def generate_description(self, aggregated_info: Dict[str, Any]) -> str:
+    def generate_description(self, aggregated_info: Dict[str, Any], use_cache: bool = True) -> str:
         """
         Generate a detailed project description based on the aggregated information.
 
         Args:
             aggregated_info (Dict[str, Any]): Aggregated data about the repository.
+            use_cache (bool): Answer from the response cache if the same request was made before.
+                With False the model is asked again and the cached response is replaced.
 
         Returns:
             str: The generated project description.
@@ -61,72 +130,412 @@ class InsightGenerator:
             logger.error("aggregated_info must be a dictionary.")
             return "Invalid input data."
 
-        prompt = self.create_prompt(aggregated_info)
+        messages = [{"role": "user", "content": self.create_prompt(aggregated_info)}]
+        cached = self.cached_response(messages, use_cache)
+        if cached is not None:
+            return cached
         try:
             response = openai.ChatCompletion.create(
                 api_key=self.api_key,
                 model=self.model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=messages,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
             )
             description = response.choices[0].message['content'].strip()
             logger.info("Description generated successfully.")
-            return description
         except openai.error.OpenAIError as e:
             logger.error(f"An error occurred: {e}")
             return "An error occurred while generating the description."
+        if self.response_cache is not None:
+            self.response_cache.set(self.model, self.temperature, self.max_tokens, messages, description)
+        return description
 
-    def create_prompt(self, aggregated_info: Dict[str, Any]) -> str:
+    def cached_response(self, messages: List[Dict[str, str]], use_cache: bool = True) -> Optional[str]:
+        """
+        Look up an earlier response to the same request.
+
+        Args:
+            messages (List[Dict[str, str]]): The request messages.
+            use_cache (bool): If False, the cache is bypassed.
+
+        Returns:
+            Optional[str]: The cached response, or None if the model has to be asked.
+        """
+        if self.response_cache is None or not use_cache:
+            return None
+        cached = self.response_cache.get(self.model, self.temperature, self.max_tokens, messages)
+        if cached is not None:
+            logger.info("Description served from the response cache.")
+        return cached
+
+    async def stream_insights(self, aggregated_info: Dict[str, Any], use_cache: bool = True,
+                              summarization: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Generate a project description, yielding it piece by piece as the model writes it.
+
+        Requests are retried as in generate_description until the first piece arrives.
+        Closing the iterator or cancelling the consuming task ends the request; a
+        description that was not streamed to the end is not cached.
+
+        Args:
+            aggregated_info (Dict[str, Any]): Aggregated data about the repository, as for
+                create_prompt, optionally with per-file facts under 'files'.
+            use_cache (bool): Reuse cached responses. With False every response is requested
+                again and replaces the cached one.
+            summarization (Optional[str]): 'single' or 'map_reduce'; defaults to the mode the
+                generator was created with.
+
+        Yields:
+            str: Consecutive pieces of the description. A cached description is yielded whole.
+
+        Raises:
+            InsightGenerationError: If the input is invalid or the model could not be reached.
+        """
+        if not isinstance(aggregated_info, dict):
+            logger.error("aggregated_info must be a dictionary.")
+            raise InsightGenerationError("Invalid input data.")
+        mode = summarization or self.summarization
+        if mode not in SUMMARIZATION_MODES:
+            raise InsightGenerationError(f"Unknown summarization mode '{mode}', expected one of {SUMMARIZATION_MODES}.")
+
+        with self.metrics.stage('generate') if self.metrics else nullcontext():
+            if mode == "map_reduce":
+                summaries = await self.summarize_directories(aggregated_info, use_cache)
+                aggregated_info = dict(aggregated_info, directory_summaries=summaries)
+            messages = [{"role": "user", "content": self.create_prompt(aggregated_info)}]
+            cached = self.cached_response(messages, use_cache)
+            if cached is not None:
+                yield cached
+                return
+
+            pieces = []
+            try:
+                async for piece in self.get_chat_client().stream(messages, self.model, self.max_tokens, self.temperature):
+                    if not pieces:
+                        piece = piece.lstrip()
+                        if not piece:
+                            continue
+                    pieces.append(piece)
+                    yield piece
+            except ChatCompletionError as e:
+                logger.error(f"An error occurred: {e}")
+                raise InsightGenerationError(str(e)) from e
+            description = ''.join(pieces).strip()
+            logger.info("Description generated successfully.")
+            if self.response_cache is not None:
+                self.response_cache.set(self.model, self.temperature, self.max_tokens, messages, description)
+
+    async def generate_insights(self, aggregated_info: Dict[str, Any], use_cache: bool = True,
+                                summarization: Optional[str] = None) -> str:
         """
-        Create a prompt for the AI model based on the aggregated repository information.
+        Generate a project description without blocking the event loop.
 
         Args:
             aggregated_info (Dict[str, Any]): Aggregated data about the repository.
+            use_cache (bool): Reuse cached responses.
+            summarization (Optional[str]): 'single' or 'map_reduce'; defaults to the generator's mode.
+
+        Returns:
+            str: The generated project description.
+
+        Raises:
+            InsightGenerationError: If the input is invalid or the model could not be reached.
+        """
+        pieces = [piece async for piece in self.stream_insights(aggregated_info, use_cache, summarization)]
+        return ''.join(pieces).strip()
+
+    async def generate_description_map_reduce(self, aggregated_info: Dict[str, Any], use_cache: bool = True) -> str:
+        """
+        Generate a project description for a repository too large for a single prompt.
+
+        Directories are summarized bottom up, concurrently, from facts about their
+        files and the summaries of their subdirectories. The final prompt is the
+        regular one with the directory summaries added, shallow directories first.
+
+        Args:
+            aggregated_info (Dict[str, Any]): Aggregated data about the repository, as for
+                create_prompt, optionally with per-file facts under 'files'.
+            use_cache (bool): Reuse cached directory summaries and descriptions. With False
+                every response is requested again and replaces the cached one.
+
+        Returns:
+            str: The generated project description.
+        """
+        if not isinstance(aggregated_info, dict):
+            logger.error("aggregated_info must be a dictionary.")
+            return "Invalid input data."
+        try:
+            return await self.generate_insights(aggregated_info, use_cache, summarization="map_reduce")
+        except InsightGenerationError:
+            return "An error occurred while generating the description."
+
+    async def summarize_directories(self, aggregated_info: Dict[str, Any], use_cache: bool = True) -> Dict[str, str]:
+        """
+        Summarize the repository's directories bottom up.
+
+        Args:
+            aggregated_info (Dict[str, Any]): Aggregated data about the repository with its
+                'structure' and, optionally, per-file facts under 'files'.
+            use_cache (bool): Reuse cached directory summaries.
+
+        Returns:
+            Dict[str, str]: Summaries keyed by directory path.
+        """
+        structure = aggregated_info.get('structure') or {}
+        files = aggregated_info.get('files') or {}
+        paths = [path for path, kind in structure.items() if kind != 'dir'] or list(files)
+        summarizer = TreeSummarizer(
+            self.get_chat_client(), self.model, temperature=self.temperature,
+            node_token_budget=self.directory_token_budget, cache=self.response_cache, counter=self.token_counter,
+        )
+        facts = {path: self.format_file_facts(info) for path, info in files.items()}
+        priorities = {path: info.get('pagerank') or 0 for path, info in files.items() if isinstance(info, dict)}
+        summaries = await summarizer.summarize(build_summary_tree(paths, self.min_directory_files), facts,
+                                               priorities, use_cache)
+        self.summary_stats = summarizer.stats
+        return summaries
+
+    def get_chat_client(self) -> AsyncChatClient:
+        if self.chat_client is None:
+            self.chat_client = AsyncChatClient(self.api_key, self.api_base, max_concurrency=self.max_concurrency,
+                                               metrics=self.metrics, count_tokens=self.token_counter.count)
+        return self.chat_client
+
+    async def close(self):
+        """
+        Close the connections of the asynchronous methods.
+        """
+        if self.chat_client is not None:
+            await self.chat_client.close()
+            self.chat_client = None
+
+    @staticmethod
+    def format_file_facts(info: Dict[str, Any]) -> str:
+        """
+        Describe a file in one line for a directory summary.
+
+        Args:
+            info (Dict[str, Any]): Facts about the file: 'code' statistics, 'definitions',
+                'pagerank' and extracted 'doc' info.
+
+        Returns:
+            str: The description; empty if nothing is known about the file.
+        """
+        if not isinstance(info, dict):
+            return ''
+        parts = []
+        if info.get('definitions'):
+            definitions = info['definitions']
+            parts.append("defines " + ', '.join(definitions[:10]) + (f" and {len(definitions) - 10} more" if len(definitions) > 10 else ''))
+        if info.get('code'):
+            parts.append(', '.join(f"{key}: {value}" for key, value in info['code'].items()))
+        doc = info.get('doc') or {}
+        if isinstance(doc, dict) and (doc.get('project_name') or doc.get('description')):
+            parts.append(' - '.join(str(doc[key]) for key in ('project_name', 'description') if doc.get(key))[:200])
+        return '; '.join(parts)
+
+    def create_prompt(self, aggregated_info: Dict[str, Any]) -> str:
+        """
+        Create a prompt for the AI model that fits the prompt token budget.
+
+        Content is ranked by importance: the root README, the most imported modules
+        and entry points come first. Less important content is shortened to a summary
+        line or left out, and large trees are collapsed to per-directory file counts.
+
+        Args:
+            aggregated_info (Dict[str, Any]): Aggregated data about the repository: 'structure'
+                (path -> entry type), 'code' (RepoInsight.summarize_code output), 'documentation'
+                (path -> extracted doc info), 'api', 'issues', 'pull_requests', optionally 'tree'
+                (the structure as a RepoTree) and, in the map-reduce mode, 'directory_summaries'
+                (path -> summary).
 
         Returns:
             str: The prompt to be used with the AI model.
         """
-        project_name = aggregated_info.get('project_name', 'Unknown')
-        description = aggregated_info.get('description', 'No description available')
+        documentation = aggregated_info.get('documentation') or {}
+        readme_path = next((path for path in sorted(documentation)
+                            if '/' not in path and _is_readme(path) and isinstance(documentation[path], dict)), None)
+        readme = documentation[readme_path] if readme_path else {}
+        project_name = aggregated_info.get('project_name') or readme.get('project_name') or 'Unknown'
+        description = aggregated_info.get('description') or readme.get('description') or 'No description available'
 
-        prompt_sections = [
+        builder = PromptBuilder(self.prompt_token_budget, self.token_counter)
+        self.add_structure_items(builder, aggregated_info.get('structure') or {}, tree=aggregated_info.get('tree'))
+        self.add_summary_items(builder, aggregated_info.get('directory_summaries') or {})
+        self.add_code_items(builder, aggregated_info.get('code') or {})
+        self.add_doc_items(builder, documentation, header_source=readme_path)
+        self.add_api_items(builder, aggregated_info.get('api') or {})
+        self.add_activity_items(builder, aggregated_info)
+
+        header = '\n\n'.join([
             "Please generate a comprehensive description of the following GitHub project:",
             f"**Project Name:** {project_name}",
-            f"**Description:** {description}",
-            f"**Repository Structure:**\n{self.format_structure(aggregated_info.get('structure', {}))}",
-            f"**Code Analysis:**\n{self.format_code_analysis(aggregated_info.get('code_analysis', {}))}",
-            f"**Documentation Analysis:**\n{self.format_doc_analysis(aggregated_info.get('doc_analysis', {}))}",
-            f"**API Analysis:**\n{self.format_api_analysis(aggregated_info.get('api_analysis', {}))}",
-            "Please include the project's purpose, main features, architecture, and usage instructions in the description."
-        ]
-
-        prompt = '\n\n'.join(prompt_sections)
+            f"**Description:** {self.token_counter.truncate(str(description), self.doc_value_tokens)}",
+        ])
+        footer = ("Please include the project's purpose, main features, architecture, "
+                  "and usage instructions in the description.")
+        prompt = builder.build(header, footer, PROMPT_SECTIONS)
         logger.debug("Prompt created for AI model.")
         return prompt
 
-    def format_structure(self, structure: Dict[str, Any], indent_level: int = 0) -> str:
+    def add_structure_items(self, builder: PromptBuilder, structure: Dict[str, Any],
+                            max_depth: int = len(DIRECTORY_PRIORITIES), tree: Optional[RepoTree] = None):
         """
-        Recursively format the repository structure into a tree-like representation.
+        Add the repository layout: root files and entry points by name, and every
+        directory down to max_depth as a file count, shallower directories first.
 
         Args:
-            structure (Dict[str, Any]): Nested dictionary representing the repository structure.
-            indent_level (int): Current indentation level for recursive calls.
+            builder (PromptBuilder): The prompt builder.
+            structure (Dict[str, Any]): Entry type ('file' or 'dir') keyed by path.
+            max_depth (int): Deepest directory level listed.
+            tree (Optional[RepoTree]): The structure as a tree, if already built.
+        """
+        for path, kind in sorted(structure.items()):
+            name = _basename(path)
+            if kind == 'dir':
+                continue
+            if name in ENTRY_POINTS:
+                builder.add("Repository Structure", f"- {path} (entry point)", 75 if '/' not in path else 65)
+            elif '/' not in path:
+                builder.add("Repository Structure", f"- {path}", 60)
+
+        for directory in (tree or RepoTree.build(structure)).directories(max_depth):
+            common = ', '.join(f"{count} .{extension}" for extension, count in directory.common_extensions(3))
+            builder.add(
+                "Repository Structure",
+                f"- {directory.path}/ ({directory.file_count} files: {common})",
+                DIRECTORY_PRIORITIES[directory.depth - 1] + min(directory.file_count, 1000) / 1000,
+                summary=f"- {directory.path}/ ({directory.file_count} files)",
+            )
+
+    def add_summary_items(self, builder: PromptBuilder, summaries: Dict[str, str]):
+        """
+        Add directory summaries, shallower directories first.
+
+        Args:
+            builder (PromptBuilder): The prompt builder.
+            summaries (Dict[str, str]): Summaries keyed by directory path.
+        """
+        for path in sorted(summaries):
+            depth = path.count('/') + 1
+            builder.add("Directory Summaries", f"- {path}/: {summaries[path]}", 88 - 20 * (depth - 1),
+                        summary=f"- {path}/: {self.token_counter.truncate(summaries[path], 40)}")
+
+    def add_code_items(self, builder: PromptBuilder, code: Dict[str, Any]):
+        """
+        Add repository-wide code totals and the most central modules, ranked by PageRank.
+
+        Args:
+            builder (PromptBuilder): The prompt builder.
+            code (Dict[str, Any]): Output of RepoInsight.summarize_code.
+        """
+        totals = dict(code.get('totals') or {}, **(code.get('symbols') or {}))
+        if totals:
+            counts = ', '.join(f"{key}: {value}" for key, value in totals.items())
+            builder.add("Code Analysis", f"- Totals over {code.get('modules', 0)} modules: {counts}", 90)
+
+        modules = code.get('key_modules') or []
+        top_score = max((module.get('pagerank') or 0 for module in modules), default=0) or 1
+        for module in modules:
+            path = module['path']
+            definitions = module.get('definitions') or []
+            listed = ', '.join(definitions[:20]) + (f" and {len(definitions) - 20} more" if len(definitions) > 20 else '')
+            lines = [f"- {path} (PageRank {module.get('pagerank')})"]
+            if module.get('stats'):
+                lines.append("  - " + ', '.join(f"{key}: {value}" for key, value in module['stats'].items()))
+            if listed:
+                lines.append(f"  - defines: {listed}")
+            if module.get('imports'):
+                lines.append(f"  - imports: {', '.join(module['imports'][:10])}")
+            priority = 30 + 55 * (module.get('pagerank') or 0) / top_score + (10 if _basename(path) in ENTRY_POINTS else 0)
+            summary = f"- {path}: defines {', '.join(definitions[:5])}" if definitions else f"- {path}"
+            builder.add("Code Analysis", '\n'.join(lines), priority, summary=summary)
+
+    def add_doc_items(self, builder: PromptBuilder, documentation: Dict[str, Any],
+                      header_source: Optional[str] = None):
+        """
+        Add the extracted documentation, the root README first, each section quoted up to
+        doc_value_tokens.
+
+        Args:
+            builder (PromptBuilder): The prompt builder.
+            documentation (Dict[str, Any]): Extracted documentation info keyed by path.
+            header_source (Optional[str]): Document whose project name and description are
+                already in the prompt header; they are not repeated.
+        """
+        for path in sorted(documentation):
+            info = documentation[path]
+            if not isinstance(info, dict):
+                continue
+            depth = path.count('/')
+            if _is_readme(path):
+                priority = 95 if depth == 0 else 55 - depth
+            else:
+                priority = 40 - 5 * depth
+            lines = [f"- **File:** {path}"]
+            for key, value in info.items():
+                if value and not (path == header_source and key in ('project_name', 'description')):
+                    lines.append(f"  - {key}: {self.token_counter.truncate(str(value), self.doc_value_tokens)}")
+            title = info.get('project_name') or ''
+            summary = f"- **File:** {path}" + (f": {self.token_counter.truncate(str(title), 20)}" if title else '')
+            builder.add("Documentation Analysis", '\n'.join(lines), priority, summary=summary)
+
+    def add_api_items(self, builder: PromptBuilder, api_analysis: Dict[str, Any]):
+        """
+        Add detected API endpoints.
+
+        Args:
+            builder (PromptBuilder): The prompt builder.
+            api_analysis (Dict[str, Any]): Endpoint details keyed by endpoint.
+        """
+        for endpoint, details in api_analysis.items():
+            if not isinstance(details, dict):
+                continue
+            described = ', '.join(f"{key}: {value}" for key, value in details.items())
+            builder.add("API Analysis", f"- **Endpoint:** {endpoint} ({described})", 35,
+                        summary=f"- **Endpoint:** {endpoint}")
+
+    def add_activity_items(self, builder: PromptBuilder, aggregated_info: Dict[str, Any]):
+        """
+        Add the issue and pull request summaries.
+
+        Args:
+            builder (PromptBuilder): The prompt builder.
+            aggregated_info (Dict[str, Any]): Aggregated data holding 'issues' and 'pull_requests'
+                as produced by ActivitySummary.summary().
+        """
+        for key, label in (('issues', 'Issues'), ('pull_requests', 'Pull requests')):
+            activity = aggregated_info.get(key)
+            if not activity:
+                continue
+            counts = f"- {label}: {activity.get('total', 0)} total, {activity.get('open', 0)} open, {activity.get('closed', 0)} closed"
+            details = []
+            if activity.get('merged'):
+                details.append(f"{activity['merged']} merged")
+            if activity.get('median_days_to_close') is not None:
+                details.append(f"median {activity['median_days_to_close']} days to close")
+            if activity.get('top_labels'):
+                details.append("labels: " + ', '.join(f"{name} ({count})" for name, count in activity['top_labels']))
+            if activity.get('recent'):
+                details.append("recent: " + '; '.join(activity['recent'][:5]))
+            builder.add("Activity", '; '.join([counts] + details), 30, summary=counts)
+
+    def format_structure(self, structure: Union[Dict[str, Any], RepoTree], max_depth: Optional[int] = None,
+                         max_children: Optional[int] = None) -> str:
+        """
+        Format the repository structure into a tree-like representation.
+
+        Args:
+            structure (Union[Dict[str, Any], RepoTree]): Entry type keyed by path, or a built tree.
+            max_depth (Optional[int]): Deepest directory level whose contents are listed.
+            max_children (Optional[int]): Most entries listed per directory.
 
         Returns:
             str: Formatted repository structure.
         """
-        formatted = ""
-        indent = "  " * indent_level
-        for name, content in structure.items():
-            name_str = str(name)
-            if isinstance(content, dict):
-                formatted += f"{indent}- {name_str}/\n"
-                formatted += self.format_structure(content, indent_level + 1)
-            else:
-                content_str = str(content)
-                formatted += f"{indent}- {name_str} ({content_str})\n"
-        return formatted.strip()
+        tree = structure if isinstance(structure, RepoTree) else RepoTree.build(structure)
+        return tree.render(max_depth, max_children)
 
     def format_code_analysis(self, code_analysis: Dict[str, Any]) -> str:
         """
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+from .chat_client import AsyncChatClient, ChatCompletionError
+from .prompt_builder import PromptBuilder, TokenCounter
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+NODE_SECTIONS = ("Subdirectories", "Files")
+
+
+@dataclass
+class SummaryNode:
+    """
+    A directory summarized as one unit.
+
+    Attributes:
+        path (str): Directory path; '' for the repository root.
+        files (List[str]): Files summarized directly at this node, including those of merged subdirectories.
+        children (List[SummaryNode]): Subdirectories summarized on their own.
+        size (int): Number of files in the whole subtree.
+    """
+    path: str
+    files: List[str] = field(default_factory=list)
+    children: List["SummaryNode"] = field(default_factory=list)
+    size: int = 0
+
+    @property
+    def depth(self) -> int:
+        return self.path.count('/') + 1 if self.path else 0
+
+    def walk(self) -> Iterable["SummaryNode"]:
+        """
+        Yield this node and all nodes below it, parents before children.
+        """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def build_summary_tree(paths: Iterable[str], min_files: int = 5) -> SummaryNode:
+    """
+    Group file paths into a tree of directories to summarize.
+
+    Directories holding fewer than min_files files in their whole subtree are not
+    summarized on their own; their files are summarized with the parent instead.
+
+    Args:
+        paths (Iterable[str]): File paths.
+        min_files (int): Smallest subtree that gets its own summary.
+
+    Returns:
+        SummaryNode: The root node, with children sorted by path.
+    """
+    root = SummaryNode('')
+    nodes = {'': root}
+    for path in sorted(set(paths)):
+        parent = root
+        parts = path.split('/')[:-1]
+        for depth in range(1, len(parts) + 1):
+            directory = '/'.join(parts[:depth])
+            node = nodes.get(directory)
+            if node is None:
+                node = nodes[directory] = SummaryNode(directory)
+                parent.children.append(node)
+            parent = node
+        parent.files.append(path)
+
+    def collapse(node: SummaryNode) -> int:
+        kept = []
+        node.size = len(node.files)
+        for child in node.children:
+            node.size += collapse(child)
+            if child.size < min_files:
+                node.files.extend(file for merged in child.walk() for file in merged.files)
+            else:
+                kept.append(child)
+        node.children = kept
+        node.files.sort()
+        return node.size
+
+    collapse(root)
+    return root
+
+
+class TreeSummarizer:
+    """
+    Summarizes a repository directory by directory, bottom up.
+
+    Each directory's prompt holds the summaries of its subdirectories and facts
+    about its own files, so the model never sees more than node_token_budget
+    tokens at once however large the repository is. Sibling directories are
+    summarized concurrently, bounded by the client's concurrency limit.
+    Summaries are cached under a hash of the request that produced them: a
+    directory whose files and subdirectory summaries did not change is answered
+    from the cache, so a change re-summarizes only the path from the changed
+    file to the root.
+    """
+
+    def __init__(
+        self,
+        client: AsyncChatClient,
+        model: str,
+        max_tokens: int = 300,
+        temperature: float = 0.0,
+        node_token_budget: int = 2000,
+        cache: Optional[ResponseCache] = None,
+        counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Initialize the TreeSummarizer.
+
+        Args:
+            client (AsyncChatClient): Chat completion client.
+            model (str): Model name.
+            max_tokens (int): Maximum number of tokens of each directory summary.
+            temperature (float): Sampling temperature.
+            node_token_budget (int): Maximum number of tokens of each directory prompt.
+            cache (Optional[ResponseCache]): Persistent store for directory summaries.
+            counter (Optional[TokenCounter]): Token counter. Defaults to one for the model.
+        """
+        self.client = client
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.node_token_budget = node_token_budget
+        self.cache = cache
+        self.counter = counter or TokenCounter(model)
+        self.stats: Dict[str, int] = {}
+
+    async def summarize(self, root: SummaryNode, facts: Dict[str, str],
+                        priorities: Optional[Dict[str, float]] = None, use_cache: bool = True) -> Dict[str, str]:
+        """
+        Summarize every directory below the root.
+
+        Args:
+            root (SummaryNode): Output of build_summary_tree.
+            facts (Dict[str, str]): One line describing each file, keyed by path. Files
+                without facts are listed by name.
+            priorities (Optional[Dict[str, float]]): Importance of files, keyed by path; the
+                most important files are kept when a directory does not fit its budget.
+            use_cache (bool): Look summaries up in the cache. With False every directory is
+                summarized again and the cached summaries are replaced.
+
+        Returns:
+            Dict[str, str]: Summaries keyed by directory path. Directories whose summary
+                failed are missing, and their parents are summarized without them.
+        """
+        self.stats = {'nodes': 0, 'calls': 0, 'cache_hits': 0, 'failures': 0}
+        summaries: Dict[str, str] = {}
+        await asyncio.gather(*(self._summarize_node(child, facts, priorities or {}, summaries, use_cache)
+                               for child in root.children))
+        logger.info(f"Summarized {self.stats['nodes']} directories: {self.stats['calls']} model calls, "
+                    f"{self.stats['cache_hits']} cached, {self.stats['failures']} failed.")
+        return summaries
+
+    async def _summarize_node(self, node: SummaryNode, facts: Dict[str, str],
+                              priorities: Dict[str, float], summaries: Dict[str, str], use_cache: bool):
+        await asyncio.gather(*(self._summarize_node(child, facts, priorities, summaries, use_cache)
+                               for child in node.children))
+        self.stats['nodes'] += 1
+        messages = [{"role": "user", "content": self.node_prompt(node, facts, priorities, summaries)}]
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(self.model, self.temperature, self.max_tokens, messages)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                summaries[node.path] = cached
+                return
+        self.stats['calls'] += 1
+        try:
+            summary = (await self.client.complete(messages, self.model, self.max_tokens, self.temperature)).strip()
+        except ChatCompletionError as e:
+            logger.error(f"Failed to summarize {node.path}/: {e}")
+            self.stats['failures'] += 1
+            return
+        summaries[node.path] = summary
+        if self.cache is not None:
+            self.cache.set(self.model, self.temperature, self.max_tokens, messages, summary)
+
+    def node_prompt(self, node: SummaryNode, facts: Dict[str, str],
+                    priorities: Dict[str, float], summaries: Dict[str, str]) -> str:
+        """
+        Create the prompt summarizing one directory.
+
+        Args:
+            node (SummaryNode): The directory.
+            facts (Dict[str, str]): One line describing each file, keyed by path.
+            priorities (Dict[str, float]): Importance of files, keyed by path.
+            summaries (Dict[str, str]): Summaries of the directory's subdirectories, keyed by path.
+
+        Returns:
+            str: The prompt, within node_token_budget tokens.
+        """
+        builder = PromptBuilder(self.node_token_budget, self.counter)
+        for child in node.children:
+            if child.path in summaries:
+                builder.add("Subdirectories", f"- {child.path}/ ({child.size} files): {summaries[child.path]}",
+                            100 + min(child.size, 1000) / 1000, summary=f"- {child.path}/ ({child.size} files)")
+        for path in node.files:
+            fact = facts.get(path)
+            text = f"- {path}: {fact}" if fact else f"- {path}"
+            builder.add("Files", text, priorities.get(path, 0), summary=f"- {path}" if fact else None)
+        header = (f"Summarize the directory {node.path}/ of a software project ({node.size} files) "
+                  f"in a few sentences: its purpose, main components and how they fit together.")
+        footer = "Answer with the summary only."
+        return builder.build(header, footer, NODE_SECTIONS)
@@ -0,0 +1,203 @@
+import math
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+except ImportError:  # optional: token counts fall back to a character heuristic
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Without tiktoken a token is assumed to span this many characters. Real tokenizers average
+# about four characters per token on English and somewhat fewer on code and paths, so the
+# heuristic overcounts slightly and a prompt it fills stays within the budget.
+CHARS_PER_TOKEN = 3
+TRUNCATION_MARK = "..."
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in model tokens.
+
+    Uses tiktoken's encoding for the model when tiktoken is installed, and a
+    characters-per-token estimate otherwise.
+    """
+
+    def __init__(self, model: str = "gpt-3.5-turbo"):
+        """
+        Initialize the TokenCounter.
+
+        Args:
+            model (str): Model whose tokenizer is used, if tiktoken knows it.
+        """
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: Number of tokens.
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, tokens: int) -> str:
+        """
+        Cut a text down to at most a number of tokens, marking the cut.
+
+        Args:
+            text (str): The text.
+            tokens (int): Maximum number of tokens of the result.
+
+        Returns:
+            str: The text itself if it fits, otherwise its start followed by TRUNCATION_MARK.
+        """
+        if self.count(text) <= tokens:
+            return text
+        keep = max(tokens - self.count(TRUNCATION_MARK), 0)
+        if self.encoding is not None:
+            head = self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:keep])
+        else:
+            head = text[:keep * CHARS_PER_TOKEN]
+        return head.rstrip() + TRUNCATION_MARK
+
+
+@dataclass
+class PromptItem:
+    """
+    One candidate piece of a prompt.
+
+    Attributes:
+        section (str): Title of the section the item belongs to.
+        text (str): The item's full text.
+        priority (float): Higher priority items are placed first.
+        summary (Optional[str]): A shorter form used when the full text does not fit.
+    """
+    section: str
+    text: str
+    priority: float
+    summary: Optional[str] = None
+
+
+class PromptBuilder:
+    """
+    Fills a token budget with the most important prompt items.
+
+    Items are considered from highest to lowest priority, ties in the order they
+    were added, and each is placed in full, as its summary, or not at all. The
+    outcome only depends on the items and the budget, so the same analysis always
+    yields the same prompt. Sections are rendered in a fixed order, with a note on
+    how many of their items were left out.
+    """
+
+    def __init__(self, budget: int, counter: Optional[TokenCounter] = None):
+        """
+        Initialize the PromptBuilder.
+
+        Args:
+            budget (int): Maximum number of tokens of the prompt.
+            counter (Optional[TokenCounter]): Token counter. Defaults to one for gpt-3.5-turbo.
+        """
+        self.budget = budget
+        self.counter = counter or TokenCounter()
+        self.items: List[PromptItem] = []
+        self.stats: Dict[str, int] = {}
+
+    def add(self, section: str, text: str, priority: float, summary: Optional[str] = None):
+        """
+        Add a candidate item.
+
+        Args:
+            section (str): Title of the section the item belongs to.
+            text (str): The item's full text.
+            priority (float): Importance of the item; higher is placed first.
+            summary (Optional[str]): A shorter form used when the full text does not fit.
+        """
+        self.items.append(PromptItem(section, text, priority, summary))
+
+    @staticmethod
+    def omission_note(count: int) -> str:
+        return f"- ({count} more not shown)"
+
+    def build(self, header: str, footer: str, sections: Sequence[str]) -> str:
+        """
+        Assemble the prompt.
+
+        Args:
+            header (str): Text opening the prompt; always included.
+            footer (str): Text closing the prompt; always included.
+            sections (Sequence[str]): Section titles in the order they are rendered. Items of
+                other sections are ignored.
+
+        Returns:
+            str: The prompt. Only the header and footer are kept if they alone exceed the budget.
+        """
+        candidates = [item for item in self.items if item.section in sections]
+        used_sections = [section for section in sections if any(item.section == section for item in candidates)]
+        # Every section title and a worst-case omission note are paid for up front.
+        remaining = self.budget - self.counter.count(header) - self.counter.count(footer) - 2
+        for section in used_sections:
+            remaining -= self.counter.count(self.section_title(section)) + 2
+            remaining -= self.counter.count(self.omission_note(len(candidates))) + 1
+
+        placed: List[PromptItem] = []
+        summarized = 0
+        ranked = sorted(range(len(candidates)), key=lambda index: (-candidates[index].priority, index))
+        for index in ranked:
+            item = candidates[index]
+            for text in (item.text, item.summary):
+                if text is None:
+                    continue
+                tokens = self.counter.count(text) + 1
+                if tokens <= remaining:
+                    placed.append(PromptItem(item.section, text, item.priority))
+                    remaining -= tokens
+                    if text is not item.text:
+                        summarized += 1
+                    break
+
+        prompt = self._render(header, footer, used_sections, candidates, placed)
+        tokens = self.counter.count(prompt)
+        # Tokens of joined texts can differ slightly from the sum of their parts.
+        while tokens > self.budget and placed:
+            placed.pop()
+            prompt = self._render(header, footer, used_sections, candidates, placed)
+            tokens = self.counter.count(prompt)
+
+        self.stats = {
+            'budget': self.budget,
+            'tokens': tokens,
+            'items': len(candidates),
+            'placed': len(placed),
+            'summarized': summarized,
+        }
+        logger.info(f"Prompt: {tokens}/{self.budget} tokens, {len(placed)} of {len(candidates)} items.")
+        return prompt
+
+    def _render(self, header: str, footer: str, sections: List[str],
+                candidates: List[PromptItem], placed: List[PromptItem]) -> str:
+        blocks = [header]
+        for section in sections:
+            lines = [item.text for item in placed if item.section == section]
+            omitted = sum(1 for item in candidates if item.section == section) - len(lines)
+            if omitted:
+                lines.append(self.omission_note(omitted))
+            blocks.append(f"{self.section_title(section)}\n" + "\n".join(lines))
+        blocks.append(footer)
+        return "\n\n".join(blocks)
+
+    @staticmethod
+    def section_title(section: str) -> str:
+        return f"**{section}:**"
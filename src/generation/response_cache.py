@@ -0,0 +1,83 @@
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+from ..utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    A persistent cache of chat completions.
+
+    Completions are keyed by a hash of everything that determines them: model,
+    temperature, maximum length and messages. A byte-identical request made in a
+    later run is answered from disk instead of the API. Entries expire after ttl
+    seconds and the least recently used are evicted once the cache exceeds
+    max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_bytes (Optional[int]): Size cap of the cache; least recently used responses are evicted first.
+            ttl (Optional[float]): Lifetime of a response in seconds. None keeps responses until evicted.
+        """
+        self.store = DiskCache(path, max_bytes, ttl)
+        expired = self.store.purge_expired()
+        if expired:
+            logger.debug(f"Removed {expired} expired responses from {path}")
+
+    @staticmethod
+    def key(model: str, temperature: float, max_tokens: int, messages: List[Dict[str, str]]) -> str:
+        request = [model, temperature, max_tokens, messages]
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, model: str, temperature: float, max_tokens: int,
+            messages: List[Dict[str, str]]) -> Optional[str]:
+        """
+        Look up the completion of a request.
+
+        Args:
+            model (str): Model name.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum number of tokens in the completion.
+            messages (List[Dict[str, str]]): The conversation, as role/content dicts.
+
+        Returns:
+            Optional[str]: The cached completion, or None if there is none or it expired.
+        """
+        value = self.store.get(self.key(model, temperature, max_tokens, messages))
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, model: str, temperature: float, max_tokens: int,
+            messages: List[Dict[str, str]], completion: str):
+        """
+        Store the completion of a request.
+
+        Args:
+            model (str): Model name.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum number of tokens in the completion.
+            messages (List[Dict[str, str]]): The conversation, as role/content dicts.
+            completion (str): The completion text.
+        """
+        self.store.set(self.key(model, temperature, max_tokens, messages), completion.encode('utf-8'))
+
+    @property
+    def hits(self) -> int:
+        return self.store.hits
+
+    @property
+    def misses(self) -> int:
+        return self.store.misses
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
+    def close(self):
+        self.store.close()
@@ -1,111 +1,759 @@
 import os
 import logging
+import posixpath
 import asyncio
-from typing import Dict, Any, Optional
-from api.github_api import GitHubAPI
-from analysis.code_analyzer import CodeAnalyzer
-from utils.file_utils import is_code_file, is_text_file
-from documentation.doc_extractor import DocExtractor
-from generation.insight_generator import InsightGenerator
-from config.config_manager import ConfigManager
+import argparse
+import time
+from collections import Counter
+from typing import AsyncIterator, Collection, Dict, Any, List, Optional, Tuple
+from .api.github_api import GitHubAPI, TreeEntry
+from .api.async_client import AsyncGitHubClient
+from .api.http_cache import ConditionalCache
+from .api.graphql_blobs import BlobBatchFetcher
+from .api.local_repo import LocalRepoAPI, LocalRepository, is_local_source
+from .analysis.code_analyzer import analyze_python_module
+from .analysis.registry import AnalyzerRegistry, RegisteredAnalyzer
+from .analysis.analysis_cache import AnalysisCache
+from .analysis.activity import ActivitySummary
+from .analysis.parallel import ProcessPoolRunner
+from .analysis.symbol_index import SymbolIndex, digest_symbols
+from .analysis.import_graph import ImportGraph
+from .analysis.repo_tree import RepoTree
+from .analysis.pipeline import AnalysisPipeline
+from .analysis.file_plan import FilePlan, FilePlanner
+from .analysis.incremental import RunState, RunStateStore, apply_file_changes, diff_trees, drop_results
+from .documentation.doc_extractor import DocExtractor
+from .generation.insight_generator import InsightGenerator, InsightGenerationError, SUMMARIZATION_MODES
+from .generation.response_cache import ResponseCache
+from .config.config_manager import ConfigManager
+from .batch import BatchRunner, GITHUB_URL_PREFIX, completed_urls, read_repo_urls
+from .utils.file_utils import git_blob_sha
+from .utils.metrics import Metrics, Profiler
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How file contents are fetched: one contents request per file, one archive download,
+# or batched GraphQL blob queries.
+INGEST_MODES = ("files", "archive", "graphql")
+
 class RepoInsight:
-    def __init__(self, config: ConfigManager):
-        self.github_api = GitHubAPI(config.github_token)
-        self.code_analyzer = CodeAnalyzer()
+    def __init__(self, config: ConfigManager, ingest_mode: str = "files", incremental: bool = False,
+                 metrics: Optional[Metrics] = None):
+        if ingest_mode not in INGEST_MODES:
+            raise ValueError(f"Unknown ingest mode '{ingest_mode}', expected one of {INGEST_MODES}.")
+        if incremental and not config.run_state_directory:
+            raise ValueError("Incremental mode requires a cache directory in the configuration.")
+        self.ingest_mode = ingest_mode
+        self.metrics = metrics or Metrics()
+        self.symbol_index_directory = config.symbol_index_directory
+        # The most recently built index, and the index of each repository analyzed so far.
+        self.symbol_index: Optional[SymbolIndex] = None
+        self.symbol_indexes: Dict[str, SymbolIndex] = {}
+        # The full name each repository URL opened so far resolved to, until it is released.
+        self.opened: Dict[str, str] = {}
+        self.detailed_modules = config.detailed_modules
+        self.import_graphs: Dict[str, ImportGraph] = {}
+        self.run_state = RunStateStore(config.run_state_directory) if incremental else None
+        self.local_api = LocalRepoAPI()
+        self.http_cache = None
+        # Without a GitHub token only local repositories can be analyzed.
+        self.github_api: Optional[GitHubAPI] = None
+        self.async_client: Optional[AsyncGitHubClient] = None
+        self.blob_fetcher: Optional[BlobBatchFetcher] = None
+        if config.github_tokens:
+            # The first token may come from GITHUB_TOKENS or github.api_tokens alone.
+            primary_token = config.github_tokens[0]
+            self.github_api = GitHubAPI(primary_token, base_url=config.github_base_url)
+            if config.http_cache_path:
+                self.http_cache = ConditionalCache(config.http_cache_path, config.http_cache_max_bytes)
+            self.async_client = AsyncGitHubClient(primary_token, base_url=config.github_base_url,
+                                                  max_concurrency=config.github_max_concurrency,
+                                                  cache=self.http_cache, tokens=config.github_tokens,
+                                                  metrics=self.metrics)
+            self.blob_fetcher = BlobBatchFetcher(self.async_client)
+        self.process_pool = ProcessPoolRunner(config.analysis_workers) if config.analysis_workers else None
+        self.fetch_concurrency = config.github_max_concurrency
+        self.pipeline_queue_size = config.pipeline_queue_size
+        self.pipeline_max_bytes = config.pipeline_max_bytes
+        self.file_planner = FilePlanner(config.max_file_size, config.supported_languages)
+        # The fetch plan of each repository analyzed so far.
+        self.file_plans: Dict[str, FilePlan] = {}
         self.doc_extractor = DocExtractor()
-        self.insight_generator = InsightGenerator(api_key=config.openai_api_key)
+        self.analyzers = AnalyzerRegistry()
+        # Statistics and symbols come from one parse, so a worker process parses each module once.
+        self.analyzers.register('python', {'python'}, analyze_python_module, parallel=True,
+                                outputs=('code_analysis', 'symbols'))
+        self.analyzers.register(
+            'doc_analysis', {'text'},
+            lambda file_path, content: self.doc_extractor.extract_info(content),
+        )
+        self.analysis_cache = None
+        if config.analysis_cache_path:
+            self.analysis_cache = AnalysisCache(config.analysis_cache_path, config.analysis_cache_max_bytes)
+        self.summarization = config.summarization_mode
+        if self.summarization not in SUMMARIZATION_MODES:
+            raise ValueError(f"Unknown summarization mode '{self.summarization}', expected one of {SUMMARIZATION_MODES}.")
+        self.response_cache = None
+        if config.response_cache_path:
+            self.response_cache = ResponseCache(config.response_cache_path, config.response_cache_max_bytes,
+                                                config.response_cache_ttl)
+        self.insight_generator = InsightGenerator(api_key=config.openai_api_key,
+                                                  prompt_token_budget=config.prompt_token_budget,
+                                                  api_base=config.openai_api_base,
+                                                  max_concurrency=config.openai_max_concurrency,
+                                                  response_cache=self.response_cache,
+                                                  summarization=self.summarization,
+                                                  metrics=self.metrics)
 
     async def analyze_repository(self, repo_url: str) -> str:
-        logger.info(f"Starting analysis for repository: {repo_url}")
-        try:
-            repo = await self.github_api.get_repository(repo_url)
-            if not repo:
-                logger.error("Failed to access repository.")
-                return "Failed to access repository."
+        pieces = [piece async for piece in self.stream_repository(repo_url)]
+        return ''.join(pieces)
 
-            structure = await self.github_api.get_repository_structure(repo)
-            if not structure:
-                logger.error("Failed to retrieve repository structure.")
-                return "Failed to retrieve repository structure."
-
-            analysis_result = self.analyze_structure(structure)
-            code_analysis = await self.analyze_code_files(repo, structure)
-            doc_analysis = await self.analyze_documentation(repo, structure)
-            api_analysis = await self.analyze_api(repo, structure)
-            issues = await self.github_api.get_issues(repo)
-            pull_requests = await self.github_api.get_pull_requests(repo)
-
-            combined_analysis = {
-                "structure": analysis_result,
-                "code": code_analysis,
-                "documentation": doc_analysis,
-                "api": api_analysis,
-                "issues": issues,
-                "pull_requests": pull_requests
-            }
+    async def stream_repository(self, repo_url: str) -> AsyncIterator[str]:
+        """
+        Analyze a repository and stream its description as the model writes it.
 
-            return await self.insight_generator.generate_insights(combined_analysis)
+        Args:
+            repo_url (str): URL of the repository.
 
-        except GitHubAPIError as e:
-            logger.error(f"GitHub API error: {str(e)}")
-            return f"GitHub API error: {str(e)}"
+        Yields:
+            str: Consecutive pieces of the description, or a single error message.
+        """
+        logger.info(f"Starting analysis for repository: {repo_url}")
+        try:
+            combined_analysis, error = await self.collect_analysis(repo_url)
+            if error:
+                yield error
+                return
+            async for piece in self.insight_generator.stream_insights(combined_analysis):
+                yield piece
         except InsightGenerationError as e:
             logger.error(f"Error generating insights: {str(e)}")
-            return f"Error generating insights: {str(e)}"
+            yield f"Error generating insights: {str(e)}"
         except Exception as e:
             logger.error(f"An unexpected error occurred: {str(e)}")
-            return f"An unexpected error occurred: {str(e)}"
+            yield f"An unexpected error occurred: {str(e)}"
+
+    async def collect_analysis(self, repo_url: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Run every analysis of a repository.
+
+        Args:
+            repo_url (str): URL of the repository.
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[str]]: The combined analysis, or None and
+                an error message if the repository could not be read.
+        """
+        with self.metrics.stage('open'):
+            repo = await asyncio.to_thread(self.open_repository, repo_url)
+        if not repo:
+            logger.error("Failed to access repository.")
+            return None, "Failed to access repository."
+        self.opened[repo_url] = repo.full_name
+        try:
+            return await self.analyze_opened(repo)
+        finally:
+            if isinstance(repo, LocalRepository):
+                repo.close()
+
+    def open_repository(self, repo_url: str) -> Any:
+        """
+        Open a repository on GitHub, or on the local disk for paths and file:// URLs.
+        """
+        if is_local_source(repo_url):
+            return self.local_api.get_repository(repo_url)
+        if self.github_api is None:
+            raise ValueError("A GitHub token is required to analyze GitHub repositories.")
+        return self.github_api.get_repository(repo_url)
+
+    def repository_api(self, repo: Any) -> Any:
+        """
+        The API serving a repository: LocalRepoAPI for local repositories, GitHubAPI otherwise.
+        """
+        return self.local_api if isinstance(repo, LocalRepository) else self.github_api
+
+    async def analyze_opened(self, repo: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Run every analysis of an opened repository; see collect_analysis.
+        """
+        # Issues and pull requests are listed while the files are fetched and analyzed.
+        if isinstance(repo, LocalRepository):
+            # Local repositories have none to list.
+            activity = asyncio.ensure_future(asyncio.sleep(0, result=(ActivitySummary().summary(),) * 2))
+        else:
+            activity = asyncio.ensure_future(asyncio.gather(
+                self.analyze_activity(repo.full_name, "issues"),
+                self.analyze_activity(repo.full_name, "pulls"),
+            ))
+        try:
+            tree, file_results = await self.analyze_repository_files(repo)
+            if not tree:
+                logger.error("Failed to retrieve repository structure.")
+                return None, "Failed to retrieve repository structure."
+            structure = {path: entry.type for path, entry in tree.items()}
+
+            with self.metrics.stage('structure'):
+                analysis_result = self.analyze_structure(structure, tree)
+            with self.metrics.stage('code_summary'):
+                code_analysis = self.summarize_code(repo.full_name, file_results['code_analysis'])
+            doc_analysis = {'doc_analysis': file_results['doc_analysis']}
+            with self.metrics.stage('api'):
+                api_analysis = await self.analyze_api(repo, structure)
+            # Only the part of the activity listing that outlasted the file analysis.
+            with self.metrics.stage('activity_wait'):
+                issues, pull_requests = await activity
+        finally:
+            activity.cancel()
+
+        combined_analysis = {
+            "repository": repo.full_name,
+            "structure": analysis_result['structure'],
+            "tree": analysis_result['tree'],
+            "code": code_analysis,
+            "documentation": doc_analysis['doc_analysis'],
+            "api": api_analysis['api_analysis'],
+            "issues": issues,
+            "pull_requests": pull_requests
+        }
+        if repo.full_name in self.file_plans:
+            combined_analysis["fetch_plan"] = self.file_plans[repo.full_name].summary()
+        if self.summarization == "map_reduce":
+            combined_analysis["files"] = self.file_facts(repo.full_name, file_results)
+        return combined_analysis, None
+
+    def release(self, full_name: str):
+        """
+        Drop the in-memory symbol index, import graph and fetch plan of a repository.
+
+        Long-running processes analyzing many repositories call this once a repository
+        is done; a later run rebuilds them from the analysis cache and run state.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+        """
+        symbol_index = self.symbol_indexes.pop(full_name, None)
+        if symbol_index is not None:
+            symbol_index.close()
+            if symbol_index is self.symbol_index:
+                self.symbol_index = None
+        self.import_graphs.pop(full_name, None)
+        self.file_plans.pop(full_name, None)
+
+    def release_url(self, repo_url: str):
+        """
+        Release the repository a URL was opened as, if it was; see release.
 
-    def analyze_structure(self, structure: Dict[str, Any]) -> Dict[str, Any]:
+        Unlike the full name, the URL is known whether the analysis finished, failed or
+        was cancelled before reporting it.
+
+        Args:
+            repo_url (str): URL or path the repository was analyzed by.
+        """
+        full_name = self.opened.pop(repo_url, None)
+        if full_name is not None:
+            self.release(full_name)
+
+    def collect_metrics(self) -> Metrics:
+        """
+        Bring the gauges read from the rate-limit scheduler and the caches up to date.
+
+        Called before exporting the metrics, and before close(), which closes the caches.
+
+        Returns:
+            Metrics: The run's metrics.
+        """
+        if self.async_client:
+            scheduler = self.async_client.scheduler.stats()
+            self.metrics.gauge('rate_limit_wait_seconds', scheduler['wait_seconds'])
+            self.metrics.gauge('rate_limit_retries', scheduler['retries'])
+        for name, cache in (('http', self.http_cache), ('analysis', self.analysis_cache),
+                            ('responses', self.response_cache)):
+            if not cache:
+                continue
+            stats = cache.stats()
+            lookups = stats['hits'] + stats['misses']
+            self.metrics.gauge('cache_hits', stats['hits'], cache=name)
+            self.metrics.gauge('cache_misses', stats['misses'], cache=name)
+            self.metrics.gauge('cache_hit_ratio', stats['hits'] / lookups if lookups else 0.0, cache=name)
+        return self.metrics
+
+    async def close(self):
+        if self.async_client:
+            await self.async_client.close()
+        if self.process_pool:
+            self.process_pool.close()
+        if self.http_cache:
+            self.http_cache.close()
+        if self.analysis_cache:
+            self.analysis_cache.close()
+        await self.insight_generator.close()
+        if self.response_cache:
+            self.response_cache.close()
+
+    def analyze_structure(self, structure: Dict[str, Any],
+                          entries: Optional[Dict[str, TreeEntry]] = None) -> Dict[str, Any]:
         logger.debug("Analyzing repository structure.")
-        return {'structure': structure}
-
-    async def analyze_code_files(self, repo: Any, structure: Dict[str, Any]) -> Dict[str, Any]:
-        code_analysis = {}
-        logger.debug("Analyzing code files.")
-        tasks = []
-        for file_path, file_type in structure.items():
-            if file_type == "file" and is_code_file(file_path):
-                tasks.append(self.analyze_single_file(repo, file_path))
-        results = await asyncio.gather(*tasks)
-        for file_path, analysis in results:
-            if analysis:
-                code_analysis[file_path] = analysis
-                logger.debug(f"Analysis for {file_path}: {analysis}")
-        return {'code_analysis': code_analysis}
-
-    async def analyze_single_file(self, repo: Any, file_path: str):
-        content = await self.github_api.get_file_content(repo, file_path)
-        if content:
-            analysis = self.code_analyzer.analyze_python_file(content)
-            return file_path, analysis
-        return file_path, None
-
-    async def analyze_documentation(self, repo: Any, structure: Dict[str, Any]) -> Dict[str, Any]:
-        doc_analysis = {}
-        logger.debug("Analyzing documentation files.")
-        tasks = []
-        for file_path, file_type in structure.items():
-            if file_type == "file" and is_text_file(file_path):
-                tasks.append(self.analyze_single_doc(repo, file_path))
-        results = await asyncio.gather(*tasks)
-        for file_path, info in results:
-            if info:
-                doc_analysis[file_path] = info
-                logger.debug(f"Documentation extracted from {file_path}")
-        return {'doc_analysis': doc_analysis}
-
-    async def analyze_single_doc(self, repo: Any, file_path: str):
-        content = await self.github_api.get_file_content(repo, file_path)
-        if content:
-            info = self.doc_extractor.extract_info(content)
-            return file_path, info
-        return file_path, None
+        repo_tree = RepoTree.build(entries if entries is not None else structure)
+        logger.info(f"Repository tree: {RepoTree.describe(repo_tree.root)}.")
+        return {'structure': structure, 'tree': repo_tree}
+
+    async def analyze_repository_files(
+        self, repo: Any
+    ) -> Tuple[Optional[Dict[str, TreeEntry]], Optional[Dict[str, Dict[str, Any]]]]:
+        api = self.repository_api(repo)
+        with self.metrics.stage('tree'):
+            head = await asyncio.to_thread(api.get_default_commit_sha, repo)
+        if not head:
+            return None, None
+        previous = self.load_run_state(repo.full_name) if self.run_state else None
+        if previous:
+            tree, file_results = await self.analyze_incremental(repo, previous, head)
+        else:
+            with self.metrics.stage('tree'):
+                tree = await asyncio.to_thread(api.get_repository_tree, repo, head)
+            if tree:
+                plan = await self.plan_files(repo, tree, head)
+                if self.ingest_mode == "archive":
+                    file_results = await self.analyze_archive(repo, head, plan.selected)
+                else:
+                    file_results = await self.analyze_files(repo, plan.selected, head)
+        if not tree:
+            return None, None
+        selected = self.file_plans[repo.full_name].selected
+
+        with self.metrics.stage('index'):
+            previous = self.symbol_indexes.get(repo.full_name)
+            self.symbol_index = self.build_symbol_index(repo.full_name, file_results.get('symbols', {}))
+            self.symbol_indexes[repo.full_name] = self.symbol_index
+            if previous is not None and previous is not self.symbol_index:
+                # A mapped index holds its file open until closed.
+                previous.close()
+            # Files without symbols, such as empty __init__.py files, are still modules of the graph;
+            # vendored and generated ones the plan skipped are not.
+            symbols = file_results.get('symbols', {})
+            self.import_graphs.setdefault(repo.full_name, ImportGraph()).update({
+                path: symbols.get(path) for path in selected if path.endswith('.py')
+            })
+        if self.run_state:
+            self.run_state.save(repo.full_name, RunState(head, tree, file_results, self.analyzer_versions()))
+        if self.analysis_cache:
+            logger.info(f"Analysis cache: {self.analysis_cache.hits} hits, {self.analysis_cache.misses} misses.")
+        return tree, file_results
+
+    def build_symbol_index(self, full_name: str, file_symbols: Dict[str, Optional[str]]) -> SymbolIndex:
+        """
+        Build the symbol index of a repository, or map the saved one if its symbols are unchanged.
+
+        The saved index is accompanied by a '.key' file holding the digest of the symbols it was
+        built from, so results served from the analysis cache or the run state reuse it as is.
+
+        Args:
+            full_name (str): The repository's full name.
+            file_symbols (Dict[str, Optional[str]]): Encoded symbols keyed by file path.
+
+        Returns:
+            SymbolIndex: The index.
+        """
+        if not self.symbol_index_directory:
+            symbol_index = SymbolIndex.build(file_symbols)
+        else:
+            path = os.path.join(self.symbol_index_directory, full_name.replace('/', '__') + '.idx')
+            key_path = path + '.key'
+            digest = digest_symbols(file_symbols)
+            symbol_index = self.load_symbol_index(path, key_path, digest)
+            if symbol_index is None:
+                symbol_index = SymbolIndex.build(file_symbols)
+                os.makedirs(self.symbol_index_directory, exist_ok=True)
+                # Drop the key first, so an interrupted save never pairs a new index with an old key.
+                if os.path.exists(key_path):
+                    os.remove(key_path)
+                symbol_index.save(path)
+                with open(key_path, 'w') as key_file:
+                    key_file.write(digest)
+            else:
+                logger.debug(f"Reusing the saved symbol index of {full_name}.")
+        logger.info(f"Symbol index: {len(symbol_index)} symbols in {len(symbol_index.files)} files.")
+        return symbol_index
+
+    @staticmethod
+    def load_symbol_index(path: str, key_path: str, digest: str) -> Optional[SymbolIndex]:
+        try:
+            with open(key_path) as key_file:
+                if key_file.read().strip() != digest:
+                    return None
+        except OSError:
+            return None
+        return SymbolIndex.load(path)
+
+    def summarize_code(self, full_name: str, code_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Summarize the code analysis, detailing only the most central modules.
+
+        Modules are ranked by PageRank over the import graph. The top detailed_modules
+        are reported with their statistics, definitions and in-repository imports; the
+        rest contribute to the totals only.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            code_results (Dict[str, Any]): Per-file code analysis results.
+
+        Returns:
+            Dict[str, Any]: Totals, symbol counts and the detailed modules, most central first.
+        """
+        graph = self.import_graphs.get(full_name) or ImportGraph()
+        symbol_index = self.symbol_indexes.get(full_name) or SymbolIndex.build({})
+        totals = Counter()
+        for stats in code_results.values():
+            totals.update(stats or {})
+        modules = []
+        for path, score in graph.ranking(self.detailed_modules):
+            definitions = [symbol.name for symbol in symbol_index.file_symbols(path) if symbol.kind != 'import']
+            modules.append({
+                'path': path,
+                'pagerank': round(score, 4),
+                'stats': code_results.get(path),
+                'definitions': definitions,
+                'imports': graph.imports_of(path),
+            })
+        return {
+            'totals': dict(totals),
+            'symbols': symbol_index.summary(),
+            'modules': len(graph),
+            'key_modules': modules,
+        }
+
+    def file_facts(self, full_name: str, file_results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect what is known about each analyzed file, for directory summaries.
+
+        Args:
+            full_name (str): Repository full name, e.g. 'owner/repo'.
+            file_results (Dict[str, Dict[str, Any]]): Per-analyzer results keyed by file path.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 'code' statistics, 'definitions', 'pagerank' and
+                extracted 'doc' info keyed by file path, for files with any of them.
+        """
+        graph = self.import_graphs.get(full_name) or ImportGraph()
+        symbol_index = self.symbol_indexes.get(full_name) or SymbolIndex.build({})
+        pagerank = dict(graph.ranking())
+        code_results = file_results.get('code_analysis', {})
+        doc_results = file_results.get('doc_analysis', {})
+        facts = {}
+        for path in sorted(set(code_results) | set(doc_results) | set(pagerank)):
+            definitions = [symbol.name for symbol in symbol_index.file_symbols(path) if symbol.kind != 'import']
+            facts[path] = {
+                'code': code_results.get(path),
+                'definitions': definitions,
+                'pagerank': round(pagerank.get(path, 0), 6),
+                'doc': doc_results.get(path),
+            }
+        return facts
+
+    def load_run_state(self, full_name: str) -> Optional[RunState]:
+        state = self.run_state.load(full_name)
+        if not state:
+            return None
+        if state.analyzer_versions != self.analyzer_versions():
+            logger.info("Analyzers or fetch plan settings changed since the last run, re-analyzing the full tree.")
+            return None
+        return state
+
+    def analyzer_versions(self) -> Dict[str, str]:
+        versions = {analyzer.name: analyzer.version for analyzer in self.analyzers.analyzers}
+        # Results kept from a run with other planner settings may cover the wrong files.
+        versions['file_plan'] = self.file_planner.version
+        return versions
+
+    async def analyze_incremental(self, repo: Any, state: RunState,
+                                  head: str) -> Tuple[Optional[Dict[str, TreeEntry]], Dict[str, Dict[str, Any]]]:
+        tree, results = state.tree, state.results
+        if state.commit_sha == head:
+            logger.info("No new commits since the last run.")
+            await self.plan_files(repo, tree, head)
+            return tree, results
+
+        api = self.repository_api(repo)
+        with self.metrics.stage('tree'):
+            changes = await asyncio.to_thread(api.compare_commits, repo, state.commit_sha, head)
+            entries = None
+            if changes is not None:
+                # Compare reports no sizes; the planner and the tree aggregates need them.
+                paths = sorted(change.path for change in changes if change.status != 'removed')
+                entries = await asyncio.to_thread(api.get_tree_entries, repo, head, paths)
+                if entries is not None and len(entries) < len(paths):
+                    entries = None
+            if entries is not None:
+                changed, removed = apply_file_changes(tree, changes)
+                tree.update(entries)
+            else:
+                tree = await asyncio.to_thread(api.get_repository_tree, repo, head)
+                changed, removed = diff_trees(state.tree, tree)
+        logger.info(f"Incremental run since {state.commit_sha[:7]}: "
+                    f"{len(changed)} added or modified, {len(removed)} removed files.")
+
+        plan = await self.plan_files(repo, tree, head)
+        if any(posixpath.basename(path) == '.gitattributes' for path in changed | removed):
+            # Attributes may have brought unchanged files into the plan.
+            changed |= set(plan.selected)
+        drop_results(results, changed | removed | set(plan.skipped))
+        changed_entries = {path: entry for path, entry in plan.selected.items() if path in changed}
+        for name, analyzer_results in (await self.analyze_files(repo, changed_entries, head)).items():
+            results[name].update(analyzer_results)
+        return tree, results
+
+    async def plan_files(self, repo: Any, tree: Dict[str, TreeEntry], ref: Optional[str] = None) -> FilePlan:
+        """
+        Decide which files of a tree to fetch, from the tree and its .gitattributes files.
+
+        The .gitattributes files are the only content fetched. The plan is kept in
+        file_plans and reported under 'fetch_plan' in the combined analysis.
+
+        Args:
+            repo (Any): The repository.
+            tree (Dict[str, TreeEntry]): Entries keyed by path.
+            ref (Optional[str]): Commit SHA the entries belong to. Defaults to the default branch.
+
+        Returns:
+            FilePlan: The files to fetch, and those skipped.
+        """
+        with self.metrics.stage('plan'):
+            paths = self.file_planner.attribute_files(tree)
+            contents = await asyncio.gather(*(self.fetch_text(repo, path, ref) for path in paths))
+            attributes = {path: content for path, content in zip(paths, contents) if content}
+            plan = self.file_planner.plan(tree, attributes, claims=self.analyzers.claims)
+        self.file_plans[repo.full_name] = plan
+        self.metrics.incr('fetch_plan_files_skipped', len(plan.skipped))
+        self.metrics.incr('fetch_plan_bytes_avoided', plan.bytes_avoided)
+        self.metrics.incr('fetch_plan_requests_avoided', plan.requests_avoided)
+        return plan
+
+    async def fetch_text(self, repo: Any, file_path: str, ref: Optional[str] = None) -> Optional[str]:
+        if isinstance(repo, LocalRepository):
+            return await asyncio.to_thread(self.local_api.get_file_content, repo, file_path, ref)
+        return await self.async_client.get_file_content(repo.full_name, file_path, ref)
+
+    def make_pipeline(self) -> AnalysisPipeline:
+        # Enough analyses in flight to fill the process pool's chunks. Inline analysis runs one at a time:
+        # parsing holds the GIL, so more threads would only take it from the fetches more often.
+        analyze_concurrency = self.process_pool.workers * self.process_pool.chunk_size if self.process_pool else 1
+        return AnalysisPipeline(fetch_concurrency=self.fetch_concurrency, analyze_concurrency=analyze_concurrency,
+                                queue_size=self.pipeline_queue_size, max_bytes=self.pipeline_max_bytes)
+
+    async def analyze_files(self, repo: Any, tree: Dict[str, TreeEntry],
+                            ref: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch and analyze the files of a tree that any analyzer claims.
+
+        Files whose results are all in the analysis cache are not fetched. The rest go
+        through an AnalysisPipeline, so fetching overlaps with analysis and the content
+        held in memory stays bounded.
+
+        Args:
+            repo (Any): The repository.
+            tree (Dict[str, TreeEntry]): Entries keyed by path.
+            ref (Optional[str]): Commit SHA the entries belong to. Defaults to the default branch.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per-file results keyed by analyzer name.
+        """
+        with self.metrics.stage('fetch_analyze'):
+            if self.ingest_mode == "graphql" and not isinstance(repo, LocalRepository):
+                return await self.analyze_files_batched(repo, tree, ref)
+            logger.debug("Analyzing repository files.")
+            results = {name: {} for name in self.analyzers.names}
+            to_fetch = self.plan_fetches(results, tree)
+
+            async def fetch(path: str) -> Optional[str]:
+                return await self.fetch_text(repo, path, ref)
+
+            pipeline = self.make_pipeline()
+            async for file_path, analyzed in pipeline.run(to_fetch, fetch, self.analyze_fetched(to_fetch)):
+                self.collect_fetched(results, to_fetch, file_path, analyzed)
+            logger.debug(f"Analysis pipeline: {pipeline.stats()}")
+            self.metrics.gauge('pipeline_peak_bytes', pipeline.peak_bytes)
+            return results
+
+    async def analyze_files_batched(self, repo: Any, tree: Dict[str, TreeEntry],
+                                    ref: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        logger.debug("Analyzing repository files fetched through batched GraphQL blob queries.")
+        results = {name: {} for name in self.analyzers.names}
+        to_fetch = self.plan_fetches(results, tree)
+
+        # Analysis of a batch overlaps with fetching the next ones.
+        entries = [entry for entry, _, _ in to_fetch.values()]
+        source = self.blob_fetcher.iter_blob_contents(repo.full_name, entries, ref)
+        pipeline = self.make_pipeline()
+        async for file_path, analyzed in pipeline.run_stream(source, self.analyze_fetched(to_fetch)):
+            self.collect_fetched(results, to_fetch, file_path, analyzed)
+        logger.debug(f"Analysis pipeline: {pipeline.stats()}")
+        self.metrics.gauge('pipeline_peak_bytes', pipeline.peak_bytes)
+        return results
+
+    def plan_fetches(self, results: Dict[str, Dict[str, Any]],
+                     tree: Dict[str, TreeEntry]) -> Dict[str, Tuple[TreeEntry, Dict[str, Any], List[RegisteredAnalyzer]]]:
+        """
+        Collect cached results for the claimed files of a tree, and list those still to fetch.
+
+        Returns:
+            Dict[str, Tuple]: (entry, cached results, pending analyzers) keyed by the path of
+                each file that needs fetching.
+        """
+        to_fetch = {}
+        for entry in tree.values():
+            if entry.type != "file" or not self.analyzers.claims(entry.path):
+                continue
+            file_results, pending = self.lookup_cached_results(entry.path, entry.sha)
+            if pending:
+                to_fetch[entry.path] = (entry, file_results, pending)
+            else:
+                self.collect_results(results, entry.path, file_results)
+        return to_fetch
+
+    def analyze_fetched(self, to_fetch: Dict[str, Tuple[TreeEntry, Dict[str, Any], List[RegisteredAnalyzer]]]):
+        async def analyze(file_path: str, content: str) -> Dict[str, Any]:
+            entry, _, pending = to_fetch[file_path]
+            if not self.process_pool:
+                # Parsing on the event loop would stall the fetches between each await.
+                return await asyncio.to_thread(self.run_analyzers, file_path, entry.sha, content, pending)
+            return await self.run_analyzers_async(file_path, entry.sha, content, pending)
+        return analyze
+
+    def collect_fetched(self, results: Dict[str, Dict[str, Any]],
+                        to_fetch: Dict[str, Tuple[TreeEntry, Dict[str, Any], List[RegisteredAnalyzer]]],
+                        file_path: str, analyzed: Optional[Dict[str, Any]]):
+        _, file_results, _ = to_fetch[file_path]
+        if analyzed:
+            file_results.update(analyzed)
+        self.collect_results(results, file_path, file_results)
+
+    def lookup_cached_results(self, file_path: str, blob_sha: str) -> Tuple[Dict[str, Any], List[RegisteredAnalyzer]]:
+        analyzers = self.analyzers.analyzers_for(file_path)
+        file_results = self.analysis_cache.lookup(blob_sha, analyzers) if self.analysis_cache else {}
+        pending = [analyzer for analyzer in analyzers
+                   if any(name not in file_results for name in analyzer.result_names)]
+        return file_results, pending
+
+    def run_analyzers(self, file_path: str, blob_sha: str, content: str,
+                      analyzers: List[RegisteredAnalyzer]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        file_results = self.analyzers.dispatch(file_path, content, analyzers)
+        self.record_file_time(file_path, time.perf_counter() - start)
+        if self.analysis_cache:
+            self.analysis_cache.store_results(blob_sha, analyzers, file_results)
+        return file_results
+
+    async def run_analyzers_async(self, file_path: str, blob_sha: str, content: str,
+                                  analyzers: List[RegisteredAnalyzer]) -> Dict[str, Any]:
+        # Includes the wait for a free worker, so a saturated pool inflates every file's time.
+        start = time.perf_counter()
+        file_results = await self.analyzers.dispatch_async(file_path, content, analyzers, self.process_pool)
+        self.record_file_time(file_path, time.perf_counter() - start)
+        if self.analysis_cache:
+            self.analysis_cache.store_results(blob_sha, analyzers, file_results)
+        return file_results
+
+    def record_file_time(self, file_path: str, seconds: float):
+        self.metrics.observe_file(file_path, seconds)
+        self.metrics.incr('files_analyzed')
+
+    async def analyze_archive(self, repo: Any, ref: Optional[str] = None,
+                              paths: Optional[Collection[str]] = None) -> Dict[str, Dict[str, Any]]:
+        logger.debug("Analyzing repository files from the repository archive.")
+        with self.metrics.stage('fetch_analyze'):
+            if self.process_pool:
+                return await self.analyze_archive_pooled(repo, ref, paths)
+            return await asyncio.to_thread(self.analyze_archive_members, repo, ref, paths)
+
+    async def analyze_archive_pooled(self, repo: Any, ref: Optional[str] = None,
+                                     paths: Optional[Collection[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze the files of the archive stream in the process pool while the stream is still read.
+
+        The archive is read member by member in a thread and fed through an AnalysisPipeline,
+        like the blobs of analyze_files_batched.
+        """
+        predicate = self.analyzers.claims if paths is None else paths.__contains__
+        results = {name: {} for name in self.analyzers.names}
+        members = self.repository_api(repo).iter_archive_files(repo, ref, predicate=predicate)
+        to_fetch: Dict[str, Tuple[TreeEntry, Dict[str, Any], List[RegisteredAnalyzer]]] = {}
+
+        async def source() -> AsyncIterator[Tuple[str, str]]:
+            while True:
+                member = await asyncio.to_thread(next, members, None)
+                if member is None:
+                    return
+                file_path, data = member
+                try:
+                    content = data.decode('utf-8')
+                except UnicodeDecodeError:
+                    logger.debug(f"Skipping non UTF-8 file {file_path}")
+                    continue
+                if not content:
+                    continue
+                blob_sha = git_blob_sha(data)
+                file_results, pending = self.lookup_cached_results(file_path, blob_sha)
+                if not pending:
+                    self.collect_results(results, file_path, file_results)
+                    continue
+                to_fetch[file_path] = (TreeEntry(file_path, 'file', blob_sha, len(data), '100644'),
+                                       file_results, pending)
+                yield file_path, content
+
+        pipeline = self.make_pipeline()
+        async for file_path, analyzed in pipeline.run_stream(source(), self.analyze_fetched(to_fetch)):
+            self.collect_fetched(results, to_fetch, file_path, analyzed)
+        logger.debug(f"Analysis pipeline: {pipeline.stats()}")
+        self.metrics.gauge('pipeline_peak_bytes', pipeline.peak_bytes)
+        return results
+
+    def analyze_archive_members(self, repo: Any, ref: Optional[str] = None,
+                                paths: Optional[Collection[str]] = None) -> Dict[str, Dict[str, Any]]:
+        # The archive holds every file; those outside the fetch plan are skipped unread.
+        predicate = self.analyzers.claims if paths is None else paths.__contains__
+        results = {name: {} for name in self.analyzers.names}
+        for file_path, data in self.repository_api(repo).iter_archive_files(repo, ref, predicate=predicate):
+            try:
+                content = data.decode('utf-8')
+            except UnicodeDecodeError:
+                logger.debug(f"Skipping non UTF-8 file {file_path}")
+                continue
+            if not content:
+                continue
+            blob_sha = git_blob_sha(data)
+            file_results, pending = self.lookup_cached_results(file_path, blob_sha)
+            if pending:
+                file_results.update(self.run_analyzers(file_path, blob_sha, content, pending))
+            self.collect_results(results, file_path, file_results)
+        return results
+
+    @staticmethod
+    def collect_results(results: Dict[str, Dict[str, Any]], file_path: str, file_results: Dict[str, Any]):
+        for name, result in file_results.items():
+            if result:
+                results[name][file_path] = result
+                logger.debug(f"{name} for {file_path}: {result}")
+
+    async def analyze_activity(self, full_name: str, kind: str) -> Dict[str, Any]:
+        logger.debug(f"Analyzing {kind}.")
+        stream = self.async_client.iter_issues if kind == "issues" else self.async_client.iter_pull_requests
+        summary = ActivitySummary()
+        if not self.run_state:
+            async for item in stream(full_name):
+                summary.add(item)
+            return summary.summary()
+
+        # Incremental runs only list what changed since the last sync and merge it by number.
+        cursor, items = self.run_state.load_activity(full_name, kind)
+        async for item in stream(full_name, since=cursor):
+            items[str(item['number'])] = item
+        for item in items.values():
+            summary.add(item)
+        self.run_state.save_activity(full_name, kind, summary.cursor, items)
+        return summary.summary()
 
     async def analyze_api(self, repo: Any, structure: Dict[str, Any]) -> Dict[str, Any]:
         logger.debug("Analyzing API endpoints.")
@@ -113,27 +761,106 @@ class RepoInsight:
         # Implement API analysis logic here
         return {'api_analysis': api_analysis}
 
-async def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate descriptions of GitHub repositories.")
+    parser.add_argument("repo_url", nargs="?",
+                        help="GitHub repository URL or local path to analyze; prompted for when omitted")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="analyze the repository URLs listed in FILE, one per line, instead of prompting for one")
+    parser.add_argument("--output", metavar="FILE", default="results.jsonl",
+                        help="where batch results are appended as JSON lines (default: results.jsonl)")
+    parser.add_argument("--concurrency", type=int, help="repositories analyzed at once (default: batch.concurrency)")
+    parser.add_argument("--timeout", type=float, help="seconds per repository (default: batch.timeout)")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip repositories already analyzed successfully in the output file")
+    parser.add_argument("--ingest", choices=INGEST_MODES,
+                        help="how file contents are fetched (default: analysis.ingest_mode)")
+    parser.add_argument("--incremental", action="store_true", default=None,
+                        help="re-analyze only files changed since the last run (default: analysis.incremental)")
+    parser.add_argument("--metrics", metavar="FILE", help="write a JSON report of timings and counters to FILE")
+    parser.add_argument("--prometheus", metavar="FILE",
+                        help="write the same metrics to FILE in the Prometheus text format")
+    parser.add_argument("--profile", choices=Profiler.MODES,
+                        help="profile the CPU-bound stages with cProfile or a low-overhead stack sampler")
+    parser.add_argument("--profile-dir", metavar="DIR", default="profiles",
+                        help="where the profile is written (default: profiles)")
+    args = parser.parse_args(argv)
+    if args.batch and args.repo_url:
+        parser.error("pass either a repository or --batch, not both")
+    return args
+
+def export_metrics(repo_insight: RepoInsight, args: argparse.Namespace):
+    metrics = repo_insight.collect_metrics()
+    if args.metrics:
+        metrics.write_json(args.metrics)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    if metrics.profiler:
+        path = metrics.profiler.write()
+        if path:
+            logger.info(f"Profile written to {path}")
+
+async def run_batch(repo_insight: RepoInsight, config: ConfigManager, args: argparse.Namespace,
+                    repo_urls: List[str]):
+    if args.resume:
+        done = completed_urls(args.output)
+        repo_urls = [repo_url for repo_url in repo_urls if repo_url not in done]
+    logger.info(f"Analyzing {len(repo_urls)} repositories from {args.batch}.")
+    runner = BatchRunner(repo_insight,
+                         concurrency=args.concurrency or config.batch_concurrency,
+                         timeout=args.timeout or config.batch_timeout)
+    with open(args.output, 'a', encoding='utf-8') as out:
+        counts = await runner.run(repo_urls, out)
+    print(f"{counts['ok']} analyzed, {counts['error']} failed, {counts['timeout']} timed out; "
+          f"results in {args.output}")
+
+async def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.batch:
+        repo_urls = read_repo_urls(args.batch)
+    else:
+        repo_url = (args.repo_url or input("Enter the GitHub repository URL or local path: ")).strip()
+        if not repo_url:
+            logger.error("No repository URL provided.")
+            print("Repository URL cannot be empty.")
+            return
+        if not (repo_url.startswith(GITHUB_URL_PREFIX) or is_local_source(repo_url)):
+            logger.error("Invalid repository URL provided.")
+            print("Please enter a valid GitHub repository URL.")
+            return
+        repo_urls = [repo_url]
+
     config = ConfigManager()
-    if not config.is_valid():
+    # Local checkouts and bare repositories are read without a GitHub token.
+    if not config.is_valid(require_github=not all(is_local_source(url) for url in repo_urls)):
         logger.error("Invalid configuration. Please check your environment variables.")
         return
 
-    repo_insight = RepoInsight(config)
-
-    repo_url = input("Enter the GitHub repository URL: ").strip()
-    if not repo_url:
-        logger.error("No repository URL provided.")
-        print("Repository URL cannot be empty.")
+    profiler = Profiler(args.profile, args.profile_dir) if args.profile else None
+    try:
+        repo_insight = RepoInsight(config, ingest_mode=args.ingest or config.ingest_mode,
+                                   incremental=args.incremental or config.incremental,
+                                   metrics=Metrics(profiler=profiler))
+    except ValueError as e:
+        logger.error(f"Invalid configuration: {e}")
+        print(str(e))
         return
-
-    if not repo_url.startswith("https://github.com/"):
-        logger.error("Invalid repository URL provided.")
-        print("Please enter a valid GitHub repository URL.")
+    if args.batch:
+        try:
+            await run_batch(repo_insight, config, args, repo_urls)
+        finally:
+            export_metrics(repo_insight, args)
+            await repo_insight.close()
         return
 
-    result = await repo_insight.analyze_repository(repo_url)
-    print(result)
+    try:
+        # Print the description as it is written; Ctrl+C cancels the request.
+        async for piece in repo_insight.stream_repository(repo_url):
+            print(piece, end="", flush=True)
+        print()
+    finally:
+        export_metrics(repo_insight, args)
+        await repo_insight.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
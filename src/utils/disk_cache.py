@@ -0,0 +1,161 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    A persistent key-value store backed by SQLite.
+
+    Entries are evicted least-recently-used first once their total size exceeds
+    max_bytes, and expire ttl seconds after they were stored. Hits and misses are
+    counted for reporting. The cache is safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Initialize the DiskCache.
+
+        Args:
+            path (str): Path of the SQLite database file; parent directories are created.
+            max_bytes (Optional[int]): Upper bound on the total size of stored values. None means unbounded.
+            ttl (Optional[float]): Lifetime of an entry in seconds. None means entries never expire.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[bytes]: The stored value, or None on a miss. Expired entries are misses and are removed.
+        """
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute("SELECT value, size, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and row[2] <= now - self.ttl:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.total_bytes -= row[1]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes):
+        """
+        Store a value, evicting least recently used entries if the size cap is exceeded.
+
+        Args:
+            key (str): The cache key.
+            value (bytes): The value to store.
+        """
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self.total_bytes += len(value) - (row[0] if row else 0)
+            if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        """
+        Remove an entry if present.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock:
+            row = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.total_bytes -= row[0]
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            removed, size = self.connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE created_at <= ?", (cutoff,)
+            ).fetchone()
+            self.connection.execute("DELETE FROM entries WHERE created_at <= ?", (cutoff,))
+            self.total_bytes -= size
+        return removed
+
+    def _evict(self):
+        """
+        Drop least recently used entries until the total size fits max_bytes. Caller holds the lock.
+        """
+        evicted = 0
+        while self.total_bytes > self.max_bytes:
+            rows = self.connection.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.total_bytes -= size
+                evicted += 1
+                if self.total_bytes <= self.max_bytes:
+                    break
+        logger.debug(f"Evicted {evicted} entries from {self.path}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report cache usage.
+
+        Returns:
+            Dict[str, int]: Hit and miss counters, entry count and total stored bytes.
+        """
+        with self._lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': self.total_bytes}
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self._lock:
+            self.connection.close()
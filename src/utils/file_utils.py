@@ -1,5 +1,26 @@
 import os
-from typing import Callable
+import mmap
+import hashlib
+from typing import Callable, FrozenSet, Optional
+
+# Files at least this large are memory-mapped rather than read into a buffer.
+MMAP_THRESHOLD = 1024 * 1024
+
+# Language of a file, keyed by extension. Used as an extra classification next to 'code'/'text'.
+LANGUAGE_EXTENSIONS = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.java': 'java',
+    '.c': 'c',
+    '.h': 'c',
+    '.cpp': 'cpp',
+    '.cs': 'csharp',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.go': 'go',
+    '.md': 'markdown',
+}
 
 def get_file_extension(file_path: str) -> str:
     """
@@ -51,4 +72,86 @@ def get_file_size(file_path: str) -> int:
     """
     return os.path.getsize(file_path)
 
+def classify_file(file_path: str) -> FrozenSet[str]:
+    """
+    Classify a file by its extension.
+
+    A file can carry several classifications at once, e.g. a Python module is
+    'code', 'text' and 'python'. Analyzers register for classifications rather
+    than for extensions.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        FrozenSet[str]: The file's classifications; empty if nothing is known about it.
+    """
+    classifications = set()
+    if is_code_file(file_path):
+        classifications.add('code')
+    if is_text_file(file_path):
+        classifications.add('text')
+    language = LANGUAGE_EXTENSIONS.get(get_file_extension(file_path))
+    if language:
+        classifications.add(language)
+    return frozenset(classifications)
+
+def git_blob_sha(data: bytes) -> str:
+    """
+    Compute the SHA git assigns to a blob with the given content.
+
+    Args:
+        data (bytes): The file content.
+
+    Returns:
+        str: The hex SHA-1 of the blob, as reported by the Git Trees API.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def git_blob_sha_of_file(file_path: str, size: Optional[int] = None) -> str:
+    """
+    Compute the git blob SHA of a file on disk.
+
+    Large files are hashed straight from a memory map, without copying them into memory.
+
+    Args:
+        file_path (str): The path to the file.
+        size (Optional[int]): The file size, if already known from a stat call.
+
+    Returns:
+        str: The hex SHA-1 of the blob.
+    """
+    size = get_file_size(file_path) if size is None else size
+    digest = hashlib.sha1(b"blob %d\0" % size)
+    with open(file_path, 'rb') as file:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+def read_text_file(file_path: str, size: Optional[int] = None) -> Optional[str]:
+    """
+    Read a UTF-8 text file from disk.
+
+    Large files are decoded straight from a memory map, skipping the intermediate bytes copy.
+
+    Args:
+        file_path (str): The path to the file.
+        size (Optional[int]): The file size, if already known from a stat call.
+
+    Returns:
+        Optional[str]: The content, or None if the file is not valid UTF-8 or cannot be read.
+    """
+    try:
+        size = get_file_size(file_path) if size is None else size
+        with open(file_path, 'rb') as file:
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return str(mapped, 'utf-8')
+            return file.read().decode('utf-8')
+    except (OSError, ValueError):
+        return None
+
 # Additional utility functions can be added here as needed.
\ No newline at end of file
@@ -0,0 +1,348 @@
+import os
+import sys
+import json
+import time
+import heapq
+import pstats
+import cProfile
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every exported Prometheus metric.
+PROMETHEUS_PREFIX = "repoinsight"
+
+# Descriptions of the metrics RepoInsight records, for the Prometheus HELP lines.
+METRIC_HELP = {
+    'http_requests': "HTTP requests sent, by client, method and status code.",
+    'http_response_bytes': "Bytes of HTTP response bodies received, by client.",
+    'rate_limit_wait_seconds': "Seconds spent waiting on GitHub rate limits.",
+    'rate_limit_retries': "GitHub requests retried after being rate limited.",
+    'cache_hits': "Cache lookups answered from the cache, by cache.",
+    'cache_misses': "Cache lookups that missed, by cache.",
+    'cache_hit_ratio': "Share of cache lookups answered from the cache, by cache.",
+    'llm_requests': "Chat completion requests sent.",
+    'llm_tokens': "Chat completion tokens, by kind (prompt or completion) and source (reported by the API or estimated).",
+    'files_analyzed': "Files run through the analyzers.",
+    'fetch_plan_files_skipped': "Files the fetch plan left out.",
+    'fetch_plan_bytes_avoided': "Bytes of file content the fetch plan avoided fetching.",
+    'fetch_plan_requests_avoided': "Content requests the fetch plan avoided.",
+    'pipeline_peak_bytes': "Most fetched content held at once by an analysis pipeline.",
+}
+
+# Stages profiled when profiling is enabled: those that do the CPU-bound work of a run.
+PROFILED_STAGES = frozenset({'tree', 'plan', 'fetch_analyze', 'index', 'structure', 'code_summary'})
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as output_file:
+        output_file.write(text)
+    os.replace(temp_path, path)
+
+
+class Profiler:
+    """
+    Profiles the hot stages of a run, opt-in.
+
+    In 'cprofile' mode a deterministic cProfile.Profile is enabled while any profiled
+    stage runs; it sees the calling thread only, i.e. the event loop. In 'sample' mode a
+    background thread records the stacks of every thread, analyzer threads included,
+    every interval seconds, at a much lower overhead. Overlapping stages share one
+    profile.
+    """
+
+    MODES = ('cprofile', 'sample')
+
+    def __init__(self, mode: str, directory: str, interval: float = 0.005,
+                 stages: frozenset = PROFILED_STAGES):
+        """
+        Initialize the Profiler.
+
+        Args:
+            mode (str): 'cprofile' or 'sample'.
+            directory (str): Where write() puts the profile.
+            interval (float): Seconds between samples in 'sample' mode.
+            stages (frozenset): Names of the stages to profile.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {self.MODES}.")
+        self.mode = mode
+        self.directory = directory
+        self.interval = interval
+        self.stages = stages
+        self.samples: Counter = Counter()
+        self._profile = cProfile.Profile() if mode == 'cprofile' else None
+        self._active = 0
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        with self._lock:
+            self._active += 1
+            if self._active > 1:
+                return
+            if self._profile is not None:
+                self._profile.enable()
+            else:
+                self._stop.clear()
+                self._sampler = threading.Thread(target=self._sample, name="repoinsight-sampler", daemon=True)
+                self._sampler.start()
+
+    def stop(self):
+        with self._lock:
+            self._active -= 1
+            if self._active > 0:
+                return
+            if self._profile is not None:
+                self._profile.disable()
+                return
+            sampler, self._sampler = self._sampler, None
+            self._stop.set()
+        if sampler is not None:
+            sampler.join()
+
+    def _sample(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def write(self) -> Optional[str]:
+        """
+        Write the profile: 'profile.prof' for pstats / snakeviz in 'cprofile' mode, or
+        'profile.folded' collapsed stacks for flame graph tools in 'sample' mode.
+
+        Returns:
+            Optional[str]: Path of the file written, or None if nothing was profiled.
+        """
+        if self._profile is not None:
+            try:
+                stats = pstats.Stats(self._profile)
+            except TypeError:
+                # Raised for a profile that never ran.
+                return None
+            if not stats.total_calls:
+                return None
+            path = os.path.join(self.directory, 'profile.prof')
+            os.makedirs(self.directory, exist_ok=True)
+            stats.dump_stats(path)
+            return path
+        if not self.samples:
+            return None
+        path = os.path.join(self.directory, 'profile.folded')
+        _write_atomic(path, ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common()))
+        return path
+
+
+class Metrics:
+    """
+    Collects the measurements of a run: per-stage wall and CPU time, counters, gauges
+    and the slowest files to analyze, and exports them as a JSON report or in the
+    Prometheus text exposition format.
+
+    Every method is thread-safe. Stage timings are summed over calls, so concurrent
+    calls (e.g. repositories of a batch) can add up to more than the elapsed time, and
+    CPU time is that of the whole process while the stage ran.
+    """
+
+    def __init__(self, slow_files: int = 20, profiler: Optional[Profiler] = None):
+        """
+        Initialize the Metrics.
+
+        Args:
+            slow_files (int): Number of slowest files to analyze kept for the report.
+            profiler (Optional[Profiler]): Profiles the hot stages when given.
+        """
+        self.slow_files = slow_files
+        self.profiler = profiler
+        self.started = time.time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.file_seconds = 0.0
+        self.file_count = 0
+        self._slowest: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a stage of the run, profiling it too if it is one of the profiler's stages.
+
+        Args:
+            name (str): Name of the stage, e.g. 'fetch_analyze'.
+        """
+        profiler = self.profiler if self.profiler and name in self.profiler.stages else None
+        if profiler:
+            profiler.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            if profiler:
+                profiler.stop()
+            with self._lock:
+                timing = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+                timing['calls'] += 1
+                timing['wall_seconds'] += wall
+                timing['cpu_seconds'] += cpu
+
+    def incr(self, name: str, value: float = 1, **labels: Any):
+        """
+        Add to a counter.
+
+        Args:
+            name (str): Name of the counter, e.g. 'http_requests'.
+            value (float): Amount added.
+            **labels: Labels telling series of the counter apart, e.g. method='GET'.
+        """
+        key = (name, _labels(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float, **labels: Any):
+        """
+        Set a gauge to its current value.
+        """
+        with self._lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def observe_file(self, file_path: str, seconds: float):
+        """
+        Record how long the analyzers took on a file.
+
+        Args:
+            file_path (str): Path of the file.
+            seconds (float): Time spent in the analyzers.
+        """
+        with self._lock:
+            self.file_seconds += seconds
+            self.file_count += 1
+            if len(self._slowest) < self.slow_files:
+                heapq.heappush(self._slowest, (seconds, file_path))
+            elif self.slow_files and seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (seconds, file_path))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """
+        Read a counter: the series with exactly these labels, or the sum of every series without labels.
+        """
+        with self._lock:
+            if labels:
+                return self.counters.get((name, _labels(labels)), 0)
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the measurements.
+
+        Returns:
+            Dict[str, Any]: 'started' (Unix time), 'elapsed_seconds', 'stages' (calls, wall and
+                CPU seconds by stage), 'counters' and 'gauges' (lists of name, labels and value),
+                and 'files' (count, total seconds and the slowest files, slowest first).
+        """
+        def series(values: Dict[Tuple[str, Labels], float]) -> List[Dict[str, Any]]:
+            return [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(values.items())]
+
+        with self._lock:
+            return {
+                'started': self.started,
+                'elapsed_seconds': round(time.time() - self.started, 6),
+                'stages': {name: dict(timing) for name, timing in self.stages.items()},
+                'counters': series(self.counters),
+                'gauges': series(self.gauges),
+                'files': {
+                    'count': self.file_count,
+                    'seconds': self.file_seconds,
+                    'slowest': [{'path': path, 'seconds': seconds} for seconds, path in sorted(self._slowest, reverse=True)],
+                },
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the measurements in the Prometheus text exposition format, e.g. for the
+        node_exporter textfile collector.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[Labels, float]]):
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{PROMETHEUS_PREFIX}_{name}{_format_labels(labels)} {value:g}")
+
+        report = self.report()
+        stages = sorted(report['stages'].items())
+        for key, help_text in (('calls', "Times a stage ran."),
+                               ('wall_seconds', "Wall-clock seconds spent in a stage."),
+                               ('cpu_seconds', "Process CPU seconds spent while a stage ran.")):
+            name = 'stage_calls_total' if key == 'calls' else f'stage_{key}_total'
+            family(name, 'counter', help_text, [((('stage', stage),), timing[key]) for stage, timing in stages])
+        for entries, kind in ((report['counters'], 'counter'), (report['gauges'], 'gauge')):
+            grouped: Dict[str, List[Tuple[Labels, float]]] = {}
+            for entry in entries:
+                grouped.setdefault(entry['name'], []).append((tuple(entry['labels'].items()), entry['value']))
+            for name, samples in grouped.items():
+                exported = f"{name}_total" if kind == 'counter' else name
+                family(exported, kind, METRIC_HELP.get(name, name.replace('_', ' ') + '.'), samples)
+        files = report['files']
+        family('file_analysis_seconds', 'summary', "Seconds the analyzers spent per file.", [])
+        lines.append(f"{PROMETHEUS_PREFIX}_file_analysis_seconds_sum {files['seconds']:g}")
+        lines.append(f"{PROMETHEUS_PREFIX}_file_analysis_seconds_count {files['count']}")
+        family('slow_file_seconds', 'gauge', "Seconds the analyzers spent on the slowest files.",
+               [((('path', entry['path']),), entry['seconds']) for entry in files['slowest']])
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str):
+        """
+        Write the report as JSON, replacing the file atomically.
+        """
+        _write_atomic(path, json.dumps(self.report(), indent=2) + '\n')
+        logger.info(f"Run report written to {path}")
+
+    def write_prometheus(self, path: str):
+        """
+        Write the Prometheus exposition text, replacing the file atomically.
+        """
+        _write_atomic(path, self.to_prometheus())
+        logger.info(f"Prometheus metrics written to {path}")
@@ -0,0 +1,33 @@
+import unittest
+from src.analysis.activity import ActivitySummary
+
+
+class TestActivitySummary(unittest.TestCase):
+    def test_summary(self):
+        summary = ActivitySummary(recent=2)
+        for number in range(1, 6):
+            summary.add({
+                'number': number, 'title': f"Item {number}", 'state': 'closed' if number <= 3 else 'open',
+                'user': 'alice' if number % 2 else 'bob', 'labels': ['bug'] if number < 3 else [],
+                'created_at': '2024-01-01T00:00:00Z',
+                'closed_at': f"2024-01-0{number + 1}T00:00:00Z" if number <= 3 else None,
+                'updated_at': f"2024-02-0{number}T00:00:00Z",
+                'merged_at': '2024-01-02T00:00:00Z' if number == 1 else None,
+            })
+
+        self.assertEqual(summary.summary(), {
+            'total': 5, 'open': 2, 'closed': 3, 'merged': 1,
+            'top_labels': [('bug', 2)], 'top_authors': [('alice', 3), ('bob', 2)],
+            'median_days_to_close': 2.0, 'recent': ['#5 Item 5', '#4 Item 4'],
+        })
+        self.assertEqual(summary.cursor, '2024-02-05T00:00:00Z')
+
+    def test_empty_summary(self):
+        summary = ActivitySummary().summary()
+        self.assertEqual(summary['total'], 0)
+        self.assertIsNone(summary['median_days_to_close'])
+        self.assertEqual(summary['recent'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
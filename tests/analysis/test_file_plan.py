@@ -0,0 +1,107 @@
+import unittest
+from src.api.github_api import TreeEntry
+from src.analysis.file_plan import FilePlanner, glob_to_regex, parse_gitattributes
+
+
+def make_tree(sizes):
+    return {path: TreeEntry(path, 'file', f'sha-{path}', size, '100644') for path, size in sizes.items()}
+
+
+class TestGlobToRegex(unittest.TestCase):
+    def test_patterns(self):
+        cases = [
+            ('*.min.js', 'static/app.min.js', True),
+            ('*.min.js', 'app.min.jsx', False),
+            ('/build.py', 'build.py', True),
+            ('/build.py', 'tools/build.py', False),
+            ('docs/*.md', 'docs/index.md', True),
+            ('docs/*.md', 'docs/api/index.md', False),
+            ('docs/**/*.md', 'docs/api/index.md', True),
+            ('**/vendor/**', 'lib/vendor/x/y.js', True),
+            ('**/vendor/**', 'vendored/y.js', False),
+            ('file[0-9].py', 'file7.py', True),
+            ('file[!0-9].py', 'file7.py', False),
+        ]
+        for pattern, path, expected in cases:
+            with self.subTest(pattern=pattern, path=path):
+                self.assertEqual(bool(glob_to_regex(pattern).match(path)), expected)
+
+    def test_gitattributes_values(self):
+        rules = parse_gitattributes("# comment\n*.dat binary\nlib/** -linguist-vendored linguist-language=Python !diff\n"
+                                    "!neg linguist-generated\nbuild/ linguist-generated\n")
+        self.assertEqual([values for _, values in rules], [
+            {'text': False, 'diff': False},
+            {'linguist-vendored': False, 'linguist-language': 'Python', 'diff': None},
+        ])
+
+
+class TestFilePlanner(unittest.TestCase):
+    def setUp(self):
+        self.tree = make_tree({
+            'README.md': 100,
+            'src/app.py': 2000,
+            'src/big.py': 5_000_000,
+            'src/api_pb2.py': 40_000,
+            'src/Main.java': 300,
+            'src/web/app.ts': 300,
+            'node_modules/left-pad/index.js': 500,
+            'third_party/lib/helper.py': 700,
+            'static/app.min.js': 900_000,
+            'package-lock.json': 300_000,
+        })
+        self.tree['src'] = TreeEntry('src', 'dir', '', None, '040000')
+        self.planner = FilePlanner(max_file_size=1_000_000, supported_languages=['Python', 'java'])
+
+    def test_skips_from_metadata(self):
+        plan = self.planner.plan(self.tree)
+
+        self.assertEqual(set(plan.selected), {'README.md', 'src/app.py', 'src/Main.java'})
+        self.assertEqual(plan.skipped, {
+            'src/big.py': 'too_large',
+            'src/api_pb2.py': 'generated',
+            'src/web/app.ts': 'unsupported_language',
+            'node_modules/left-pad/index.js': 'vendored',
+            'third_party/lib/helper.py': 'vendored',
+            'static/app.min.js': 'generated',
+            'package-lock.json': 'generated',
+        })
+        self.assertEqual(plan.requests_avoided, 7)
+        self.assertEqual(plan.bytes_avoided, 5_000_000 + 40_000 + 300 + 500 + 700 + 900_000 + 300_000)
+        self.assertEqual(plan.summary()['by_reason'], {'too_large': 1, 'generated': 3,
+                                                       'unsupported_language': 1, 'vendored': 2})
+
+    def test_gitattributes_override_heuristics(self):
+        attributes = {
+            '.gitattributes': "third_party/** -linguist-vendored\nsrc/app.py linguist-generated\n",
+            'src/.gitattributes': "*.ts linguist-language=Python\nMain.java binary\n",
+        }
+        plan = self.planner.plan(self.tree, attributes)
+
+        self.assertIn('third_party/lib/helper.py', plan.selected)
+        self.assertIn('src/web/app.ts', plan.selected)
+        self.assertEqual(plan.skipped['src/app.py'], 'generated')
+        self.assertEqual(plan.skipped['src/Main.java'], 'binary')
+
+    def test_unclaimed_files_are_not_counted(self):
+        plan = self.planner.plan(self.tree, claims=lambda path: path.endswith('.py'))
+
+        self.assertEqual(set(plan.selected), {'src/app.py'})
+        self.assertEqual(set(plan.skipped), {'src/big.py', 'src/api_pb2.py', 'third_party/lib/helper.py'})
+
+    def test_unknown_size_is_not_fetched_under_a_limit(self):
+        self.tree['src/app.py'] = TreeEntry('src/app.py', 'file', 'sha', None, '100644')
+        self.assertEqual(self.planner.plan(self.tree).skipped['src/app.py'], 'unknown_size')
+        self.assertIn('src/app.py', FilePlanner().plan(self.tree).selected)
+
+    def test_no_limits(self):
+        plan = FilePlanner(vendored_patterns=(), generated_patterns=()).plan(self.tree)
+        self.assertEqual(plan.skipped, {})
+        self.assertEqual(len(plan.selected), 10)
+
+    def test_version_follows_settings(self):
+        self.assertEqual(self.planner.version, FilePlanner(1_000_000, ['java', 'python']).version)
+        self.assertNotEqual(self.planner.version, FilePlanner(2_000_000, ['java', 'python']).version)
+
+
+if __name__ == '__main__':
+    unittest.main()
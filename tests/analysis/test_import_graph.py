@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+from src.analysis.code_analyzer import analyze_python_module
+from src.analysis.import_graph import ImportGraph, module_names
+
+SOURCES = {
+    'src/pkg/__init__.py': 'from .core import run\n',
+    'src/pkg/core.py': 'import os\nfrom pkg import util\nfrom . import helpers\n',
+    'src/pkg/util.py': 'from .helpers import h\n',
+    'src/pkg/helpers.py': 'def h():\n    pass\n',
+    'scripts/run.py': 'from pkg.core import run\nimport pkg\n',
+}
+
+
+def symbols(sources):
+    return {path: analyze_python_module(path, source)['symbols'] for path, source in sources.items()}
+
+
+def dense_pagerank(adjacency: np.ndarray, damping: float = 0.85) -> np.ndarray:
+    size = len(adjacency)
+    out_degree = adjacency.sum(axis=1)
+    rank = np.full(size, 1 / size)
+    for _ in range(500):
+        flow = np.zeros(size)
+        for source in range(size):
+            if out_degree[source]:
+                flow += rank[source] * adjacency[source] / out_degree[source]
+            else:
+                flow += rank[source] / size
+        rank = damping * flow + (1 - damping) / size
+    return rank
+
+
+class TestImportGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = ImportGraph.build(symbols(SOURCES))
+
+    def test_module_names_cover_src_layout(self):
+        self.assertEqual(module_names('src/pkg/core.py', {'src/pkg'}), ['src.pkg.core', 'pkg.core'])
+        self.assertEqual(module_names('src/pkg/__init__.py', {'src/pkg'}), ['src.pkg', 'pkg'])
+        self.assertEqual(module_names('setup.py', set()), ['setup'])
+
+    def test_imports_resolve_to_repository_modules(self):
+        self.assertEqual(self.graph.imports_of('src/pkg/__init__.py'), ['src/pkg/core.py'])
+        self.assertEqual(sorted(self.graph.imports_of('src/pkg/core.py')), ['src/pkg/helpers.py', 'src/pkg/util.py'])
+        self.assertEqual(self.graph.imports_of('src/pkg/util.py'), ['src/pkg/helpers.py'])
+        self.assertEqual(sorted(self.graph.imports_of('scripts/run.py')), ['src/pkg/__init__.py', 'src/pkg/core.py'])
+        self.assertEqual(self.graph.in_degree().sum(), 6)
+
+    def test_pagerank_matches_dense_reference(self):
+        scores = self.graph.pagerank()
+        expected = dense_pagerank(self.graph.matrix.toarray())
+        np.testing.assert_allclose(scores, expected, atol=1e-6)
+        self.assertEqual(self.graph.ranking(1)[0][0], 'src/pkg/helpers.py')
+
+    def test_incremental_update_matches_fresh_build(self):
+        self.graph.pagerank()
+        sources = dict(SOURCES)
+        sources['src/pkg/extra.py'] = 'from pkg.helpers import *\nfrom .util import x\n'
+        sources['src/pkg/util.py'] = 'x = 1\n'
+        del sources['scripts/run.py']
+
+        self.assertEqual(self.graph.update(symbols(sources)), 3)
+        fresh = ImportGraph.build(symbols(sources))
+
+        self.assertEqual(len(self.graph), 5)
+        self.assertEqual(self.graph.imports_of('scripts/run.py'), [])
+        self.assertEqual(self.graph.imports_of('src/pkg/util.py'), [])
+        ranking, expected = self.graph.ranking(), fresh.ranking()
+        self.assertEqual([path for path, _ in ranking], [path for path, _ in expected])
+        np.testing.assert_allclose([score for _, score in ranking], [score for _, score in expected], atol=1e-6)
+
+    def test_unchanged_files_need_no_update(self):
+        self.assertEqual(self.graph.update(symbols(SOURCES)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
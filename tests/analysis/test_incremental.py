@@ -0,0 +1,57 @@
+import unittest
+from src.analysis.incremental import apply_file_changes, diff_trees
+from src.api.github_api import FileChange, TreeEntry
+
+
+def file_entry(path, sha):
+    return TreeEntry(path, 'file', sha, 1, '100644')
+
+
+def dir_entry(path):
+    return TreeEntry(path, 'dir', 'tree-' + path, None, '040000')
+
+
+class TestApplyFileChanges(unittest.TestCase):
+    def setUp(self):
+        self.tree = {
+            'README.md': file_entry('README.md', 'r1'),
+            'src': dir_entry('src'),
+            'src/app.py': file_entry('src/app.py', 'a1'),
+            'docs': dir_entry('docs'),
+            'docs/guide.md': file_entry('docs/guide.md', 'g1'),
+        }
+
+    def test_modified_added_and_removed_files(self):
+        changed, removed = apply_file_changes(self.tree, [
+            FileChange('modified', 'src/app.py', 'a2'),
+            FileChange('added', 'src/pkg/mod.py', 'm1'),
+            FileChange('removed', 'docs/guide.md', None),
+        ])
+
+        self.assertEqual(changed, {'src/app.py', 'src/pkg/mod.py'})
+        self.assertEqual(removed, {'docs/guide.md'})
+        self.assertEqual(self.tree['src/app.py'].sha, 'a2')
+        self.assertEqual(self.tree['src/pkg'].type, 'dir')
+        self.assertNotIn('docs', self.tree)
+
+    def test_renamed_file(self):
+        changed, removed = apply_file_changes(self.tree, [
+            FileChange('renamed', 'src/main.py', 'a1', previous_path='src/app.py'),
+        ])
+
+        self.assertEqual(changed, {'src/main.py'})
+        self.assertEqual(removed, {'src/app.py'})
+        self.assertIn('src', self.tree)
+        self.assertNotIn('src/app.py', self.tree)
+
+
+class TestDiffTrees(unittest.TestCase):
+    def test_diff_by_blob_sha(self):
+        old = {'a.py': file_entry('a.py', '1'), 'b.py': file_entry('b.py', '2'), 'c.py': file_entry('c.py', '3')}
+        new = {'a.py': file_entry('a.py', '1'), 'b.py': file_entry('b.py', '9'), 'd.py': file_entry('d.py', '4')}
+
+        self.assertEqual(diff_trees(old, new), ({'b.py', 'd.py'}, {'c.py'}))
+
+
+if __name__ == '__main__':
+    unittest.main()
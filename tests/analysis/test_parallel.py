@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import unittest
+from src.analysis.code_analyzer import analyze_python_module
+from src.analysis.parallel import ProcessPoolRunner, WorkerError
+from src.analysis.registry import AnalyzerRegistry
+
+
+def fail_on_marker(file_path: str, content: str) -> int:
+    if "boom" in content:
+        raise ValueError("boom")
+    return len(content)
+
+
+class TestProcessPoolRunner(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = ProcessPoolRunner(workers=2, chunk_size=16)
+        self.sources = [(f"module{index}.py", f"import os\n\ndef f{index}():\n    x = {index}\n") for index in range(40)]
+
+    async def asyncTearDown(self):
+        self.pool.close()
+
+    async def test_concurrent_submissions_are_chunked(self):
+        results = await asyncio.gather(*(self.pool.submit(analyze_python_module, *source) for source in self.sources))
+
+        self.assertEqual(results, [analyze_python_module(*source) for source in self.sources])
+        self.assertEqual(self.pool.chunks_sent, 3)
+
+    async def test_map_keeps_call_order(self):
+        results = await self.pool.map(analyze_python_module, self.sources)
+        self.assertEqual(results, [analyze_python_module(*source) for source in self.sources])
+
+    async def test_failure_is_isolated_to_its_call(self):
+        results = await asyncio.gather(
+            self.pool.submit(fail_on_marker, "a.py", "fine"),
+            self.pool.submit(fail_on_marker, "b.py", "boom"),
+            return_exceptions=True,
+        )
+        self.assertEqual(results[0], 4)
+        self.assertIsInstance(results[1], WorkerError)
+
+    async def test_registry_offloads_parallel_analyzers(self):
+        registry = AnalyzerRegistry()
+        registry.register('python', {'python'}, analyze_python_module, parallel=True, outputs=('code_analysis', 'symbols'))
+        registry.register('broken', {'python'}, fail_on_marker, parallel=True)
+        registry.register('doc_analysis', {'text'}, lambda path, content: {'length': len(content)})
+
+        results = await registry.dispatch_async("app.py", "boom = 1\n", pool=self.pool)
+
+        self.assertEqual(results, {
+            'code_analysis': {'functions': 0, 'classes': 0, 'imports': 0, 'assignments': 1},
+            'symbols': '',
+            'doc_analysis': {'length': 9},
+        })
+
+    async def test_inline_analyzers_run_off_the_event_loop(self):
+        registry = AnalyzerRegistry()
+        registry.register('doc_analysis', {'text'}, lambda path, content: threading.current_thread().name)
+
+        results = await registry.dispatch_async("README.md", "# Title\n", pool=self.pool)
+
+        self.assertNotEqual(results['doc_analysis'], threading.current_thread().name)
+
+    async def test_one_pass_analyzer_in_the_pool(self):
+        registry = AnalyzerRegistry()
+        registry.register('python', {'python'}, analyze_python_module, parallel=True, outputs=('code_analysis', 'symbols'))
+        source = "import os\n\nclass App:\n    def run(self):\n        pass\n"
+
+        results = await registry.dispatch_async("app.py", source, pool=self.pool)
+
+        self.assertEqual(results, analyze_python_module("app.py", source))
+        self.assertEqual(results['code_analysis']['classes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from src.analysis.registry import AnalyzerRegistry
+
+
+class TestAnalyzerRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = AnalyzerRegistry()
+        self.registry.register('code_analysis', {'python'}, lambda path, content: {'lines': content.count('\n')})
+        self.registry.register('doc_analysis', {'text'}, lambda path, content: {'length': len(content)})
+
+    def test_overlapping_classifications_route_to_both_analyzers(self):
+        names = [analyzer.name for analyzer in self.registry.analyzers_for('src/app.py')]
+        self.assertEqual(names, ['code_analysis', 'doc_analysis'])
+
+        results = self.registry.dispatch('src/app.py', 'x = 1\ny = 2\n')
+        self.assertEqual(results, {'code_analysis': {'lines': 2}, 'doc_analysis': {'length': 12}})
+
+    def test_unclaimed_files_are_not_fetched(self):
+        self.assertTrue(self.registry.claims('README.md'))
+        self.assertFalse(self.registry.claims('logo.png'))
+        self.assertFalse(self.registry.claims('Main.java'))
+
+    def test_failing_analyzer_does_not_drop_other_results(self):
+        self.registry.register('broken', {'python'}, lambda path, content: 1 / 0)
+        results = self.registry.dispatch('src/app.py', 'x = 1\n')
+        self.assertEqual(set(results), {'code_analysis', 'doc_analysis'})
+
+    def test_duplicate_names_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.registry.register('doc_analysis', {'markdown'}, lambda path, content: None)
+        with self.assertRaises(ValueError):
+            self.registry.register('stats', {'python'}, lambda path, content: None, outputs=('code_analysis', 'x'))
+
+    def test_one_pass_results_are_split(self):
+        calls = []
+
+        def analyze(path, content):
+            calls.append(path)
+            return None if 'broken' in content else {'lines': content.count('\n'), 'chars': len(content)}
+
+        self.registry.register('stats', {'python'}, analyze, outputs=('lines', 'chars'))
+        self.assertEqual(self.registry.names, ['code_analysis', 'doc_analysis', 'lines', 'chars'])
+
+        results = self.registry.dispatch('src/app.py', 'x = 1\n')
+        self.assertEqual((results['lines'], results['chars']), (1, 6))
+        self.assertEqual(len(calls), 1)
+        results = self.registry.dispatch('src/app.py', 'broken\n')
+        self.assertEqual((results['lines'], results['chars']), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
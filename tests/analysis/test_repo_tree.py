@@ -0,0 +1,72 @@
+import io
+import unittest
+from src.analysis.repo_tree import RepoTree, format_size
+from src.api.github_api import TreeEntry
+
+STRUCTURE = {
+    'README.md': 'file',
+    'setup.py': 'file',
+    'src': 'dir',
+    'src/pkg/__init__.py': 'file',
+    'src/pkg/core.py': 'file',
+    'src/pkg/util.py': 'file',
+    'src/main.py': 'file',
+    'docs/index.md': 'file',
+    'empty': 'dir',
+    'vendor/lib': 'submodule',
+}
+SIZES = {path: 100 for path in STRUCTURE}
+SIZES['src/pkg/core.py'] = 2048
+
+
+class TestRepoTree(unittest.TestCase):
+    def setUp(self):
+        self.tree = RepoTree.build(STRUCTURE, SIZES)
+
+    def test_aggregates_cover_subtrees(self):
+        src = self.tree.find('src')
+        self.assertEqual(src.file_count, 4)
+        self.assertEqual(src.size, 3 * 100 + 2048)
+        self.assertEqual(src.languages(), {'python': 4})
+        self.assertEqual(self.tree.root.file_count, 7)
+        self.assertEqual(self.tree.root.common_extensions(2), [('py', 5), ('md', 2)])
+        self.assertEqual([node.path for node in self.tree.directories()], ['docs', 'src', 'src/pkg'])
+        self.assertEqual([node.path for node in self.tree.directories(max_depth=1)], ['docs', 'src'])
+
+    def test_render_lists_directories_before_files(self):
+        self.assertEqual(self.tree.render(), '\n'.join([
+            "- src/ (4 files, 2.3 KB, python 100%)",
+            "  - pkg/ (3 files, 2.2 KB, python 100%)",
+            "    - __init__.py (100 B)",
+            "    - core.py (2.0 KB)",
+            "    - util.py (100 B)",
+            "  - main.py (100 B)",
+            "- docs/ (1 file, 100 B, markdown 100%)",
+            "  - index.md (100 B)",
+            "- empty/ (0 files)",
+            "- README.md (100 B)",
+            "- setup.py (100 B)",
+        ]))
+
+    def test_depth_and_fan_out_limits(self):
+        self.assertEqual(self.tree.render(max_depth=1, max_children=2), '\n'.join([
+            "- src/ (4 files, 2.3 KB, python 100%)",
+            "- docs/ (1 file, 100 B, markdown 100%)",
+            "- ... 3 more entries (2 files)",
+        ]))
+
+    def test_tree_entries_supply_sizes(self):
+        entries = {'a/b.py': TreeEntry('a/b.py', 'file', 'sha', 10, '100644'), 'a': TreeEntry('a', 'dir', 'sha', None, '040000')}
+        tree = RepoTree.build(entries)
+        out = io.StringIO()
+        tree.write(out)
+        self.assertEqual(out.getvalue(), "- a/ (1 file, 10 B, python 100%)\n  - b.py (10 B)\n")
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KB")
+        self.assertEqual(format_size(3 * 1024 ** 3), "3.0 GB")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from src.analysis.code_analyzer import analyze_python_module
+from src.analysis.symbol_index import Symbol, SymbolIndex, decode_symbols
+
+SOURCE = '''import os, sys as system
+from . import helpers
+from ..pkg.mod import a
+
+class Outer:
+    def method(self):
+        def inner():
+            pass
+
+    class Inner:
+        async def run(self):
+            pass
+
+def top():
+    return 1
+'''
+
+
+def python_symbols(file_path: str, content: str) -> str:
+    return analyze_python_module(file_path, content)['symbols']
+
+
+class TestSymbolExtraction(unittest.TestCase):
+    def test_qualified_names_kinds_and_spans(self):
+        symbols = list(decode_symbols(python_symbols('app.py', SOURCE)))
+        self.assertEqual(symbols, [
+            ('import', 'os', 1, 1),
+            ('import', 'sys', 1, 1),
+            ('import', '.helpers', 2, 2),
+            ('import', '..pkg.mod.a', 3, 3),
+            ('class', 'Outer', 5, 12),
+            ('method', 'Outer.method', 6, 8),
+            ('function', 'Outer.method.inner', 7, 8),
+            ('class', 'Outer.Inner', 10, 12),
+            ('method', 'Outer.Inner.run', 11, 12),
+            ('function', 'top', 14, 15),
+        ])
+
+    def test_syntax_error_yields_none(self):
+        self.assertIsNone(analyze_python_module('broken.py', 'def broken(:\n'))
+
+
+class TestSymbolIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SymbolIndex.build({
+            'src/app.py': python_symbols('src/app.py', SOURCE),
+            'src/cli.py': python_symbols('src/cli.py', 'import os\n\ndef top():\n    pass\n'),
+            'src/broken.py': None,
+        })
+
+    def test_lookup_by_name_spans_files(self):
+        self.assertEqual(self.index.lookup('top'), [
+            Symbol('function', 'top', 'src/app.py', 14, 15),
+            Symbol('function', 'top', 'src/cli.py', 3, 4),
+        ])
+        self.assertEqual([symbol.file_path for symbol in self.index.lookup('os')], ['src/app.py', 'src/cli.py'])
+        self.assertEqual(self.index.lookup('missing'), [])
+
+    def test_lookup_by_file_keeps_source_order(self):
+        names = [symbol.name for symbol in self.index.file_symbols('src/app.py')]
+        self.assertEqual(names[:4], ['os', 'sys', '.helpers', '..pkg.mod.a'])
+        self.assertEqual(self.index.file_symbols('src/broken.py'), [])
+
+    def test_summary_counts_kinds(self):
+        self.assertEqual(self.index.summary(),
+                         {'files': 2, 'functions': 3, 'classes': 2, 'methods': 2, 'imports': 5})
+
+    def test_saved_index_is_memory_mapped_on_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'symbols.idx')
+            self.index.save(path)
+            loaded = SymbolIndex.load(path)
+
+            self.assertIsInstance(loaded.row_start, memoryview)
+            self.assertEqual(loaded.lookup('Outer.Inner.run'), self.index.lookup('Outer.Inner.run'))
+            self.assertEqual(loaded.file_symbols('src/cli.py'), self.index.file_symbols('src/cli.py'))
+            self.assertEqual(loaded.summary(), self.index.summary())
+            loaded.close()
+
+    def test_invalid_file_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'symbols.idx')
+            with open(path, 'wb') as index_file:
+                index_file.write(b'not an index')
+            self.assertIsNone(SymbolIndex.load(path))
+            self.assertIsNone(SymbolIndex.load(os.path.join(directory, 'missing.idx')))
+
+
+if __name__ == '__main__':
+    unittest.main()
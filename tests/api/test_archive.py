@@ -0,0 +1,52 @@
+import io
+import tarfile
+import unittest
+from src.api.archive import iter_tar_members
+
+
+class NonSeekableStream(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        chunk = self._buffer.read(len(target))
+        target[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def make_tarball(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        directory = tarfile.TarInfo("octo-repo-abc1234")
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for path, data in files.items():
+            info = tarfile.TarInfo(f"octo-repo-abc1234/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class TestIterTarMembers(unittest.TestCase):
+    def setUp(self):
+        self.files = {
+            "README.md": b"# Project\n",
+            "src/app.py": b"print('hi')\n",
+            "assets/logo.png": b"\x89PNG",
+        }
+
+    def test_streams_files_with_root_stripped(self):
+        members = dict(iter_tar_members(NonSeekableStream(make_tarball(self.files))))
+        self.assertEqual(members, self.files)
+
+    def test_predicate_and_size_limit(self):
+        stream = NonSeekableStream(make_tarball(self.files))
+        members = list(iter_tar_members(stream, predicate=lambda path: not path.endswith(".png"), max_member_size=10))
+        self.assertEqual(members, [("README.md", b"# Project\n")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import time
+import unittest
+from benchmarks.fake_github import FakeGitHubServer
+from src.api.async_client import AsyncGitHubClient, project_fields
+
+
+def make_item(number: int, pull_request: bool = False) -> dict:
+    item = {
+        "number": number, "title": f"Item {number}", "state": "open" if number % 2 else "closed",
+        "user": {"login": f"user{number % 3}", "id": number}, "labels": [{"name": "bug", "color": "red"}],
+        "body": "x" * 1000, "updated_at": f"2024-01-01T00:{number // 60:02d}:{number % 60:02d}Z",
+    }
+    if pull_request:
+        item["pull_request"] = {"url": "..."}
+    return item
+
+
+class TestAsyncGitHubClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        files = {f"src/module{index}.py": f"value = {index}\n".encode() for index in range(8)}
+        self.server = FakeGitHubServer(files, latency=0.2).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    async def test_fetches_overlap(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url, max_concurrency=8) as client:
+            start = time.perf_counter()
+            contents = await asyncio.gather(*(
+                client.get_file_content(self.server.full_name, path) for path in self.server.files
+            ))
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(contents, [data.decode() for data in self.server.files.values()])
+        self.assertLess(elapsed, 0.2 * 4)
+
+    async def test_concurrency_is_bounded(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url, max_concurrency=2) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                client.get_file_content(self.server.full_name, path) for path in self.server.files
+            ))
+            elapsed = time.perf_counter() - start
+
+        self.assertGreaterEqual(elapsed, 0.2 * 4)
+
+    async def test_timeout_returns_none(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url, timeout=0.05) as client:
+            content = await client.get_file_content(self.server.full_name, "src/module0.py")
+        self.assertIsNone(content)
+
+    async def test_missing_file_returns_none(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url) as client:
+            content = await client.get_file_content(self.server.full_name, "missing.py")
+        self.assertIsNone(content)
+
+    async def test_paths_are_quoted(self):
+        files = {path: path.encode() for path in ("docs/C# notes.md", "docs/what?.md", "docs/100%.md")}
+        with FakeGitHubServer(files) as server:
+            async with AsyncGitHubClient("token", base_url=server.base_url) as client:
+                contents = [await client.get_file_content(server.full_name, path) for path in files]
+        self.assertEqual(contents, list(files))
+
+
+class TestStreamingListings(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        issues = [make_item(number, pull_request=number % 10 == 0) for number in range(1, 251)]
+        pulls = [make_item(number) for number in range(1, 121)]
+        self.server = FakeGitHubServer({"README.md": b"# Demo\n"}, issues=issues, pulls=pulls, latency=0.05).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    async def test_issues_stream_all_pages_without_pull_requests(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url) as client:
+            issues = [issue async for issue in client.iter_issues(self.server.full_name, per_page=50)]
+
+        self.assertEqual(len(issues), 225)
+        self.assertEqual(len(self.server.request_paths), 5)
+        self.assertEqual(issues[0], {
+            "number": 1, "title": "Item 1", "state": "open", "user": "user1", "labels": ["bug"],
+            "comments": None, "created_at": None, "updated_at": "2024-01-01T00:00:01Z", "closed_at": None,
+        })
+
+    async def test_since_limits_the_listing(self):
+        since = "2024-01-01T00:01:40Z"
+        async with AsyncGitHubClient("token", base_url=self.server.base_url) as client:
+            issues = [issue["number"] async for issue in client.iter_issues(self.server.full_name, since=since)]
+            pulls = [pull["number"] async for pull in client.iter_pull_requests(self.server.full_name, since=since)]
+
+        self.assertEqual(issues, [number for number in range(100, 251) if number % 10])
+        self.assertEqual(pulls, list(range(120, 99, -1)))
+
+    async def test_next_page_is_prefetched(self):
+        async with AsyncGitHubClient("token", base_url=self.server.base_url) as client:
+            start = time.perf_counter()
+            async for _ in client.iter_pages(f"/repos/{self.server.full_name}/issues", {"per_page": 25}):
+                await asyncio.sleep(0.05)
+            elapsed = time.perf_counter() - start
+
+        # Ten pages fetched and processed strictly in turn would take at least 10 * (0.05 + 0.05) seconds.
+        self.assertLess(elapsed, 0.9)
+
+    def test_project_fields(self):
+        projected = project_fields(make_item(7), ("number", "user.login", "labels.name", "milestone.title"))
+        self.assertEqual(projected, {"number": 7, "user": "user1", "labels": ["bug"], "milestone": None})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from src.api.github_api import MAX_DIRECTORY_LISTINGS, GitHubAPI, TreeEntry
+
+
+def make_element(path, type_, sha, size=None, mode=None):
+    mode = mode or ('040000' if type_ == 'tree' else '100644')
+    return SimpleNamespace(path=path, type=type_, sha=sha, size=size, mode=mode)
+
+
+def make_tree(sha, elements, truncated=False):
+    return SimpleNamespace(sha=sha, tree=elements, truncated=truncated)
+
+
+class TestGetRepositoryTree(unittest.TestCase):
+    def setUp(self):
+        self.github_api = GitHubAPI(token="test-token", max_workers=2)
+        self.repo = MagicMock()
+        self.repo.default_branch = "main"
+        self.repo.get_branch.return_value.commit.sha = "commit-sha"
+
+    def test_single_recursive_request(self):
+        self.repo.get_git_tree.return_value = make_tree("root", [
+            make_element("README.md", "blob", "b1", 10),
+            make_element("src", "tree", "t1"),
+            make_element("src/app.py", "blob", "b2", 20, "100755"),
+        ])
+
+        tree = self.github_api.get_repository_tree(self.repo)
+
+        self.repo.get_git_tree.assert_called_once_with("commit-sha", recursive=True)
+        self.assertEqual(tree["src/app.py"], TreeEntry("src/app.py", "file", "b2", 20, "100755"))
+        self.assertEqual(tree["src"], TreeEntry("src", "dir", "t1", None, "040000"))
+
+    def test_truncated_listing_falls_back_to_subtrees(self):
+        trees = {
+            ("commit-sha", True): make_tree("root", [make_element("a", "tree", "ta")], truncated=True),
+            ("root", False): make_tree("root", [
+                make_element("README.md", "blob", "b1", 10),
+                make_element("a", "tree", "ta"),
+                make_element("b", "tree", "tb"),
+            ]),
+            ("ta", True): make_tree("ta", [make_element("x.py", "blob", "b2", 5)]),
+            ("tb", True): make_tree("tb", [], truncated=True),
+            ("tb", False): make_tree("tb", [make_element("c", "tree", "tc")]),
+            ("tc", True): make_tree("tc", [make_element("y.py", "blob", "b3", 7)]),
+        }
+        self.repo.get_git_tree.side_effect = lambda sha, recursive=False: trees[(sha, recursive)]
+
+        tree = self.github_api.get_repository_tree(self.repo)
+
+        self.assertEqual(
+            sorted(tree),
+            ["README.md", "a", "a/x.py", "b", "b/c", "b/c/y.py"],
+        )
+        self.assertEqual(tree["b/c/y.py"].sha, "b3")
+        self.assertEqual(tree["a/x.py"].size, 5)
+
+    def test_entries_are_looked_up_in_their_directories_only(self):
+        trees = {
+            "commit-sha": make_tree("root", [
+                make_element("README.md", "blob", "b1", 10),
+                make_element("src", "tree", "ts"),
+                make_element("docs", "tree", "td"),
+            ]),
+            "ts": make_tree("ts", [make_element("app.py", "blob", "b2", 20), make_element("pkg", "tree", "tp")]),
+            "tp": make_tree("tp", [make_element("util.py", "blob", "b3", 30)]),
+        }
+        self.repo.get_git_tree.side_effect = lambda sha, recursive=False: trees[sha]
+
+        entries = self.github_api.get_tree_entries(self.repo, "commit-sha", ["src/pkg/util.py", "src/gone.py", "README.md"])
+
+        self.assertEqual(entries, {
+            "src/pkg/util.py": TreeEntry("src/pkg/util.py", "file", "b3", 30, "100644"),
+            "README.md": TreeEntry("README.md", "file", "b1", 10, "100644"),
+        })
+        self.assertEqual(sorted(call.args[0] for call in self.repo.get_git_tree.call_args_list),
+                         ["commit-sha", "tp", "ts"])
+
+    def test_entry_lookup_gives_up_on_many_directories(self):
+        paths = [f"dir{index}/file.py" for index in range(MAX_DIRECTORY_LISTINGS)]
+        self.assertIsNone(self.github_api.get_tree_entries(self.repo, "commit-sha", paths))
+        self.repo.get_git_tree.assert_not_called()
+
+    def test_structure_uses_tree_mode(self):
+        self.repo.get_git_tree.return_value = make_tree("root", [
+            make_element("src", "tree", "t1"),
+            make_element("src/app.py", "blob", "b2", 20),
+        ])
+
+        structure = self.github_api.get_repository_structure(self.repo)
+
+        self.assertEqual(structure, {"src": "dir", "src/app.py": "file"})
+        self.repo.get_contents.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from src.api.gitignore import IgnoreRules
+
+
+class TestIgnoreRules(unittest.TestCase):
+    def rules(self, text: str, prefix: str = '') -> IgnoreRules:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, '.gitignore')
+            with open(path, 'w', encoding='utf-8') as ignore_file:
+                ignore_file.write(text)
+            rules = IgnoreRules()
+            rules.add_file(path, prefix)
+        return rules
+
+    def test_unanchored_patterns_match_at_any_depth(self):
+        rules = self.rules("*.pyc\n__pycache__/\n")
+        self.assertTrue(rules.ignored("a.pyc", False))
+        self.assertTrue(rules.ignored("src/deep/a.pyc", False))
+        self.assertTrue(rules.ignored("src/__pycache__", True))
+        self.assertFalse(rules.ignored("src/__pycache__", False))
+        self.assertFalse(rules.ignored("src/a.py", False))
+
+    def test_anchored_and_double_star_patterns(self):
+        rules = self.rules("/build\ndocs/*.tmp\na/**/b\nlogs/**\n")
+        self.assertTrue(rules.ignored("build", True))
+        self.assertFalse(rules.ignored("src/build", True))
+        self.assertTrue(rules.ignored("docs/x.tmp", False))
+        self.assertFalse(rules.ignored("docs/sub/x.tmp", False))
+        self.assertTrue(rules.ignored("a/b", False))
+        self.assertTrue(rules.ignored("a/x/y/b", False))
+        self.assertTrue(rules.ignored("logs/today.txt", False))
+        self.assertFalse(rules.ignored("logs", True))
+
+    def test_last_match_wins_and_negation_reincludes(self):
+        rules = self.rules("# comment\n*.log\n!keep.log\n\\#literal\n")
+        self.assertTrue(rules.ignored("debug.log", False))
+        self.assertFalse(rules.ignored("keep.log", False))
+        self.assertTrue(rules.ignored("#literal", False))
+
+    def test_nested_rules_apply_below_their_directory(self):
+        rules = self.rules("*.txt\n", prefix="sub/")
+        self.assertTrue(rules.ignored("sub/a.txt", False))
+        self.assertTrue(rules.ignored("sub/deeper/a.txt", False))
+        self.assertFalse(rules.ignored("a.txt", False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from benchmarks.fake_github import FakeGitHubServer
+from src.api.async_client import AsyncGitHubClient
+from src.api.github_api import TreeEntry
+from src.api.graphql_blobs import BlobBatchFetcher
+
+
+def file_entry(path: str, size) -> TreeEntry:
+    return TreeEntry(path, 'file', '0' * 40, size, '100644')
+
+
+class TestBatchPlanning(unittest.TestCase):
+    def setUp(self):
+        self.fetcher = BlobBatchFetcher(client=None, max_batch_files=3, max_batch_bytes=100, unknown_size=40)
+
+    def test_batches_respect_file_count_and_byte_budget(self):
+        entries = [file_entry(f"f{index}", 10) for index in range(7)]
+        entries += [file_entry("large", 90), file_entry("huge", 500), file_entry("unknown", None)]
+        batches = [[entry.path for entry in batch] for batch in self.fetcher.plan_batches(entries)]
+        self.assertEqual(batches, [["f0", "f1", "f2"], ["f3", "f4", "f5"], ["f6", "large"], ["huge"], ["unknown"]])
+
+    def test_query_declares_one_variable_per_alias(self):
+        query = self.fetcher.build_query(2)
+        self.assertIn("$e1: String!", query)
+        self.assertIn("f1: object(expression: $e1)", query)
+        self.assertNotIn("$e2", query)
+
+
+class TestBlobBatchFetcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.files = {f"src/module{index}.py": f"value = {index}\n".encode() for index in range(250)}
+        self.files["assets/logo.png"] = b"\x89PNG\r\n\x1a\n\0\0"
+        self.files["data/large.txt"] = b"line\n" * 100
+        self.server = FakeGitHubServer(self.files, graphql_text_limit=200).start()
+        self.client = AsyncGitHubClient("token", base_url=self.server.base_url)
+        self.fetcher = BlobBatchFetcher(self.client, max_batch_files=100)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.stop()
+
+    def entries(self, paths):
+        return [file_entry(path, len(self.files.get(path, b""))) for path in paths]
+
+    async def test_fetches_many_files_per_request(self):
+        paths = [path for path in self.files if path.endswith(".py")]
+        contents = {path: content async for path, content in self.fetcher.iter_blob_contents(
+            self.server.full_name, self.entries(paths), self.server.commit_sha)}
+
+        self.assertEqual(contents, {path: self.files[path].decode() for path in paths})
+        self.assertEqual(self.server.request_paths, ["/graphql"] * 3)
+
+    async def test_binary_missing_and_truncated_blobs(self):
+        paths = ["assets/logo.png", "missing.py", "data/large.txt", "src/module1.py"]
+        contents = {path: content async for path, content in self.fetcher.iter_blob_contents(
+            self.server.full_name, self.entries(paths))}
+
+        self.assertIsNone(contents["assets/logo.png"])
+        self.assertIsNone(contents["missing.py"])
+        self.assertEqual(contents["data/large.txt"], self.files["data/large.txt"].decode())
+        self.assertEqual(contents["src/module1.py"], "value = 1\n")
+        self.assertEqual(self.fetcher.stats(), {'queries': 1, 'fallbacks': 1})
+        self.assertEqual(self.server.request_paths.count("/graphql"), 1)
+        self.assertEqual(len(self.server.request_paths), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
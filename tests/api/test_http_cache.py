@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from benchmarks.fake_github import FakeGitHubServer
+from src.api.async_client import AsyncGitHubClient
+from src.api.http_cache import ConditionalCache
+
+
+class TestConditionalCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.issues = [{"number": number, "title": f"Issue {number}"} for number in range(1, 66)]
+        self.server = FakeGitHubServer({"README.md": b"# Demo\n"}, issues=self.issues).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "http.sqlite")
+
+    def tearDown(self):
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def make_client(self) -> AsyncGitHubClient:
+        return AsyncGitHubClient("token", base_url=self.server.base_url, cache=ConditionalCache(self.cache_path))
+
+    async def test_revalidated_file_is_served_from_disk_across_clients(self):
+        async with self.make_client() as client:
+            first = await client.get_file_content(self.server.full_name, "README.md")
+            client.cache.close()
+        async with self.make_client() as client:
+            second = await client.get_file_content(self.server.full_name, "README.md")
+            stats = client.cache.stats()
+            client.cache.close()
+
+        self.assertEqual(first, "# Demo\n")
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.not_modified_count, 1)
+        self.assertEqual(stats['not_modified'], 1)
+
+    async def test_changed_file_is_downloaded_again(self):
+        async with self.make_client() as client:
+            await client.get_file_content(self.server.full_name, "README.md")
+            self.server.push({"README.md": b"# Renamed\n"})
+            content = await client.get_file_content(self.server.full_name, "README.md")
+            client.cache.close()
+
+        self.assertEqual(content, "# Renamed\n")
+        self.assertEqual(self.server.not_modified_count, 0)
+
+    async def test_paginated_listing_follows_cached_link_headers(self):
+        url = f"/repos/{self.server.full_name}/issues"
+        async with self.make_client() as client:
+            first = await client.paginate_request(url, params={"state": "all"})
+            second = await client.paginate_request(url, params={"state": "all"})
+            client.cache.close()
+
+        self.assertEqual(first, self.issues)
+        self.assertEqual(second, self.issues)
+        self.assertEqual(self.server.not_modified_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+from benchmarks.fake_openai import FakeChatServer
+from src.api.git_objects import GitObjectStore, apply_delta
+from src.api.local_repo import LocalRepoAPI, is_local_source
+from src.main import RepoInsight, main
+from tests.test_main import make_config
+
+FILES = {
+    "README.md": b"# Demo\n\nA demo project.\n",
+    "src/app.py": b"import os\n\ndef main():\n    return os.getcwd()\n",
+    "src/util.py": b"".join(b"def helper%d():\n    return %d\n\n" % (index, index) for index in range(200)),
+    "assets/logo.png": b"\x89PNG\r\n\x1a\n\x00\xff",
+}
+
+
+def git(directory: str, *args: str) -> str:
+    return subprocess.run(["git", "-c", "user.name=Test", "-c", "user.email=test@example.com",
+                           "-c", "init.defaultBranch=main", *args],
+                          cwd=directory, check=True, capture_output=True, text=True).stdout
+
+
+def write_files(root: str, files):
+    for path, data in files.items():
+        os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+        with open(os.path.join(root, path), 'wb') as output_file:
+            output_file.write(data)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestLocalRepoAPI(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work = os.path.join(self.temp_dir.name, "octo", "demo")
+        os.makedirs(self.work)
+        git(self.work, "init", "-q")
+        write_files(self.work, FILES)
+        git(self.work, "add", "-A")
+        git(self.work, "commit", "-q", "-m", "first")
+        self.first = git(self.work, "rev-parse", "HEAD").strip()
+        # A small edit of a large file, so a repack stores one version as a delta of the other.
+        write_files(self.work, {"src/util.py": FILES["src/util.py"] + b"def extra():\n    pass\n"})
+        git(self.work, "commit", "-q", "-am", "second")
+        self.api = LocalRepoAPI()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def packed_bare_clone(self) -> str:
+        bare = os.path.join(self.temp_dir.name, "mirrors", "octo", "demo.git")
+        git(self.temp_dir.name, "clone", "-q", "--bare", "--no-local", self.work, bare)
+        git(bare, "repack", "-adq", "--depth=10")
+        return bare
+
+    def git_tree(self, directory: str, ref: str = "HEAD"):
+        listing = {}
+        for line in git(directory, "ls-tree", "-r", "-t", "-l", ref).splitlines():
+            meta, path = line.split("\t", 1)
+            mode, kind, sha, size = meta.split()
+            listing[path] = (kind, sha, None if size == "-" else int(size))
+        return listing
+
+    def assert_matches_git(self, tree, directory: str, ref: str = "HEAD"):
+        types = {"blob": "file", "tree": "dir"}
+        expected = self.git_tree(directory, ref)
+        self.assertEqual(set(tree), set(expected))
+        for path, (kind, sha, size) in expected.items():
+            self.assertEqual(tree[path].type, types[kind], path)
+            if kind == "blob":
+                self.assertEqual((tree[path].sha, tree[path].size), (sha, size), path)
+
+    def test_working_tree_matches_git(self):
+        repo = self.api.get_repository(self.work)
+        tree = self.api.get_repository_tree(repo)
+
+        self.assert_matches_git(tree, self.work)
+        self.assertEqual(repo.full_name, "octo/demo")
+        self.assertEqual(self.api.get_file_content(repo, "src/app.py"), FILES["src/app.py"].decode())
+        self.assertIsNone(self.api.get_file_content(repo, "assets/logo.png"))
+
+    def test_working_tree_reflects_uncommitted_changes(self):
+        repo = self.api.get_repository(self.work)
+        head = self.api.get_default_commit_sha(repo)
+        write_files(self.work, {"src/app.py": b"def changed():\n    pass\n", "src/new.py": b"x = 1\n"})
+        os.utime(os.path.join(self.work, "src/app.py"), ns=(1, 1))
+
+        changed = self.api.get_default_commit_sha(repo)
+        tree = self.api.get_repository_tree(repo, changed)
+
+        self.assertNotEqual(head, changed)
+        self.assertEqual(tree["src/app.py"].sha, git(self.work, "hash-object", "src/app.py").strip())
+        self.assertEqual(tree["src/new.py"].sha, git(self.work, "hash-object", "src/new.py").strip())
+
+    def test_working_tree_skips_ignored_untracked_files(self):
+        write_files(self.work, {".gitignore": b"node_modules/\n*.log\n!keep.log\nbuild/\n",
+                                "build/tracked.txt": b"kept\n"})
+        git(self.work, "add", ".gitignore")
+        git(self.work, "add", "-f", "build/tracked.txt")
+        git(self.work, "commit", "-q", "-m", "ignore")
+        write_files(self.work, {"node_modules/lib/index.js": b"x\n", "debug.log": b"x\n", "keep.log": b"x\n",
+                                "build/out.o": b"x\n", "docs/draft.md": b"x\n", "tmp/scratch.txt": b"x\n"})
+        with open(os.path.join(self.work, ".git", "info", "exclude"), "a") as exclude_file:
+            exclude_file.write("tmp\n")
+
+        repo = self.api.get_repository(self.work)
+        tree = self.api.get_repository_tree(repo)
+
+        files = {path for path, entry in tree.items() if entry.type == "file"}
+        self.assertEqual(files, set(git(self.work, "ls-files", "--cached", "--others", "--exclude-standard").split()))
+        self.assertNotIn("node_modules", tree)
+
+    def test_packed_bare_repository_matches_git(self):
+        bare = self.packed_bare_clone()
+        pack_dir = os.path.join(bare, "objects", "pack")
+        indexes = [os.path.join(pack_dir, name) for name in os.listdir(pack_dir) if name.endswith(".idx")]
+        self.assertIn("chain length = 1", git(bare, "verify-pack", "-v", *indexes))
+        repo = self.api.get_repository(bare)
+        try:
+            self.assertTrue(repo.bare)
+            self.assertEqual(repo.default_branch, "main")
+            self.assert_matches_git(self.api.get_repository_tree(repo), bare)
+            self.assert_matches_git(self.api.get_repository_tree(repo, self.first), bare, self.first)
+            self.assertEqual(self.api.get_file_content(repo, "src/util.py", self.first), FILES["src/util.py"].decode())
+            files = dict(self.api.iter_archive_files(repo, predicate=lambda path: path.endswith(".py")))
+            self.assertEqual(set(files), {"src/app.py", "src/util.py"})
+            self.assertTrue(files["src/util.py"].endswith(b"def extra():\n    pass\n"))
+        finally:
+            repo.close()
+
+    def test_loose_objects_are_read(self):
+        store = GitObjectStore(os.path.join(self.work, ".git"))
+        try:
+            self.assertEqual(store.packs, [])
+            tree = store.commit_tree(store.resolve("HEAD"))
+            paths = {path: sha for mode, path, sha in store.iter_tree(tree)}
+            self.assertEqual(store.read(paths["README.md"]), ("blob", FILES["README.md"]))
+            self.assertEqual(store.size(paths["README.md"]), len(FILES["README.md"]))
+        finally:
+            store.close()
+
+    def test_apply_delta(self):
+        base = b"hello world, hello delta"
+        # Copy 12 bytes from offset 0, insert 'git!'.
+        delta = bytes([len(base), 16, 0x90, 12, 4]) + b"git!"
+        self.assertEqual(apply_delta(base, delta), b"hello world,git!")
+
+    def test_local_sources(self):
+        self.assertTrue(is_local_source(self.work))
+        self.assertTrue(is_local_source("file:///srv/mirrors/octo/demo.git"))
+        self.assertFalse(is_local_source("https://github.com/octo/demo"))
+        self.assertFalse(is_local_source("github.com/octo/demo"))
+        self.assertFalse(is_local_source("git@github.com:octo/demo.git"))
+        self.assertFalse(is_local_source(os.path.join(self.temp_dir.name, "missing")))
+        self.assertIsNone(self.api.get_repository(os.path.join(self.temp_dir.name, "missing")))
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestRepoInsightLocal(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work = os.path.join(self.temp_dir.name, "octo", "demo")
+        os.makedirs(self.work)
+        git(self.work, "init", "-q")
+        write_files(self.work, FILES)
+        git(self.work, "add", "-A")
+        git(self.work, "commit", "-q", "-m", "first")
+        self.bare = os.path.join(self.temp_dir.name, "mirrors", "octo", "demo.git")
+        git(self.temp_dir.name, "clone", "-q", "--bare", "--no-local", self.work, self.bare)
+        # Nothing listens here: local repositories must not touch the network.
+        self.repo_insight = RepoInsight(make_config(self.temp_dir.name, "http://127.0.0.1:9"))
+
+    async def asyncTearDown(self):
+        await self.repo_insight.close()
+        self.temp_dir.cleanup()
+
+    async def test_working_tree_and_bare_repository_give_the_same_analysis(self):
+        from_work, error = await self.repo_insight.collect_analysis(self.work)
+        self.assertIsNone(error)
+        from_bare, error = await self.repo_insight.collect_analysis(f"file://{self.bare}")
+        self.assertIsNone(error)
+
+        self.assertEqual(from_work['repository'], "octo/demo")
+        self.assertEqual(from_work['code'], from_bare['code'])
+        self.assertEqual(from_work['documentation'], from_bare['documentation'])
+        self.assertEqual(from_work['code']['totals']['functions'], 201)
+        self.assertEqual(from_work['documentation']['README.md']['project_name'], 'Demo')
+        self.assertEqual(from_work['issues']['total'], 0)
+
+    async def test_command_line_needs_no_github_token(self):
+        chat = FakeChatServer(reply=lambda messages: "Demo is a small demo project.").start()
+        self.addCleanup(chat.stop)
+        config = make_config(self.temp_dir.name, "http://127.0.0.1:9",
+                             github={'api_token': None}, openai={'api_base': chat.base_url})
+        output = StringIO()
+        with patch.dict(os.environ, {'REPOINSIGHT_CONFIG': config.config_path}), redirect_stdout(output):
+            os.environ.pop('GITHUB_TOKEN', None)
+            os.environ.pop('GITHUB_TOKENS', None)
+            await main([self.work])
+
+        self.assertEqual(output.getvalue().strip(), "Demo is a small demo project.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import unittest
+from email.utils import formatdate
+import httpx
+from benchmarks.fake_github import FakeGitHubServer
+from src.api.async_client import AsyncGitHubClient
+from src.api.rate_limiter import RateLimitScheduler, TokenBucket, parse_retry_after
+
+
+class TestRateLimitScheduler(unittest.IsolatedAsyncioTestCase):
+    def make_server(self, **limits) -> FakeGitHubServer:
+        files = {f"src/module{index}.py": f"value = {index}\n".encode() for index in range(12)}
+        server = FakeGitHubServer(files, etags=False, **limits).start()
+        self.addCleanup(server.stop)
+        return server
+
+    async def fetch_all(self, client: AsyncGitHubClient, server: FakeGitHubServer):
+        return await asyncio.gather(*(client.get_file_content(server.full_name, path) for path in server.files))
+
+    async def test_secondary_limit_backs_off_concurrency(self):
+        server = self.make_server(latency=0.05, secondary_limit=3, retry_after=0)
+        async with AsyncGitHubClient("token", base_url=server.base_url, max_concurrency=12) as client:
+            contents = await self.fetch_all(client, server)
+            stats = client.scheduler.stats()
+
+        self.assertNotIn(None, contents)
+        self.assertGreater(server.rate_limited_count, 0)
+        self.assertGreater(stats['retries'], 0)
+        self.assertLess(stats['concurrency_limit'], 12)
+
+    async def test_exhausted_tokens_rotate_across_pool(self):
+        server = self.make_server(rate_limit=5)
+        async with AsyncGitHubClient("token-a", base_url=server.base_url,
+                                     tokens=["token-b", "token-c"]) as client:
+            contents = await self.fetch_all(client, server)
+            stats = client.scheduler.stats()
+
+        self.assertNotIn(None, contents)
+        self.assertEqual(stats['tokens'], 3)
+        self.assertEqual(stats['wait_seconds'], 0)
+
+    async def test_waits_for_reset_when_pool_is_exhausted(self):
+        server = self.make_server(rate_limit=8, rate_limit_window=1.0)
+        async with AsyncGitHubClient("token", base_url=server.base_url, max_concurrency=4) as client:
+            contents = await self.fetch_all(client, server)
+            stats = client.scheduler.stats()
+
+        self.assertNotIn(None, contents)
+        self.assertGreater(stats['wait_seconds'], 0)
+
+    def test_long_retry_after_is_not_cut_short(self):
+        scheduler = RateLimitScheduler(["token"], max_backoff=60.0)
+        response = httpx.Response(403, headers={'retry-after': '120'},
+                                  request=httpx.Request('GET', 'https://api.github.com/repos/o/r'))
+
+        delay = scheduler.observe(scheduler.tokens[0], response, attempt=0)
+
+        self.assertEqual(delay, 120.0)
+        self.assertEqual(scheduler.stats()['wait_seconds'], 120.0)
+
+    def test_retry_after_as_http_date(self):
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 30, usegmt=True)), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
+
+        scheduler = RateLimitScheduler(["token"], max_backoff=60.0)
+        response = httpx.Response(429, headers={'retry-after': 'soon'},
+                                  request=httpx.Request('GET', 'https://api.github.com/repos/o/r'))
+        delay = scheduler.observe(scheduler.tokens[0], response, attempt=2)
+        self.assertLessEqual(delay, 4.0)
+
+
+class TestTokenBucket(unittest.IsolatedAsyncioTestCase):
+    async def test_paces_to_rate(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.perf_counter()
+        for _ in range(5):
+            await bucket.acquire()
+        self.assertGreaterEqual(time.perf_counter() - start, 4 / 20 * 0.9)
+
+    async def test_unpaced_bucket_does_not_wait(self):
+        bucket = TokenBucket()
+        waited = sum([await bucket.acquire() for _ in range(100)])
+        self.assertEqual(waited, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
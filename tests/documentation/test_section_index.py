@@ -0,0 +1,71 @@
+import random
+import unittest
+from src.documentation.doc_extractor import DocExtractor
+from src.documentation.section_index import MarkdownSectionIndex
+
+DOCUMENTS = {
+    'plain': "# Demo\n\nA demo project.\n\nSecond paragraph.\n\n## Installation\nRun the installer.\n\n## Usage\n\nUse it.\n",
+    'inline_markup': "# **Demo** tool\n\nRun `demo` *now*.\n\n## Usage\n\n- one\n- two\n\n    code block\n\n## Contributing\n",
+    'setext_and_rules': "Demo\n====\n\nIntro.\n\n***\n\nAfter the rule.\n\nUsage\n-----\nText\nmore\n---\nTail.\n",
+    'references': "# [Demo][home]\n\nSee the [docs][] for more.\n\n## Usage\n\nRead [the guide][docs].\n\n[home]: https://example.com\n[docs]: https://example.com/docs\n",
+    'code_then_heading': "# Demo\n\n    # not a heading\n    more code\nparagraph\n---\n\n## Installation\n\n1. step one\n2. step two\n",
+    'no_sections': "Just text without headings.\n",
+    'empty_heading': "#\n\ntext\n\n### Usage ###\nrun\n",
+}
+
+# Lines whose combinations exercise link definitions, lazy continuation lines, lists and quotes.
+LINES = ["# Demo", "## Usage", "## Installation", "### Contributing", "Title", "Usage", "=====", "-----", "--",
+         "***", "text here", "more *text*", "Title [a]", "[a]: http://x", '[b]: http://y "t"', "[d]:", "  http://w",
+         '"t"', "  [c]: http://z", "> [a]: http://x", "- item", "* item", "1. step", "  - nested", "> quote",
+         "> ## Quoted", ">", "    code", "    # code", "  indented", "<div>", "</div>", "", "", ""]
+
+
+class TestMarkdownSectionIndex(unittest.TestCase):
+    def setUp(self):
+        self.extractor = DocExtractor(sections=('Installation', 'Usage', 'Contributing', 'Getting Started'))
+
+    def test_matches_html_extraction(self):
+        for name, content in DOCUMENTS.items():
+            with self.subTest(document=name):
+                self.assertFalse(MarkdownSectionIndex(content).requires_html)
+                self.assertEqual(self.extractor.extract_info(content), self.extractor.extract_info_html(content))
+
+    def test_user_configured_sections(self):
+        content = "# Demo\n\n## Getting Started\n\nClone it.\n"
+        info = self.extractor.extract_info(content)
+        self.assertEqual(info['getting_started'], 'Clone it.')
+        self.assertIsNone(info['installation'])
+
+    def test_one_pass_index_spans(self):
+        index = MarkdownSectionIndex(DOCUMENTS['setext_and_rules'])
+        self.assertEqual([heading.level for heading in index.headings], [1, 0, 2, 0])
+        usage = index.find_heading('usage', [2, 3])
+        self.assertEqual(index.section_source(usage), "Text\nmore")
+
+    def test_nested_headings_fall_back_to_html(self):
+        for content in ("# Demo\n\n- # nested\n", "> ## Quoted\n\ntext\n", '<div>\n\n# In HTML\n\n</div>\n'):
+            with self.subTest(content=content):
+                self.assertTrue(MarkdownSectionIndex(content).requires_html)
+                self.assertEqual(self.extractor.extract_info(content), self.extractor.extract_info_html(content))
+
+    def test_link_definitions_end_paragraph_blocks(self):
+        for content, project_name in (("[a]: http://x\nTitle\n=====\n", 'Title'),
+                                      ("[a]: http://x\nTitle\n---\n", None),
+                                      ("[d]:\n  http://w\nTitle\n--\n# Demo\n", 'Demo'),
+                                      ("- item\n[a]: http://x\nTitle\n=====\n", 'Title'),
+                                      ("> quote\n[a]: http://x\nTitle\n=====\n", 'Title')):
+            with self.subTest(content=content):
+                info = self.extractor.extract_info(content)
+                self.assertEqual(info['project_name'], project_name)
+                self.assertEqual(info, self.extractor.extract_info_html(content))
+
+    def test_random_documents_match_html_extraction(self):
+        generator = random.Random(0)
+        for _ in range(2000):
+            content = '\n'.join(generator.choice(LINES) for _ in range(generator.randint(1, 12))) + '\n'
+            with self.subTest(content=content):
+                self.assertEqual(self.extractor.extract_info(content), self.extractor.extract_info_html(content))
+
+
+if __name__ == '__main__':
+    unittest.main()
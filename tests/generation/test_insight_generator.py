@@ -1,34 +1,62 @@
 import unittest
-from src.generation.insight_generator import InsightGenerator
+from unittest.mock import patch
+from benchmarks.fake_openai import FakeChatServer
+from src.generation.insight_generator import InsightGenerator, InsightGenerationError
+from tests.generation.test_prompt_builder import HeuristicCounter
 
-class TestInsightGenerator(unittest.TestCase):
+REPLY = "  A demo project.\n"
+
+
+class TestInsightGenerator(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
-        self.insight_generator = InsightGenerator()
-
-    def test_generate_insights_empty_input(self):
-        result = self.insight_generator.generate_insights([])
-        self.assertEqual(result, [])
-
-    def test_generate_insights_single_input(self):
-        input_data = [{"key": "value"}]
-        result = self.insight_generator.generate_insights(input_data)
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 1)
-
-    def test_generate_insights_multiple_inputs(self):
-        input_data = [{"key1": "value1"}, {"key2": "value2"}, {"key3": "value3"}]
-        result = self.insight_generator.generate_insights(input_data)
-        self.assertIsInstance(result, list)
-        self.assertEqual(len(result), 3)
-
-    def test_generate_insights_invalid_input(self):
-        with self.assertRaises(TypeError):
-            self.insight_generator.generate_insights("invalid input")
-
-    def test_generate_insights_none_input(self):
-        with self.assertRaises(TypeError):
-            self.insight_generator.generate_insights(None)
+        self.server = FakeChatServer(reply=lambda messages: REPLY).start()
+        self.insight_generator = InsightGenerator(api_key="key", api_base=self.server.base_url)
+        self.insight_generator.token_counter = HeuristicCounter()
+
+    async def asyncTearDown(self):
+        await self.insight_generator.close()
+        self.server.stop()
+
+    def prompt(self) -> str:
+        return self.server.requests[-1]['messages'][-1]['content']
+
+    def test_api_key_is_required(self):
+        with patch.dict('os.environ', {}, clear=True):
+            with self.assertRaises(ValueError):
+                InsightGenerator()
+
+    async def test_generate_insights_empty_input(self):
+        result = await self.insight_generator.generate_insights({})
+        self.assertEqual(result, REPLY.strip())
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_generate_insights_single_input(self):
+        input_data = {'structure': {'README.md': 'file'}}
+        result = await self.insight_generator.generate_insights(input_data)
+        self.assertEqual(result, REPLY.strip())
+        self.assertIn('README.md', self.prompt())
+
+    async def test_generate_insights_multiple_inputs(self):
+        input_data = {
+            'structure': {'README.md': 'file', 'src/app.py': 'file'},
+            'documentation': {'README.md': {'project_name': 'Demo', 'description': 'A demo project.'}},
+        }
+        pieces = [piece async for piece in self.insight_generator.stream_insights(input_data)]
+        self.assertEqual(''.join(pieces).strip(), REPLY.strip())
+        for fact in ('src/app.py', 'Demo', 'A demo project.'):
+            self.assertIn(fact, self.prompt())
+
+    async def test_generate_insights_invalid_input(self):
+        with self.assertRaises(InsightGenerationError):
+            await self.insight_generator.generate_insights("invalid input")
+        self.assertEqual(self.server.request_count, 0)
+
+    async def test_generate_insights_none_input(self):
+        with self.assertRaises(InsightGenerationError):
+            await self.insight_generator.generate_insights(None)
+        self.assertEqual(self.server.request_count, 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from benchmarks.fake_openai import FakeChatServer
+from src.generation.chat_client import AsyncChatClient
+from src.generation.insight_generator import InsightGenerator
+from src.generation.map_reduce import TreeSummarizer, build_summary_tree
+from src.generation.response_cache import ResponseCache
+from tests.generation.test_prompt_builder import HeuristicCounter
+
+PATHS = ['README.md', 'setup.py'] + [f'src/pkg{group}/mod{index}.py' for group in range(6) for index in range(8)] + [
+    'docs/index.md', 'docs/api.md', 'tools/run.py',
+]
+
+
+class TestSummaryTree(unittest.TestCase):
+    def test_small_directories_merge_into_parent(self):
+        root = build_summary_tree(PATHS, min_files=5)
+
+        self.assertEqual(root.files, ['README.md', 'docs/api.md', 'docs/index.md', 'setup.py', 'tools/run.py'])
+        self.assertEqual([child.path for child in root.children], ['src'])
+        self.assertEqual([child.path for child in root.children[0].children], [f'src/pkg{group}' for group in range(6)])
+        self.assertEqual(root.size, len(PATHS))
+        self.assertEqual(sum(len(node.files) for node in root.walk()), len(PATHS))
+
+
+class TestTreeSummarizer(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = FakeChatServer(latency=0.05).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, 'summaries.sqlite'))
+        self.client = AsyncChatClient("key", self.server.base_url, max_concurrency=3, retry_wait=0.01)
+        self.facts = {path: f"facts about {path}" for path in PATHS}
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.cache.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def summarizer(self) -> TreeSummarizer:
+        return TreeSummarizer(self.client, "gpt-3.5-turbo", cache=self.cache, counter=HeuristicCounter())
+
+    async def test_directories_are_summarized_concurrently_within_limit(self):
+        summaries = await self.summarizer().summarize(build_summary_tree(PATHS), self.facts)
+
+        self.assertEqual(sorted(summaries), ['src'] + [f'src/pkg{group}' for group in range(6)])
+        self.assertEqual(self.server.request_count, 7)
+        self.assertEqual(self.server.max_in_flight, 3)
+        src_prompt = next(request['messages'][0]['content'] for request in self.server.requests
+                          if 'directory src/ ' in request['messages'][0]['content'])
+        self.assertIn(f"- src/pkg0/ (8 files): {summaries['src/pkg0']}", src_prompt)
+
+    async def test_unchanged_directories_come_from_cache(self):
+        first = await self.summarizer().summarize(build_summary_tree(PATHS), self.facts)
+        self.server.reset_counters()
+        self.assertEqual(await self.summarizer().summarize(build_summary_tree(PATHS), self.facts), first)
+        self.assertEqual(self.server.request_count, 0)
+
+        self.facts['src/pkg3/mod1.py'] = "changed"
+        summarizer = self.summarizer()
+        second = await summarizer.summarize(build_summary_tree(PATHS), self.facts)
+
+        self.assertEqual(summarizer.stats['calls'], 2)
+        self.assertEqual(summarizer.stats['cache_hits'], 5)
+        self.assertEqual({path for path in first if first[path] != second[path]}, {'src', 'src/pkg3'})
+
+    async def test_rate_limited_requests_are_retried(self):
+        self.server.failures = 4
+        summarizer = self.summarizer()
+        summaries = await summarizer.summarize(build_summary_tree(PATHS), self.facts)
+
+        self.assertEqual(len(summaries), 7)
+        self.assertEqual(summarizer.stats['failures'], 0)
+        self.assertEqual(self.server.request_count, 11)
+
+    async def test_failed_directory_is_left_out(self):
+        self.server.failures = 100
+        self.client.max_attempts = 1
+        summarizer = self.summarizer()
+        self.assertEqual(await summarizer.summarize(build_summary_tree(PATHS), self.facts), {})
+        self.assertEqual(summarizer.stats['failures'], 7)
+
+
+class TestMapReduceDescription(unittest.IsolatedAsyncioTestCase):
+    async def test_final_prompt_reduces_directory_summaries(self):
+        with FakeChatServer() as server:
+            generator = InsightGenerator(api_key="key", api_base=server.base_url, prompt_token_budget=800)
+            generator.token_counter = HeuristicCounter()
+            files = {path: {'definitions': ['run'], 'pagerank': 0.1} for path in PATHS if path.endswith('.py')}
+            description = await generator.generate_description_map_reduce({
+                'structure': {path: 'file' for path in PATHS},
+                'files': files,
+                'documentation': {'README.md': {'project_name': 'Demo', 'description': 'A demo project.'}},
+            })
+            await generator.close()
+
+        final_prompt = server.requests[-1]['messages'][0]['content']
+        self.assertEqual(len(server.requests), 8)
+        self.assertTrue(description.startswith("Summary "))
+        self.assertIn("**Directory Summaries:**", final_prompt)
+        self.assertIn("- src/: Summary ", final_prompt)
+        self.assertIn("**Project Name:** Demo", final_prompt)
+        self.assertIn("defines run", server.requests[0]['messages'][0]['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from src.generation.insight_generator import InsightGenerator
+from src.generation.prompt_builder import PromptBuilder, TokenCounter
+
+
+class HeuristicCounter(TokenCounter):
+    def __init__(self):
+        self.encoding = None
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.counter = HeuristicCounter()
+
+    def test_budget_is_filled_by_priority(self):
+        builder = PromptBuilder(60, self.counter)
+        builder.add("A", "low " * 20, 1)
+        builder.add("A", "high", 10)
+        builder.add("B", "middle " * 5, 5, summary="mid")
+        prompt = builder.build("Header", "Footer", ["A", "B"])
+
+        self.assertLessEqual(self.counter.count(prompt), 60)
+        self.assertIn("high", prompt)
+        self.assertIn("middle", prompt)
+        self.assertNotIn("low", prompt)
+        self.assertIn("- (1 more not shown)", prompt)
+        self.assertEqual(builder.stats['placed'], 2)
+
+    def test_summary_replaces_text_that_does_not_fit(self):
+        builder = PromptBuilder(40, self.counter)
+        builder.add("A", "detail " * 30, 5, summary="short form")
+        prompt = builder.build("Header", "Footer", ["A"])
+
+        self.assertIn("short form", prompt)
+        self.assertEqual(builder.stats['summarized'], 1)
+
+    def test_truncate_marks_the_cut(self):
+        text = "word " * 100
+        truncated = self.counter.truncate(text, 10)
+        self.assertLessEqual(self.counter.count(truncated), 10)
+        self.assertTrue(truncated.endswith("..."))
+        self.assertEqual(self.counter.truncate("short", 10), "short")
+
+
+class TestBudgetedPrompt(unittest.TestCase):
+    def setUp(self):
+        self.generator = InsightGenerator(api_key="key", prompt_token_budget=600)
+        self.generator.token_counter = HeuristicCounter()
+        structure = {'README.md': 'file', 'setup.py': 'file', 'src': 'dir', 'src/main.py': 'file'}
+        structure.update({f'src/pkg{group}/mod{index}.py': 'file' for group in range(200) for index in range(50)})
+        self.aggregated_info = {
+            'structure': structure,
+            'code': {
+                'totals': {'functions': 300, 'classes': 40},
+                'modules': 10001,
+                'key_modules': [
+                    {'path': f'src/pkg{rank}/mod0.py', 'pagerank': round(0.2 / (rank + 1), 4),
+                     'stats': {'functions': 3}, 'definitions': [f'Class{rank}'], 'imports': []}
+                    for rank in range(20)
+                ],
+            },
+            'documentation': {
+                'docs/guide.md': {'project_name': 'Guide', 'usage': 'guide ' * 300},
+                'README.md': {'project_name': 'Demo', 'description': 'A demo project.', 'usage': 'demo --help'},
+            },
+            'issues': {'total': 5, 'open': 2, 'closed': 3, 'recent': ['#5 Crash on start']},
+        }
+
+    def test_prompt_fits_budget_and_keeps_key_content(self):
+        prompt = self.generator.create_prompt(self.aggregated_info)
+
+        self.assertLessEqual(self.generator.token_counter.count(prompt), 600)
+        self.assertIn("**Project Name:** Demo", prompt)
+        self.assertIn("demo --help", prompt)
+        self.assertIn("- setup.py (entry point)", prompt)
+        self.assertIn("src/pkg0/mod0.py (PageRank 0.2)", prompt)
+        self.assertIn("- src/ (10001 files: 10001 .py)", prompt)
+        self.assertNotIn("src/pkg150/mod7.py", prompt)
+
+    def test_prompt_is_deterministic(self):
+        first = self.generator.create_prompt(self.aggregated_info)
+        self.assertEqual(self.generator.create_prompt(self.aggregated_info), first)
+
+    def test_larger_budget_includes_more(self):
+        small = self.generator.create_prompt(self.aggregated_info)
+        self.generator.prompt_token_budget = 3000
+        large = self.generator.create_prompt(self.aggregated_info)
+        self.assertGreater(len(large), len(small))
+        self.assertIn("src/pkg19/mod0.py", large)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from src.generation.insight_generator import InsightGenerator
+from src.generation.response_cache import ResponseCache
+from tests.generation.test_prompt_builder import HeuristicCounter
+
+AGGREGATED_INFO = {
+    'structure': {'README.md': 'file', 'src/app.py': 'file'},
+    'documentation': {'README.md': {'project_name': 'Demo', 'description': 'A demo project.'}},
+}
+
+
+def completion(content: str):
+    return SimpleNamespace(choices=[SimpleNamespace(message={'content': content})])
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, 'responses.sqlite'))
+        self.generator = InsightGenerator(api_key="key", response_cache=self.cache)
+        self.generator.token_counter = HeuristicCounter()
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_key_covers_model_parameters_and_messages(self):
+        messages = [{"role": "user", "content": "hi"}]
+        key = ResponseCache.key("gpt-4", 0.7, 100, messages)
+        self.assertEqual(key, ResponseCache.key("gpt-4", 0.7, 100, [{"content": "hi", "role": "user"}]))
+        self.assertNotEqual(key, ResponseCache.key("gpt-4", 0.2, 100, messages))
+        self.assertNotEqual(key, ResponseCache.key("gpt-4", 0.7, 200, messages))
+        self.assertNotEqual(key, ResponseCache.key("gpt-3.5-turbo", 0.7, 100, messages))
+        self.assertNotEqual(key, ResponseCache.key("gpt-4", 0.7, 100, [{"role": "user", "content": "hi!"}]))
+
+    @mock.patch('src.generation.insight_generator.openai.ChatCompletion.create')
+    def test_identical_request_is_answered_from_cache(self, create):
+        create.return_value = completion(" First description ")
+        self.assertEqual(self.generator.generate_description(AGGREGATED_INFO), "First description")
+        self.assertEqual(self.generator.generate_description(AGGREGATED_INFO), "First description")
+        self.assertEqual(create.call_count, 1)
+
+        self.generator.temperature = 0.2
+        self.generator.generate_description(AGGREGATED_INFO)
+        self.assertEqual(create.call_count, 2)
+
+    @mock.patch('src.generation.insight_generator.openai.ChatCompletion.create')
+    def test_bypass_requests_again_and_refreshes_cache(self, create):
+        create.return_value = completion("Old")
+        self.generator.generate_description(AGGREGATED_INFO)
+        create.return_value = completion("New")
+
+        self.assertEqual(self.generator.generate_description(AGGREGATED_INFO, use_cache=False), "New")
+        self.assertEqual(self.generator.generate_description(AGGREGATED_INFO), "New")
+        self.assertEqual(create.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from benchmarks.fake_openai import FakeChatServer
+from src.generation.chat_client import AsyncChatClient, ChatCompletionError
+from src.generation.insight_generator import InsightGenerator, InsightGenerationError
+from src.generation.response_cache import ResponseCache
+from src.utils.metrics import Metrics
+from tests.generation.test_prompt_builder import HeuristicCounter
+
+MESSAGES = [{"role": "user", "content": "Describe the project."}]
+REPLY = "A demo project that does one thing and does it well."
+AGGREGATED_INFO = {
+    'structure': {'README.md': 'file', 'src/app.py': 'file'},
+    'documentation': {'README.md': {'project_name': 'Demo', 'description': 'A demo project.'}},
+}
+
+
+class TestChatStream(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = FakeChatServer(reply=lambda messages: REPLY, chunk_delay=0.02).start()
+        self.client = AsyncChatClient("key", self.server.base_url, max_concurrency=1, retry_wait=0.01)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.stop()
+
+    async def test_pieces_arrive_before_the_completion_ends(self):
+        start = time.perf_counter()
+        pieces, first = [], None
+        async for piece in self.client.stream(MESSAGES, "gpt-3.5-turbo", 100, 0.0):
+            first = first or time.perf_counter() - start
+            pieces.append(piece)
+        total = time.perf_counter() - start
+
+        self.assertEqual(''.join(pieces), REPLY)
+        self.assertEqual(len(pieces), len(REPLY.split()))
+        self.assertLess(first, total / 3)
+        self.assertTrue(self.server.requests[0]['stream'])
+
+    async def test_failures_before_first_byte_are_retried(self):
+        self.server.failures = 2
+        pieces = [piece async for piece in self.client.stream(MESSAGES, "gpt-3.5-turbo", 100, 0.0)]
+
+        self.assertEqual(''.join(pieces), REPLY)
+        self.assertEqual(self.server.request_count, 3)
+
+    async def test_broken_stream_is_not_retried(self):
+        self.server.break_after_chunks = 2
+        pieces = []
+        with self.assertRaises(ChatCompletionError):
+            async for piece in self.client.stream(MESSAGES, "gpt-3.5-turbo", 100, 0.0):
+                pieces.append(piece)
+
+        self.assertEqual(pieces, REPLY.split(" ")[:1] + [" " + REPLY.split(" ")[1]])
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_cancelled_stream_releases_its_slot(self):
+        first_piece = asyncio.Event()
+
+        async def consume():
+            async for _ in self.client.stream(MESSAGES, "gpt-3.5-turbo", 100, 0.0):
+                first_piece.set()
+
+        task = asyncio.create_task(consume())
+        await first_piece.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        # With a concurrency of one, this only completes if the cancelled stream gave its slot back.
+        completion = await asyncio.wait_for(self.client.complete(MESSAGES, "gpt-3.5-turbo", 100, 0.0), 5)
+        self.assertEqual(completion, REPLY)
+
+    async def test_token_usage_is_reported_or_estimated(self):
+        metrics = Metrics()
+        self.client.metrics, self.client.count_tokens = metrics, lambda text: len(text.split())
+        await self.client.complete(MESSAGES, "gpt-3.5-turbo", 100, 0.0)
+        self.server.usage = True
+        pieces = [piece async for piece in self.client.stream(MESSAGES, "gpt-3.5-turbo", 100, 0.0)]
+        await self.client.complete(MESSAGES, "gpt-3.5-turbo", 100, 0.0)
+
+        prompt, completion = len(MESSAGES[0]['content'].split()), len(REPLY.split())
+        self.assertEqual(''.join(pieces), REPLY)
+        self.assertEqual(metrics.counter('llm_requests'), 3)
+        self.assertEqual(metrics.counter('llm_tokens', kind='prompt', source='estimated'), prompt)
+        self.assertEqual(metrics.counter('llm_tokens', kind='completion', source='estimated'), completion)
+        self.assertEqual(metrics.counter('llm_tokens', kind='prompt', source='reported'), 2 * prompt)
+        self.assertEqual(metrics.counter('llm_tokens', kind='completion', source='reported'), 2 * completion)
+
+
+class TestStreamInsights(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = FakeChatServer(reply=lambda messages: REPLY).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self.temp_dir.name, 'responses.sqlite'))
+        self.generator = InsightGenerator(api_key="key", api_base=self.server.base_url, response_cache=self.cache)
+        self.generator.token_counter = HeuristicCounter()
+
+    async def asyncTearDown(self):
+        await self.generator.close()
+        self.cache.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    async def test_streamed_description_is_cached_once_complete(self):
+        pieces = [piece async for piece in self.generator.stream_insights(AGGREGATED_INFO)]
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(''.join(pieces), REPLY)
+
+        self.assertEqual(await self.generator.generate_insights(AGGREGATED_INFO), REPLY)
+        self.assertEqual(self.server.request_count, 1)
+
+    async def test_interrupted_description_is_not_cached(self):
+        stream = self.generator.stream_insights(AGGREGATED_INFO)
+        await stream.__anext__()
+        await stream.aclose()
+
+        self.assertEqual(await self.generator.generate_insights(AGGREGATED_INFO), REPLY)
+        self.assertEqual(self.server.request_count, 2)
+
+    async def test_failures_raise_generation_error(self):
+        self.server.failures = 100
+        self.generator.get_chat_client().max_attempts = 1
+        with self.assertRaises(InsightGenerationError):
+            await self.generator.generate_insights(AGGREGATED_INFO)
+        with self.assertRaises(InsightGenerationError):
+            await self.generator.generate_insights([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.fake_openai import FakeChatServer
+from src.batch import BatchRunner, completed_urls, read_repo_urls
+from src.main import RepoInsight
+from tests.test_main import make_config
+
+FILES = {
+    "README.md": b"# Demo\n\nA demo project.\n",
+    "src/app.py": b"import os\n\ndef main():\n    return os.getcwd()\n",
+}
+
+
+class TimedOutput(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.write_times = []
+
+    def write(self, text: str) -> int:
+        self.write_times.append(time.perf_counter())
+        return super().write(text)
+
+
+class TestBatchRunner(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.names = [f"octo/repo{index}" for index in range(4)]
+        self.server = FakeGitHubServer(FILES, owner="octo", name="repo0", mirrors=self.names[1:]).start()
+        self.chat = FakeChatServer(latency=0.2).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        config = make_config(self.temp_dir.name, self.server.base_url, openai={'api_base': self.chat.base_url})
+        self.repo_insight = RepoInsight(config)
+        self.urls = [f"https://github.com/{name}" for name in self.names]
+
+    async def asyncTearDown(self):
+        await self.repo_insight.close()
+        self.chat.stop()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def records(self, out: io.StringIO):
+        return [json.loads(line) for line in out.getvalue().splitlines()]
+
+    async def test_each_repository_gets_a_record(self):
+        out = io.StringIO()
+        urls = self.urls[:2] + ["https://github.com/octo/missing", "https://example.com/octo/repo0"]
+        counts = await BatchRunner(self.repo_insight, concurrency=4, timeout=30).run(urls, out)
+
+        records = {record['url']: record for record in self.records(out)}
+        self.assertEqual(counts, {'ok': 2, 'error': 2, 'timeout': 0})
+        self.assertEqual(set(records), set(urls))
+        self.assertEqual(records[self.urls[1]]['repository'], "octo/repo1")
+        self.assertTrue(records[self.urls[1]]['description'].startswith("Summary "))
+        self.assertEqual(records["https://github.com/octo/missing"]['error'], "Failed to access repository.")
+        self.assertEqual(records["https://example.com/octo/repo0"]['status'], 'error')
+        self.assertEqual(self.repo_insight.symbol_indexes, {})
+        self.assertEqual(self.repo_insight.import_graphs, {})
+
+    async def test_concurrency_is_capped_and_records_stream_out(self):
+        out = TimedOutput()
+        start = time.perf_counter()
+        await BatchRunner(self.repo_insight, concurrency=2, timeout=30).run(self.urls, out)
+        total = time.perf_counter() - start
+
+        self.assertEqual(self.chat.max_in_flight, 2)
+        self.assertEqual(len(self.records(out)), 4)
+        self.assertLess(out.write_times[0] - start, total * 0.75)
+
+    async def test_slow_repositories_time_out(self):
+        self.chat.latency = 2.0
+        out = io.StringIO()
+        counts = await BatchRunner(self.repo_insight, concurrency=4, timeout=0.5).run(self.urls[:2], out)
+
+        self.assertEqual(counts['timeout'], 2)
+        self.assertTrue(all(record['seconds'] < 1.5 for record in self.records(out)))
+        self.assertEqual(self.repo_insight.symbol_indexes, {})
+        self.assertEqual(self.repo_insight.file_plans, {})
+        self.assertEqual(self.repo_insight.opened, {})
+
+
+class TestBatchFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name: str, text: str) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as output_file:
+            output_file.write(text)
+        return path
+
+    def test_read_repo_urls_skips_comments_and_repeats(self):
+        path = self.write('repos.txt', "# nightly\nhttps://github.com/a/b\n\nhttps://github.com/c/d\nhttps://github.com/a/b\n")
+        self.assertEqual(read_repo_urls(path), ["https://github.com/a/b", "https://github.com/c/d"])
+
+    def test_completed_urls_ignores_failures_and_truncated_lines(self):
+        path = self.write('results.jsonl', '{"url": "u1", "status": "ok"}\n{"url": "u2", "status": "timeout"}\n{"url": "u3", "sta')
+        self.assertEqual(completed_urls(path), {"u1"})
+        self.assertEqual(completed_urls(os.path.join(self.temp_dir.name, 'missing.jsonl')), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
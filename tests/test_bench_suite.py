@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.bench_suite import compare, run_scenario, save_baseline
+from benchmarks.synthetic import RepositorySpec, make_items, make_repository
+
+
+class TestSyntheticRepository(unittest.TestCase):
+    def test_scale_and_determinism(self):
+        spec = RepositorySpec(files=60, depth=3, file_size=1000, doc_ratio=0.25)
+        files = make_repository(spec)
+
+        self.assertEqual(files, make_repository(spec))
+        self.assertNotEqual(files, make_repository(RepositorySpec(files=60, depth=3, file_size=1000, seed=1)))
+        self.assertEqual(len(files), 60)
+        self.assertEqual(sum(path.endswith('.md') for path in files), 1 + round(59 * 0.25))
+        self.assertLessEqual(max(path.count('/') for path in files), 1 + 3)
+        self.assertTrue(all(500 <= len(data) <= 2000 + 200 for path, data in files.items() if path != 'README.md'))
+        self.assertIn(b'import ', files[max(path for path in files if path.endswith('.py'))])
+
+    def test_items(self):
+        pulls = make_items(20, pull_requests=True)
+        self.assertEqual([pull['number'] for pull in pulls], list(range(1, 21)))
+        self.assertTrue(all(pull['state'] == ('closed' if pull['closed_at'] else 'open') for pull in pulls))
+        self.assertTrue(all(pull['merged_at'] in (None, pull['closed_at']) for pull in pulls))
+        self.assertNotIn('merged_at', make_items(1)[0])
+
+
+class TestBenchSuite(unittest.TestCase):
+    def setUp(self):
+        self.result = run_scenario(RepositorySpec(files=12, depth=2, file_size=500, issues=5, pulls=3),
+                                   latency=0.0, chat_latency=0.0, repeat=1)
+
+    def test_run_scenario(self):
+        self.assertEqual(self.result['files'], 12)
+        self.assertTrue({'total', 'tree', 'plan', 'fetch_analyze', 'generate'} <= set(self.result['seconds']))
+        self.assertIn('fetch_analyze', self.result['throughput'])
+        self.assertNotIn('generate', self.result['throughput'])
+        self.assertGreater(self.result['requests'], 12)
+
+    def test_compare_with_saved_baseline(self):
+        result = dict(self.result, seconds={'total': 1.0, 'fetch_analyze': 0.5, 'plan': 0.001, 'index': 0.2})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baselines', 'baseline.json')
+            save_baseline(path, {'small': result})
+            with open(path, encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+
+        current = dict(result, seconds={'total': 1.1, 'fetch_analyze': 0.8, 'plan': 0.01, 'index': 0.1, 'tree': 0.3})
+        statuses = {row['timing']: row['status'] for row in compare({'small': current}, baseline, tolerance=0.25)}
+        self.assertEqual(statuses, {'total': 'ok', 'fetch_analyze': 'regression', 'plan': 'noise',
+                                    'index': 'improved', 'tree': 'new'})
+
+        rescaled = dict(current, spec=dict(current['spec'], files=13))
+        rows = compare({'small': rescaled, 'other': current}, baseline, tolerance=0.25)
+        self.assertEqual({(row['scenario'], row['status']) for row in rows}, {('small', 'incomparable'), ('other', 'new')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,381 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+import yaml
+from benchmarks.fake_github import FakeGitHubServer
+from benchmarks.fake_openai import FakeChatServer
+from src.config.config_manager import ConfigManager
+from src.analysis.symbol_index import SymbolIndex
+from src.main import RepoInsight, main
+from src.utils.file_utils import git_blob_sha
+
+
+def make_config(directory: str, base_url: str, **sections) -> ConfigManager:
+    settings = {
+        'github': {'api_token': 'token', 'api_url': base_url},
+        'openai': {'api_key': 'key'},
+        'cache': {'directory': None},
+    }
+    for section, values in sections.items():
+        settings.setdefault(section, {}).update(values)
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as config_file:
+        yaml.safe_dump(settings, config_file)
+    return ConfigManager(path)
+
+
+class TestRepoInsightFileAnalysis(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = FakeGitHubServer({
+            "README.md": b"# Demo\n\nA demo project.\n\n## Usage\n\nRun it.\n",
+            "src/app.py": b"import os\n\ndef main():\n    return os.getcwd()\n",
+            "assets/logo.png": b"\x89PNG",
+        }).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_insight = self.make_repo_insight()
+        self.repo = self.repo_insight.github_api.get_repository(f"https://github.com/{self.server.full_name}")
+        self.tree = self.repo_insight.github_api.get_repository_tree(self.repo)
+        self.server.reset_counters()
+
+    def make_repo_insight(self, **sections) -> RepoInsight:
+        return RepoInsight(make_config(self.temp_dir.name, self.server.base_url, **sections))
+
+    async def asyncTearDown(self):
+        await self.repo_insight.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def content_requests(self) -> Counter:
+        return Counter(path for path in self.server.request_paths if "/contents/" in path)
+
+    async def test_each_file_is_fetched_once(self):
+        results = await self.repo_insight.analyze_files(self.repo, self.tree)
+
+        self.assertEqual(sorted(self.content_requests().values()), [1, 1])
+        self.assertEqual(results['code_analysis']['src/app.py']['functions'], 1)
+        self.assertIn('src/app.py', results['doc_analysis'])
+        self.assertEqual(results['doc_analysis']['README.md']['project_name'], 'Demo')
+
+    async def test_extra_tokens_alone_are_enough(self):
+        with patch.dict(os.environ):
+            os.environ.pop('GITHUB_TOKEN', None)
+            os.environ.pop('GITHUB_TOKENS', None)
+            repo_insight = self.make_repo_insight(github={'api_token': None, 'api_tokens': ['token-a', 'token-b']})
+        try:
+            results = await repo_insight.analyze_files(self.repo, self.tree)
+            self.assertEqual(results['code_analysis']['src/app.py']['functions'], 1)
+            self.assertEqual(repo_insight.async_client.scheduler.stats()['tokens'], 2)
+        finally:
+            await repo_insight.close()
+
+    async def test_archive_mode_matches_per_file_mode(self):
+        per_file = await self.repo_insight.analyze_files(self.repo, self.tree)
+        archive = await self.repo_insight.analyze_archive(self.repo)
+        self.assertEqual(per_file, archive)
+
+    async def test_pooled_archive_mode_matches_per_file_mode(self):
+        per_file = await self.repo_insight.analyze_files(self.repo, self.tree)
+        pooled_run = self.make_repo_insight(analysis={'workers': 2})
+        archive = await pooled_run.analyze_archive(self.repo)
+        chunks_sent = pooled_run.process_pool.chunks_sent
+        await pooled_run.close()
+
+        self.assertEqual(per_file, archive)
+        self.assertGreater(chunks_sent, 0)
+
+    async def test_graphql_mode_matches_per_file_mode(self):
+        per_file = await self.repo_insight.analyze_files(self.repo, self.tree)
+        self.server.reset_counters()
+
+        self.repo_insight.ingest_mode = "graphql"
+        batched = await self.repo_insight.analyze_files(self.repo, self.tree)
+
+        self.assertEqual(per_file, batched)
+        self.assertEqual(self.server.request_paths, ["/graphql"])
+
+    async def test_process_pool_matches_inline_analysis(self):
+        inline_run = self.make_repo_insight(analysis={'workers': 0})
+        inline = await inline_run.analyze_files(self.repo, self.tree)
+        await inline_run.close()
+        self.assertIsNone(inline_run.process_pool)
+        pooled_run = self.make_repo_insight(analysis={'workers': 2})
+        pooled = await pooled_run.analyze_files(self.repo, self.tree)
+        await pooled_run.close()
+        self.assertEqual(inline, pooled)
+
+    async def test_unchanged_blobs_are_served_from_analysis_cache(self):
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        first_run = self.make_repo_insight(cache={'directory': cache_dir})
+        first = await first_run.analyze_files(self.repo, self.tree)
+        await first_run.close()
+        self.server.reset_counters()
+
+        second_run = self.make_repo_insight(cache={'directory': cache_dir})
+        second = await second_run.analyze_files(self.repo, self.tree)
+        stats = second_run.analysis_cache.stats()
+        await second_run.close()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.content_requests(), Counter())
+        self.assertEqual(stats['misses'], 0)
+        self.assertEqual(stats['hits'], 4)
+
+    async def test_vendored_generated_and_large_files_are_not_fetched(self):
+        self.server.push({
+            "README.md": b"# Demo\n",
+            "src/app.py": b"def main():\n    pass\n",
+            "src/big.py": b"x = 1\n" * 200,
+            "vendor/lib.py": b"def vendored():\n    pass\n",
+            "static/app.min.js": b"var a=1;",
+            "gen/schema.py": b"SCHEMA = {}\n",
+            ".gitattributes": b"gen/** linguist-generated\n",
+        })
+        repo_insight = self.make_repo_insight(analysis={'max_file_size': 1000})
+        try:
+            tree, results = await repo_insight.analyze_repository_files(self.repo)
+            summary = repo_insight.file_plans[self.repo.full_name].summary()
+        finally:
+            await repo_insight.close()
+
+        fetched = sorted(path.split("/contents/")[1].split("?")[0] for path in self.content_requests())
+        self.assertEqual(fetched, [".gitattributes", "README.md", "src/app.py"])
+        self.assertIn("vendor/lib.py", tree)
+        self.assertEqual(set(results['code_analysis']), {"src/app.py"})
+        self.assertEqual(summary['by_reason'], {'too_large': 1, 'vendored': 1, 'generated': 2})
+        self.assertEqual(summary['requests_avoided'], 4)
+        self.assertEqual(summary['bytes_avoided'], 1200 + 25 + 8 + 12)
+
+    async def test_description_is_streamed(self):
+        with FakeChatServer(reply=lambda messages: "Demo is a small demo project.") as chat:
+            repo_insight = self.make_repo_insight(openai={'api_base': chat.base_url})
+            try:
+                pieces = [piece async for piece in repo_insight.stream_repository(f"https://github.com/{self.server.full_name}")]
+            finally:
+                await repo_insight.close()
+
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(''.join(pieces), "Demo is a small demo project.")
+        self.assertIn("**Project Name:** Demo", chat.requests[0]['messages'][0]['content'])
+
+    async def test_run_is_instrumented(self):
+        cache = {'directory': os.path.join(self.temp_dir.name, 'cache')}
+        with FakeChatServer(reply=lambda messages: "Demo is a small demo project.", usage=True) as chat:
+            repo_insight = self.make_repo_insight(openai={'api_base': chat.base_url}, cache=cache)
+            try:
+                await repo_insight.analyze_repository(f"https://github.com/{self.server.full_name}")
+                metrics = repo_insight.collect_metrics()
+                report = metrics.report()
+            finally:
+                await repo_insight.close()
+
+        self.assertTrue({'open', 'tree', 'plan', 'fetch_analyze', 'index', 'structure', 'generate'} <= set(report['stages']))
+        # The asynchronous client's requests: file contents, and the issue and pull request listings.
+        self.assertEqual(metrics.counter('http_requests'), len(self.content_requests()) + 2)
+        self.assertGreater(metrics.counter('http_response_bytes'), 0)
+        self.assertEqual(metrics.counter('files_analyzed'), 2)
+        self.assertEqual({entry['path'] for entry in report['files']['slowest']}, {'README.md', 'src/app.py'})
+        self.assertEqual(metrics.counter('llm_requests'), 1)
+        self.assertGreater(metrics.counter('llm_tokens', kind='prompt', source='reported'), 0)
+        ratios = {entry['labels']['cache']: entry['value'] for entry in report['gauges'] if entry['name'] == 'cache_hit_ratio'}
+        self.assertEqual(ratios['analysis'], 0.0)
+        self.assertIn('repoinsight_stage_wall_seconds_total{stage="fetch_analyze"}', metrics.to_prometheus())
+
+
+class TestIncrementalAnalysis(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.files = {
+            "README.md": b"# Demo\n\nA demo project.\n",
+            "src/app.py": b"def main():\n    pass\n",
+            "src/util.py": b"x = 1\n",
+            "old/legacy.py": b"class Legacy:\n    pass\n",
+        }
+        self.server = FakeGitHubServer(dict(self.files)).start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        cache = {'directory': os.path.join(self.temp_dir.name, 'cache')}
+        self.repo_insight = RepoInsight(make_config(self.temp_dir.name, self.server.base_url, cache=cache),
+                                        incremental=True)
+        self.repo = self.repo_insight.github_api.get_repository(f"https://github.com/{self.server.full_name}")
+
+    async def asyncTearDown(self):
+        await self.repo_insight.close()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    async def test_only_changed_paths_are_refetched(self):
+        await self.repo_insight.analyze_repository_files(self.repo)
+
+        files = dict(self.files)
+        files["src/app.py"] = b"def main():\n    pass\n\ndef helper():\n    pass\n"
+        files["src/new.py"] = b"import os\n"
+        del files["old/legacy.py"]
+        self.server.push(files)
+        self.server.reset_counters()
+
+        tree, results = await self.repo_insight.analyze_repository_files(self.repo)
+
+        fetched = sorted(path.split("/contents/")[1] for path in self.server.request_paths if "/contents/" in path)
+        self.assertEqual(fetched, ["src/app.py", "src/new.py"])
+        # Only the root and src/ are listed, to learn the changed files' sizes.
+        self.assertEqual(sum("/git/trees/" in path for path in self.server.request_paths), 2)
+        self.assertEqual(tree['src/app.py'].size, len(files["src/app.py"]))
+        self.assertEqual(tree['src/new.py'].size, len(b"import os\n"))
+        self.assertEqual(results['code_analysis']['src/app.py']['functions'], 2)
+        self.assertEqual(results['code_analysis']['src/new.py']['imports'], 1)
+        self.assertNotIn('old/legacy.py', results['code_analysis'])
+        self.assertNotIn('old', tree)
+        self.assertNotIn('old/legacy.py', tree)
+        self.assertEqual(tree['src/new.py'].sha, git_blob_sha(b"import os\n"))
+        self.assertIn('README.md', results['doc_analysis'])
+
+    async def test_symbol_index_follows_incremental_changes(self):
+        await self.repo_insight.analyze_repository_files(self.repo)
+        files = dict(self.files)
+        files["src/app.py"] = b"def main():\n    pass\n\ndef helper():\n    pass\n"
+        del files["old/legacy.py"]
+        self.server.push(files)
+
+        await self.repo_insight.analyze_repository_files(self.repo)
+
+        symbol_index = self.repo_insight.symbol_index
+        self.assertEqual([symbol.name for symbol in symbol_index.file_symbols('src/app.py')], ['main', 'helper'])
+        self.assertEqual(symbol_index.lookup('Legacy'), [])
+        saved = SymbolIndex.load(os.path.join(self.temp_dir.name, 'cache', 'symbols', self.server.full_name.replace('/', '__') + '.idx'))
+        self.assertEqual(saved.lookup('helper'), symbol_index.lookup('helper'))
+        saved.close()
+
+    async def test_unchanged_symbols_reuse_saved_index(self):
+        await self.repo_insight.analyze_repository_files(self.repo)
+        built = self.repo_insight.symbol_index
+        self.assertNotIsInstance(built.row_start, memoryview)
+
+        await self.repo_insight.analyze_repository_files(self.repo)
+
+        reused = self.repo_insight.symbol_index
+        self.assertIsInstance(reused.row_start, memoryview)
+        self.assertEqual(reused.file_symbols('src/app.py'), built.file_symbols('src/app.py'))
+
+        files = dict(self.files)
+        files["src/app.py"] = b"def main():\n    pass\n\ndef helper():\n    pass\n"
+        self.server.push(files)
+        await self.repo_insight.analyze_repository_files(self.repo)
+
+        # The replaced index's map is released rather than left open.
+        with self.assertRaises(ValueError):
+            reused.row_start[0]
+        self.repo_insight.release(self.repo.full_name)
+
+    async def test_report_details_most_imported_modules(self):
+        files = dict(self.files)
+        files["src/app.py"] = b"from src import util\n\ndef main():\n    pass\n"
+        files["old/legacy.py"] = b"from src.util import x\n\nclass Legacy:\n    pass\n"
+        self.server.push(files)
+        self.repo_insight.detailed_modules = 2
+
+        tree, results = await self.repo_insight.analyze_repository_files(self.repo)
+        summary = self.repo_insight.summarize_code(self.repo.full_name, results['code_analysis'])
+
+        self.assertEqual(summary['modules'], 3)
+        self.assertEqual(summary['totals']['functions'], 1)
+        self.assertEqual([module['path'] for module in summary['key_modules']], ['src/util.py', 'old/legacy.py'])
+        self.assertEqual(summary['key_modules'][1]['definitions'], ['Legacy'])
+        self.assertEqual(summary['key_modules'][1]['imports'], ['src/util.py'])
+
+        facts = self.repo_insight.file_facts(self.repo.full_name, results)
+        self.assertEqual(facts['old/legacy.py']['definitions'], ['Legacy'])
+        self.assertGreater(facts['src/util.py']['pagerank'], facts['src/app.py']['pagerank'])
+        self.assertEqual(facts['src/app.py']['code']['functions'], 1)
+
+    async def test_issue_sync_resumes_from_cursor(self):
+        self.server.issues = [
+            {"number": number, "title": f"Issue {number}", "state": "open",
+             "updated_at": f"2024-01-0{number}T00:00:00Z"}
+            for number in range(1, 5)
+        ]
+        first = await self.repo_insight.analyze_activity(self.repo.full_name, "issues")
+
+        self.server.issues[0] = dict(self.server.issues[0], state="closed", updated_at="2024-02-01T00:00:00Z")
+        self.server.reset_counters()
+        second = await self.repo_insight.analyze_activity(self.repo.full_name, "issues")
+
+        self.assertEqual((first['total'], first['open']), (4, 4))
+        self.assertEqual((second['total'], second['open'], second['closed']), (4, 3, 1))
+        self.assertEqual(second['recent'][0], "#1 Issue 1")
+        self.assertEqual(len(self.server.request_paths), 1)
+
+    async def test_unchanged_head_needs_no_content_requests(self):
+        first_tree, first_results = await self.repo_insight.analyze_repository_files(self.repo)
+        self.server.reset_counters()
+
+        tree, results = await self.repo_insight.analyze_repository_files(self.repo)
+
+        self.assertEqual(results, first_results)
+        self.assertEqual(set(tree), set(first_tree))
+        self.assertFalse(any("/contents/" in path for path in self.server.request_paths))
+
+
+class TestCommandLine(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = FakeGitHubServer({
+            "README.md": b"# Demo\n\nA demo project.\n",
+            "src/app.py": b"def main():\n    pass\n",
+        }).start()
+        self.chat = FakeChatServer(reply=lambda messages: "Demo is a small demo project.").start()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_url = f"https://github.com/{self.server.full_name}"
+
+    def tearDown(self):
+        self.chat.stop()
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    async def run_main(self, *argv: str, **sections) -> str:
+        config = make_config(self.temp_dir.name, self.server.base_url,
+                             openai={'api_base': self.chat.base_url}, **sections)
+        output = StringIO()
+        with patch.dict(os.environ, {'REPOINSIGHT_CONFIG': config.config_path}), redirect_stdout(output):
+            await main(list(argv))
+        return output.getvalue()
+
+    async def test_repository_from_the_command_line(self):
+        metrics_path = os.path.join(self.temp_dir.name, 'run.json')
+        with patch('builtins.input', side_effect=AssertionError("prompted")):
+            output = await self.run_main(self.repo_url, '--metrics', metrics_path)
+
+        self.assertEqual(output.strip(), "Demo is a small demo project.")
+        self.assertTrue(os.path.exists(metrics_path))
+
+    async def test_ingest_mode_from_flag_or_configuration(self):
+        await self.run_main(self.repo_url, '--ingest', 'archive')
+        self.assertTrue(any(path.startswith('/_codeload/') for path in self.server.request_paths))
+        self.assertFalse(any('/contents/' in path for path in self.server.request_paths))
+
+        self.server.reset_counters()
+        await self.run_main(self.repo_url, analysis={'ingest_mode': 'graphql'})
+        self.assertIn('/graphql', self.server.request_paths)
+        self.assertFalse(any('/contents/' in path for path in self.server.request_paths))
+
+        output = await self.run_main(self.repo_url, analysis={'ingest_mode': 'tarball'})
+        self.assertIn("Unknown ingest mode 'tarball'", output)
+
+    async def test_incremental_from_flag_or_configuration(self):
+        cache = {'directory': os.path.join(self.temp_dir.name, 'cache')}
+        await self.run_main(self.repo_url, '--incremental', cache=cache)
+        self.server.reset_counters()
+        await self.run_main(self.repo_url, cache=cache, analysis={'incremental': True})
+        # The head is unchanged, so the tree kept by the last run is reused.
+        self.assertFalse(any('/git/trees/' in path for path in self.server.request_paths))
+
+        output = await self.run_main(self.repo_url, '--incremental')
+        self.assertIn("Incremental mode requires a cache directory", output)
+
+    async def test_repository_and_batch_are_exclusive(self):
+        with self.assertRaises(SystemExit), redirect_stdout(StringIO()), patch('sys.stderr', StringIO()):
+            await self.run_main(self.repo_url, '--batch', 'repos.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from src.utils.disk_cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache.sqlite')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_values_persist_across_instances(self):
+        cache = DiskCache(self.path)
+        cache.set('key', b'value')
+        cache.close()
+
+        cache = DiskCache(self.path)
+        self.assertEqual(cache.get('key'), b'value')
+        self.assertIsNone(cache.get('other'))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'entries': 1, 'bytes': 5})
+        cache.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = DiskCache(self.path, max_bytes=30)
+        cache.set('a', b'x' * 10)
+        cache.set('b', b'x' * 10)
+        cache.set('c', b'x' * 10)
+        cache.get('a')
+        cache.set('d', b'x' * 10)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('d'))
+        self.assertLessEqual(cache.total_bytes, 30)
+        cache.close()
+
+    def test_overwrite_updates_size(self):
+        cache = DiskCache(self.path)
+        cache.set('a', b'x' * 10)
+        cache.set('a', b'x' * 4)
+        self.assertEqual(cache.total_bytes, 4)
+        cache.close()
+
+    def test_expired_entries_are_misses(self):
+        cache = DiskCache(self.path, ttl=60)
+        cache.set('a', b'x' * 10)
+        cache.set('b', b'x' * 5)
+        self.assertEqual(cache.get('a'), b'x' * 10)
+
+        with mock.patch('src.utils.disk_cache.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get('a'))
+            self.assertEqual(cache.total_bytes, 5)
+            self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.total_bytes, 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import json
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from src.utils.metrics import Metrics, Profiler
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics(slow_files=2)
+
+    def test_stages_accumulate_wall_and_cpu_time(self):
+        for _ in range(2):
+            with self.metrics.stage('analyze'):
+                busy(0.02)
+        with self.assertRaises(RuntimeError):
+            with self.metrics.stage('fetch'):
+                raise RuntimeError("failed stages are timed too")
+
+        stages = self.metrics.report()['stages']
+        self.assertEqual(stages['analyze']['calls'], 2)
+        self.assertGreaterEqual(stages['analyze']['wall_seconds'], 0.04)
+        self.assertGreater(stages['analyze']['cpu_seconds'], 0)
+        self.assertEqual(stages['fetch']['calls'], 1)
+
+    def test_counters_gauges_and_slowest_files(self):
+        self.metrics.incr('http_requests', client='github', method='GET', status=200)
+        self.metrics.incr('http_requests', 2, client='github', method='GET', status=200)
+        self.metrics.incr('http_requests', client='github', method='GET', status=404)
+        self.metrics.gauge('cache_hit_ratio', 0.5, cache='analysis')
+        self.metrics.gauge('cache_hit_ratio', 0.75, cache='analysis')
+        for path, seconds in (('a.py', 0.1), ('b.py', 0.3), ('c.py', 0.2)):
+            self.metrics.observe_file(path, seconds)
+
+        report = self.metrics.report()
+        self.assertEqual(self.metrics.counter('http_requests'), 4)
+        self.assertEqual(self.metrics.counter('http_requests', client='github', method='GET', status=200), 3)
+        self.assertEqual(report['gauges'], [{'name': 'cache_hit_ratio', 'labels': {'cache': 'analysis'}, 'value': 0.75}])
+        self.assertEqual(report['files']['count'], 3)
+        self.assertAlmostEqual(report['files']['seconds'], 0.6)
+        self.assertEqual([entry['path'] for entry in report['files']['slowest']], ['b.py', 'c.py'])
+
+    def test_prometheus_exposition(self):
+        with self.metrics.stage('plan'):
+            pass
+        self.metrics.incr('http_response_bytes', 1024, client='github')
+        self.metrics.gauge('cache_hit_ratio', 0.25, cache='http')
+        self.metrics.observe_file('src/"odd".py', 0.5)
+
+        text = self.metrics.to_prometheus()
+        lines = text.splitlines()
+        self.assertIn('# TYPE repoinsight_http_response_bytes_total counter', lines)
+        self.assertIn('repoinsight_http_response_bytes_total{client="github"} 1024', lines)
+        self.assertIn('repoinsight_cache_hit_ratio{cache="http"} 0.25', lines)
+        self.assertIn('repoinsight_stage_calls_total{stage="plan"} 1', lines)
+        self.assertIn('repoinsight_file_analysis_seconds_count 1', lines)
+        self.assertIn('repoinsight_slow_file_seconds{path="src/\\"odd\\".py"} 0.5', lines)
+        self.assertTrue(all(line.startswith('#') or line.startswith('repoinsight_') for line in lines))
+
+    def test_exports_are_written(self):
+        self.metrics.incr('files_analyzed', 3)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, 'reports', 'run.json')
+            prometheus_path = os.path.join(directory, 'run.prom')
+            self.metrics.write_json(json_path)
+            self.metrics.write_prometheus(prometheus_path)
+
+            with open(json_path, encoding='utf-8') as report_file:
+                report = json.load(report_file)
+            with open(prometheus_path, encoding='utf-8') as prometheus_file:
+                exposition = prometheus_file.read()
+        self.assertEqual(report['counters'], [{'name': 'files_analyzed', 'labels': {}, 'value': 3}])
+        self.assertIn('repoinsight_files_analyzed_total 3', exposition)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_cprofile_covers_profiled_stages_only(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = Metrics(profiler=Profiler('cprofile', directory))
+            with metrics.stage('generate'):
+                busy(0.01)
+            self.assertIsNone(metrics.profiler.write())
+            with metrics.stage('fetch_analyze'):
+                with metrics.stage('index'):
+                    busy(0.01)
+            path = metrics.profiler.write()
+            functions = {function for _, _, function in pstats.Stats(path).stats}
+        self.assertIn('busy', functions)
+
+    def test_sampler_records_stacks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = Profiler('sample', directory, interval=0.001)
+            metrics = Metrics(profiler=profiler)
+            with metrics.stage('fetch_analyze'):
+                busy(0.1)
+            path = profiler.write()
+            with open(path, encoding='utf-8') as folded:
+                stacks = folded.read()
+        self.assertIn('busy (test_metrics.py:', stacks)
+        self.assertIsNone(profiler._sampler)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Profiler('perf', 'profiles')
+
+
+if __name__ == '__main__':
+    unittest.main()